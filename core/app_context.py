@@ -5,8 +5,9 @@
 Устраняет дублирование создания сервисов в разных местах.
 """
 
+import threading
 import logging
-from typing import Dict, Any
+from typing import Callable, Dict, Any
 
 from core.business.project_service import ProjectService
 from core.business.code_service import CodeService
@@ -15,117 +16,150 @@ from core.business.ast_service import ASTService
 from core.business.code_manager import CodeManager
 from core.business.change_service import ChangeManager
 from core.business.project_creator_service import ProjectCreatorService
+from core.business.template_registry import TemplateRegistry
 from core.business.ai_schema_service import AISchemaService  # Используем новый сервис
 from core.business.diff_engine import DiffEngine
+from core.business.undo_manager import UndoManager
+from core.business.parse_cache import ParseCache
+from core.business.workspace_service import WorkspaceService
+from core.data.file_cache import FileCache
 from core.data.project_repository import ProjectRepository
 from core.business.error_handler import handle_errors
 
 logger = logging.getLogger('ai_code_assistant')
 
+
+class MockAnalysisService(IAnalysisService):
+    """Сервис анализа (мок-реализация)"""
+    
+    @handle_errors(default_return=[])
+    def analyze_code(self, project_path: str):
+        return [
+            {'type': 'info', 'message': 'Анализ начат', 'file': '', 'line': 0},
+            {'type': 'warning', 'message': 'Неиспользуемый импорт', 'file': 'main.py', 'line': 5},
+            {'type': 'error', 'message': 'Синтаксическая ошибка', 'file': 'utils.py', 'line': 10},
+            {'type': 'success', 'message': 'Анализ завершен', 'file': '', 'line': 0}
+        ]
+    
+    @handle_errors(default_return="")
+    def get_report(self, project_path: str) -> str:
+        return "Отчет анализа: найдено 2 проблемы (мок-реализация)"
+    
+    @handle_errors(default_return=False)
+    def auto_refactor(self, project_path: str) -> bool:
+        return True
+
+
 class AppContext:
-    """Контекст приложения с единым управлением зависимостями"""
+    """
+    Контекст приложения с единым управлением зависимостями.
+    
+    Сервисы создаются лениво - при первом запросе через get_service,
+    зависимости фабрики запрашивает у контекста. Поэтому все потребители
+    получают одни и те же экземпляры: один ASTService поверх общих
+    ParseCache и FileCache, один репозиторий проекта и т.д.
+    """
     
     def __init__(self):
         self._services: Dict[str, Any] = {}
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.RLock()
         self._initialized = False
         logger.debug("Создан AppContext")
     
     def initialize(self) -> bool:
-        """Инициализирует все сервисы приложения"""
+        """Регистрирует фабрики сервисов; сами сервисы создаются при первом запросе"""
         if self._initialized:
             return True
         
         try:
             logger.info("Инициализация AppContext...")
             
-            # 1. Создаем репозитории
-            project_repository = ProjectRepository()
-            
-            # 2. Создаем основные сервисы
-            project_service = ProjectService(project_repository)
-            code_service = CodeService(project_repository)
-            
-            # 3. Создаем вспомогательные сервисы
-            ast_service = ASTService()
-            code_manager = CodeManager()
-            change_manager = ChangeManager()
-            diff_engine = DiffEngine()
-            project_creator = ProjectCreatorService()
-            ai_schema_service = AISchemaService()
-            
-            # 4. Создаем AISchemaParser для обратной совместимости
-            from core.data.ai_schema_parser import AISchemaParser
-            schema_parser = AISchemaParser()
-            
-            # 5. Создаем сервис анализа (мок-реализация)
-            class MockAnalysisService(IAnalysisService):
-                @handle_errors(default_return=[])
-                def analyze_code(self, project_path: str):
-                    return [
-                        {'type': 'info', 'message': 'Анализ начат', 'file': '', 'line': 0},
-                        {'type': 'warning', 'message': 'Неиспользуемый импорт', 'file': 'main.py', 'line': 5},
-                        {'type': 'error', 'message': 'Синтаксическая ошибка', 'file': 'utils.py', 'line': 10},
-                        {'type': 'success', 'message': 'Анализ завершен', 'file': '', 'line': 0}
-                    ]
-                
-                @handle_errors(default_return="")
-                def get_report(self, project_path: str) -> str:
-                    return "Отчет анализа: найдено 2 проблемы (мок-реализация)"
-                
-                @handle_errors(default_return=False)
-                def auto_refactor(self, project_path: str) -> bool:
-                    return True
-            
-            analysis_service = MockAnalysisService()
-            
-            # 6. Создаем сервис структуры проекта
-            from core.business.project_structure_service import ProjectStructureService
-            project_structure_service = ProjectStructureService(project_repository, ast_service)
-            
-            # Сохраняем все сервисы
-            self._services = {
-                'project_repository': project_repository,
-                'project_service': project_service,
-                'code_service': code_service,
-                'analysis_service': analysis_service,
-                'ast_service': ast_service,
-                'code_manager': code_manager,
-                'change_manager': change_manager,
-                'diff_engine': diff_engine,
-                'project_creator': project_creator,
-                'ai_schema_service': ai_schema_service,
-                'project_structure_service': project_structure_service,
-                'schema_parser': schema_parser
-            }
-            
+            self._factories = self._create_factories()
             self._initialized = True
-            logger.info("AppContext инициализирован успешно")
-            logger.info("Сервисы созданы:")
-            for name, service in self._services.items():
-                logger.info(f"  - {name}: {type(service).__name__}")
-            
+            logger.info(f"AppContext инициализирован: зарегистрировано сервисов {len(self._factories)}")
             return True
             
         except Exception as e:
             logger.error(f"Ошибка инициализации AppContext: {e}")
             return False
     
+    def _create_factories(self) -> Dict[str, Callable[[], Any]]:
+        """Фабрики сервисов; зависимости берутся из контекста (get_service)."""
+        get = self.get_service
+        
+        def create_change_manager():
+            change_manager = ChangeManager(get('project_repository'))
+            change_manager.undo_manager = get('undo_manager')
+            return change_manager
+        
+        def create_schema_parser():
+            # AISchemaParser для обратной совместимости
+            from core.data.ai_schema_parser import AISchemaParser
+            return AISchemaParser()
+        
+        def create_project_structure_service():
+            from core.business.project_structure_service import ProjectStructureService
+            return ProjectStructureService(get('project_repository'), get('ast_service'))
+        
+        return {
+            # Общие кэши чтения и парсинга (разделяются между проектами)
+            'file_cache': FileCache,
+            'parse_cache': ParseCache,
+            'ast_service': lambda: ASTService(parse_cache=get('parse_cache'), file_cache=get('file_cache')),
+            'workspace': lambda: WorkspaceService(file_cache=get('file_cache'), parse_cache=get('parse_cache'),
+                                                  ast_service=get('ast_service')),
+            'project_repository': lambda: ProjectRepository(file_cache=get('file_cache')),
+            'project_service': lambda: ProjectService(get('project_repository'), ast_service=get('ast_service'),
+                                                      project_structure_service=get('project_structure_service')),
+            'code_manager': lambda: CodeManager(ast_service=get('ast_service')),
+            'code_service': lambda: CodeService(get('project_repository'), ast_service=get('ast_service'),
+                                                code_manager=get('code_manager')),
+            'analysis_service': MockAnalysisService,
+            'undo_manager': lambda: UndoManager(get('project_repository')),
+            'change_manager': create_change_manager,
+            'diff_engine': DiffEngine,
+            'project_creator': lambda: ProjectCreatorService(
+                template_registry=TemplateRegistry(cache_file=TemplateRegistry.DEFAULT_CACHE)
+            ),
+            'ai_schema_service': AISchemaService,
+            'project_structure_service': create_project_structure_service,
+            'schema_parser': create_schema_parser,
+        }
+    
     def get_service(self, service_name: str) -> Any:
-        """Возвращает сервис по имени"""
+        """Возвращает сервис по имени, создавая его при первом запросе"""
         if not self._initialized:
             self.initialize()
         
-        if service_name in self._services:
-            return self._services[service_name]
+        service = self._services.get(service_name)
+        if service is not None:
+            return service
         
-        logger.error(f"Сервис '{service_name}' не найден в контексте")
-        return None
+        with self._lock:
+            if service_name in self._services:
+                return self._services[service_name]
+            factory = self._factories.get(service_name)
+            if factory is None:
+                logger.error(f"Сервис '{service_name}' не найден в контексте")
+                return None
+            
+            service = factory()
+            self._services[service_name] = service
+            logger.debug(f"Сервис создан: {service_name} ({type(service).__name__})")
+            return service
     
     def get_all_services(self) -> Dict[str, Any]:
-        """Возвращает все сервисы"""
+        """Возвращает все сервисы (создает еще не созданные)"""
         if not self._initialized:
             self.initialize()
         
+        for name in list(self._factories):
+            self.get_service(name)
+        return self._services.copy()
+    
+    def get_created_services(self) -> Dict[str, Any]:
+        """Возвращает только уже созданные сервисы (не создавая остальные)"""
         return self._services.copy()
     
     def set_service(self, service_name: str, service: Any) -> None:
@@ -133,6 +167,10 @@ class AppContext:
         self._services[service_name] = service
         logger.debug(f"Сервис '{service_name}' установлен в контекст")
     
+    def get_workspace(self) -> WorkspaceService:
+        """Возвращает рабочее пространство открытых проектов"""
+        return self.get_service('workspace')
+    
     def get_project_repository(self) -> ProjectRepository:
         """Возвращает репозиторий проекта"""
         return self.get_service('project_repository')
@@ -161,6 +199,10 @@ class AppContext:
         """Возвращает менеджер изменений"""
         return self.get_service('change_manager')
     
+    def get_undo_manager(self) -> UndoManager:
+        """Возвращает менеджер отмены примененных изменений"""
+        return self.get_service('undo_manager')
+    
     def get_diff_engine(self) -> DiffEngine:
         """Возвращает движок сравнения"""
         return self.get_service('diff_engine')
@@ -176,6 +218,7 @@ class AppContext:
     def clear(self):
         """Очищает контекст"""
         self._services.clear()
+        self._factories.clear()
         self._initialized = False
         logger.debug("AppContext очищен")
 
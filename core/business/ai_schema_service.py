@@ -1,8 +1,8 @@
 # core/business/ai_schema_service.py
 
-import re
 import logging
 from typing import Dict, Any, Optional
+from core.parsers.ai_schema_stream_parser import AISchemaStreamParser
 from .error_handler import handle_errors
 
 logger = logging.getLogger('ai_code_assistant')
@@ -23,59 +23,20 @@ class AISchemaService:
         """
         logger.info(f"Парсинг AI схемы: {len(schema_text)} символов")
         
-        modules = []
-        files = {}
+        # Один проход по строкам: разделы modules/files, многострочное
+        # содержимое, деревья (├──) и простые списки путей
+        result = AISchemaStreamParser.parse(schema_text, AISchemaService._get_default_file_content)
         
-        try:
-            # Парсим раздел modules (список путей)
-            mod_match = re.search(r'modules:\s*([\s\S]+?)(files\:|$)', schema_text)
-            if mod_match:
-                mods_block = mod_match.group(1)
-                lines = [line.strip('- ').strip() for line in mods_block.splitlines() if line.strip()]
-                for line in lines:
-                    if line and not line.startswith('files:') and line != '':
-                        modules.append(line)
-            
-            # Парсим раздел files (каждая строка: file.py: "content")
-            files_match = re.search(r'files:\s*([\s\S]+)', schema_text)
-            if files_match:
-                files_block = files_match.group(1)
-                lines = [line.strip() for line in files_block.splitlines() if line.strip()]
-                for line in lines:
-                    # Формат: path: "content"
-                    if ':' in line:
-                        file_path, content = line.split(':', 1)
-                        # Удалить кавычки, если есть
-                        content = content.strip().strip('"').strip("'")
-                        files[file_path.strip()] = content
-            
-            # Дополнительно парсим простую схему (старая логика)
-            if not modules and not files:
-                lines = schema_text.strip().split('\n')
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    if line.endswith('.py'):
-                        files[line] = AISchemaService._get_default_file_content(line)
-                    elif '/' in line or '\\' in line:
-                        modules.append(line)
-            
-            result = {
-                'name': 'ai_generated_project',
-                'modules': modules,
-                'files': files,
-                'directories': []
-            }
-            
-            logger.info(f"Схема распарсена: {len(modules)} модулей, {len(files)} файлов")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Ошибка при парсинге AI схемы: {e}")
-            return None
+        logger.info(f"Схема распарсена: {len(result['modules'])} модулей, {len(result['files'])} файлов")
+        return result
+    
+    # Совместимость с интерфейсом AISchemaParser
+    parse = parse_ai_schema
+    
+    @staticmethod
+    def create_stream_parser() -> AISchemaStreamParser:
+        """Парсер для схемы, поступающей порциями (feed/close)."""
+        return AISchemaStreamParser(AISchemaService._get_default_file_content)
     
     @staticmethod
     def _get_default_file_content(filename: str) -> str:
@@ -2,10 +2,13 @@
 
 import ast
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from core.models.code_model import CodeNode
 from core.business.error_handler import handle_errors
+from core.business.code_utils import CodeUtils
+from core.data.file_cache import get_file_signature
 
 import logging
 logger = logging.getLogger('ai_code_assistant')
@@ -17,52 +20,96 @@ class ASTService:
     Объединяет функционал из ast_service.py и code_tree_parser.py.
     """
     
-    def __init__(self):
+    def __init__(self, parse_cache=None, file_cache=None):
         self.project_tree: Dict[str, CodeNode] = {}
+        # Общие кэши (ParseCache / FileCache) разделяются между проектами
+        self.parse_cache = parse_cache
+        self.file_cache = file_cache
     
     @handle_errors(default_return={})
-    def parse_project(self, directory_path: str) -> Dict[str, CodeNode]:
+    def parse_project(self, directory_path: str, max_workers: int = 1) -> Dict[str, CodeNode]:
         """
         Парсит весь проект и возвращает дерево модулей.
         Объединяет функционал из двух исходных реализаций.
-        """
-        self.project_tree = {}
         
+        Args:
+            directory_path: Каталог проекта
+            max_workers: Число потоков чтения и парсинга файлов (1 - последовательно)
+        """
         logger.info(f"Парсинг проекта: {directory_path}")
         
         if not os.path.exists(directory_path):
             raise ValueError(f"Директория не существует: {directory_path}")
         
-        python_files_found = 0
-        
         # Используем Path для кроссплатформенности
-        python_files = list(Path(directory_path).rglob('*.py'))
+        python_files = [str(file_path) for file_path in Path(directory_path).rglob('*.py')]
         
-        for file_path in python_files:
-            module_node = self.parse_module(str(file_path))
-            if module_node:
-                self.project_tree[str(file_path)] = module_node
-                python_files_found += 1
+        if max_workers > 1 and len(python_files) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(python_files))) as executor:
+                # map сохраняет порядок файлов
+                module_nodes = list(executor.map(self.parse_module, python_files))
+        else:
+            module_nodes = [self.parse_module(file_path) for file_path in python_files]
+        
+        self.project_tree = {file_path: module_node
+                             for file_path, module_node in zip(python_files, module_nodes) if module_node}
         
-        logger.info(f"Парсинг завершен: {python_files_found} файлов")
+        logger.info(f"Парсинг завершен: {len(self.project_tree)} файлов")
         return self.project_tree
     
     @handle_errors(default_return=None)
     def parse_module(self, file_path: str) -> Optional[CodeNode]:
         """
         Парсит один исходный .py файл в иерархию CodeNode.
-        Объединяет лучшие практики из обеих реализаций.
+        Если подключен ParseCache, неизмененные файлы не перепарсиваются.
         """
+        if self.parse_cache is None:
+            return self._parse_module_uncached(file_path)
+        
+        signature = get_file_signature(file_path)
+        cached = self.parse_cache.get(file_path, signature)
+        if cached is not None:
+            return cached
+        
+        module_node = self._parse_module_uncached(file_path)
+        self.parse_cache.put(file_path, signature, module_node)
+        return module_node
+    
+    def invalidate_module(self, file_path: str):
+        """Сбрасывает закэшированный результат парсинга файла."""
+        if self.parse_cache is not None:
+            self.parse_cache.invalidate(file_path)
+        if self.file_cache is not None:
+            self.file_cache.invalidate(file_path)
+    
+    def _read_source(self, file_path: str) -> str:
+        """Читает исходный код через общий кэш чтения (если он подключен)."""
+        if self.file_cache is not None and os.path.isfile(file_path):
+            return self.file_cache.read(file_path)
+        return Path(file_path).read_text(encoding='utf-8')
+    
+    def _parse_module_uncached(self, file_path: str) -> Optional[CodeNode]:
+        """Парсит модуль без обращения к кэшу."""
+        try:
+            source = self._read_source(file_path)
+            return self.parse_source(source, file_path)
+        except FileNotFoundError:
+            logger.error(f"Файл не найден: {file_path}")
+            return None
+        except Exception as e:
+            logger.error(f"Ошибка парсинга {file_path}: {e}")
+            return None
+    
+    def parse_source(self, source: str, file_path: str = "") -> Optional[CodeNode]:
+        """Строит иерархию CodeNode из исходного кода (без чтения файла)."""
         try:
-            source = Path(file_path).read_text(encoding='utf-8')
-            
             try:
-                tree = ast.parse(source, filename=file_path)
+                tree = ast.parse(source, filename=file_path or '<source>')
             except SyntaxError as e:
                 logger.error(f"Синтаксическая ошибка в {file_path}: {e}")
                 return self._create_error_node(file_path, source, e)
             
-            module_name = Path(file_path).stem
+            module_name = Path(file_path).stem if file_path else 'module'
             lines = source.split('\n')
             
             # Создаем узел модуля с ИНИЦИАЛИЗИРОВАННЫМИ children
@@ -117,9 +164,6 @@ class ASTService:
             
             return module_node
             
-        except FileNotFoundError:
-            logger.error(f"Файл не найден: {file_path}")
-            return None
         except Exception as e:
             logger.error(f"Ошибка парсинга {file_path}: {e}")
             return None
@@ -156,7 +200,7 @@ class ASTService:
         else:
             node_type = 'method' if is_method else 'function'
         
-        return CodeNode(
+        func_node = CodeNode(
             name=node.name,
             node_type=node_type,
             ast_node=node,
@@ -164,6 +208,8 @@ class ASTService:
             file_path=file_path,
             children=[]  # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: инициализируем children
         )
+        self._set_node_span(func_node, node)
+        return func_node
     
     def _parse_class(self, node: ast.ClassDef, lines: List[str], file_path: str) -> CodeNode:
         """Парсит класс с методами"""
@@ -179,6 +225,7 @@ class ASTService:
             file_path=file_path,
             children=[]  # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: инициализируем children
         )
+        self._set_node_span(class_node, node)
         
         # Методы класса
         for subitem in node.body:
@@ -188,6 +235,16 @@ class ASTService:
         
         return class_node
     
+    @staticmethod
+    def _set_node_span(code_node: CodeNode, node: ast.AST):
+        """Сохраняет положение сущности в файле (с учетом декораторов)."""
+        code_node.set_span(
+            CodeUtils.node_first_line(node),
+            node.col_offset,
+            getattr(node, 'end_lineno', None) or node.lineno,
+            getattr(node, 'end_col_offset', None) or 0
+        )
+    
     def _extract_global_code(self, tree: ast.AST, lines: List[str]) -> str:
         """Извлекает глобальный код (не импорты, не функции, не классы)"""
         global_lines = []
@@ -0,0 +1,344 @@
+# core/business/change_applier.py
+
+"""
+Применение набора изменений кода к файлам проекта.
+
+Изменения группируются по файлам: каждый файл читается один раз, все его
+правки сращиваются по смещениям за один проход по тексту, и файл
+записывается один раз атомарно. Независимые файлы обрабатываются параллельно.
+В транзакционном режиме исходные версии файлов сохраняются в журнал отката,
+и при сбое любой записи все файлы восстанавливаются.
+Изменения, вычисленные для старой версии файла, применяются к ней и
+сливаются с текущей версией трехсторонне, без повторного анализа.
+"""
+
+import ast
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from core.data.rollback_journal import RollbackJournal
+from .change_service import CodeChange
+from .merge import ThreeWayMerge
+from .span_editor import SpanEditor
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class ChangeResult:
+    """Результат применения одного изменения"""
+
+    def __init__(self, change: CodeChange, success: bool, message: str = "", duration: float = 0.0):
+        self.change = change
+        self.success = success
+        self.message = message
+        # Время обработки файла изменения (чтение, правки, запись), с
+        self.duration = duration
+
+    @property
+    def file_path(self) -> str:
+        return self.change.file_path
+
+    def __repr__(self):
+        status = 'ok' if self.success else f'failed: {self.message}'
+        return f"ChangeResult({self.change.action} {self.change.entity_name}: {status})"
+
+
+class ApplyReport:
+    """Отчет о применении набора изменений"""
+
+    def __init__(self):
+        self.results: List[ChangeResult] = []
+        self.touched_files: List[str] = []
+        # Записанный файл -> (текст до записи или None, если файла не было, текст после)
+        self.file_versions: Dict[str, Tuple[Optional[str], str]] = {}
+        self.duration = 0.0
+
+    @property
+    def success(self) -> bool:
+        return all(result.success for result in self.results)
+
+    @property
+    def applied(self) -> List[ChangeResult]:
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self) -> List[ChangeResult]:
+        return [result for result in self.results if not result.success]
+
+    def summary(self) -> str:
+        return (f"Применено изменений: {len(self.applied)} из {len(self.results)}, "
+                f"файлов изменено: {len(self.touched_files)}")
+
+    def __repr__(self):
+        return f"ApplyReport({self.summary()})"
+
+
+class ChangeApplier:
+    """Применяет изменения кода, сгруппированные по файлам"""
+
+    def __init__(self, repository, max_workers: int = 4):
+        self.repository = repository
+        self.max_workers = max_workers
+
+    def apply(self, changes: List[CodeChange], transactional: bool = False,
+              journal_dir: Optional[str] = None) -> ApplyReport:
+        """
+        Применяет изменения и возвращает отчет.
+        Порядок результатов в отчете совпадает с порядком изменений.
+
+        Args:
+            changes: Изменения (внутри файла применяются в порядке списка)
+            transactional: Все или ничего: при ошибке любого изменения файлы
+                           не записываются, а при сбое записи все записанные
+                           файлы восстанавливаются из журнала отката
+            journal_dir: Каталог журнала отката (по умолчанию временный)
+        """
+        started = time.perf_counter()
+        report = ApplyReport()
+        results: Dict[int, ChangeResult] = {}
+        groups: Dict[str, List[Tuple[int, CodeChange]]] = {}
+
+        for position, change in enumerate(changes):
+            if change.action == 'conflict':
+                results[position] = ChangeResult(change, False, "Конфликт не разрешен")
+            elif not change.file_path:
+                results[position] = ChangeResult(change, False, "Не указан файл")
+            else:
+                groups.setdefault(os.path.abspath(change.file_path), []).append((position, change))
+
+        if groups:
+            workers = max(1, min(self.max_workers, len(groups)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                if transactional:
+                    self._apply_transaction(executor, groups, results, report, journal_dir)
+                else:
+                    file_results = list(executor.map(lambda item: self._apply_file(*item), groups.items()))
+                    for file_path, (versions, indexed_results) in zip(groups, file_results):
+                        if versions is not None:
+                            report.touched_files.append(file_path)
+                            report.file_versions[file_path] = versions
+                        results.update(indexed_results)
+
+        report.results = [results[position] for position in range(len(changes))]
+        report.duration = time.perf_counter() - started
+        logger.info(f"{report.summary()} за {report.duration:.3f} с")
+        return report
+
+    def _apply_transaction(self, executor: ThreadPoolExecutor,
+                           groups: Dict[str, List[Tuple[int, CodeChange]]],
+                           results: Dict[int, ChangeResult], report: ApplyReport,
+                           journal_dir: Optional[str]):
+        """Подготовка всех файлов в памяти, затем запись под журналом отката."""
+        prepared = list(executor.map(lambda item: self._prepare_file(*item), groups.items()))
+        for _, _, _, indexed_results in prepared:
+            results.update(indexed_results)
+
+        if any(not result.success for result in results.values()):
+            self._cancel(results, "Отменено: другое изменение транзакции не применено")
+            return
+
+        writes = [(file_path, new_source) for file_path, _, new_source, _ in prepared if new_source is not None]
+        journal = RollbackJournal(journal_dir)
+
+        def write(item: Tuple[str, str]) -> bool:
+            file_path, new_source = item
+            journal.record(file_path)
+            return self.repository.write_file_atomic(file_path, new_source)
+
+        try:
+            written = list(executor.map(write, writes))
+        except Exception as e:
+            logger.error(f"Ошибка записи транзакции: {e}")
+            written = [False]
+
+        if all(written):
+            journal.commit()
+            report.touched_files.extend(file_path for file_path, _ in writes)
+            report.file_versions.update((file_path, (source, new_source))
+                                        for file_path, source, new_source, _ in prepared
+                                        if new_source is not None)
+            return
+
+        failed = journal.rollback()
+        message = "Откат: ошибка записи файла" + (f" (не восстановлено: {len(failed)})" if failed else "")
+        self._cancel(results, message)
+        report.touched_files.extend(failed)
+
+    @staticmethod
+    def _cancel(results: Dict[int, ChangeResult], message: str):
+        for position, result in results.items():
+            if result.success:
+                results[position] = ChangeResult(result.change, False, message, result.duration)
+
+    def _prepare_file(self, file_path: str, indexed_changes: List[Tuple[int, CodeChange]]
+                      ) -> Tuple[str, Optional[str], Optional[str], Dict[int, ChangeResult]]:
+        """
+        Читает файл и применяет к нему изменения в памяти.
+
+        Returns:
+            (путь, исходный текст или None, если файла нет,
+             новый текст или None, если файл не меняется, результаты по позициям)
+        """
+        started = time.perf_counter()
+        exists = os.path.exists(file_path)
+        source = self.repository.read_file(file_path) if exists else ""
+        if not source and exists and os.path.getsize(file_path) > 0:
+            # Файл не прочитан: запись поверх него уничтожила бы содержимое
+            return file_path, None, None, {position: ChangeResult(change, False, "Ошибка чтения файла")
+                                           for position, change in indexed_changes}
+        new_source, results = self.apply_with_merge(source, [change for _, change in indexed_changes])
+
+        duration = time.perf_counter() - started
+        for result in results:
+            result.duration = duration
+        indexed_results = {position: result for (position, _), result in zip(indexed_changes, results)}
+        return (file_path, source if exists else None,
+                new_source if new_source != source else None, indexed_results)
+
+    def _apply_file(self, file_path: str, indexed_changes: List[Tuple[int, CodeChange]]
+                    ) -> Tuple[Optional[Tuple[Optional[str], str]], Dict[int, ChangeResult]]:
+        """
+        Одно чтение, правки в памяти и одна атомарная запись файла.
+
+        Returns:
+            ((текст до, текст после) или None, если файл не записан, результаты по позициям)
+        """
+        started = time.perf_counter()
+        _, source, new_source, results = self._prepare_file(file_path, indexed_changes)
+
+        written = False
+        if new_source is not None:
+            written = self.repository.write_file_atomic(file_path, new_source)
+            duration = time.perf_counter() - started
+            results = {position: ChangeResult(result.change, written and result.success,
+                                               result.message or ("" if written else "Ошибка записи файла"),
+                                               duration)
+                       for position, result in results.items()}
+
+        return ((source, new_source) if written else None), results
+
+    def apply_with_merge(self, source: str, changes: List[CodeChange]) -> Tuple[str, List[ChangeResult]]:
+        """
+        Применяет изменения к текущему тексту файла. Изменения, у которых
+        base_content отличается от текущего текста, применяются к своей базе
+        и сливаются с текущим текстом; при конфликте слияния они отклоняются.
+        """
+        results: List[Optional[ChangeResult]] = [None] * len(changes)
+        current: List[int] = []
+        stale: Dict[str, List[int]] = {}
+        for position, change in enumerate(changes):
+            # Дописывание в конец не зависит от версии файла
+            appended = change.action == 'add' and not change.span
+            if appended or change.base_content is None or change.base_content == source:
+                current.append(position)
+            else:
+                stale.setdefault(change.base_content, []).append(position)
+
+        new_source, current_results = self.apply_to_source(source, [changes[i] for i in current])
+        for position, result in zip(current, current_results):
+            results[position] = result
+
+        for base, positions in stale.items():
+            changed_base, base_results = self.apply_to_source(base, [changes[i] for i in positions])
+            merged = ThreeWayMerge.merge(base, new_source, changed_base)
+            if merged.has_conflicts:
+                lines = ", ".join(str(conflict.line) for conflict in merged.conflicts[:5])
+                message = f"Конфликт с изменениями файла (строки базы: {lines})"
+                base_results = [ChangeResult(result.change, False, result.message or message)
+                                for result in base_results]
+            else:
+                new_source = merged.text
+                logger.debug(f"Изменения для устаревшей версии слиты: {len(positions)}")
+            for position, result in zip(positions, base_results):
+                results[position] = result
+
+        return new_source, results
+
+    def apply_to_source(self, source: str, changes: List[CodeChange]) -> Tuple[str, List[ChangeResult]]:
+        """
+        Применяет изменения одного файла к тексту.
+
+        - изменения с диапазоном строк (span) применяются по нему; для замены
+          и удаления текст диапазона должен совпадать с old_code;
+        - замена и удаление без диапазона находят сущность через AST;
+        - добавление без диапазона дописывает код в конец файла.
+        """
+        starts = SpanEditor.line_starts(source)
+        splices = []
+        appends = []
+        results = []
+        tree: Optional[ast.AST] = None
+        tree_error = None
+
+        for change in changes:
+            if change.action == 'add' and not change.span:
+                appends.append(change.new_code)
+                results.append(ChangeResult(change, True))
+                continue
+
+            if change.span:
+                splice, error = self._span_splice(source, starts, change)
+            else:
+                if tree is None and tree_error is None:
+                    try:
+                        tree = ast.parse(source)
+                    except SyntaxError as e:
+                        tree_error = f"Синтаксическая ошибка в файле: {e}"
+                if tree_error:
+                    splice, error = None, tree_error
+                else:
+                    splice, error = self._located_splice(source, tree, change)
+
+            if splice is None:
+                results.append(ChangeResult(change, False, error))
+            else:
+                splices.append(splice)
+                results.append(ChangeResult(change, True))
+
+        try:
+            new_source = SpanEditor.splice(source, splices)
+        except ValueError as e:
+            return source, [ChangeResult(result.change, False, str(e)) for result in results]
+
+        for code in appends:
+            new_source = new_source.rstrip() + '\n\n' + code + '\n' if new_source.strip() else code + '\n'
+        return new_source, results
+
+    @staticmethod
+    def _span_splice(source: str, starts: List[int],
+                     change: CodeChange) -> Tuple[Optional[Tuple[int, int, str]], str]:
+        start_line, end_line = change.span
+
+        if change.action == 'add' and end_line == start_line - 1:
+            if start_line <= len(starts):
+                return (starts[start_line - 1], starts[start_line - 1], change.new_code + '\n'), ""
+            if start_line == len(starts) + 1:
+                return (len(source), len(source), '\n' + change.new_code), ""
+            return None, "Позиция вставки за пределами файла"
+
+        span = SpanEditor.span_for_lines(source, start_line, end_line, 0, starts)
+        if span is None:
+            return None, "Диапазон за пределами файла"
+        if source[span.start_offset:span.end_offset] != change.old_code:
+            return None, "Файл изменился после анализа"
+
+        if change.action == 'delete':
+            return (span.start_offset, SpanEditor.deletion_end(source, span), ""), ""
+        return (span.start_offset, span.end_offset, change.new_code), ""
+
+    @staticmethod
+    def _located_splice(source: str, tree: ast.AST,
+                        change: CodeChange) -> Tuple[Optional[Tuple[int, int, str]], str]:
+        node_type = change.node_type if change.node_type not in ('ai_code', 'error') else None
+        span = SpanEditor.locate(source, change.entity_name, node_type, tree=tree)
+        if span is None:
+            return None, f"Сущность '{change.entity_name}' не найдена"
+
+        if change.action == 'delete':
+            return (span.start_offset, SpanEditor.deletion_end(source, span), ""), ""
+        if change.action == 'replace':
+            return (span.start_offset, span.end_offset, SpanEditor.align(change.new_code, span.indent)), ""
+        return None, f"Неподдерживаемое действие: {change.action}"
@@ -1,7 +1,9 @@
 # core/business/change_service.py
 
+import os
 import time
-from typing import List, Tuple, Optional
+import uuid
+from typing import Any, Dict, List, Tuple, Optional
 from core.models.code_model import CodeNode
 from .error_handler import handle_errors
 
@@ -21,6 +23,14 @@ class CodeChange:
         self.file_path = file_path
         self.node_type = node_type
         self.conflict_reason = ""
+        # Для изменений на уровне членов класса: имя класса-владельца и
+        # диапазон строк (первая, последняя; 1-based, включительно) в файле.
+        # Для вставки последняя строка = первая - 1.
+        self.parent_name = ""
+        self.span: Optional[Tuple[int, int]] = None
+        # Содержимое файла, относительно которого вычислено изменение.
+        # Если файл с тех пор изменился, изменение сливается трехсторонне.
+        self.base_content: Optional[str] = None
 
 
 class PendingChange:
@@ -36,10 +46,51 @@ class PendingChange:
         self.node_type = node_type
         self.timestamp = time.time()
         self.applied = False
+        self.parent_name = ""
+        self.span: Optional[Tuple[int, int]] = None
+        self.base_content: Optional[str] = None
+        self.change_id = uuid.uuid4().hex
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Словарь для сохранения в журнал (base_content сохраняется отдельно)."""
+        return {
+            'id': self.change_id,
+            'action': self.action,
+            'entity_name': self.entity_name,
+            'new_code': self.new_code,
+            'old_code': self.old_code,
+            'file_path': self.file_path,
+            'node_type': self.node_type,
+            'timestamp': self.timestamp,
+            'parent_name': self.parent_name,
+            'span': list(self.span) if self.span else None,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PendingChange':
+        """Восстанавливает изменение из словаря to_dict()."""
+        change = cls(data['action'], data['entity_name'], data.get('new_code', ""),
+                     data.get('old_code', ""), data.get('file_path', ""), data.get('node_type', ""))
+        change.change_id = data.get('id') or change.change_id
+        change.timestamp = data.get('timestamp', change.timestamp)
+        change.parent_name = data.get('parent_name', "")
+        span = data.get('span')
+        change.span = (span[0], span[1]) if span else None
+        return change
+    
+    @classmethod
+    def from_code_change(cls, change: CodeChange) -> 'PendingChange':
+        """Отложенное изменение по результату анализа (CodeChange)."""
+        pending = cls(change.action, change.entity_name, change.new_code,
+                      change.old_code, change.file_path, change.node_type)
+        pending.parent_name = change.parent_name
+        pending.span = change.span
+        pending.base_content = change.base_content
+        return pending
     
     def to_code_change(self) -> CodeChange:
         """Конвертирует в обычный CodeChange"""
-        return CodeChange(
+        change = CodeChange(
             action=self.action,
             entity_name=self.entity_name,
             new_code=self.new_code,
@@ -47,44 +98,267 @@ class PendingChange:
             file_path=self.file_path,
             node_type=self.node_type
         )
+        change.parent_name = self.parent_name
+        change.span = self.span
+        change.base_content = self.base_content
+        return change
 
 
 class ChangeManager:
-    """Управляет отложенными изменениями"""
+    """
+    Управляет отложенными изменениями.
+    
+    Очередь индексирована по цели изменения (файл, квалифицированное имя
+    сущности): новое изменение той же цели сливается с уже поставленным,
+    а счетчики по файлам поддерживаются при каждом изменении очереди.
+    Изменения без конкретной сущности (AI-код, конфликты) не сливаются.
+    """
+    
+    NON_COALESCING_TYPES = ('ai_code',)
     
-    def __init__(self):
-        self.pending_changes: List[PendingChange] = []
+    def __init__(self, repository=None, max_workers: int = 4, journal_dir: Optional[str] = None):
+        # Ключ -> изменение; порядок словаря - порядок постановки в очередь
+        self._changes: Dict[Tuple[str, str], PendingChange] = {}
+        # Файл -> ключи его изменений
+        self._by_file: Dict[str, Dict[Tuple[str, str], None]] = {}
+        self._keys_by_id: Dict[str, Tuple[str, str]] = {}
+        self._sequence = 0
+        self.journal = None
+        self.repository = repository
+        self.max_workers = max_workers
+        self.journal_dir = journal_dir
+        self.last_report = None
+        # UndoManager: примененные транзакции запоминаются для отмены
+        self.undo_manager = None
+    
+    @property
+    def pending_changes(self) -> List[PendingChange]:
+        return list(self._changes.values())
+    
+    @property
+    def count(self) -> int:
+        """Количество изменений в очереди (O(1))."""
+        return len(self._changes)
+    
+    def __len__(self) -> int:
+        return len(self._changes)
     
     def add_change(self, change: PendingChange):
-        """Добавляет изменение в очередь"""
-        self.pending_changes.append(change)
-        logger.debug(f"Добавлено отложенное изменение: {change.action} {change.entity_name}")
+        """
+        Добавляет изменение в очередь, сливая его с изменением той же цели:
+        add+replace -> add, add+delete -> ничего, replace+delete -> delete,
+        delete+add -> replace, иначе новое изменение заменяет прежнее.
+        """
+        if self.journal is not None:
+            self.journal.log_add(change.to_dict(), change.base_content)
+        
+        key = self._key(change)
+        existing = self._changes.get(key)
+        if existing is None:
+            self._insert(key, change)
+            logger.debug(f"Добавлено отложенное изменение: {change.action} {change.entity_name}")
+            return
+        
+        action = self._coalesce(existing.action, change.action)
+        if action is None:
+            self._remove(key)
+            logger.debug(f"Изменения взаимно отменены: {change.entity_name}")
+            self._compact_journal()
+            return
+        
+        # Прежнее изменение сохраняет позицию в очереди, исходный код и базу
+        existing.action = action
+        existing.new_code = change.new_code if action != 'delete' else ""
+        existing.node_type = change.node_type or existing.node_type
+        existing.timestamp = change.timestamp
+        if action != 'replace' or not existing.span:
+            # Замена (в том числе delete+add) сохраняет диапазон заменяемой
+            # сущности: у вставки диапазон пустой и к ней неприменим
+            existing.span = change.span if change.span else existing.span
+        if existing.base_content is None:
+            existing.base_content = change.base_content
+        logger.debug(f"Изменение слито: {existing.action} {existing.entity_name}")
+        self._compact_journal()
     
     def get_pending_changes(self) -> List[PendingChange]:
-        """Возвращает список отложенных изменений"""
+        """Возвращает список отложенных изменений в порядке постановки"""
         return self.pending_changes
     
+    def get_change(self, file_path: str, entity_name: str) -> Optional[PendingChange]:
+        """Изменение цели (файл, квалифицированное имя) или None (O(1))."""
+        return self._changes.get((self._file_key(file_path), entity_name))
+    
+    def get_changes_for_file(self, file_path: str) -> List[PendingChange]:
+        """Изменения одного файла в порядке постановки."""
+        keys = self._by_file.get(self._file_key(file_path), {})
+        return [self._changes[key] for key in keys]
+    
+    def count_for_file(self, file_path: str) -> int:
+        """Количество изменений файла (O(1))."""
+        return len(self._by_file.get(self._file_key(file_path), ()))
+    
+    def get_file_counts(self) -> Dict[str, int]:
+        """Количество изменений по файлам."""
+        return {file_path: len(keys) for file_path, keys in self._by_file.items()}
+    
+    def get_apply_plan(self) -> Dict[str, List[PendingChange]]:
+        """План применения: изменения, сгруппированные по файлам, в порядке постановки."""
+        return {file_path: [self._changes[key] for key in keys]
+                for file_path, keys in self._by_file.items()}
+    
+    def remove_change(self, change: PendingChange) -> bool:
+        """Удаляет изменение из очереди."""
+        key = self._keys_by_id.get(change.change_id)
+        if key is None:
+            return False
+        self._remove(key, log=True)
+        return True
+    
     def clear_changes(self):
         """Очищает все отложенные изменения"""
-        self.pending_changes.clear()
+        self._changes.clear()
+        self._by_file.clear()
+        self._keys_by_id.clear()
+        if self.journal is not None:
+            self.journal.log_clear()
+    
+    def remove_applied(self) -> int:
+        """Удаляет из очереди примененные изменения и возвращает их количество"""
+        applied = [key for key, change in self._changes.items() if change.applied]
+        for key in applied:
+            self._remove(key, log=True)
+        self._compact_journal()
+        return len(applied)
+    
+    # --- Журнал ---
+    
+    def attach_journal(self, journal) -> int:
+        """
+        Подключает журнал: очередь заменяется состоянием из журнала, и все
+        последующие операции записываются в него.
+        
+        Returns:
+            Количество восстановленных изменений
+        """
+        self.detach_journal()
+        self.clear_changes()
+        
+        for op, data in journal.load():
+            if op == 'add':
+                change = PendingChange.from_dict(data)
+                change.base_content = data.get('base_content')
+                self.add_change(change)
+            elif op == 'remove':
+                key = self._keys_by_id.get(data)
+                if key is not None:
+                    self._remove(key)
+            elif op == 'clear':
+                self.clear_changes()
+        
+        self.journal = journal
+        self._compact_journal()
+        logger.info(f"Восстановлено отложенных изменений из журнала: {len(self._changes)}")
+        return len(self._changes)
+    
+    def detach_journal(self):
+        """Отключает журнал; его содержимое на диске сохраняется."""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+    
+    def set_repository(self, repository):
+        """Переключает менеджер на репозиторий другого проекта рабочего пространства."""
+        self.repository = repository
+        logger.debug("Репозиторий ChangeManager переключен")
+    
+    def _compact_journal(self):
+        if self.journal is not None and self.journal.needs_compaction(len(self._changes)):
+            self.journal.compact((change.to_dict(), change.base_content)
+                                 for change in self._changes.values())
+    
+    @staticmethod
+    def _coalesce(previous: str, new: str) -> Optional[str]:
+        """Итоговое действие двух изменений одной цели (None - изменения отменяют друг друга)."""
+        if previous == 'add':
+            return None if new == 'delete' else 'add'
+        if previous == 'delete' and new == 'add':
+            return 'replace'
+        return new
+    
+    @staticmethod
+    def _file_key(file_path: str) -> str:
+        return os.path.abspath(file_path) if file_path else ""
+    
+    def _key(self, change: PendingChange) -> Tuple[str, str]:
+        if change.node_type in self.NON_COALESCING_TYPES or change.action == 'conflict' \
+                or not change.entity_name:
+            # Уникальный ключ: такие изменения только накапливаются
+            self._sequence += 1
+            return self._file_key(change.file_path), f"#{self._sequence}"
+        
+        name = change.entity_name
+        if change.parent_name and not name.startswith(f"{change.parent_name}."):
+            name = f"{change.parent_name}.{name}"
+        return self._file_key(change.file_path), name
+    
+    def _insert(self, key: Tuple[str, str], change: PendingChange):
+        self._changes[key] = change
+        self._by_file.setdefault(key[0], {})[key] = None
+        self._keys_by_id[change.change_id] = key
+    
+    def _remove(self, key: Tuple[str, str], log: bool = False):
+        change = self._changes.pop(key, None)
+        if change is not None:
+            self._keys_by_id.pop(change.change_id, None)
+            if log and self.journal is not None:
+                self.journal.log_remove(change.change_id)
+        keys = self._by_file.get(key[0])
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._by_file[key[0]]
     
     @handle_errors(default_return=(False, []))
-    def apply_all_changes(self) -> Tuple[bool, List[str]]:
-        """Применяет все отложенные изменения"""
-        if not self.pending_changes:
+    def apply_all_changes(self, transactional: bool = True) -> Tuple[bool, List[str]]:
+        """
+        Применяет все отложенные изменения: одна атомарная запись на файл,
+        файлы обрабатываются параллельно. В транзакционном режиме при ошибке
+        любого изменения все затронутые файлы остаются в исходном состоянии.
+        
+        Returns:
+            (успех, сообщения: сводка и результат каждого изменения со временем)
+        """
+        self.last_report = None
+        if not self._changes:
             return True, []
         
-        try:
-            # Здесь будет вызов кода для применения изменений
-            # Временная реализация
-            applied_count = len(self.pending_changes)
-            for change in self.pending_changes:
-                change.applied = True
-            
-            self.clear_changes()
-            logger.info(f"Применено изменений: {applied_count}")
-            return True, [f"Применено изменений: {applied_count}"]
-            
-        except Exception as e:
-            logger.error(f"Ошибка при применении изменений: {e}")
-            return False, [f"Ошибка: {e}"]
\ No newline at end of file
+        # Импорт здесь: change_applier зависит от этого модуля
+        from .change_applier import ChangeApplier
+        
+        applier = ChangeApplier(self._get_repository(), self.max_workers)
+        # Изменения передаются сгруппированными по файлам
+        changes = [change for file_changes in self.get_apply_plan().values() for change in file_changes]
+        report = applier.apply([change.to_code_change() for change in changes],
+                               transactional=transactional, journal_dir=self.journal_dir)
+        
+        for change, result in zip(changes, report.results):
+            change.applied = result.success
+        self.remove_applied()
+        self.last_report = report
+        if self.undo_manager is not None and report.file_versions:
+            self.undo_manager.record(f"Применение изменений ({len(report.applied)})",
+                                     report.file_versions)
+        
+        messages = [report.summary()]
+        for result in report.results:
+            status = "применено" if result.success else f"ошибка: {result.message}"
+            messages.append(f"{result.change.action} {result.change.entity_name} "
+                            f"({result.file_path}): {status} [{result.duration * 1000:.1f} мс]")
+        logger.info(report.summary())
+        return report.success, messages
+    
+    def _get_repository(self):
+        if self.repository is None:
+            from core.data.project_repository import ProjectRepository
+            self.repository = ProjectRepository()
+        return self.repository
@@ -2,43 +2,124 @@
 
 import ast
 import re
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from core.models.code_model import CodeNode
 from .ast_service import ASTService
 from .change_service import CodeChange, PendingChange, ChangeManager
+from .code_utils import CodeUtils
 from .error_handler import handle_errors
+from .symbol_index import SymbolIndex
 
 import logging
 logger = logging.getLogger('ai_code_assistant')
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_entity_source(source: str) -> Optional[ast.AST]:
+    """
+    Парсит исходный код сущности и возвращает первый узел тела.
+    Результат кэшируется: код существующих сущностей не перепарсивается
+    при повторных анализах. Возвращает None при синтаксической ошибке.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    return tree.body[0] if tree.body else None
+
+
 class CodeManager:
     """Управляет интеграцией AI-кода в проект"""
     
-    def __init__(self):
-        self.ast_service = ASTService()
+    # Минимальное число сущностей, при котором проверка конфликтов
+    # распределяется по пулу потоков
+    PARALLEL_THRESHOLD = 64
+    
+    def __init__(self, ast_service: Optional[ASTService] = None):
+        # Слияние классов на уровне методов вместо замены класса целиком
+        self.member_level_merge = True
+        # Удалять методы, которых нет в AI-версии класса. По умолчанию выключено:
+        # AI часто возвращает класс лишь с измененными методами.
+        self.allow_member_deletes = False
+        self.ast_service = ast_service or ASTService()
         self.change_manager = ChangeManager()
+        self._symbol_index: Optional[SymbolIndex] = None
+        self._index_lock = threading.Lock()
     
     @handle_errors(default_return=[])
     def analyze_ai_code(self, ai_code: str, project_tree: Dict[str, CodeNode], 
                        target_file_path: str = "") -> List[CodeChange]:
         """Анализирует AI-код и возвращает список изменений"""
+        return self.analyze_ai_code_batch(ai_code, project_tree, target_file_path)
+    
+    @handle_errors(default_return=[])
+    def analyze_ai_code_batch(self, ai_code: str, project_tree: Dict[str, CodeNode],
+                              target_file_path: str = "",
+                              max_workers: Optional[int] = None,
+                              cancel_event: Optional[threading.Event] = None,
+                              symbol_index: Optional[SymbolIndex] = None) -> List[CodeChange]:
+        """
+        Пакетный анализ AI-кода.
+        
+        Все сущности сопоставляются с проектом через индекс символов за один
+        проход, код существующих сущностей берется из уже разобранных AST узлов.
+        
+        Args:
+            ai_code: AI-код
+            project_tree: Дерево проекта {путь: CodeNode модуля}
+            target_file_path: Целевой файл для изменений
+            max_workers: Число потоков для проверки конфликтов. Пул используется,
+                         если max_workers > 1 и сущностей не меньше PARALLEL_THRESHOLD.
+            cancel_event: Событие отмены; при его установке анализ прекращается
+                          и возвращается пустой список.
+            symbol_index: Готовый индекс для сопоставления сущностей (например,
+                          по одному модулю). По умолчанию - индекс всего дерева.
+            
+        Returns:
+            Список изменений в порядке следования сущностей в AI-коде
+        """
         changes = []
         
         logger.info(f"Анализ AI-кода: {len(ai_code)} символов")
         
         try:
             ai_tree = ast.parse(ai_code)
-            ai_entities = self._extract_entities(ai_tree, ai_code)
+            ai_entities = self._extract_entity_nodes(ai_tree, ai_code)
+            ai_lines = ai_code.split('\n')
+            index = symbol_index if symbol_index is not None else self.get_symbol_index(project_tree)
             
-            for entity_name, entity_type, entity_code in ai_entities:
-                change = self._analyze_entity(
-                    entity_name, entity_type, entity_code, 
-                    project_tree, target_file_path
+            def analyze(entity):
+                if cancel_event is not None and cancel_event.is_set():
+                    return []
+                entity_name, entity_type, entity_code, entity_node = entity
+                existing_entity = index.lookup(entity_name, entity_type)
+                
+                if self.member_level_merge and entity_type == 'class' and existing_entity:
+                    member_changes = self.analyze_class_members(existing_entity, entity_node, ai_lines)
+                    if member_changes is not None:
+                        return member_changes
+                
+                change = self._build_change(
+                    entity_name, entity_type, entity_code, entity_node,
+                    existing_entity, target_file_path
                 )
-                if change:
-                    changes.append(change)
-                    
+                return [change] if change else []
+            
+            if max_workers and max_workers > 1 and len(ai_entities) >= self.PARALLEL_THRESHOLD:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # map сохраняет порядок входных данных
+                    results = list(executor.map(analyze, ai_entities))
+            else:
+                results = [analyze(entity) for entity in ai_entities]
+            
+            if cancel_event is not None and cancel_event.is_set():
+                logger.debug("Анализ AI-кода отменен")
+                return []
+            
+            changes = [change for entity_changes in results for change in entity_changes]
             logger.info(f"Анализ завершен: {len(changes)} изменений")
             
         except SyntaxError as e:
@@ -55,8 +136,19 @@ class CodeManager:
         
         return changes
     
+    def get_symbol_index(self, project_tree: Dict[str, CodeNode]) -> SymbolIndex:
+        """Возвращает индекс символов, перестраивая его только при изменении дерева."""
+        with self._index_lock:
+            if self._symbol_index is None or not self._symbol_index.is_valid_for(project_tree):
+                self._symbol_index = SymbolIndex(project_tree)
+            return self._symbol_index
+    
     def _extract_entities(self, tree: ast.AST, source_code: str) -> List[Tuple[str, str, str]]:
         """Извлекает сущности из AST дерева"""
+        return [entity[:3] for entity in self._extract_entity_nodes(tree, source_code)]
+    
+    def _extract_entity_nodes(self, tree: ast.AST, source_code: str) -> List[Tuple[str, str, str, ast.AST]]:
+        """Извлекает сущности из AST дерева вместе с их AST узлами"""
         entities = []
         
         for node in tree.body:
@@ -69,7 +161,7 @@ class CodeManager:
                 
                 entity_code = ast.get_source_segment(source_code, node)
                 if entity_code:
-                    entities.append((node.name, node_type, entity_code))
+                    entities.append((node.name, node_type, entity_code, node))
         
         return entities
     
@@ -78,11 +170,19 @@ class CodeManager:
         """Анализирует одну сущность и определяет необходимое действие"""
         
         # Ищем существующую сущность
-        existing_entity = self._find_entity_in_project(entity_name, entity_type, project_tree)
-        
+        existing_entity = self.get_symbol_index(project_tree).lookup(entity_name, entity_type)
+        return self._build_change(entity_name, entity_type, entity_code, None,
+                                  existing_entity, target_file_path)
+    
+    def _build_change(self, entity_name: str, entity_type: str, entity_code: str,
+                      entity_node: Optional[ast.AST], existing_entity: Optional[CodeNode],
+                      target_file_path: str) -> Optional[CodeChange]:
+        """Определяет необходимое действие для сущности по найденному в проекте узлу"""
         if existing_entity:
             # Проверяем конфликты
-            has_conflict, conflict_details = self._check_for_conflicts(existing_entity, entity_code)
+            has_conflict, conflict_details = self._check_for_conflicts(
+                existing_entity, entity_code, entity_node
+            )
             
             if has_conflict:
                 change = CodeChange(
@@ -115,6 +215,178 @@ class CodeManager:
                 node_type=entity_type
             )
     
+    def analyze_module_statements(self, ai_code: str,
+                                  module_node: CodeNode) -> Tuple[List[CodeChange], List[CodeChange]]:
+        """
+        Сопоставляет код уровня модуля (импорты, присваивания, прочие
+        инструкции) из AI-кода с существующим модулем.
+        
+        Инструкции, уже присутствующие в модуле, пропускаются; присваивание
+        существующему имени заменяет его на месте. Новые инструкции, стоящие
+        в AI-коде до первой функции или класса, вставляются после импортов
+        модуля, остальные дописываются в конец файла.
+        
+        Returns:
+            (изменения, которые ставятся перед изменениями сущностей,
+             дописывание в конец файла - после них). При синтаксической
+            ошибке списки пусты: о ней сообщает анализ сущностей.
+        """
+        if module_node.type != 'module' or not module_node.file_path:
+            return [], []
+        source = module_node.source_code
+        try:
+            ai_tree = ast.parse(ai_code)
+            module_tree = ast.parse(source)
+        except SyntaxError:
+            return [], []
+        
+        entity_types = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        existing = {CodeUtils.fingerprint_node(item) for item in module_tree.body}
+        assignments = {self._assigned_name(item): item for item in module_tree.body
+                       if self._assigned_name(item)}
+        source_lines = source.split('\n')
+        file_path = module_node.file_path
+        
+        header, trailer, changes = [], [], []
+        seen_entity = False
+        for position, item in enumerate(ai_tree.body):
+            if isinstance(item, entity_types):
+                seen_entity = True
+                continue
+            if position == 0 and self._is_docstring(item):
+                continue
+            if CodeUtils.fingerprint_node(item) in existing:
+                continue
+            
+            text = ast.get_source_segment(ai_code, item) or ""
+            old_item = assignments.get(self._assigned_name(item))
+            if old_item is not None:
+                old_code = '\n'.join(source_lines[old_item.lineno - 1:old_item.end_lineno])
+                change = CodeChange('replace', self._assigned_name(item), text, old_code,
+                                    file_path=file_path, node_type='variable')
+                change.span = (old_item.lineno, old_item.end_lineno)
+                changes.append(change)
+            else:
+                (trailer if seen_entity else header).append(text)
+        
+        if header:
+            imports = [item for item in module_tree.body if isinstance(item, (ast.Import, ast.ImportFrom))]
+            if imports:
+                insert_line, new_code = imports[-1].end_lineno + 1, '\n'.join(header)
+            else:
+                # Перед первой инструкцией модуля (после докстринга), отделяя пустой строкой
+                body = module_tree.body[1:] if module_tree.body and self._is_docstring(module_tree.body[0]) \
+                    else module_tree.body
+                insert_line = CodeUtils.node_first_line(body[0]) if body else len(source.splitlines()) + 1
+                new_code = '\n'.join(header) + ('\n' if body else '')
+            change = CodeChange('add', "Код модуля: начало", new_code, file_path=file_path, node_type='module_code')
+            change.span = (insert_line, insert_line - 1)
+            changes.insert(0, change)
+        trailing = [CodeChange('add', "Код модуля: конец", '\n'.join(trailer),
+                               file_path=file_path, node_type='module_code')] if trailer else []
+        return changes, trailing
+    
+    @staticmethod
+    def _assigned_name(node: ast.AST) -> Optional[str]:
+        """Имя простого присваивания 'NAME = ...' или 'NAME: T = ...'."""
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            return node.targets[0].id
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            return node.target.id
+        return None
+    
+    @staticmethod
+    def _is_docstring(node: ast.AST) -> bool:
+        return isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) \
+            and isinstance(node.value.value, str)
+    
+    def analyze_class_members(self, existing_class: CodeNode, new_class: ast.ClassDef,
+                              ai_lines: List[str]) -> Optional[List[CodeChange]]:
+        """
+        Сопоставляет методы AI-версии класса с существующим классом по имени и отпечатку.
+        
+        Args:
+            existing_class: Узел существующего класса (с ast_node и file_path)
+            new_class: AST узел класса из AI-кода
+            ai_lines: Строки AI-кода (номера строк new_class относятся к ним)
+            
+        Returns:
+            Список изменений уровня методов (пустой, если класс не изменился) или
+            None, если слияние по методам невозможно и класс нужно заменить целиком:
+            отличаются заголовок, декораторы или не-методные элементы тела.
+        """
+        old_class = existing_class.ast_node
+        if not isinstance(old_class, ast.ClassDef) or not isinstance(new_class, ast.ClassDef):
+            return None
+        if not existing_class.file_path:
+            return None
+        if CodeUtils.class_shell_fingerprint(old_class) != CodeUtils.class_shell_fingerprint(new_class):
+            return None
+        
+        method_types = (ast.FunctionDef, ast.AsyncFunctionDef)
+        old_methods = {item.name: item for item in old_class.body if isinstance(item, method_types)}
+        new_methods = [item for item in new_class.body if isinstance(item, method_types)]
+        new_names = {item.name for item in new_methods}
+        
+        deleted = [] if not self.allow_member_deletes else \
+            [item for name, item in old_methods.items() if name not in new_names]
+        remaining = len(old_class.body) - len(deleted)
+        if remaining == 0 and not any(item.name not in old_methods for item in new_methods):
+            # Класс остался бы без тела
+            return None
+        
+        # Строки существующего класса: source_code начинается со строки class
+        class_lines = existing_class.source_code.split('\n')
+        class_offset = old_class.lineno
+        
+        def old_text(node) -> Tuple[Tuple[int, int], str]:
+            start, end = CodeUtils.node_first_line(node), node.end_lineno
+            return (start, end), '\n'.join(class_lines[start - class_offset:end - class_offset + 1])
+        
+        member_indent = old_class.body[0].col_offset if old_class.body else old_class.col_offset + 4
+        insert_line = old_class.end_lineno + 1
+        changes = []
+        
+        for new_method in new_methods:
+            start = CodeUtils.node_first_line(new_method)
+            method_lines = CodeUtils.reindent(
+                ai_lines[start - 1:new_method.end_lineno], new_method.col_offset, member_indent
+            )
+            new_code = '\n'.join(method_lines)
+            qualified_name = f"{old_class.name}.{new_method.name}"
+            old_method = old_methods.get(new_method.name)
+            
+            if old_method is None:
+                # Новый метод дописывается в конец класса через пустую строку
+                change = CodeChange('add', qualified_name, '\n' + new_code,
+                                    file_path=existing_class.file_path, node_type='method')
+                change.span = (insert_line, insert_line - 1)
+            else:
+                span, old_code = old_text(old_method)
+                if CodeUtils.fingerprint_node(old_method) == CodeUtils.fingerprint_node(new_method) \
+                        and CodeUtils.comments(old_code) == CodeUtils.comments(new_code):
+                    continue
+                action = 'conflict' if self._compare_functions(old_method, new_method) else 'replace'
+                change = CodeChange(action, qualified_name, new_code, old_code,
+                                    file_path=existing_class.file_path, node_type='method')
+                change.span = span
+                if action == 'conflict':
+                    change.conflict_reason = "Изменена сигнатура метода"
+            
+            change.parent_name = old_class.name
+            changes.append(change)
+        
+        for old_method in deleted:
+            span, old_code = old_text(old_method)
+            change = CodeChange('delete', f"{old_class.name}.{old_method.name}", "", old_code,
+                                file_path=existing_class.file_path, node_type='method')
+            change.span = span
+            change.parent_name = old_class.name
+            changes.append(change)
+        
+        logger.debug(f"Слияние класса {old_class.name} по методам: {len(changes)} изменений")
+        return changes
+    
     def _find_entity_in_project(self, entity_name: str, entity_type: str, 
                                project_tree: Dict[str, CodeNode]) -> Optional[CodeNode]:
         """Ищет сущность в проекте по имени и типу"""
@@ -136,7 +408,8 @@ class CodeManager:
         
         return None
     
-    def _check_for_conflicts(self, existing_entity: CodeNode, new_code: str) -> Tuple[bool, str]:
+    def _check_for_conflicts(self, existing_entity: CodeNode, new_code: str,
+                             new_node: Optional[ast.AST] = None) -> Tuple[bool, str]:
         """Проверяет наличие конфликтов"""
         old_code = existing_entity.source_code.strip()
         new_code_clean = new_code.strip()
@@ -145,25 +418,25 @@ class CodeManager:
         if old_code == new_code_clean:
             return False, ""
         
-        try:
-            old_ast = ast.parse(old_code)
-            new_ast = ast.parse(new_code_clean)
-            
-            if len(old_ast.body) > 0 and len(new_ast.body) > 0:
-                old_node = old_ast.body[0]
-                new_node = new_ast.body[0]
-                
-                if isinstance(old_node, (ast.FunctionDef, ast.AsyncFunctionDef)) and \
-                   isinstance(new_node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    return self._compare_functions(old_node, new_node), "сигнатура функции"
-                
-                elif isinstance(old_node, ast.ClassDef) and isinstance(new_node, ast.ClassDef):
-                    return self._compare_classes(old_node, new_node), "сигнатура класса"
-            
-            return True, "тело функции/класса"
-            
-        except SyntaxError:
+        # Используем уже разобранные узлы: AST существующей сущности сохранен
+        # в CodeNode, AST новой - получен при разборе AI-кода
+        old_node = existing_entity.ast_node
+        if not isinstance(old_node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            old_node = _parse_entity_source(old_code)
+        if new_node is None:
+            new_node = _parse_entity_source(new_code_clean)
+        
+        if old_node is None or new_node is None:
             return self._heuristic_compare(old_code, new_code_clean), "эвристическое сравнение"
+        
+        if isinstance(old_node, (ast.FunctionDef, ast.AsyncFunctionDef)) and \
+           isinstance(new_node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return self._compare_functions(old_node, new_node), "сигнатура функции"
+        
+        elif isinstance(old_node, ast.ClassDef) and isinstance(new_node, ast.ClassDef):
+            return self._compare_classes(old_node, new_node), "сигнатура класса"
+        
+        return True, "тело функции/класса"
     
     def _compare_functions(self, old_func: ast.FunctionDef, new_func: ast.FunctionDef) -> bool:
         """Сравнивает две функции на предмет конфликтов"""
@@ -1,11 +1,14 @@
 # core/business/code_service.py
 
 from abc import ABC, abstractmethod
+from typing import Optional
 from core.business.code_manager import CodeManager
 from core.business.diff_engine import DiffEngine
 from core.business.ast_service import ASTService
 from core.business.change_service import ChangeManager
 from core.business.error_handler import handle_errors
+from core.business.span_editor import SpanEditor
+from core.models.code_model import CodeNode
 
 import logging
 logger = logging.getLogger('ai_code_assistant')
@@ -43,12 +46,12 @@ class ICodeService(ABC):
 class CodeService(ICodeService):
     """Сервис для управления исходным и AI-кодом с реальной реализацией."""
     
-    def __init__(self, repository, ast_service=None):
+    def __init__(self, repository, ast_service=None, code_manager=None):
         self.repository = repository
-        self.code_manager = CodeManager()
-        self.diff_engine = DiffEngine()
         self.ast_service = ast_service or ASTService()
-        self._change_manager = ChangeManager()
+        self.code_manager = code_manager or CodeManager(self.ast_service)
+        self.diff_engine = DiffEngine()
+        self._change_manager = ChangeManager(repository)
     
     @handle_errors(default_return=False)
     def save_current_file(self, content: str) -> bool:
@@ -67,42 +70,36 @@ class CodeService(ICodeService):
             logger.error("Нет открытого файла для добавления AI-кода")
             return False
         
-        # Получаем текущее содержимое
-        current_content = self.get_file_content(current_file)
-        
-        # Добавляем AI-код
-        new_content = current_content.rstrip() + '\n\n' + ai_code + '\n'
+        # Правка в документе без пересборки всего текста файла
+        document = self.repository.get_document(current_file)
+        self._append_block(document, ai_code)
         
         # Сохраняем
-        return self.repository.write_file(current_file, new_content)
+        return self.repository.commit_document(current_file)
     
     @handle_errors(default_return=False)
-    def replace_code(self, file_path: str, node_name: str, new_code: str) -> bool:
-        """Заменяет кусок кода в файле."""
+    def replace_code(self, file_path: str, node_name: str, new_code: str,
+                     node: Optional[CodeNode] = None) -> bool:
+        """
+        Заменяет сущность в файле по ее диапазону в AST (с декораторами).
+        
+        Args:
+            node_name: Имя сущности, в том числе квалифицированное (Class.method)
+            node: Узел из дерева проекта; если передан, используется его
+                  сохраненное положение без повторного поиска
+        """
         logger.info(f"Замена кода: {file_path}, {node_name}")
         
-        # Получаем текущий код
         old_content = self.get_file_content(file_path)
+        span = SpanEditor.span_from_node(old_content, node) if node is not None \
+            else SpanEditor.locate(old_content, node_name)
         
-        # Простая замена по имени узла
-        # (В реальной реализации здесь будет использоваться AST парсинг)
-        lines = old_content.split('\n')
-        new_lines = []
-        replaced = False
-        
-        for line in lines:
-            if node_name in line and not replaced:
-                new_lines.append(new_code)
-                replaced = True
-            else:
-                new_lines.append(line)
-        
-        if replaced:
-            new_content = '\n'.join(new_lines)
-            return self.repository.write_file(file_path, new_content)
-        else:
+        if span is None:
             logger.warning(f"Элемент '{node_name}' не найден в файле {file_path}")
             return False
+        
+        new_content = SpanEditor.replace(old_content, span, new_code)
+        return self.repository.write_file(file_path, new_content)
     
     @handle_errors(default_return="")
     def get_file_content(self, file_path: str) -> str:
@@ -138,50 +135,58 @@ class CodeService(ICodeService):
         """Добавляет код в файл."""
         logger.info(f"Добавление кода в файл: {file_path}")
         
-        content = self.get_file_content(file_path)
+        document = self.repository.get_document(file_path)
         
         if position == 'end':
-            new_content = content.rstrip() + '\n\n' + code + '\n'
+            self._append_block(document, code)
         elif position == 'beginning':
-            new_content = code + '\n\n' + content
+            document.insert(0, code + '\n\n')
         else:
-            # Простая вставка в середину (упрощенная реализация)
-            lines = content.split('\n')
+            # Вставка перед строкой с номером position (0-based)
             try:
                 pos = int(position)
-                if 0 <= pos < len(lines):
-                    lines.insert(pos, code)
-                    new_content = '\n'.join(lines)
+                if 0 <= pos < document.line_count:
+                    document.insert(document.line_start(pos + 1), code + '\n')
                 else:
-                    new_content = content + '\n\n' + code + '\n'
+                    document.append('\n\n' + code + '\n')
             except ValueError:
-                new_content = content + '\n\n' + code + '\n'
+                document.append('\n\n' + code + '\n')
         
-        return self.repository.write_file(file_path, new_content)
+        return self.repository.commit_document(file_path)
+    
+    @staticmethod
+    def _append_block(document, code: str):
+        """Дописывает блок кода в конец документа через пустую строку."""
+        trailing = document.trailing_whitespace_length()
+        document.replace(len(document) - trailing, len(document), '\n\n' + code + '\n')
+    
+    def batch_edits(self):
+        """
+        Группирует правки файлов: внутри блока with изменения накапливаются
+        в памяти, и каждый файл записывается один раз при выходе.
+        """
+        return self.repository.batch_edits()
     
     @handle_errors(default_return=False)
-    def delete_code(self, file_path: str, entity_name: str) -> bool:
-        """Удаляет код из файла."""
+    def delete_code(self, file_path: str, entity_name: str,
+                    node: Optional[CodeNode] = None) -> bool:
+        """Удаляет сущность из файла по ее диапазону в AST (с декораторами)."""
         logger.info(f"Удаление кода из файла: {file_path}, элемент: {entity_name}")
         
         content = self.get_file_content(file_path)
-        lines = content.split('\n')
-        new_lines = []
-        
-        # Простая реализация - удаляем строки, содержащие имя элемента
-        # (В реальной реализации будет использоваться AST парсинг)
-        for line in lines:
-            if entity_name not in line:
-                new_lines.append(line)
+        span = SpanEditor.span_from_node(content, node) if node is not None \
+            else SpanEditor.locate(content, entity_name)
         
-        new_content = '\n'.join(new_lines)
-        
-        # Если ничего не удалили, возвращаем False
-        if len(new_lines) == len(lines):
+        if span is None:
             logger.warning(f"Элемент '{entity_name}' не найден в файле {file_path}")
             return False
         
-        return self.repository.write_file(file_path, new_content)
+        return self.repository.write_file(file_path, SpanEditor.delete(content, span))
+    
+    def set_repository(self, repository):
+        """Переключает сервис на репозиторий другого проекта рабочего пространства."""
+        self.repository = repository
+        logger.debug("Репозиторий CodeService переключен")
     
     def set_ast_service(self, ast_service: ASTService):
         """Устанавливает AST сервис."""
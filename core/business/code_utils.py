@@ -1,6 +1,10 @@
 # core/business/code_utils.py
 
+import ast
+import io
 import re
+import hashlib
+import tokenize
 from typing import List, Tuple
 
 
@@ -41,4 +45,66 @@ class CodeUtils:
             else:
                 normalized_lines.append(line)
         
-        return '\n'.join(normalized_lines)
\ No newline at end of file
+        return '\n'.join(normalized_lines)
+    
+    @staticmethod
+    def fingerprint_node(node: ast.AST) -> str:
+        """
+        Отпечаток AST узла, не зависящий от позиций, отступов и комментариев.
+        Две сущности с одинаковым отпечатком эквивалентны структурно.
+        """
+        dump = ast.dump(node, annotate_fields=False, include_attributes=False)
+        return hashlib.blake2b(dump.encode('utf-8'), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def comments(code: str) -> List[str]:
+        """
+        Комментарии кода по порядку. Отпечаток AST их не учитывает, поэтому
+        правка, затронувшая только комментарии, проверяется отдельно.
+        """
+        try:
+            tokens = tokenize.generate_tokens(io.StringIO(code).readline)
+            return [token.string.rstrip() for token in tokens if token.type == tokenize.COMMENT]
+        except (tokenize.TokenError, SyntaxError):
+            return [line.strip() for line in code.split('\n') if line.strip().startswith('#')]
+    
+    @staticmethod
+    def class_shell_fingerprint(class_node: ast.ClassDef) -> str:
+        """
+        Отпечаток "оболочки" класса: имя, базовые классы, декораторы и все
+        элементы тела, кроме методов (атрибуты, докстринг, вложенные классы).
+        """
+        parts = [class_node.name]
+        parts.extend(CodeUtils.fingerprint_node(base) for base in class_node.bases)
+        parts.append('|')
+        parts.extend(CodeUtils.fingerprint_node(keyword) for keyword in class_node.keywords)
+        parts.append('|')
+        parts.extend(CodeUtils.fingerprint_node(decorator) for decorator in class_node.decorator_list)
+        parts.append('|')
+        parts.extend(
+            CodeUtils.fingerprint_node(item) for item in class_node.body
+            if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+        )
+        return hashlib.blake2b('\n'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def node_first_line(node: ast.AST) -> int:
+        """Первая строка узла с учетом декораторов (1-based)."""
+        decorators = getattr(node, 'decorator_list', None) or []
+        return min([node.lineno] + [decorator.lineno for decorator in decorators])
+    
+    @staticmethod
+    def reindent(lines: List[str], old_indent: int, new_indent: int) -> List[str]:
+        """Сдвигает отступ блока строк с old_indent на new_indent пробелов."""
+        if old_indent == new_indent:
+            return list(lines)
+        
+        prefix = ' ' * new_indent
+        result = []
+        for line in lines:
+            if not line.strip():
+                result.append('')
+                continue
+            stripped = len(line) - len(line.lstrip(' \t'))
+            result.append(prefix + line[min(stripped, old_indent):])
+        return result
@@ -1,8 +1,13 @@
 # core/business/diff_engine.py
 
-import difflib
-from typing import List, Tuple
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple, Union
 from .error_handler import handle_errors
+from .diff_result import DiffResult, content_hash
+from .line_diff import LineDiff
+from .merge import MergeResult, ThreeWayMerge
+from .structural_diff import StructuralDiff, EntityDiff
 
 import logging
 logger = logging.getLogger('ai_code_assistant')
@@ -11,35 +16,66 @@ logger = logging.getLogger('ai_code_assistant')
 class DiffEngine:
     """Движок для сравнения кода и генерации diff"""
     
+    DEFAULT_CACHE_SIZE = 32
+    
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        # LRU результатов по паре хэшей (старое, новое содержимое)
+        self.cache_size = cache_size
+        self._results: "OrderedDict[Tuple[str, str], DiffResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def compare(self, old_code: str, new_code: str) -> DiffResult:
+        """
+        Ленивый результат сравнения из кэша. Повторное сравнение тех же
+        версий возвращает уже (частично) посчитанный diff.
+        """
+        key = (content_hash(old_code), content_hash(new_code))
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        
+        result = DiffResult(old_code, new_code, old_hash=key[0], new_hash=key[1])
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return result
+    
+    def clear_cache(self):
+        """Очищает кэш результатов."""
+        with self._lock:
+            self._results.clear()
+    
     @staticmethod
     @handle_errors(default_return=[])
     def generate_diff(old_code: str, new_code: str) -> List[Tuple[str, str]]:
         """Генерирует различия между старым и новым кодом"""
         logger.debug(f"Генерация diff: old={len(old_code)}, new={len(new_code)}")
         
-        diff = []
         old_lines = old_code.splitlines(keepends=True)
         new_lines = new_code.splitlines(keepends=True)
         
-        differ = difflib.Differ()
-        diff_result = list(differ.compare(old_lines, new_lines))
-        
-        for line in diff_result:
-            if line.startswith('  '):
-                diff.append(('equal', line[2:]))
-            elif line.startswith('+ '):
-                diff.append(('insert', line[2:]))
-            elif line.startswith('- '):
-                diff.append(('delete', line[2:]))
+        # Myers + patience по интернированным строкам вместо difflib.Differ,
+        # у которого внутристрочное сопоставление квадратично
+        diff = LineDiff.diff(old_lines, new_lines)
         
         logger.debug(f"Diff сгенерирован: {len(diff)} строк")
         return diff
     
     @staticmethod
     @handle_errors(default_return="")
-    def format_diff_for_display(diff: List[Tuple[str, str]]) -> str:
+    def format_diff_for_display(diff: Union[DiffResult, List[Tuple[str, str]]]) -> str:
         """Форматирует diff для отображения в GUI"""
         result = []
+        if isinstance(diff, DiffResult):
+            diff = diff.iter_lines()
         
         for change_type, line in diff:
             if change_type == 'equal':
@@ -52,7 +88,74 @@ class DiffEngine:
         return ''.join(result)
     
     @staticmethod
-    def has_changes(diff: List[Tuple[str, str]]) -> bool:
-        """Проверяет, есть ли реальные изменения в diff"""
+    def has_changes(diff: Union[DiffResult, List[Tuple[str, str]]]) -> bool:
+        """Проверяет, есть ли реальные изменения в diff (для DiffResult - по хэшам)"""
+        if isinstance(diff, DiffResult):
+            return diff.has_changes
         return any(change_type in ('insert', 'delete') 
-                  for change_type, _ in diff)
\ No newline at end of file
+                  for change_type, _ in diff)
+    
+    @staticmethod
+    def merge3(base: str, ours: str, theirs: str,
+               ours_label: str = "ours", theirs_label: str = "theirs") -> MergeResult:
+        """
+        Трехстороннее слияние двух версий, полученных из base.
+        Непересекающиеся изменения сливаются автоматически, в местах
+        конфликтов текст результата содержит маркеры.
+        """
+        return ThreeWayMerge.merge(base, ours, theirs, ours_label, theirs_label)
+    
+    @staticmethod
+    @handle_errors(default_return=None)
+    def generate_structural_diff(old_code: str, new_code: str,
+                                 with_line_diff: bool = True) -> Optional[List[EntityDiff]]:
+        """
+        Структурный diff: какие сущности добавлены, удалены, переименованы,
+        изменены по сигнатуре или телу. Построчный diff считается только
+        для измененных сущностей.
+        
+        Returns:
+            Список изменений сущностей или None, если одна из версий
+            не разбирается (тогда нужен обычный построчный diff)
+        """
+        from .ast_service import ASTService
+        
+        ast_service = ASTService()
+        old_root = ast_service.parse_source(old_code)
+        new_root = ast_service.parse_source(new_code)
+        if old_root is None or new_root is None or \
+                'module_error' in (old_root.type, new_root.type):
+            logger.debug("Структурный diff недоступен: ошибка разбора")
+            return None
+        
+        return StructuralDiff.compare(old_root, new_root, with_line_diff)
+    
+    @staticmethod
+    @handle_errors(default_return="")
+    def format_structural_diff(entity_diffs: List[EntityDiff]) -> str:
+        """Форматирует структурный diff: описание изменения и строки только этой сущности"""
+        markers = {'added': '+', 'removed': '-', 'renamed': '>'}
+        result = []
+        
+        for entity_diff in entity_diffs:
+            result.append(f"{markers.get(entity_diff.kind, '~')} {entity_diff.summary}\n")
+            if entity_diff.line_diff:
+                block = DiffEngine.format_diff_for_display(entity_diff.line_diff)
+                result.extend(f"    {line}" for line in block.splitlines(True))
+                if not block.endswith('\n'):
+                    result.append('\n')
+        
+        return ''.join(result)
+    
+    @staticmethod
+    @handle_errors(default_return="")
+    def format_hunks_for_display(diff: DiffResult, context: int = 3) -> str:
+        """Форматирует только измененные фрагменты с контекстом (хунки)"""
+        result = []
+        
+        for hunk in diff.iter_hunks(context):
+            result.append(f"{hunk.header}\n")
+            block = DiffEngine.format_diff_for_display(hunk.lines)
+            result.append(block if block.endswith('\n') else block + '\n')
+        
+        return ''.join(result)
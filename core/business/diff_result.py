@@ -0,0 +1,162 @@
+# core/business/diff_result.py
+
+"""
+Результат сравнения двух версий текста с ленивым вычислением.
+
+Наличие изменений определяется по хэшам содержимого без построения diff,
+а сам diff считается по мере чтения: хунки выдаются, как только посчитана
+соответствующая часть файла. Уже посчитанные строки сохраняются, поэтому
+повторный обход (например, при повторном открытии окна сравнения) не
+пересчитывает diff.
+"""
+
+import hashlib
+import threading
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from .line_diff import LineDiff
+
+
+def content_hash(text: str) -> str:
+    """Хэш содержимого для сравнения версий без сравнения строк."""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+class DiffHunk:
+    """Измененный фрагмент с контекстом. Номера строк 1-based."""
+
+    def __init__(self, old_start: int, new_start: int):
+        self.old_start = old_start
+        self.new_start = new_start
+        self.old_count = 0
+        self.new_count = 0
+        self.lines: List[Tuple[str, str]] = []
+
+    def append(self, tag: str, line: str):
+        self.lines.append((tag, line))
+        if tag != 'insert':
+            self.old_count += 1
+        if tag != 'delete':
+            self.new_count += 1
+
+    @property
+    def header(self) -> str:
+        """Заголовок в формате unified diff."""
+        return f"@@ -{self.old_start},{self.old_count} +{self.new_start},{self.new_count} @@"
+
+    def __repr__(self):
+        return f"DiffHunk({self.header})"
+
+
+class DiffResult:
+    """Ленивый результат сравнения двух версий"""
+
+    def __init__(self, old_code: str, new_code: str,
+                 old_hash: Optional[str] = None, new_hash: Optional[str] = None):
+        self.old_hash = old_hash or content_hash(old_code)
+        self.new_hash = new_hash or content_hash(new_code)
+        self._lines: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._source: Optional[Iterator[Tuple[str, str]]] = None
+        if self.has_changes:
+            self._source = LineDiff.iter_diff(old_code.splitlines(keepends=True),
+                                              new_code.splitlines(keepends=True))
+        else:
+            self._lines = [('equal', line) for line in old_code.splitlines(keepends=True)]
+
+    @property
+    def has_changes(self) -> bool:
+        """Есть ли изменения (по хэшам, без вычисления diff)."""
+        return self.old_hash != self.new_hash
+
+    @property
+    def is_complete(self) -> bool:
+        """Посчитан ли diff целиком."""
+        return self._source is None
+
+    @property
+    def lines(self) -> List[Tuple[str, str]]:
+        """Полный diff: список ('equal'|'insert'|'delete', строка)."""
+        for _ in self.iter_lines():
+            pass
+        return self._lines
+
+    def iter_lines(self) -> Iterator[Tuple[str, str]]:
+        """Строки diff; недостающие досчитываются по мере обхода."""
+        index = 0
+        while True:
+            if index < len(self._lines):
+                yield self._lines[index]
+                index += 1
+            elif not self._pull() and index >= len(self._lines):
+                return
+
+    def iter_hunks(self, context: int = 3) -> Iterator[DiffHunk]:
+        """
+        Хунки diff с context строками контекста. Каждый хунк выдается,
+        как только за ним посчитано достаточно общих строк.
+        """
+        before: deque = deque(maxlen=context)
+        hunk: Optional[DiffHunk] = None
+        trailing = 0
+        old_no = new_no = 1
+
+        for tag, line in self.iter_lines():
+            if tag == 'equal':
+                if hunk is None:
+                    before.append((line, old_no, new_no))
+                else:
+                    hunk.append(tag, line)
+                    trailing += 1
+                    if trailing > 2 * context:
+                        # Общих строк достаточно, чтобы закрыть хунк:
+                        # лишние строки становятся контекстом следующего
+                        tail = hunk.lines[len(hunk.lines) - trailing + context:]
+                        del hunk.lines[len(hunk.lines) - trailing + context:]
+                        hunk.old_count -= len(tail)
+                        hunk.new_count -= len(tail)
+                        yield hunk
+                        hunk = None
+                        first_old, first_new = old_no - len(tail) + 1, new_no - len(tail) + 1
+                        before.clear()
+                        before.extend((text, first_old + i, first_new + i)
+                                      for i, (_, text) in enumerate(tail))
+                old_no += 1
+                new_no += 1
+                continue
+
+            if hunk is None:
+                start_old, start_new = (before[0][1], before[0][2]) if before else (old_no, new_no)
+                hunk = DiffHunk(start_old, start_new)
+                for text, _, _ in before:
+                    hunk.append('equal', text)
+                before.clear()
+            trailing = 0
+            hunk.append(tag, line)
+            if tag == 'delete':
+                old_no += 1
+            else:
+                new_no += 1
+
+        if hunk is not None:
+            extra = max(trailing - context, 0)
+            if extra:
+                del hunk.lines[-extra:]
+                hunk.old_count -= extra
+                hunk.new_count -= extra
+            yield hunk
+
+    def _pull(self) -> bool:
+        """Досчитывает следующую порцию строк diff. False, если diff посчитан."""
+        with self._lock:
+            if self._source is None:
+                return False
+            count = len(self._lines)
+            for item in self._source:
+                self._lines.append(item)
+                # Порциями: выдаем управление после каждой сотни строк
+                if len(self._lines) - count >= 100:
+                    return True
+            self._source = None
+            return len(self._lines) > count
@@ -0,0 +1,298 @@
+# core/business/diff_view_model.py
+
+"""
+Модель представления diff для просмотра больших файлов.
+
+Неизмененные области сворачиваются до context строк вокруг изменений и
+раскрываются по запросу. Строки представления строятся только для
+запрошенного окна, поэтому отображение не зависит от размера файла.
+Поддерживаются построчный (unified) и двухколоночный (side-by-side) режимы.
+"""
+
+import logging
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+
+from .diff_result import DiffResult
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class DiffRow:
+    """
+    Строка представления.
+
+    kind: 'equal', 'delete', 'insert', 'change' (только side-by-side:
+    удаленная и вставленная строки рядом) или 'gap' (свернутая область).
+    """
+
+    __slots__ = ('kind', 'old_no', 'old_text', 'new_no', 'new_text', 'hidden')
+
+    def __init__(self, kind: str, old_no: Optional[int] = None, old_text: str = "",
+                 new_no: Optional[int] = None, new_text: str = "", hidden: int = 0):
+        self.kind = kind
+        self.old_no = old_no
+        self.old_text = old_text
+        self.new_no = new_no
+        self.new_text = new_text
+        self.hidden = hidden
+
+    def __repr__(self):
+        return f"DiffRow({self.kind}, {self.old_no}, {self.new_no})"
+
+
+class _Segment:
+    """Диапазон [lo, hi) строк diff: показанный или свернутый."""
+
+    __slots__ = ('lo', 'hi', 'collapsed', 'rows')
+
+    def __init__(self, lo: int, hi: int, collapsed: bool):
+        self.lo = lo
+        self.hi = hi
+        self.collapsed = collapsed
+        self.rows: Optional[List[Tuple[int, int]]] = None
+
+
+class DiffViewModel:
+    """Свернутое и разбитое на окна представление DiffResult"""
+
+    def __init__(self, diff: DiffResult, context: int = 3, side_by_side: bool = False):
+        self.diff = diff
+        self.context = context
+        self.side_by_side = side_by_side
+        self._lines = diff.lines
+
+        # Номера строк старой и новой версии для каждой строки diff
+        self._old_numbers: List[int] = []
+        self._new_numbers: List[int] = []
+        old_no = new_no = 1
+        for tag, _ in self._lines:
+            self._old_numbers.append(old_no)
+            self._new_numbers.append(new_no)
+            if tag != 'insert':
+                old_no += 1
+            if tag != 'delete':
+                new_no += 1
+
+        self._segments: List[_Segment] = []
+        self._row_starts: List[int] = []
+        self.collapse_all()
+
+    # --- Структура ---
+
+    def collapse_all(self):
+        """Сворачивает все неизмененные области, кроме context строк вокруг изменений."""
+        segments: List[_Segment] = []
+        total = len(self._lines)
+        context = self.context
+        index = 0
+        while index < total:
+            if self._lines[index][0] != 'equal':
+                end = index
+                while end < total and self._lines[end][0] != 'equal':
+                    end += 1
+                self._add_segment(segments, index, end, False)
+                index = end
+                continue
+
+            end = index
+            while end < total and self._lines[end][0] == 'equal':
+                end += 1
+            keep_before = context if index > 0 else 0
+            keep_after = context if end < total else 0
+            if end - index > keep_before + keep_after:
+                self._add_segment(segments, index, index + keep_before, False)
+                self._add_segment(segments, index + keep_before, end - keep_after, True)
+                self._add_segment(segments, end - keep_after, end, False)
+            else:
+                self._add_segment(segments, index, end, False)
+            index = end
+
+        self._segments = segments
+        self._reindex()
+
+    def expand(self, row: int, lines: Optional[int] = None) -> bool:
+        """
+        Раскрывает свернутую область в строке row.
+
+        Args:
+            row: Индекс строки 'gap'
+            lines: Сколько строк показать сверху (None - всю область)
+
+        Returns:
+            False, если в строке row нет свернутой области
+        """
+        position = self._segment_at(row)
+        if position is None or not self._segments[position].collapsed:
+            return False
+
+        segment = self._segments[position]
+        if lines is None or lines >= segment.hi - segment.lo:
+            replacement = [_Segment(segment.lo, segment.hi, False)]
+        else:
+            middle = segment.lo + max(lines, 0)
+            replacement = [_Segment(segment.lo, middle, False), _Segment(middle, segment.hi, True)]
+        self._segments[position:position + 1] = [item for item in replacement if item.hi > item.lo]
+
+        # Соседние показанные сегменты объединяются
+        merged: List[_Segment] = []
+        for item in self._segments:
+            self._add_segment(merged, item.lo, item.hi, item.collapsed, item)
+        self._segments = merged
+        self._reindex()
+        return True
+
+    def set_side_by_side(self, side_by_side: bool):
+        """Переключает режим отображения."""
+        if side_by_side != self.side_by_side:
+            self.side_by_side = side_by_side
+            for segment in self._segments:
+                segment.rows = None
+            self._reindex()
+
+    # --- Окно строк ---
+
+    @property
+    def row_count(self) -> int:
+        return self._row_starts[-1] if self._row_starts else 0
+
+    @property
+    def hidden_count(self) -> int:
+        """Количество строк в свернутых областях."""
+        return sum(segment.hi - segment.lo for segment in self._segments if segment.collapsed)
+
+    def rows(self, start: int, count: int) -> List[DiffRow]:
+        """Строки представления [start, start + count)."""
+        start = max(start, 0)
+        stop = min(start + max(count, 0), self.row_count)
+        result: List[DiffRow] = []
+        position = self._segment_at(start)
+        row = start
+        while position is not None and position < len(self._segments) and row < stop:
+            segment = self._segments[position]
+            first = self._row_starts[position]
+            if segment.collapsed:
+                result.append(self._gap_row(segment))
+                row += 1
+            else:
+                pairs = self._segment_rows(segment)
+                for pair in pairs[row - first:stop - first]:
+                    result.append(self._make_row(pair))
+                row = min(stop, first + len(pairs))
+            position += 1
+        return result
+
+    def hunk_rows(self) -> List[int]:
+        """Индексы первых измененных строк каждого блока изменений (для навигации)."""
+        result = []
+        previous_changed = False
+        for position, segment in enumerate(self._segments):
+            if segment.collapsed:
+                previous_changed = False
+                continue
+            for offset, (old_index, new_index) in enumerate(self._segment_rows(segment)):
+                index = old_index if old_index >= 0 else new_index
+                changed = self._lines[index][0] != 'equal'
+                if changed and not previous_changed:
+                    result.append(self._row_starts[position] + offset)
+                previous_changed = changed
+        return result
+
+    def format_rows(self, rows: List[DiffRow], width: int = 60) -> List[str]:
+        """Текст строк представления (без перевода строки)."""
+        return [self.format_row(row, width) for row in rows]
+
+    def format_row(self, row: DiffRow, width: int = 60) -> str:
+        """Текст одной строки: номера строк, маркер и код."""
+        if row.kind == 'gap':
+            return f"{'':>11} ··· скрыто строк: {row.hidden} ···"
+
+        old_no = str(row.old_no) if row.old_no is not None else ""
+        new_no = str(row.new_no) if row.new_no is not None else ""
+        old_text = row.old_text.rstrip('\r\n')
+        new_text = row.new_text.rstrip('\r\n')
+        if not self.side_by_side:
+            marker = {'equal': ' ', 'delete': '-', 'insert': '+'}[row.kind]
+            text = old_text if row.kind == 'delete' else new_text
+            return f"{old_no:>5} {new_no:>5} {marker} {text}"
+
+        left_marker = '-' if row.kind in ('delete', 'change') else ' '
+        right_marker = '+' if row.kind in ('insert', 'change') else ' '
+        left = old_text[:width].ljust(width) if row.old_no is not None else ' ' * width
+        return f"{old_no:>5} {left_marker} {left} │ {new_no:>5} {right_marker} {new_text}"
+
+    # --- Внутренняя логика ---
+
+    @staticmethod
+    def _add_segment(segments: List[_Segment], lo: int, hi: int, collapsed: bool,
+                     existing: Optional[_Segment] = None):
+        if hi <= lo:
+            return
+        if segments and not collapsed and not segments[-1].collapsed and segments[-1].hi == lo:
+            segments[-1].hi = hi
+            segments[-1].rows = None
+            return
+        segments.append(existing if existing is not None else _Segment(lo, hi, collapsed))
+
+    def _reindex(self):
+        starts = [0]
+        for segment in self._segments:
+            starts.append(starts[-1] + (1 if segment.collapsed else len(self._segment_rows(segment))))
+        self._row_starts = starts
+
+    def _segment_at(self, row: int) -> Optional[int]:
+        if row < 0 or row >= self.row_count:
+            return None
+        return bisect_right(self._row_starts, row) - 1
+
+    def _segment_rows(self, segment: _Segment) -> List[Tuple[int, int]]:
+        """Строки сегмента как пары индексов строк diff (старая, новая); -1 - нет строки."""
+        if segment.rows is not None:
+            return segment.rows
+
+        rows: List[Tuple[int, int]] = []
+        if not self.side_by_side:
+            for index in range(segment.lo, segment.hi):
+                tag = self._lines[index][0]
+                rows.append((index if tag != 'insert' else -1, index if tag != 'delete' else -1))
+        else:
+            deletes: List[int] = []
+            inserts: List[int] = []
+            for index in range(segment.lo, segment.hi + 1):
+                tag = self._lines[index][0] if index < segment.hi else 'equal'
+                if tag == 'delete':
+                    deletes.append(index)
+                    continue
+                if tag == 'insert':
+                    inserts.append(index)
+                    continue
+                # Конец блока изменений: удаленные и вставленные строки попарно
+                for k in range(max(len(deletes), len(inserts))):
+                    rows.append((deletes[k] if k < len(deletes) else -1,
+                                 inserts[k] if k < len(inserts) else -1))
+                deletes, inserts = [], []
+                if index < segment.hi:
+                    rows.append((index, index))
+        segment.rows = rows
+        return rows
+
+    def _make_row(self, pair: Tuple[int, int]) -> DiffRow:
+        old_index, new_index = pair
+        old_text = self._lines[old_index][1] if old_index >= 0 else ""
+        new_text = self._lines[new_index][1] if new_index >= 0 else ""
+        index = old_index if old_index >= 0 else new_index
+        tag = self._lines[index][0]
+
+        if tag == 'equal':
+            return DiffRow('equal', self._old_numbers[index], old_text,
+                           self._new_numbers[index], new_text)
+        if old_index >= 0 and new_index >= 0:
+            return DiffRow('change', self._old_numbers[old_index], old_text,
+                           self._new_numbers[new_index], new_text)
+        if old_index >= 0:
+            return DiffRow('delete', self._old_numbers[old_index], old_text)
+        return DiffRow('insert', new_no=self._new_numbers[new_index], new_text=new_text)
+
+    def _gap_row(self, segment: _Segment) -> DiffRow:
+        return DiffRow('gap', self._old_numbers[segment.lo], "",
+                       self._new_numbers[segment.lo], "", hidden=segment.hi - segment.lo)
@@ -0,0 +1,238 @@
+# core/business/line_diff.py
+
+"""
+Построчный diff за почти линейное время.
+
+Строки интернируются в целые числа, общие начало и конец отбрасываются,
+затем уникальные в обеих версиях строки служат опорными точками (patience),
+а промежутки между ними сравниваются алгоритмом Майерса O((N+M)D).
+Результат совместим с DiffEngine: список ('equal'|'insert'|'delete', строка).
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class LineDiff:
+    """Построчное сравнение двух последовательностей строк"""
+
+    # Минимальный предел стоимости (числа правок) для алгоритма Майерса
+    # в одном промежутке; при превышении промежуток заменяется целиком.
+    MIN_MYERS_COST = 256
+
+    @staticmethod
+    def diff(old_lines: Sequence[str], new_lines: Sequence[str],
+             patience: bool = True, max_cost: int = 0) -> List[Tuple[str, str]]:
+        """
+        Сравнивает две последовательности строк.
+
+        Args:
+            old_lines: Строки старой версии
+            new_lines: Строки новой версии
+            patience: Использовать уникальные строки как опорные точки
+            max_cost: Предел числа правок Майерса в промежутке
+                      (0 - выбирается по размеру входных данных)
+
+        Returns:
+            Список ('equal'|'insert'|'delete', строка); внутри каждого
+            измененного блока удаления идут перед вставками.
+        """
+        return list(LineDiff.iter_diff(old_lines, new_lines, patience, max_cost))
+
+    @staticmethod
+    def iter_diff(old_lines: Sequence[str], new_lines: Sequence[str],
+                  patience: bool = True, max_cost: int = 0) -> Iterator[Tuple[str, str]]:
+        """
+        То же, что diff(), но строки результата выдаются по мере обработки
+        промежутков: начало diff доступно до того, как посчитан весь файл.
+        """
+        a, b = LineDiff._intern(old_lines, new_lines)
+        if not max_cost:
+            max_cost = max(LineDiff.MIN_MYERS_COST, int((len(a) + len(b)) ** 0.5) * 4)
+
+        ops: List[Tuple[str, int]] = []
+        inserts: List[Tuple[str, str]] = []
+        # Явный стек вместо рекурсии: задачи выполняются в порядке вывода
+        stack: List[Tuple] = [('region', 0, len(a), 0, len(b))]
+        while stack:
+            task = stack.pop()
+            if task[0] != 'region':
+                ops.append((task[0], task[1]))
+            else:
+                LineDiff._process_region(a, b, task[1], task[2], task[3], task[4],
+                                         patience, max_cost, ops, stack)
+            yield from LineDiff._materialize(ops, old_lines, new_lines, inserts)
+            ops.clear()
+
+        yield from inserts
+
+    @staticmethod
+    def _intern(old_lines: Sequence[str], new_lines: Sequence[str]) -> Tuple[List[int], List[int]]:
+        table: Dict[str, int] = {}
+        a = [table.setdefault(line, len(table)) for line in old_lines]
+        b = [table.setdefault(line, len(table)) for line in new_lines]
+        return a, b
+
+    @staticmethod
+    def _process_region(a, b, alo, ahi, blo, bhi, patience, max_cost, ops, stack):
+        # Общее начало
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            ops.append(('equal', alo))
+            alo += 1
+            blo += 1
+
+        # Общий конец выводится после середины
+        suffix = 0
+        while alo < ahi - suffix and blo < bhi - suffix and a[ahi - suffix - 1] == b[bhi - suffix - 1]:
+            suffix += 1
+        for i in range(ahi - 1, ahi - suffix - 1, -1):
+            stack.append(('equal', i))
+        ahi -= suffix
+        bhi -= suffix
+
+        if alo == ahi or blo == bhi:
+            ops.extend(('delete', i) for i in range(alo, ahi))
+            ops.extend(('insert', j) for j in range(blo, bhi))
+            return
+
+        anchors = LineDiff._patience_anchors(a, alo, ahi, b, blo, bhi) if patience else []
+        if anchors:
+            # Промежутки и опорные строки в обратном порядке (стек)
+            tasks = []
+            prev_a, prev_b = alo, blo
+            for anchor_a, anchor_b in anchors:
+                tasks.append(('region', prev_a, anchor_a, prev_b, anchor_b))
+                tasks.append(('equal', anchor_a))
+                prev_a, prev_b = anchor_a + 1, anchor_b + 1
+            tasks.append(('region', prev_a, ahi, prev_b, bhi))
+            stack.extend(reversed(tasks))
+            return
+
+        if not set(a[alo:ahi]).intersection(b[blo:bhi]):
+            middle = None
+        else:
+            middle = LineDiff._myers(a[alo:ahi], b[blo:bhi], max_cost)
+
+        if middle is None:
+            ops.extend(('delete', i) for i in range(alo, ahi))
+            ops.extend(('insert', j) for j in range(blo, bhi))
+        else:
+            ops.extend((tag, index + (alo if tag != 'insert' else blo)) for tag, index in middle)
+
+    @staticmethod
+    def _patience_anchors(a, alo, ahi, b, blo, bhi) -> List[Tuple[int, int]]:
+        """Пары индексов строк, уникальных в обеих частях, образующие возрастающую цепочку."""
+        unique_a: Dict[int, int] = {}
+        for i in range(alo, ahi):
+            value = a[i]
+            unique_a[value] = -1 if value in unique_a else i
+        unique_b: Dict[int, int] = {}
+        for j in range(blo, bhi):
+            value = b[j]
+            unique_b[value] = -1 if value in unique_b else j
+
+        pairs = [(unique_a[value], j) for value, j in unique_b.items()
+                 if j >= 0 and unique_a.get(value, -1) >= 0]
+        if not pairs:
+            return []
+        pairs.sort(key=lambda pair: pair[1])
+
+        # Наибольшая возрастающая подпоследовательность по индексам в a
+        tails: List[int] = []
+        tail_pairs: List[int] = []
+        previous = [-1] * len(pairs)
+        for position, (i, _) in enumerate(pairs):
+            k = bisect_left(tails, i)
+            if k == len(tails):
+                tails.append(i)
+                tail_pairs.append(position)
+            else:
+                tails[k] = i
+                tail_pairs[k] = position
+            previous[position] = tail_pairs[k - 1] if k > 0 else -1
+
+        chain = []
+        position = tail_pairs[-1]
+        while position != -1:
+            chain.append(pairs[position])
+            position = previous[position]
+        chain.reverse()
+        return chain
+
+    @staticmethod
+    def _myers(a: List[int], b: List[int], max_cost: int):
+        """
+        Кратчайший скрипт правок (Майерс). Возвращает список
+        ('equal'|'delete'|'insert', индекс) или None при превышении max_cost.
+        """
+        n, m = len(a), len(b)
+        v = {1: 0}
+        trace = []
+
+        for d in range(min(n + m, max_cost) + 1):
+            trace.append(v.copy())
+            for k in range(-d, d + 1, 2):
+                if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                    x = v[k + 1]
+                else:
+                    x = v[k - 1] + 1
+                y = x - k
+                while x < n and y < m and a[x] == b[y]:
+                    x += 1
+                    y += 1
+                v[k] = x
+                if x >= n and y >= m:
+                    return LineDiff._backtrack(trace, n, m)
+        return None
+
+    @staticmethod
+    def _backtrack(trace, n: int, m: int) -> List[Tuple[str, int]]:
+        x, y = n, m
+        ops = []
+        for d in range(len(trace) - 1, -1, -1):
+            v = trace[d]
+            k = x - y
+            if k == -d or (k != d and v.get(k - 1, -1) < v.get(k + 1, -1)):
+                prev_k = k + 1
+            else:
+                prev_k = k - 1
+            prev_x = v[prev_k]
+            prev_y = prev_x - prev_k
+
+            while x > prev_x and y > prev_y:
+                ops.append(('equal', x - 1))
+                x -= 1
+                y -= 1
+            if d > 0:
+                if x == prev_x:
+                    ops.append(('insert', y - 1))
+                else:
+                    ops.append(('delete', x - 1))
+            x, y = prev_x, prev_y
+
+        ops.reverse()
+        return ops
+
+    @staticmethod
+    def _materialize(ops: List[Tuple[str, int]], old_lines: Sequence[str],
+                     new_lines: Sequence[str], inserts: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Переводит индексы в строки; в измененных блоках удаления ставятся перед
+        вставками. Вставки незавершенного блока остаются в inserts до следующей
+        общей строки.
+        """
+        result: List[Tuple[str, str]] = []
+        for tag, index in ops:
+            if tag == 'equal':
+                if inserts:
+                    result.extend(inserts)
+                    inserts.clear()
+                result.append(('equal', old_lines[index]))
+            elif tag == 'delete':
+                result.append(('delete', old_lines[index]))
+            else:
+                inserts.append(('insert', new_lines[index]))
+        return result
@@ -0,0 +1,194 @@
+# core/business/merge.py
+
+"""
+Трехстороннее слияние текста (diff3).
+
+Обе версии сравниваются с общей базой, после чего измененные области
+сливаются одним проходом: непересекающиеся изменения применяются
+автоматически, одинаковые изменения берутся один раз, а конфликтом
+считаются только пересекающиеся различные изменения.
+"""
+
+import logging
+from typing import List, Tuple
+
+from .line_diff import LineDiff
+
+logger = logging.getLogger('ai_code_assistant')
+
+# Измененная область: (начало в базе, конец в базе, новые строки); индексы 0-based
+Region = Tuple[int, int, List[str]]
+
+
+class MergeConflict:
+    """Пересекающиеся различные изменения одной области базы"""
+
+    def __init__(self, base_start: int, base_end: int, base_lines: List[str],
+                 ours_lines: List[str], theirs_lines: List[str]):
+        self.base_start = base_start
+        self.base_end = base_end
+        self.base_lines = base_lines
+        self.ours_lines = ours_lines
+        self.theirs_lines = theirs_lines
+
+    @property
+    def line(self) -> int:
+        """Номер первой строки области в базе (1-based)."""
+        return self.base_start + 1
+
+    def __repr__(self):
+        return f"MergeConflict(lines {self.base_start + 1}-{self.base_end})"
+
+
+class MergeResult:
+    """Результат слияния: строки (с маркерами в местах конфликтов) и конфликты"""
+
+    def __init__(self, lines: List[str], conflicts: List[MergeConflict]):
+        self.lines = lines
+        self.conflicts = conflicts
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.lines)
+
+    @property
+    def has_conflicts(self) -> bool:
+        return bool(self.conflicts)
+
+    def __repr__(self):
+        return f"MergeResult(lines={len(self.lines)}, conflicts={len(self.conflicts)})"
+
+
+class ThreeWayMerge:
+    """Трехстороннее слияние по строкам"""
+
+    @staticmethod
+    def merge(base: str, ours: str, theirs: str,
+              ours_label: str = "ours", theirs_label: str = "theirs") -> MergeResult:
+        """
+        Сливает две версии, полученные из общей базы.
+
+        Args:
+            base: Общая исходная версия
+            ours: Первая измененная версия
+            theirs: Вторая измененная версия
+            ours_label, theirs_label: Подписи маркеров конфликта
+
+        Returns:
+            MergeResult; в местах конфликтов текст содержит маркеры
+            <<<<<<< / ======= / >>>>>>>
+        """
+        if ours == theirs or theirs == base:
+            return MergeResult(ours.splitlines(keepends=True), [])
+        if ours == base:
+            return MergeResult(theirs.splitlines(keepends=True), [])
+
+        base_lines = base.splitlines(keepends=True)
+        ours_regions = ThreeWayMerge.changed_regions(base_lines, ours.splitlines(keepends=True))
+        theirs_regions = ThreeWayMerge.changed_regions(base_lines, theirs.splitlines(keepends=True))
+
+        lines: List[str] = []
+        conflicts: List[MergeConflict] = []
+        position = 0
+        i = j = 0
+
+        while i < len(ours_regions) or j < len(theirs_regions):
+            # Кластер: цепочка пересекающихся областей обеих сторон
+            if j >= len(theirs_regions) or (i < len(ours_regions) and
+                                            ours_regions[i][0] <= theirs_regions[j][0]):
+                start, end = ours_regions[i][0], ours_regions[i][1]
+            else:
+                start, end = theirs_regions[j][0], theirs_regions[j][1]
+            first_i, first_j = i, j
+            while True:
+                if i < len(ours_regions) and ThreeWayMerge._overlaps(ours_regions[i], start, end):
+                    end = max(end, ours_regions[i][1])
+                    i += 1
+                elif j < len(theirs_regions) and ThreeWayMerge._overlaps(theirs_regions[j], start, end):
+                    end = max(end, theirs_regions[j][1])
+                    j += 1
+                else:
+                    break
+
+            lines.extend(base_lines[position:start])
+            position = end
+
+            if first_j == j:
+                lines.extend(ThreeWayMerge._apply(base_lines, start, end, ours_regions[first_i:i]))
+                continue
+            if first_i == i:
+                lines.extend(ThreeWayMerge._apply(base_lines, start, end, theirs_regions[first_j:j]))
+                continue
+
+            ours_block = ThreeWayMerge._apply(base_lines, start, end, ours_regions[first_i:i])
+            theirs_block = ThreeWayMerge._apply(base_lines, start, end, theirs_regions[first_j:j])
+            if ours_block == theirs_block:
+                lines.extend(ours_block)
+                continue
+
+            conflicts.append(MergeConflict(start, end, base_lines[start:end], ours_block, theirs_block))
+            lines.append(f"<<<<<<< {ours_label}\n")
+            lines.extend(ThreeWayMerge._terminated(ours_block))
+            lines.append("=======\n")
+            lines.extend(ThreeWayMerge._terminated(theirs_block))
+            lines.append(f">>>>>>> {theirs_label}\n")
+
+        lines.extend(base_lines[position:])
+        logger.debug(f"Трехстороннее слияние: конфликтов {len(conflicts)}")
+        return MergeResult(lines, conflicts)
+
+    @staticmethod
+    def changed_regions(base_lines: List[str], other_lines: List[str]) -> List[Region]:
+        """Измененные области версии относительно базы в порядке следования."""
+        regions: List[Region] = []
+        position = 0
+        start = None
+        inserted: List[str] = []
+
+        for tag, line in LineDiff.diff(base_lines, other_lines):
+            if tag == 'equal':
+                if start is not None:
+                    regions.append((start, position, inserted))
+                    start, inserted = None, []
+                position += 1
+                continue
+            if start is None:
+                start = position
+            if tag == 'delete':
+                position += 1
+            else:
+                inserted.append(line)
+
+        if start is not None:
+            regions.append((start, position, inserted))
+        return regions
+
+    @staticmethod
+    def _overlaps(region: Region, start: int, end: int) -> bool:
+        """
+        Пересекается ли область с кластером [start, end). Вставки в одну точку
+        и вставка на границе измененной области тоже считаются пересечением:
+        их взаимный порядок неоднозначен.
+        """
+        region_start, region_end = region[0], region[1]
+        if region_start < end or region_start == start:
+            return True
+        return region_start == end and (region_start == region_end or start == end)
+
+    @staticmethod
+    def _apply(base_lines: List[str], start: int, end: int, regions: List[Region]) -> List[str]:
+        """Строки области базы [start, end) после изменений одной стороны."""
+        result: List[str] = []
+        position = start
+        for region_start, region_end, inserted in regions:
+            result.extend(base_lines[position:region_start])
+            result.extend(inserted)
+            position = region_end
+        result.extend(base_lines[position:end])
+        return result
+
+    @staticmethod
+    def _terminated(block: List[str]) -> List[str]:
+        if block and not block[-1].endswith('\n'):
+            return block[:-1] + [block[-1] + '\n']
+        return block
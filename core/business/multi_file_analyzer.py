@@ -0,0 +1,339 @@
+# core/business/multi_file_analyzer.py
+
+"""
+Анализ многофайловых ответов AI.
+
+Ответ AI, содержащий несколько файлов в блоках ``` с заголовками путей,
+разбивается на файлы за один линейный проход (в том числе по мере
+поступления текста), каждый файл сопоставляется с модулем проекта
+и анализируется параллельно. Результат - набор изменений на каждый файл.
+"""
+
+import os
+import re
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from core.models.code_model import CodeNode
+from .change_service import CodeChange
+from .code_manager import CodeManager
+from .error_handler import handle_errors
+from .symbol_index import SymbolIndex
+
+logger = logging.getLogger('ai_code_assistant')
+
+# Путь к файлу: хотя бы одна часть с расширением, разделители / или \
+PATH_PATTERN = re.compile(r'[\w.\-]+(?:[/\\][\w.\-]+)*\.\w+')
+FENCE_PATTERN = re.compile(r'^\s*(`{3,}|~{3,})(.*)$')
+HEADER_PREFIX_PATTERN = re.compile(r'^(?:file|файл|path|путь)\s*:?\s*', re.IGNORECASE)
+
+
+class FilePayload:
+    """Содержимое одного файла из ответа AI"""
+
+    def __init__(self, path: str, code: str, language: str = ""):
+        self.path = path
+        self.code = code
+        self.language = language
+
+    @property
+    def is_python(self) -> bool:
+        if self.path:
+            return self.path.endswith('.py')
+        return self.language in ('', 'python', 'py')
+
+    def __repr__(self):
+        return f"FilePayload(path={self.path!r}, lines={self.code.count(chr(10)) + 1})"
+
+
+class MultiFileResponseSplitter:
+    """
+    Потоковый разбор ответа AI на файлы.
+
+    Текст подается частями через feed(); каждая строка просматривается
+    один раз. Путь файла берется из строки заголовка перед блоком
+    (`path/file.py`, **path/file.py**, ### path/file.py, File: path/file.py),
+    из info-строки блока (```python path/file.py) или из комментария
+    в первой строке блока (# path/file.py).
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._header_path = ""
+        self._fence = None
+        self._language = ""
+        self._block_path = ""
+        self._block_lines: List[str] = []
+        self._block_started = False
+        self._payloads: List[FilePayload] = []
+
+    def feed(self, chunk: str) -> List[FilePayload]:
+        """Обрабатывает очередную часть текста и возвращает завершенные файлы."""
+        self._buffer += chunk
+        lines = self._buffer.split('\n')
+        self._buffer = lines.pop()
+
+        completed = []
+        for line in lines:
+            payload = self._process_line(line.rstrip('\r'))
+            if payload is not None:
+                completed.append(payload)
+        return completed
+
+    def close(self) -> List[FilePayload]:
+        """Завершает разбор. Незакрытый блок считается завершенным."""
+        completed = []
+        if self._buffer:
+            payload = self._process_line(self._buffer.rstrip('\r'))
+            self._buffer = ""
+            if payload is not None:
+                completed.append(payload)
+        if self._fence is not None:
+            completed.append(self._finish_block())
+        return completed
+
+    @property
+    def payloads(self) -> List[FilePayload]:
+        """Все завершенные файлы в порядке следования."""
+        return list(self._payloads)
+
+    def _process_line(self, line: str) -> Optional[FilePayload]:
+        if self._fence is None:
+            match = FENCE_PATTERN.match(line)
+            if match:
+                self._open_block(match.group(1), match.group(2))
+            elif line.strip():
+                self._header_path = self._parse_header(line)
+            return None
+
+        stripped = line.strip()
+        if stripped and stripped[0] == self._fence[0] and \
+                stripped == stripped[0] * len(stripped) and len(stripped) >= len(self._fence):
+            return self._finish_block()
+
+        if stripped and not self._block_started:
+            self._block_started = True
+            # Комментарий с путем в первой строке блока (# core/module.py)
+            if not self._block_path and stripped.startswith('#'):
+                path = stripped.lstrip('#').strip()
+                if PATH_PATTERN.fullmatch(path):
+                    self._block_path = path
+        self._block_lines.append(line)
+        return None
+
+    def _open_block(self, fence: str, info: str):
+        self._fence = fence
+        self._language = ""
+        self._block_path = ""
+        self._block_lines = []
+        self._block_started = False
+
+        for token in re.split(r'[\s:]+', info.strip()):
+            if not token:
+                continue
+            if PATH_PATTERN.fullmatch(token) and not self._block_path:
+                self._block_path = token
+            elif not self._language:
+                self._language = token.lower()
+
+        if not self._block_path:
+            self._block_path = self._header_path
+        self._header_path = ""
+
+    def _finish_block(self) -> FilePayload:
+        lines = self._block_lines
+        while lines and not lines[-1].strip():
+            lines.pop()
+        payload = FilePayload(self._block_path.replace('\\', '/'), '\n'.join(lines), self._language)
+
+        self._fence = None
+        self._block_lines = []
+        self._block_path = ""
+        self._payloads.append(payload)
+        return payload
+
+    @staticmethod
+    def _parse_header(line: str) -> str:
+        """Возвращает путь, если строка - заголовок файла, иначе пустую строку."""
+        text = line.strip().strip('#*_` ').rstrip(':').strip('*_` ')
+        text = HEADER_PREFIX_PATTERN.sub('', text).strip('*_` ')
+        return text if PATH_PATTERN.fullmatch(text) else ""
+
+
+class ProjectModuleIndex:
+    """Сопоставление путей из ответа AI с модулями проекта"""
+
+    def __init__(self, project_tree: Dict[str, CodeNode], project_root: str = ""):
+        self.project_tree = project_tree
+        paths = [path for path in project_tree if path]
+        if not project_root and paths:
+            project_root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+        self.project_root = os.path.abspath(project_root) if project_root else ""
+
+        self._by_relative: Dict[str, str] = {}
+        self._by_dotted: Dict[str, str] = {}
+        self._by_basename: Dict[str, List[str]] = {}
+
+        for path in paths:
+            relative = self._relative(path)
+            self._by_relative[relative] = path
+            self._by_dotted[relative[:-3].replace('/', '.')] = path
+            self._by_basename.setdefault(os.path.basename(path), []).append(path)
+
+    def _relative(self, path: str) -> str:
+        if self.project_root:
+            path = os.path.relpath(os.path.abspath(path), self.project_root)
+        return path.replace('\\', '/')
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Находит модуль проекта по пути из ответа AI (или None)."""
+        if not path:
+            return None
+        if path in self.project_tree:
+            return path
+
+        normalized = path.replace('\\', '/')
+        while normalized.startswith('./'):
+            normalized = normalized[2:]
+        parts = [part for part in normalized.split('/') if part]
+
+        # Путь может содержать лишние начальные каталоги (имя репозитория и т.п.)
+        for start in range(len(parts)):
+            found = self._by_relative.get('/'.join(parts[start:]))
+            if found:
+                return found
+
+        if len(parts) == 1 and parts[0].endswith('.py'):
+            found = self._by_dotted.get(parts[0][:-3])
+            if found:
+                return found
+
+        candidates = self._by_basename.get(parts[-1], []) if parts else []
+        return candidates[0] if len(candidates) == 1 else None
+
+    def target_path(self, path: str) -> str:
+        """Путь для создания нового файла в проекте."""
+        if os.path.isabs(path) or not self.project_root:
+            return path
+        normalized = path.replace('\\', '/')
+        while normalized.startswith('./'):
+            normalized = normalized[2:]
+        return os.path.join(self.project_root, *normalized.split('/'))
+
+
+class FileChangeSet:
+    """Изменения для одного файла многофайлового ответа"""
+
+    def __init__(self, payload: FilePayload, target_path: str, module_path: Optional[str]):
+        self.payload = payload
+        self.target_path = target_path
+        self.module_path = module_path
+        self.changes: List[CodeChange] = []
+
+    @property
+    def path(self) -> str:
+        return self.payload.path
+
+    @property
+    def is_new(self) -> bool:
+        return self.module_path is None
+
+    @property
+    def conflicts(self) -> List[CodeChange]:
+        return [change for change in self.changes if change.action == 'conflict']
+
+    def __repr__(self):
+        return f"FileChangeSet(path={self.path!r}, new={self.is_new}, changes={len(self.changes)})"
+
+
+class MultiFileAnalyzer:
+    """Анализатор многофайловых ответов AI"""
+
+    def __init__(self, code_manager: Optional[CodeManager] = None, max_workers: int = 8):
+        self.code_manager = code_manager or CodeManager()
+        self.max_workers = max_workers
+
+    @staticmethod
+    def is_multi_file(response: str) -> bool:
+        """Содержит ли ответ хотя бы один блок кода с путем файла."""
+        splitter = MultiFileResponseSplitter()
+        splitter.feed(response)
+        splitter.close()
+        return any(payload.path for payload in splitter.payloads)
+
+    @handle_errors(default_return=[])
+    def analyze(self, response: str, project_tree: Dict[str, CodeNode],
+                project_root: str = "", cancel_event: Optional[threading.Event] = None) -> List[FileChangeSet]:
+        """Анализирует полный ответ AI."""
+        return self.analyze_stream([response], project_tree, project_root, cancel_event)
+
+    @handle_errors(default_return=[])
+    def analyze_stream(self, chunks: Iterable[str], project_tree: Dict[str, CodeNode],
+                       project_root: str = "",
+                       cancel_event: Optional[threading.Event] = None) -> List[FileChangeSet]:
+        """
+        Анализирует ответ AI по мере поступления частей текста.
+        Анализ файла начинается сразу после закрытия его блока.
+
+        Returns:
+            Наборы изменений по файлам в порядке первого появления файла.
+            Блоки без пути пропускаются; повторный блок того же файла
+            заменяет предыдущий.
+        """
+        module_index = ProjectModuleIndex(project_tree, project_root)
+        splitter = MultiFileResponseSplitter()
+        futures = {}
+        order: List[str] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit(payloads: List[FilePayload]):
+                for payload in payloads:
+                    if not payload.path:
+                        continue
+                    if payload.path not in futures:
+                        order.append(payload.path)
+                    futures[payload.path] = executor.submit(
+                        self._analyze_payload, payload, module_index, cancel_event
+                    )
+
+            for chunk in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                submit(splitter.feed(chunk))
+            submit(splitter.close())
+
+            change_sets = [futures[path].result() for path in order]
+
+        if cancel_event is not None and cancel_event.is_set():
+            logger.debug("Анализ многофайлового ответа отменен")
+            return []
+
+        logger.info(f"Многофайловый ответ: {len(change_sets)} файлов, "
+                    f"{sum(len(s.changes) for s in change_sets)} изменений")
+        return change_sets
+
+    def _analyze_payload(self, payload: FilePayload, module_index: ProjectModuleIndex,
+                         cancel_event: Optional[threading.Event]) -> FileChangeSet:
+        """Анализирует один файл (выполняется в пуле потоков)."""
+        module_path = module_index.resolve(payload.path)
+        target_path = module_path or module_index.target_path(payload.path)
+        change_set = FileChangeSet(payload, target_path, module_path)
+
+        if not payload.is_python:
+            return change_set
+
+        # Сущности сопоставляются только с целевым модулем
+        module_tree = {module_path: module_index.project_tree[module_path]} if module_path else {}
+        change_set.changes = self.code_manager.analyze_ai_code_batch(
+            payload.code, module_tree, target_path,
+            cancel_event=cancel_event, symbol_index=SymbolIndex(module_tree)
+        )
+        if module_path:
+            # Импорты и код уровня модуля, от которых зависят сущности
+            leading, trailing = self.code_manager.analyze_module_statements(
+                payload.code, module_index.project_tree[module_path]
+            )
+            change_set.changes = leading + change_set.changes + trailing
+        return change_set
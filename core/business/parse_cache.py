@@ -0,0 +1,111 @@
+# core/business/parse_cache.py
+
+"""
+Общий кэш результатов парсинга модулей.
+Позволяет нескольким экземплярам ASTService (по одному на проект)
+переиспользовать уже построенные деревья CodeNode.
+"""
+
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from core.models.code_model import CodeNode
+from core.data.file_cache import FileSignature
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class ParseCache:
+    """
+    LRU-кэш деревьев CodeNode, привязанных к сигнатуре файла.
+    Ограничивается суммарным объемом исходного кода закэшированных модулей.
+    """
+
+    DEFAULT_MAX_SOURCE_BYTES = 128 * 1024 * 1024
+
+    def __init__(self, max_source_bytes: int = DEFAULT_MAX_SOURCE_BYTES):
+        self.max_source_bytes = max_source_bytes
+        self._entries: "OrderedDict[str, Tuple[FileSignature, CodeNode]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str, signature: Optional[FileSignature]) -> Optional[CodeNode]:
+        """Возвращает дерево модуля, если оно построено для той же версии файла."""
+        if signature is None:
+            return None
+
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, file_path: str, signature: Optional[FileSignature], module_node: CodeNode):
+        """Сохраняет дерево модуля."""
+        if signature is None or module_node is None:
+            return
+
+        key = os.path.abspath(file_path)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (signature, module_node)
+            self._size += self._node_size(module_node)
+            while self._size > self.max_source_bytes and len(self._entries) > 1:
+                old_key = next(iter(self._entries))
+                self._remove(old_key)
+
+    def invalidate(self, file_path: str):
+        """Удаляет модуль из кэша."""
+        with self._lock:
+            self._remove(os.path.abspath(file_path))
+
+    def invalidate_under(self, directory: str) -> int:
+        """Удаляет из кэша модули каталога (например, выгруженного проекта)."""
+        with self._lock:
+            keys = [key for key in self._entries if self._is_under(key, directory)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def size_under(self, directory: str) -> int:
+        """Объем исходного кода закэшированных модулей каталога."""
+        with self._lock:
+            return sum(self._node_size(node) for key, (_, node) in self._entries.items()
+                       if self._is_under(key, directory))
+
+    def clear(self):
+        """Очищает кэш."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Суммарный объем исходного кода закэшированных модулей."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= self._node_size(entry[1])
+
+    @staticmethod
+    def _is_under(key: str, directory: str) -> bool:
+        prefix = os.path.join(os.path.normcase(os.path.abspath(directory)), '')
+        return os.path.normcase(key).startswith(prefix)
+
+    @staticmethod
+    def _node_size(module_node: CodeNode) -> int:
+        return len(module_node.source_code) if module_node.source_code else 0
@@ -2,9 +2,11 @@
 
 import os
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional
 from .error_handler import handle_errors
 from .ai_schema_service import AISchemaService
+from .template_registry import TemplateRegistry
+from core.data.project_materializer import MaterializationPlan, MaterializationResult, ProjectMaterializer
 
 import logging
 logger = logging.getLogger('ai_code_assistant')
@@ -13,31 +15,77 @@ logger = logging.getLogger('ai_code_assistant')
 class ProjectCreatorService:
     """Сервис создания проектов из AI-схем и шаблонов"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, template_registry: Optional[TemplateRegistry] = None):
+        self.materializer = ProjectMaterializer(max_workers=max_workers)
+        self.template_registry = template_registry or TemplateRegistry(max_workers=max_workers)
+        self.last_plan: Optional[MaterializationPlan] = None
+        self.last_result: Optional[MaterializationResult] = None
+        # Причина последнего отказа create_project_from_template (для сообщения пользователю)
+        self.last_error: Optional[str] = None
         logger.debug("Инициализирован ProjectCreatorService")
     
     @handle_errors(default_return=False)
-    def create_project_from_ai_schema(self, schema: Dict[str, Any], project_path: str) -> bool:
-        """Создает проект на основе схемы от AI"""
+    def create_project_from_ai_schema(self, schema: Dict[str, Any], project_path: str,
+                                      dry_run: bool = False) -> bool:
+        """
+        Создает проект на основе схемы от AI.
+        
+        Сначала вычисляется полный план (каталоги, файлы, совпадения с
+        существующими файлами), затем каталоги создаются одним проходом,
+        а файлы записываются атомарно параллельно. При dry_run только
+        строится план; отчет доступен в last_plan.report().
+        """
         logger.info(f"Создание проекта из AI схемы: {project_path}")
         
-        try:
-            project_dir = Path(project_path)
-            if not self._create_directory(project_dir):
-                return False
-            
-            # Создаем директории
-            self._create_directories_structure(project_dir, schema.get('modules', []))
-            
-            # Создаем файлы
-            self._create_files(project_dir, schema.get('files', {}))
-            
-            logger.info(f"Проект успешно создан: {project_path}")
+        self.last_plan, self.last_result = self.materializer.materialize(
+            project_path, schema, dry_run=dry_run
+        )
+        if dry_run:
             return True
-            
-        except Exception as e:
-            logger.error(f"Ошибка при создании проекта: {e}")
+        
+        for path, reason in self.last_plan.rejected:
+            logger.warning(f"Путь схемы отклонен: {path} ({reason})")
+        if not self.last_result.success:
+            logger.error(f"Проект создан с ошибками: {self.last_result.summary()}")
             return False
+        
+        logger.info(f"Проект успешно создан: {project_path}")
+        return True
+    
+    def plan_project_from_ai_schema(self, schema: Dict[str, Any], project_path: str) -> MaterializationPlan:
+        """План создания проекта без изменений на диске (пробный запуск)."""
+        return self.materializer.plan(project_path, schema)
+    
+    @handle_errors(default_return=False)
+    def create_project_from_template(self, template_name: str, project_path: str, project_name: str,
+                                     overwrite: bool = False) -> bool:
+        """
+        Создает проект project_path/project_name из шаблона каталога templates/.
+        Подстановки ({project_name} и др.) рендерятся, остальные файлы
+        копируются быстрым способом файловой системы. В непустой каталог
+        проект создается только с overwrite=True; причина отказа - в last_error.
+        """
+        logger.info(f"Создание проекта из шаблона {template_name}: {project_path}/{project_name}")
+        self.last_error = None
+        
+        target = Path(project_path) / project_name
+        if self.template_registry.get(template_name) is None:
+            self.last_error = f"Шаблон не найден: {template_name}"
+            return False
+        if not overwrite and target.is_dir() and any(target.iterdir()):
+            self.last_error = f"Каталог проекта не пуст: {target}"
+            logger.error(self.last_error)
+            return False
+        
+        result = self.template_registry.instantiate(
+            template_name, str(target), {'project_name': project_name}, overwrite=overwrite
+        )
+        if result is None or not result.success:
+            self.last_error = result.summary() if result is not None else "Не удалось создать проект из шаблона"
+            return False
+        
+        logger.info(f"Проект успешно создан из шаблона: {result.summary()}")
+        return True
     
     @handle_errors(default_return=False)
     def create_basic_python_project(self, project_path: str, project_name: str) -> bool:
@@ -76,42 +124,3 @@ class ProjectCreatorService:
         except Exception as e:
             logger.error(f"Ошибка при создании директории {directory}: {e}")
             return False
-    
-    def _create_directories_structure(self, base_dir: Path, modules: List[str]):
-        """Создает структуру директорий"""
-        created_dirs = set()
-        
-        for module_path in modules:
-            clean_path = module_path.strip('/')
-            if not clean_path:
-                continue
-                
-            parts = clean_path.split('/')
-            current_path = base_dir
-            
-            for part in parts:
-                current_path = current_path / part
-                if self._create_directory(current_path):
-                    created_dirs.add(str(current_path))
-        
-        logger.debug(f"Создано директорий: {len(created_dirs)}")
-    
-    def _create_files(self, base_dir: Path, files: Dict[str, str]):
-        """Создает файлы проекта"""
-        files_created = 0
-        
-        for file_path, content in files.items():
-            file_full_path = base_dir / file_path
-            
-            parent_dir = file_full_path.parent
-            if not parent_dir.exists():
-                self._create_directory(parent_dir)
-            
-            try:
-                file_full_path.write_text(content, encoding='utf-8')
-                files_created += 1
-                logger.debug(f"Создан файл: {file_full_path}")
-            except Exception as e:
-                logger.warning(f"Не удалось создать файл {file_full_path}: {e}")
-        
-        logger.info(f"Файлов создано: {files_created}/{len(files)}")
\ No newline at end of file
@@ -5,6 +5,7 @@ from core.business.project_creator_service import ProjectCreatorService
 from core.business.ai_schema_service import AISchemaService  # ← ИСПРАВЛЕНО!
 from core.business.error_handler import handle_errors
 from core.business.project_structure_service import ProjectStructureService
+from core.business.project_structure_cache import ProjectStructureCache
 from core.data.project_repository import ProjectRepository  # ← ДОБАВЛЕНО!
 
 import logging
@@ -31,11 +32,13 @@ class IProjectService(ABC):
 class ProjectService(IProjectService):
     """Сервис управления проектом с реальной реализацией."""
     
-    def __init__(self, repository=None):  # ← ДОБАВЛЕН ПАРАМЕТР ПО УМОЛЧАНИЮ
+    def __init__(self, repository=None, ast_service=None, project_structure_service=None):  # ← ДОБАВЛЕН ПАРАМЕТР ПО УМОЛЧАНИЮ
         self.repository = repository or ProjectRepository()  # ← СОЗДАЕМ ПО УМОЛЧАНИЮ
         self.project_creator = ProjectCreatorService()
         self.schema_parser = AISchemaService()  # ← ИСПРАВЛЕНО!
-        self.project_structure_service = ProjectStructureService(self.repository)
+        self.project_structure_service = (project_structure_service
+                                          or ProjectStructureService(self.repository, ast_service))
+        self.structure_cache = ProjectStructureCache(self.project_structure_service)
         self.project_path = None
         self.project_name = None
         self.opened = False
@@ -66,6 +69,8 @@ class ProjectService(IProjectService):
         
         result = self.repository.open(path)
         if result:
+            if path != self.project_path:
+                self.structure_cache.invalidate()
             self.project_path = path
             self.project_name = self._extract_project_name(path)
             self.opened = True
@@ -103,6 +108,7 @@ class ProjectService(IProjectService):
         result = self.repository.close()
         
         if result:
+            self.structure_cache.invalidate()
             self.project_path = None
             self.project_name = None
             self.opened = False
@@ -133,7 +139,9 @@ class ProjectService(IProjectService):
             return False
         
         # Создаем структуру в проекте
-        return self.project_creator.create_project_from_ai_schema(structure, self.project_path)
+        result = self.project_creator.create_project_from_ai_schema(structure, self.project_path)
+        self.structure_cache.invalidate()
+        return result
     
     def _extract_project_name(self, path):
         import os
@@ -148,7 +156,7 @@ class ProjectService(IProjectService):
             logger.warning("Нет открытого проекта для получения структуры")
             return {}
         
-        return self.project_structure_service.get_full_project_structure(self.project_path)
+        return self.structure_cache.get(self.project_path)
     
     @handle_errors(default_return={})
     def get_file_structure(self):
@@ -180,8 +188,35 @@ class ProjectService(IProjectService):
     @handle_errors(default_return={})
     def get_project_statistics(self):
         """Получить статистику по проекту."""
-        structure = self.get_project_structure()
-        return structure.get('statistics', {}) if structure else {}
+        if not self.opened or not self.project_path:
+            return {}
+        
+        self.structure_cache.get(self.project_path)
+        return self.structure_cache.statistics
+    
+    @handle_errors(default_return={})
+    def get_structure_counts(self):
+        """Получить количество файлов, директорий и модулей (из кэша структуры)."""
+        if not self.opened or not self.project_path:
+            return {}
+        
+        if self.structure_cache.peek() is None:
+            self.structure_cache.get(self.project_path)
+        return self.structure_cache.get_counts()
+    
+    def invalidate_structure(self, file_path=None):
+        """
+        Инвалидирует кэш структуры проекта.
+        
+        Args:
+            file_path: Измененный файл (после сохранения/применения изменений).
+                       Если не указан - структура будет пересобрана целиком.
+        """
+        self.structure_cache.invalidate(file_path)
+    
+    def notify_file_event(self, event_type, file_path, dest_path=None):
+        """Передает событие файлового наблюдателя в кэш структуры."""
+        self.structure_cache.on_watcher_event(event_type, file_path, dest_path)
     
     # Свойства для доступа к состоянию
     @property
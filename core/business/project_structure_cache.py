@@ -0,0 +1,255 @@
+# core/business/project_structure_cache.py
+
+"""
+Кэш полной структуры проекта с явной инвалидацией.
+
+Полное сканирование + чтение + парсинг проекта выполняется один раз.
+Дальше структура обновляется только по событиям: сохранение файла,
+применение изменений, события файлового наблюдателя.
+"""
+
+import os
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Set
+
+from core.business.project_structure_service import ProjectStructureService
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class ProjectStructureCache:
+    """
+    Кэшированная структура проекта.
+
+    Изменение содержимого файла помечает только этот файл как устаревший:
+    при следующем обращении он перечитывается и перепарсивается, а статистика
+    пересчитывается инкрементально (минус старый вклад, плюс новый).
+    Создание, удаление и перемещение файлов сбрасывают кэш целиком,
+    так как меняют список директорий и модулей.
+    """
+
+    # События наблюдателя, которые меняют состав файлов проекта
+    STRUCTURAL_EVENTS = ('created', 'deleted', 'moved')
+
+    # Во сколько раз дерево CodeNode + AST больше исходного текста (грубая оценка)
+    AST_OVERHEAD_FACTOR = 6
+
+    def __init__(self, structure_service: ProjectStructureService):
+        self.structure_service = structure_service
+        self._project_path: Optional[str] = None
+        self._structure: Optional[Dict[str, Any]] = None
+        self._dirty_files: Set[str] = set()
+        self._lock = threading.RLock()
+        self._source_bytes = 0
+        self.version = 0
+        logger.debug("Инициализирован ProjectStructureCache")
+
+    # --- Доступ к структуре ---
+
+    def get(self, project_path: str) -> Dict[str, Any]:
+        """Возвращает структуру проекта, при необходимости пересобирая ее."""
+        with self._lock:
+            if self._structure is None or self._project_path != str(project_path):
+                self._rebuild(project_path)
+            elif self._dirty_files:
+                self._refresh_dirty_files()
+            return self._structure or {}
+
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """Возвращает закэшированную структуру без пересборки (или None)."""
+        return self._structure
+
+    @property
+    def is_valid(self) -> bool:
+        """Проверяет, есть ли актуальная структура в кэше."""
+        return self._structure is not None and not self._dirty_files
+
+    # --- Инвалидация ---
+
+    def invalidate(self, file_path: Optional[str] = None):
+        """
+        Инвалидирует кэш.
+
+        Args:
+            file_path: Путь к измененному файлу. Если не указан -
+                       сбрасывается вся структура.
+        """
+        with self._lock:
+            if file_path is None or self._structure is None:
+                self._drop()
+                return
+
+            rel_path = self._to_relative(file_path)
+            if rel_path is None:
+                return
+
+            if rel_path in self._structure.get('files', {}):
+                self._dirty_files.add(rel_path)
+                logger.debug(f"Файл помечен как устаревший: {rel_path}")
+            elif rel_path.endswith('.py'):
+                # Новый Python файл меняет состав проекта
+                self._drop()
+
+    def on_watcher_event(self, event_type: str, file_path: str, dest_path: Optional[str] = None):
+        """
+        Обрабатывает событие файлового наблюдателя.
+
+        Args:
+            event_type: 'created', 'modified', 'deleted' или 'moved'
+            file_path: Путь к файлу
+            dest_path: Новый путь для события 'moved'
+        """
+        if self._structure is None:
+            return
+
+        paths = [file_path] + ([dest_path] if dest_path else [])
+        if not any(self._to_relative(path) is not None for path in paths):
+            return
+
+        if event_type in self.STRUCTURAL_EVENTS:
+            if self._is_relevant_structural_change(paths):
+                self.invalidate()
+        else:
+            self.invalidate(file_path)
+
+    # --- Дешевые O(1) аксессоры ---
+
+    @property
+    def files_count(self) -> int:
+        """Количество файлов в проекте."""
+        return len(self._structure.get('files', {})) if self._structure else 0
+
+    @property
+    def directories_count(self) -> int:
+        """Количество директорий в проекте."""
+        return len(self._structure.get('directories', [])) if self._structure else 0
+
+    @property
+    def modules_count(self) -> int:
+        """Количество модулей в проекте."""
+        return len(self._structure.get('modules', [])) if self._structure else 0
+
+    @property
+    def memory_estimate(self) -> int:
+        """Оценка памяти, занятой структурой (исходники + деревья CodeNode), в байтах."""
+        if self._structure is None:
+            return 0
+        return self._source_bytes * self.AST_OVERHEAD_FACTOR
+
+    def get_counts(self) -> Dict[str, int]:
+        """Возвращает счетчики файлов, директорий и модулей."""
+        return {
+            'files': self.files_count,
+            'directories': self.directories_count,
+            'modules': self.modules_count
+        }
+
+    @property
+    def statistics(self) -> Dict[str, Any]:
+        """Статистика проекта (устаревшие файлы пересчитываются перед выдачей)."""
+        with self._lock:
+            if self._structure is None:
+                return {}
+            if self._dirty_files:
+                self._refresh_dirty_files()
+            return self._structure.get('statistics', {})
+
+    # --- Внутренняя логика ---
+
+    def _rebuild(self, project_path: str):
+        """Полностью пересобирает структуру проекта."""
+        structure = self.structure_service.get_full_project_structure(project_path)
+        self._project_path = str(project_path)
+        self._structure = structure if structure else None
+        self._source_bytes = sum(
+            len(info.get('content') or '')
+            for info in (structure or {}).get('files', {}).values()
+            if isinstance(info, dict)
+        )
+        self._dirty_files.clear()
+        self.version += 1
+        logger.info(f"Структура проекта закэширована: {self.files_count} файлов")
+
+    def _drop(self):
+        """Сбрасывает закэшированную структуру."""
+        self._structure = None
+        self._source_bytes = 0
+        self._dirty_files.clear()
+        self.version += 1
+        logger.debug("Кэш структуры проекта сброшен")
+
+    def _refresh_dirty_files(self):
+        """Перечитывает и перепарсивает только устаревшие файлы."""
+        files = self._structure.get('files', {})
+        ast_tree = self._structure.setdefault('ast_tree', {})
+        statistics = self._structure.get('statistics')
+
+        for rel_path in list(self._dirty_files):
+            file_info = files.get(rel_path)
+            if not isinstance(file_info, dict):
+                continue
+
+            abs_path = file_info.get('path') or str(Path(self._project_path) / rel_path)
+            old_node = file_info.get('ast_node') or ast_tree.get(abs_path)
+
+            new_info = None
+            if os.path.exists(abs_path):
+                new_info = self.structure_service.get_file_with_ast(abs_path, self._project_path)
+            if not new_info:
+                # Файл исчез - дешевле пересобрать все
+                self._drop()
+                self._rebuild(self._project_path)
+                return
+
+            new_node = new_info.get('ast_node')
+            new_content = new_info.get('content', '')
+            self._source_bytes += len(new_content) - len(file_info.get('content') or '')
+            file_info['content'] = new_content
+            file_info['ast_node'] = new_node
+            if new_node is not None:
+                ast_tree[abs_path] = new_node
+            else:
+                ast_tree.pop(abs_path, None)
+
+            if statistics is not None:
+                self._apply_statistics_delta(statistics, old_node, new_node)
+
+        self._dirty_files.clear()
+        self.version += 1
+        logger.debug("Устаревшие файлы структуры обновлены")
+
+    def _apply_statistics_delta(self, statistics: Dict[str, Any], old_node, new_node):
+        """Инкрементально обновляет статистику по одному модулю."""
+        old_stats = ProjectStructureService.get_module_statistics(old_node)
+        new_stats = ProjectStructureService.get_module_statistics(new_node)
+
+        for key in old_stats:
+            statistics[key] = statistics.get(key, 0) - old_stats[key] + new_stats[key]
+
+        if old_node is None and new_node is not None:
+            statistics['python_files'] = statistics.get('python_files', 0) + 1
+        elif old_node is not None and new_node is None:
+            statistics['python_files'] = statistics.get('python_files', 0) - 1
+
+    def _is_relevant_structural_change(self, paths) -> bool:
+        """Создание/удаление влияет на структуру только для .py файлов и директорий."""
+        for path in paths:
+            if path.endswith('.py') or os.path.isdir(path) or not os.path.splitext(path)[1]:
+                return True
+        return False
+
+    def _to_relative(self, file_path: str) -> Optional[str]:
+        """Возвращает путь относительно корня проекта (или None, если файл вне проекта)."""
+        if not self._project_path:
+            return None
+
+        path = Path(file_path)
+        if not path.is_absolute():
+            return str(path)
+
+        try:
+            return str(path.relative_to(self._project_path))
+        except ValueError:
+            return None
@@ -129,18 +129,40 @@ class ProjectStructureService:
         
         # Подсчитываем элементы из AST
         for ast_node in ast_tree.values():
-            if ast_node.type == 'module_error':
-                stats['errors'] += 1
-                continue
-                
-            for child in ast_node.children:
-                if child.type == 'class':
-                    stats['classes'] += 1
-                    stats['methods'] += len([c for c in child.children if c.type == 'method'])
-                elif child.type in ['function', 'async_function']:
-                    stats['functions'] += 1
-                elif child.type == 'import_section':
-                    stats['import_sections'] += 1
+            for key, value in self.get_module_statistics(ast_node).items():
+                stats[key] += value
+        
+        return stats
+    
+    @staticmethod
+    def get_module_statistics(ast_node) -> Dict[str, int]:
+        """
+        Возвращает вклад одного модуля в статистику проекта.
+        Используется кэшем структуры для инкрементального пересчета.
+        """
+        stats = {
+            'classes': 0,
+            'functions': 0,
+            'methods': 0,
+            'import_sections': 0,
+            'errors': 0
+        }
+        
+        if ast_node is None:
+            return stats
+        
+        if ast_node.type == 'module_error':
+            stats['errors'] += 1
+            return stats
+        
+        for child in ast_node.children:
+            if child.type == 'class':
+                stats['classes'] += 1
+                stats['methods'] += len([c for c in child.children if c.type == 'method'])
+            elif child.type in ['function', 'async_function']:
+                stats['functions'] += 1
+            elif child.type == 'import_section':
+                stats['import_sections'] += 1
         
         return stats
     
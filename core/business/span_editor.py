@@ -0,0 +1,242 @@
+# core/business/span_editor.py
+
+"""
+Точечное редактирование исходного кода по диапазонам AST.
+
+Сущность (функция, класс, метод) находится по имени через AST, а не поиском
+подстроки, поэтому совпадения в комментариях, строках и других именах
+исключены. Правка вырезает диапазон строк сущности (с декораторами) из
+текста одной операцией, без разбиения файла на строки.
+"""
+
+import ast
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from core.models.code_model import CodeNode
+from .code_utils import CodeUtils
+
+logger = logging.getLogger('ai_code_assistant')
+
+FUNCTION_TYPES = ('function', 'method')
+ASYNC_FUNCTION_TYPES = ('async_function', 'async_method')
+METHOD_TYPES = ('method', 'async_method')
+
+
+class EntitySpan:
+    """
+    Диапазон сущности в тексте файла.
+
+    start_line/end_line - строки 1-based включительно (первая - с декоратором),
+    start_offset - начало первой строки, end_offset - конец последней строки
+    (без перевода строки), indent - отступ сущности.
+    """
+
+    def __init__(self, start_line: int, end_line: int, indent: int,
+                 start_offset: int, end_offset: int):
+        self.start_line = start_line
+        self.end_line = end_line
+        self.indent = indent
+        self.start_offset = start_offset
+        self.end_offset = end_offset
+
+    def __repr__(self):
+        return f"EntitySpan(lines={self.start_line}-{self.end_line}, indent={self.indent})"
+
+
+class SpanEditor:
+    """Поиск диапазонов сущностей и правки текста по ним"""
+
+    @staticmethod
+    def line_starts(source: str) -> List[int]:
+        """Смещения начала каждой строки (один проход по тексту)."""
+        starts = [0]
+        position = source.find('\n')
+        while position != -1:
+            starts.append(position + 1)
+            position = source.find('\n', position + 1)
+        return starts
+
+    @staticmethod
+    def span_for_lines(source: str, start_line: int, end_line: int, indent: int,
+                       line_starts: Optional[List[int]] = None) -> Optional[EntitySpan]:
+        """Строит диапазон по номерам строк."""
+        starts = line_starts if line_starts is not None else SpanEditor.line_starts(source)
+        if start_line < 1 or end_line < start_line or end_line > len(starts):
+            return None
+
+        end_offset = starts[end_line] - 1 if end_line < len(starts) else len(source)
+        if end_offset > 0 and source[end_offset - 1:end_offset] == '\r':
+            end_offset -= 1
+        return EntitySpan(start_line, end_line, indent, starts[start_line - 1], end_offset)
+
+    @staticmethod
+    def locate(source: str, name: str, node_type: Optional[str] = None,
+               tree: Optional[ast.AST] = None) -> Optional[EntitySpan]:
+        """
+        Находит сущность по имени (в том числе квалифицированному: Class.method).
+
+        Неквалифицированное имя ищется среди сущностей верхнего уровня, а для
+        методов (node_type 'method'/'async_method') - во вложенных классах;
+        при нескольких совпадениях возвращается None, чтобы не изменить не ту сущность.
+        """
+        if tree is None:
+            try:
+                tree = ast.parse(source)
+            except SyntaxError as e:
+                logger.warning(f"Не удалось разобрать файл для поиска '{name}': {e}")
+                return None
+
+        node = SpanEditor._find_node(tree, name.split('.'), node_type)
+        if node is None:
+            return None
+        return SpanEditor.span_for_lines(
+            source, CodeUtils.node_first_line(node), node.end_lineno, node.col_offset
+        )
+
+    @staticmethod
+    def span_from_node(source: str, node: CodeNode) -> Optional[EntitySpan]:
+        """
+        Диапазон по сохраненному положению узла CodeNode.
+        Если файл изменился после разбора (текст не совпадает с source_code),
+        сущность ищется заново по квалифицированному имени.
+        """
+        if node.has_span:
+            starts = SpanEditor.line_starts(source)
+            span = SpanEditor.span_for_lines(
+                source, node.start_line, node.end_line, node.start_col or 0, starts
+            )
+            if span is not None and node.source_code and \
+                    source[span.start_offset:span.end_offset].endswith(node.source_code):
+                return span
+
+        return SpanEditor.locate(source, node.qualified_name, node.type)
+
+    @staticmethod
+    def replace(source: str, span: EntitySpan, new_code: str) -> str:
+        """Заменяет сущность новым кодом, выравнивая его отступ по сущности."""
+        return SpanEditor.apply(source, [(span, new_code)])
+
+    @staticmethod
+    def delete(source: str, span: EntitySpan) -> str:
+        """Удаляет сущность вместе с переводом строки."""
+        return SpanEditor.apply(source, [(span, None)])
+
+    @staticmethod
+    def apply(source: str, edits: Sequence[Tuple[EntitySpan, Optional[str]]]) -> str:
+        """
+        Применяет несколько непересекающихся правок за один проход.
+        new_code=None означает удаление.
+
+        Raises:
+            ValueError: если диапазоны правок пересекаются
+        """
+        splices = []
+        for span, new_code in edits:
+            if new_code is None:
+                splices.append((span.start_offset, SpanEditor.deletion_end(source, span), ""))
+            else:
+                splices.append((span.start_offset, span.end_offset, SpanEditor.align(new_code, span.indent)))
+        return SpanEditor.splice(source, splices)
+
+    @staticmethod
+    def splice(source: str, splices: Sequence[Tuple[int, int, str]]) -> str:
+        """
+        Заменяет диапазоны смещений [start, end) текстом за один проход.
+        Вставки (start == end) в одной позиции сохраняют исходный порядок.
+
+        Raises:
+            ValueError: если диапазоны пересекаются
+        """
+        pieces = []
+        position = 0
+        ordered = sorted(enumerate(splices), key=lambda item: (item[1][0], item[1][1], item[0]))
+        for _, (start, end, text) in ordered:
+            if start < position:
+                raise ValueError(f"Пересекающиеся правки: {start}-{end}")
+            pieces.append(source[position:start])
+            pieces.append(text)
+            position = end
+        pieces.append(source[position:])
+        return ''.join(pieces)
+
+    @staticmethod
+    def align(new_code: str, indent: int) -> str:
+        """Выравнивает отступ кода по отступу заменяемой сущности."""
+        lines = new_code.strip('\n').split('\n')
+        first = next((line for line in lines if line.strip()), '')
+        current = len(first) - len(first.lstrip(' \t'))
+        return '\n'.join(CodeUtils.reindent(lines, current, indent))
+
+    @staticmethod
+    def deletion_end(source: str, span: EntitySpan) -> int:
+        """
+        Конец удаляемого фрагмента: строки сущности с переводом строки,
+        а если перед сущностью пустая строка или заголовок блока (первый член
+        класса) - и следующие за ней пустые строки, чтобы не оставлять лишних разрывов.
+        """
+        end = source.find('\n', span.end_offset)
+        end = len(source) if end == -1 else end + 1
+
+        previous_start = source.rfind('\n', 0, max(span.start_offset - 1, 0)) + 1
+        previous_line = source[previous_start:span.start_offset].strip()
+        if span.start_offset == 0 or not previous_line or previous_line.endswith(':'):
+            while end < len(source):
+                next_end = source.find('\n', end)
+                line_end = len(source) if next_end == -1 else next_end + 1
+                if source[end:line_end].strip():
+                    break
+                end = line_end
+        return end
+
+    @staticmethod
+    def _find_node(tree: ast.AST, parts: List[str], node_type: Optional[str]) -> Optional[ast.AST]:
+        definitions = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+        if len(parts) > 1:
+            scope = tree
+            for part in parts[:-1]:
+                scope = next((item for item in scope.body
+                              if isinstance(item, ast.ClassDef) and item.name == part), None)
+                if scope is None:
+                    return None
+            return next((item for item in scope.body
+                         if isinstance(item, definitions) and item.name == parts[-1]
+                         and SpanEditor._type_matches(item, node_type)), None)
+
+        name = parts[0]
+        if node_type not in METHOD_TYPES:
+            # Функции и классы без квалификации ищутся только на верхнем уровне:
+            # одноименный метод класса - другая сущность
+            return next((item for item in tree.body
+                         if isinstance(item, definitions) and item.name == name
+                         and SpanEditor._type_matches(item, node_type)), None)
+
+        matches = []
+        stack = [item for item in tree.body if isinstance(item, ast.ClassDef)]
+        while stack:
+            class_node = stack.pop()
+            for item in class_node.body:
+                if isinstance(item, definitions) and item.name == name and \
+                        SpanEditor._type_matches(item, node_type):
+                    matches.append(item)
+                if isinstance(item, ast.ClassDef):
+                    stack.append(item)
+
+        if len(matches) > 1:
+            logger.warning(f"Имя '{name}' неоднозначно ({len(matches)} совпадений), "
+                           f"укажите квалифицированное имя")
+            return None
+        return matches[0] if matches else None
+
+    @staticmethod
+    def _type_matches(node: ast.AST, node_type: Optional[str]) -> bool:
+        if not node_type:
+            return True
+        if node_type == 'class':
+            return isinstance(node, ast.ClassDef)
+        if node_type in FUNCTION_TYPES:
+            return isinstance(node, ast.FunctionDef)
+        if node_type in ASYNC_FUNCTION_TYPES:
+            return isinstance(node, ast.AsyncFunctionDef)
+        return True
@@ -0,0 +1,243 @@
+# core/business/structural_diff.py
+
+"""
+Структурный diff на уровне сущностей (классы, функции, методы, секции модуля).
+
+Деревья CodeNode выравниваются по квалифицированным именам и отпечаткам AST:
+совпадающие по отпечатку сущности пропускаются без сравнения текста,
+переименования распознаются по одинаковому содержимому, а построчный diff
+считается только для действительно измененных сущностей.
+"""
+
+import ast
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from core.models.code_model import CodeNode
+from .code_utils import CodeUtils
+from .line_diff import LineDiff
+
+logger = logging.getLogger('ai_code_assistant')
+
+ENTITY_TYPES = ('class', 'function', 'async_function', 'method', 'async_method')
+SECTION_TYPES = ('import_section', 'global_section')
+
+TYPE_TITLES = {
+    'class': 'класс',
+    'function': 'функция',
+    'async_function': 'async функция',
+    'method': 'метод',
+    'async_method': 'async метод',
+    'import_section': 'импорты',
+    'global_section': 'глобальный код',
+}
+
+
+class EntityDiff:
+    """
+    Изменение одной сущности.
+
+    kind: 'added', 'removed', 'renamed', 'signature_changed', 'body_changed'
+    """
+
+    def __init__(self, kind: str, qualified_name: str, node_type: str,
+                 old_node: Optional[CodeNode] = None, new_node: Optional[CodeNode] = None,
+                 old_name: str = ""):
+        self.kind = kind
+        self.qualified_name = qualified_name
+        self.node_type = node_type
+        self.old_node = old_node
+        self.new_node = new_node
+        self.old_name = old_name
+        self.body_changed = kind == 'body_changed'
+        self.line_diff: List[Tuple[str, str]] = []
+
+    @property
+    def summary(self) -> str:
+        """Краткое описание изменения."""
+        title = TYPE_TITLES.get(self.node_type, self.node_type)
+        if self.node_type in SECTION_TYPES:
+            return {'added': f"{title}: добавлены", 'removed': f"{title}: удалены"}.get(
+                self.kind, f"{title}: изменены")
+
+        name = self.qualified_name
+        if self.kind == 'added':
+            return f"{title} {name} добавлен(а)"
+        if self.kind == 'removed':
+            return f"{title} {name} удален(а)"
+        if self.kind == 'renamed':
+            return f"{title} {self.old_name} переименован(а) в {name}"
+        if self.kind == 'signature_changed':
+            suffix = " и тело" if self.body_changed else ""
+            return f"{title} {name}: изменена сигнатура{suffix}"
+        return f"{title} {name}: изменено тело"
+
+    def __repr__(self):
+        return f"EntityDiff({self.kind}, {self.qualified_name})"
+
+
+class _Entity:
+    """Сущность дерева с отпечатками для выравнивания."""
+
+    __slots__ = ('name', 'qualified_name', 'parent', 'node', 'order',
+                 'signature', 'body', 'text', 'trivial')
+
+    def __init__(self, node: CodeNode, qualified_name: str, parent: str, order: int):
+        self.name = node.name
+        self.qualified_name = qualified_name
+        self.parent = parent
+        self.node = node
+        self.order = order
+        self.text = StructuralDiff.entity_text(node)
+        self.signature, self.body = StructuralDiff.fingerprints(node, self.text)
+        self.trivial = StructuralDiff.is_trivial(node)
+
+    @property
+    def content(self) -> Tuple[str, str]:
+        return self.signature, self.body
+
+
+class StructuralDiff:
+    """Сравнение двух деревьев CodeNode на уровне сущностей"""
+
+    @staticmethod
+    def compare(old_root: Optional[CodeNode], new_root: Optional[CodeNode],
+                with_line_diff: bool = True) -> List[EntityDiff]:
+        """
+        Сравнивает деревья модулей.
+
+        Returns:
+            Изменения в порядке следования сущностей в новой версии,
+            затем удаленные сущности в порядке старой версии.
+        """
+        old_entities = StructuralDiff._collect(old_root)
+        new_entities = StructuralDiff._collect(new_root)
+
+        diffs: List[Tuple[int, EntityDiff]] = []
+        unmatched_new: List[_Entity] = []
+
+        for key, new in new_entities.items():
+            old = old_entities.pop(key, None)
+            if old is None:
+                unmatched_new.append(new)
+            elif old.content != new.content:
+                kind = 'signature_changed' if old.signature != new.signature else 'body_changed'
+                entity_diff = EntityDiff(kind, new.qualified_name, new.node.type, old.node, new.node)
+                entity_diff.body_changed = old.body != new.body
+                if with_line_diff:
+                    entity_diff.line_diff = StructuralDiff._line_diff(old.text, new.text)
+                diffs.append((new.order, entity_diff))
+
+        # Переименование: то же содержимое в той же области под другим именем
+        renamed_candidates: Dict[Tuple, List[_Entity]] = {}
+        for old in old_entities.values():
+            renamed_candidates.setdefault((old.parent, old.node.type) + old.content, []).append(old)
+
+        for new in unmatched_new:
+            candidates = renamed_candidates.get((new.parent, new.node.type) + new.content)
+            if candidates and not new.trivial:
+                old = candidates.pop(0)
+                del old_entities[(old.qualified_name, old.node.type)]
+                entity_diff = EntityDiff('renamed', new.qualified_name, new.node.type,
+                                         old.node, new.node, old_name=old.qualified_name)
+            else:
+                entity_diff = EntityDiff('added', new.qualified_name, new.node.type, new_node=new.node)
+                if with_line_diff:
+                    entity_diff.line_diff = [('insert', line) for line in (new.text + '\n').splitlines(True)]
+            diffs.append((new.order, entity_diff))
+
+        diffs.sort(key=lambda item: item[0])
+        result = [entity_diff for _, entity_diff in diffs]
+
+        for old in sorted(old_entities.values(), key=lambda entity: entity.order):
+            entity_diff = EntityDiff('removed', old.qualified_name, old.node.type, old_node=old.node)
+            if with_line_diff:
+                entity_diff.line_diff = [('delete', line) for line in (old.text + '\n').splitlines(True)]
+            result.append(entity_diff)
+
+        logger.debug(f"Структурный diff: {len(result)} изменений сущностей")
+        return result
+
+    @staticmethod
+    def entity_text(node: CodeNode) -> str:
+        """
+        Текст сущности для построчного сравнения. У класса исключаются
+        методы - они сравниваются как отдельные сущности.
+        """
+        source = node.source_code or ""
+        class_node = node.ast_node
+        if node.type != 'class' or not isinstance(class_node, ast.ClassDef):
+            return source
+
+        lines = source.split('\n')
+        offset = class_node.lineno
+        excluded = set()
+        for item in class_node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                excluded.update(range(CodeUtils.node_first_line(item) - offset, item.end_lineno - offset + 1))
+        return '\n'.join(line for index, line in enumerate(lines) if index not in excluded)
+
+    @staticmethod
+    def fingerprints(node: CodeNode, text: str) -> Tuple[str, str]:
+        """Отпечатки (сигнатура, тело) сущности, не зависящие от форматирования."""
+        ast_node = node.ast_node
+        if isinstance(ast_node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            signature = [ast_node.args, ast_node.returns] + list(ast_node.decorator_list)
+            return StructuralDiff._digest(signature), StructuralDiff._digest(ast_node.body)
+        if isinstance(ast_node, ast.ClassDef):
+            signature = list(ast_node.bases) + list(ast_node.keywords) + list(ast_node.decorator_list)
+            body = [item for item in ast_node.body
+                    if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            return StructuralDiff._digest(signature), StructuralDiff._digest(body)
+
+        # Секции модуля сравниваются по тексту без пустых строк
+        normalized = '\n'.join(line.rstrip() for line in text.split('\n') if line.strip())
+        return "", hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def is_trivial(node: CodeNode) -> bool:
+        """
+        Заглушка (тело из pass, ... или только докстринга) или секция модуля.
+        Одинаковое содержимое таких сущностей не означает переименования.
+        """
+        if node.type in SECTION_TYPES:
+            return True
+        body = getattr(node.ast_node, 'body', None)
+        if body is None:
+            return True
+        return all(isinstance(item, ast.Pass) or
+                   (isinstance(item, ast.Expr) and isinstance(item.value, ast.Constant))
+                   for item in body)
+
+    @staticmethod
+    def _digest(nodes) -> str:
+        parts = [CodeUtils.fingerprint_node(item) if isinstance(item, ast.AST) else repr(item)
+                 for item in nodes]
+        return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _collect(root: Optional[CodeNode]) -> Dict[Tuple[str, str], _Entity]:
+        """Сущности дерева: {(квалифицированное имя, тип): _Entity} в порядке обхода."""
+        entities: Dict[Tuple[str, str], _Entity] = {}
+        if root is None:
+            return entities
+
+        stack = [(child, "") for child in reversed(root.children)]
+        while stack:
+            node, parent = stack.pop()
+            if node.type not in ENTITY_TYPES and node.type not in SECTION_TYPES:
+                continue
+            qualified_name = f"{parent}.{node.name}" if parent else node.name
+            key = (qualified_name, node.type)
+            if key not in entities:
+                entities[key] = _Entity(node, qualified_name, parent, len(entities))
+            if node.type == 'class':
+                stack.extend((child, qualified_name) for child in reversed(node.children))
+        return entities
+
+    @staticmethod
+    def _line_diff(old_text: str, new_text: str) -> List[Tuple[str, str]]:
+        # Текст сущности не заканчивается переводом строки: добавляем его,
+        # чтобы последняя строка сравнивалась так же, как остальные
+        return LineDiff.diff((old_text + '\n').splitlines(True), (new_text + '\n').splitlines(True))
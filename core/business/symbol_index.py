@@ -0,0 +1,77 @@
+# core/business/symbol_index.py
+
+"""
+Индекс символов проекта для быстрого поиска сущностей по имени и типу.
+Строится за один обход дерева проекта вместо DFS на каждый запрос.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from core.models.code_model import CodeNode
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class SymbolIndex:
+    """
+    Индекс (имя, тип) -> CodeNode.
+
+    Порядок обхода совпадает с прежним поиском (модули в порядке дерева,
+    внутри модуля - обход в глубину), поэтому для повторяющихся имен
+    возвращается тот же узел, что и при линейном поиске.
+    """
+
+    def __init__(self, project_tree: Dict[str, CodeNode] = None):
+        self._by_key: Dict[Tuple[str, str], CodeNode] = {}
+        self._by_name: Dict[str, List[CodeNode]] = {}
+        self.signature: Tuple = ()
+        if project_tree:
+            self.build(project_tree)
+
+    @staticmethod
+    def tree_signature(project_tree: Dict[str, CodeNode]) -> Tuple:
+        """
+        Дешевая сигнатура дерева проекта: меняется при замене любого модуля.
+        Позволяет переиспользовать индекс, пока дерево не изменилось, в том числе
+        для копии словаря (например, снимка дерева для фонового анализа).
+        Индекс держит ссылки на узлы модулей, поэтому их id не переиспользуются.
+        """
+        return (len(project_tree),) + tuple(id(node) for node in project_tree.values())
+
+    def build(self, project_tree: Dict[str, CodeNode]):
+        """Строит индекс за один обход дерева."""
+        self._by_key.clear()
+        self._by_name.clear()
+
+        for module_node in project_tree.values():
+            if module_node is None:
+                continue
+            stack = [module_node]
+            while stack:
+                node = stack.pop()
+                self._by_key.setdefault((node.name, node.type), node)
+                self._by_name.setdefault(node.name, []).append(node)
+                # Обратный порядок сохраняет обход в глубину слева направо
+                stack.extend(reversed(node.children))
+
+        self.signature = self.tree_signature(project_tree)
+        logger.debug(f"Индекс символов построен: {len(self._by_key)} записей")
+
+    def is_valid_for(self, project_tree: Dict[str, CodeNode]) -> bool:
+        """Проверяет, построен ли индекс для текущей версии дерева."""
+        return self.signature == self.tree_signature(project_tree)
+
+    def lookup(self, name: str, node_type: str) -> Optional[CodeNode]:
+        """Находит первую сущность с указанными именем и типом."""
+        return self._by_key.get((name, node_type))
+
+    def lookup_all(self, name: str) -> List[CodeNode]:
+        """Возвращает все сущности с указанным именем."""
+        return list(self._by_name.get(name, []))
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._by_key
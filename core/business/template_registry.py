@@ -0,0 +1,422 @@
+# core/business/template_registry.py
+
+"""
+Реестр шаблонов проектов.
+
+Каталог templates/ просматривается один раз: для каждого шаблона
+строится манифест - список файлов с размером, хэшем и найденными
+подстановками ({project_name} и т.п.), а также отсортированный список
+каталогов. Манифесты кэшируются в памяти и, если задан cache_file, на
+диске: при следующем запуске файлы с прежними размером и временем
+изменения не перечитываются.
+
+При создании проекта файлы с подстановками рендерятся из заранее
+прочитанного текста, а остальные копируются быстрым путем: жесткой
+ссылкой (если разрешено), клонированием (reflink), copy_file_range или
+обычным копированием - что первым поддерживается файловой системой.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger('ai_code_assistant')
+
+# ioctl FICLONE (Linux): клонирование файла без копирования данных
+_FICLONE = 0x40049409
+_HEADER = re.compile(r'^(?:#|//)\s*templates/\S+\s*$')
+_IGNORED_DIRS = {'__pycache__', '.git'}
+
+
+class TemplateFile:
+    """Файл шаблона в манифесте"""
+
+    __slots__ = ('path', 'size', 'mtime_ns', 'digest', 'placeholders', 'header', 'text')
+
+    def __init__(self, path: str, size: int, mtime_ns: int, digest: str,
+                 placeholders: List[str], header: bool = False, text: Optional[str] = None):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+        self.placeholders = placeholders
+        # Первая строка - служебный заголовок с путем файла в templates/
+        self.header = header
+        # Текст файла, который рендерится при создании проекта
+        self.text = text
+
+    @property
+    def rendered(self) -> bool:
+        return bool(self.placeholders) or self.header
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'path': self.path, 'size': self.size, 'mtime_ns': self.mtime_ns,
+                'digest': self.digest, 'placeholders': self.placeholders,
+                'header': self.header, 'text': self.text}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TemplateFile':
+        return cls(data['path'], data['size'], data['mtime_ns'], data['digest'],
+                   data.get('placeholders', []), data.get('header', False), data.get('text'))
+
+    def __repr__(self):
+        return f"TemplateFile({self.path}, rendered={self.rendered})"
+
+
+class TemplateManifest:
+    """Манифест шаблона: описание, файлы и каталоги"""
+
+    def __init__(self, name: str, root: Path, info: Dict[str, Any], files: List[TemplateFile]):
+        self.name = name
+        self.root = root
+        self.info = info
+        self.files = files
+        directories = {str(Path(item.path).parent.as_posix()) for item in files}
+        directories.discard('.')
+        # Каталоги с промежуточными, родитель раньше потомка
+        for directory in list(directories):
+            parent = Path(directory).parent
+            while str(parent) != '.':
+                directories.add(parent.as_posix())
+                parent = parent.parent
+        self.directories = sorted(directories, key=lambda path: (path.count('/'), path))
+
+    @property
+    def description(self) -> str:
+        return self.info.get('description', '')
+
+    @property
+    def placeholders(self) -> List[str]:
+        return sorted({name for item in self.files for name in item.placeholders})
+
+    def __repr__(self):
+        return f"TemplateManifest({self.name}, files={len(self.files)})"
+
+
+class TemplateResult:
+    """Результат создания проекта из шаблона"""
+
+    def __init__(self, template: str, target: Path):
+        self.template = template
+        self.target = target
+        self.rendered: List[str] = []
+        # Способ копирования -> количество файлов
+        self.copied: Dict[str, int] = {}
+        self.failed: List[str] = []
+        self.duration = 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> str:
+        methods = ", ".join(f"{method}: {count}" for method, count in sorted(self.copied.items()))
+        return (f"Шаблон {self.template}: отрендерено {len(self.rendered)}, "
+                f"скопировано {sum(self.copied.values())}" + (f" ({methods})" if methods else "")
+                + (f", ошибок {len(self.failed)}" if self.failed else ""))
+
+    def __repr__(self):
+        return f"TemplateResult({self.summary()})"
+
+
+class TemplateRegistry:
+    """Реестр шаблонов каталога templates/ с кэшем манифестов"""
+
+    INFO_FILE = "template_info.json"
+    DEFAULT_DIR = Path(__file__).resolve().parents[2] / "templates"
+    DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".ai_code_assistant", "template_manifests.json")
+    DEFAULT_PLACEHOLDERS = ('project_name', 'year', 'date')
+    # Текст файлов больше этого размера не кэшируется в манифесте
+    MAX_CACHED_TEXT = 1024 * 1024
+
+    def __init__(self, templates_dir: Optional[str] = None, cache_file: Optional[str] = None,
+                 max_workers: int = 8, link: bool = False):
+        """
+        Args:
+            templates_dir: Каталог шаблонов (по умолчанию templates/ приложения)
+            cache_file: Файл кэша манифестов между запусками (None - только память)
+            max_workers: Наибольшее число потоков копирования
+            link: Разрешить жесткие ссылки на файлы шаблона. Файлы проекта и
+                  шаблона тогда общие: запись в файл на месте меняет шаблон
+        """
+        self.templates_dir = Path(templates_dir) if templates_dir else self.DEFAULT_DIR
+        self.cache_file = cache_file
+        self.max_workers = max_workers
+        self.link = link
+        self.scan_count = 0
+        self._manifests: Optional[Dict[str, TemplateManifest]] = None
+        self._lock = threading.Lock()
+
+    # --- Манифесты ---
+
+    def names(self) -> List[str]:
+        """Имена доступных шаблонов."""
+        return sorted(self._get_manifests())
+
+    def get(self, name: str) -> Optional[TemplateManifest]:
+        """Манифест шаблона или None."""
+        return self._get_manifests().get(name)
+
+    def refresh(self):
+        """Сбрасывает кэш: шаблоны будут просмотрены заново при следующем обращении."""
+        with self._lock:
+            self._manifests = None
+
+    def _get_manifests(self) -> Dict[str, TemplateManifest]:
+        with self._lock:
+            if self._manifests is None:
+                self._manifests = self._scan()
+            return self._manifests
+
+    def _scan(self) -> Dict[str, TemplateManifest]:
+        self.scan_count += 1
+        started = time.perf_counter()
+        manifests: Dict[str, TemplateManifest] = {}
+        if not self.templates_dir.is_dir():
+            logger.warning(f"Каталог шаблонов не найден: {self.templates_dir}")
+            return manifests
+
+        cached = self._load_cache()
+        for entry in sorted(os.scandir(self.templates_dir), key=lambda item: item.name):
+            if not entry.is_dir() or entry.name.startswith('.') or entry.name in _IGNORED_DIRS:
+                continue
+            root = Path(entry.path)
+            info = self._read_info(root / self.INFO_FILE)
+            name = info.get('name') or entry.name
+            placeholders = tuple(info.get('placeholders', ())) + self.DEFAULT_PLACEHOLDERS
+            previous = {item['path']: item for item in cached.get(name, {}).get('files', [])}
+            files = [self._scan_file(root, relative, placeholders, previous.get(relative))
+                     for relative in self._walk(root)]
+            manifests[name] = TemplateManifest(name, root, info, files)
+
+        self._save_cache(manifests)
+        logger.info(f"Шаблонов найдено: {len(manifests)} за {time.perf_counter() - started:.3f} с")
+        return manifests
+
+    def _walk(self, root: Path) -> List[str]:
+        result = []
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = sorted(name for name in subdirs if name not in _IGNORED_DIRS)
+            relative_dir = Path(directory).relative_to(root)
+            for name in sorted(files):
+                if relative_dir == Path('.') and name == self.INFO_FILE:
+                    continue
+                if name.endswith(('.pyc', '.pyo')):
+                    continue
+                result.append((relative_dir / name).as_posix())
+        return result
+
+    def _scan_file(self, root: Path, relative: str, placeholders, cached: Optional[Dict]) -> TemplateFile:
+        path = root / relative
+        stat = path.stat()
+        if cached and cached.get('size') == stat.st_size and cached.get('mtime_ns') == stat.st_mtime_ns:
+            return TemplateFile.from_dict(cached)
+
+        data = path.read_bytes()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            # Двоичный файл: только копирование
+            return TemplateFile(relative, stat.st_size, stat.st_mtime_ns, digest, [])
+
+        found = [name for name in placeholders if '{' + name + '}' in text]
+        first_line = text.split('\n', 1)[0]
+        header = bool(_HEADER.match(first_line))
+        rendered = bool(found) or header
+        keep_text = rendered and len(data) <= self.MAX_CACHED_TEXT
+        return TemplateFile(relative, stat.st_size, stat.st_mtime_ns, digest, found, header,
+                            text if keep_text else None)
+
+    @staticmethod
+    def _read_info(path: Path) -> Dict[str, Any]:
+        """template_info.json; строки-комментарии '//' в начале допускаются."""
+        try:
+            lines = path.read_text(encoding='utf-8').splitlines()
+        except OSError:
+            return {}
+        body = "\n".join(line for line in lines if not line.lstrip().startswith('//'))
+        try:
+            info = json.loads(body) if body.strip() else {}
+        except ValueError as e:
+            logger.warning(f"Некорректное описание шаблона {path}: {e}")
+            return {}
+        return info if isinstance(info, dict) else {}
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('templates_dir') != str(self.templates_dir):
+            return {}
+        return data.get('templates', {})
+
+    def _save_cache(self, manifests: Dict[str, TemplateManifest]):
+        if not self.cache_file:
+            return
+        data = {
+            'templates_dir': str(self.templates_dir),
+            'templates': {name: {'files': [item.to_dict() for item in manifest.files]}
+                          for name, manifest in manifests.items()}
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            temp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить кэш шаблонов: {e}")
+
+    # --- Создание проекта ---
+
+    def instantiate(self, name: str, target_dir: str, variables: Optional[Dict[str, str]] = None,
+                    overwrite: bool = False) -> Optional[TemplateResult]:
+        """
+        Создает проект из шаблона.
+
+        Args:
+            name: Имя шаблона
+            target_dir: Каталог нового проекта
+            variables: Значения подстановок ({'project_name': ...});
+                       year и date подставляются автоматически
+            overwrite: Разрешить запись в непустой каталог
+
+        Returns:
+            TemplateResult или None, если шаблон не найден или каталог занят
+        """
+        manifest = self.get(name)
+        if manifest is None:
+            logger.error(f"Шаблон не найден: {name}")
+            return None
+
+        target = Path(target_dir)
+        if not overwrite and target.is_dir() and any(target.iterdir()):
+            logger.error(f"Каталог проекта не пуст: {target}")
+            return None
+
+        started = time.perf_counter()
+        today = datetime.date.today()
+        values = {'year': str(today.year), 'date': today.isoformat()}
+        values.update(variables or {})
+
+        result = TemplateResult(name, target)
+        target.mkdir(parents=True, exist_ok=True)
+        for directory in manifest.directories:
+            (target / directory).mkdir(exist_ok=True)
+
+        def create(item: TemplateFile) -> Optional[str]:
+            """Способ создания файла ('render', способ копирования) или None при ошибке."""
+            destination = target / item.path
+            try:
+                if overwrite and destination.exists():
+                    destination.unlink()
+                if item.rendered:
+                    text = item.text if item.text is not None else \
+                        (manifest.root / item.path).read_text(encoding='utf-8')
+                    with open(destination, 'w', encoding='utf-8', newline='') as f:
+                        f.write(self._render(text, item, values))
+                    return 'render'
+                return self._copy(manifest.root / item.path, destination, item.size)
+            except OSError as e:
+                logger.error(f"Ошибка создания файла {destination}: {e}")
+                return None
+
+        workers = max(1, min(self.max_workers, len(manifest.files)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            methods = list(executor.map(create, manifest.files))
+
+        for item, method in zip(manifest.files, methods):
+            if method is None:
+                result.failed.append(item.path)
+            elif method == 'render':
+                result.rendered.append(item.path)
+            else:
+                result.copied[method] = result.copied.get(method, 0) + 1
+
+        result.duration = time.perf_counter() - started
+        logger.info(f"{result.summary()} за {result.duration * 1000:.1f} мс")
+        return result
+
+    @staticmethod
+    def _render(text: str, item: TemplateFile, values: Dict[str, str]) -> str:
+        if item.header:
+            # Служебный заголовок и пустые строки после него не переносятся в проект
+            text = text.split('\n', 1)[1] if '\n' in text else ""
+            text = text.lstrip('\r\n')
+        for name in item.placeholders:
+            if name in values:
+                text = text.replace('{' + name + '}', values[name])
+        return text
+
+    def _copy(self, source: Path, destination: Path, size: int) -> str:
+        """Копирует файл самым быстрым доступным способом; возвращает его название."""
+        if self.link:
+            try:
+                os.link(source, destination)
+                return 'link'
+            except OSError:
+                pass
+
+        with open(source, 'rb') as fsrc, open(destination, 'wb') as fdst:
+            if size == 0:
+                method = 'empty'
+            elif fcntl is not None and self._reflink(fsrc, fdst):
+                method = 'reflink'
+            elif self._copy_file_range(fsrc, fdst, size):
+                method = 'copy_file_range'
+            else:
+                shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+                method = 'copy'
+
+        mode = os.stat(source).st_mode
+        if mode & 0o111:
+            os.chmod(destination, mode & 0o7777)
+        return method
+
+    @staticmethod
+    def _reflink(fsrc, fdst) -> bool:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _copy_file_range(fsrc, fdst, size: int) -> bool:
+        if not hasattr(os, 'copy_file_range'):
+            return False
+        remaining = size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            remaining = size
+        if remaining == 0:
+            return True
+        # Частичное копирование: начинаем заново обычным способом
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        return False
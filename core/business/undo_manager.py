@@ -0,0 +1,375 @@
+# core/business/undo_manager.py
+
+"""
+Отмена и повтор примененных изменений.
+
+Для каждой примененной транзакции (набора файлов, записанных одним
+применением изменений) хранятся не копии файлов, а компактные патчи:
+измененные области в обратную сторону (для отмены) и в прямую (для
+повтора). Перед отменой проверяется, что файл не менялся после
+применения; все файлы транзакции записываются под журналом отката,
+поэтому отмена многофайловой интеграции выполняется целиком или никак.
+
+Объем патчей в памяти ограничен: при превышении лимита старые транзакции
+выгружаются на диск и читаются оттуда по требованию.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.data.rollback_journal import RollbackJournal
+from .diff_result import content_hash
+from .merge import Region, ThreeWayMerge
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class FilePatch:
+    """Изменение одного файла в виде обратных и прямых областей"""
+
+    __slots__ = ('path', 'before_hash', 'after_hash', 'created', 'deleted', 'reverse', 'forward')
+
+    def __init__(self, path: str, before_hash: Optional[str], after_hash: Optional[str],
+                 reverse: List[Region], forward: List[Region]):
+        self.path = path
+        self.before_hash = before_hash
+        self.after_hash = after_hash
+        # Файл создан (не было версии до) или удален (нет версии после)
+        self.created = before_hash is None
+        self.deleted = after_hash is None
+        self.reverse = reverse
+        self.forward = forward
+
+    @classmethod
+    def from_versions(cls, path: str, before: Optional[str], after: Optional[str]) -> 'FilePatch':
+        """Патч по версиям файла до и после записи (None - файла нет)."""
+        before_lines = before.splitlines(keepends=True) if before is not None else []
+        after_lines = after.splitlines(keepends=True) if after is not None else []
+        # Для созданного файла отмена - удаление, обратные области не нужны
+        reverse = ThreeWayMerge.changed_regions(after_lines, before_lines) if before is not None else []
+        forward = ThreeWayMerge.changed_regions(before_lines, after_lines) if after is not None else []
+        return cls(path, _hash(before), _hash(after), reverse, forward)
+
+    @property
+    def size(self) -> int:
+        """Примерный объем патча в памяти, байт."""
+        return sum(64 + sum(len(line) for line in lines)
+                   for regions in (self.reverse, self.forward) for _, _, lines in regions)
+
+    def revert(self, text: Optional[str]) -> Optional[str]:
+        """Версия до записи по версии после (None - файл удаляется)."""
+        if self.created:
+            return None
+        return _apply_regions(text or "", self.reverse)
+
+    def reapply(self, text: Optional[str]) -> Optional[str]:
+        """Версия после записи по версии до (None - файл удаляется)."""
+        if self.deleted:
+            return None
+        return _apply_regions(text or "", self.forward)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'before': self.before_hash,
+            'after': self.after_hash,
+            'reverse': [list(region) for region in self.reverse],
+            'forward': [list(region) for region in self.forward],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FilePatch':
+        return cls(data['path'], data.get('before'), data.get('after'),
+                   [tuple(region) for region in data.get('reverse', [])],
+                   [tuple(region) for region in data.get('forward', [])])
+
+    def __repr__(self):
+        return f"FilePatch({self.path}, reverse={len(self.reverse)}, forward={len(self.forward)})"
+
+
+class UndoTransaction:
+    """Патчи файлов одного применения изменений"""
+
+    def __init__(self, label: str, patches: List[FilePatch], timestamp: Optional[float] = None):
+        self.label = label
+        self.files = [patch.path for patch in patches]
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.size = sum(patch.size for patch in patches)
+        # None - патчи выгружены на диск в spill_path
+        self.patches: Optional[List[FilePatch]] = patches
+        self.spill_path: Optional[str] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self.patches is None
+
+    def __repr__(self):
+        return f"UndoTransaction({self.label!r}, files={len(self.files)})"
+
+
+class UndoManager:
+    """Стеки отмены и повтора примененных транзакций"""
+
+    def __init__(self, repository=None, memory_limit: int = 8 * 1024 * 1024,
+                 spill_dir: Optional[str] = None, max_depth: int = 100,
+                 journal_dir: Optional[str] = None):
+        """
+        Args:
+            repository: Репозиторий для чтения и атомарной записи файлов
+            memory_limit: Предельный объем патчей в памяти, байт
+            spill_dir: Каталог выгрузки патчей (по умолчанию временный)
+            max_depth: Наибольшее число транзакций в стеке отмены
+            journal_dir: Каталог журнала отката (по умолчанию временный)
+        """
+        self.repository = repository
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.max_depth = max_depth
+        self.journal_dir = journal_dir
+        self.last_error = ""
+        self._undo: List[UndoTransaction] = []
+        self._redo: List[UndoTransaction] = []
+        self._memory = 0
+        self._spill_counter = 0
+        self._own_spill_dir = False
+        self._lock = threading.RLock()
+
+    # --- Состояние ---
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    @property
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
+
+    @property
+    def memory_usage(self) -> int:
+        """Объем патчей, находящихся в памяти, байт."""
+        return self._memory
+
+    # --- Запись ---
+
+    def record(self, label: str,
+               versions: Dict[str, Tuple[Optional[str], Optional[str]]]) -> Optional[UndoTransaction]:
+        """
+        Запоминает примененную транзакцию. Стек повтора очищается.
+
+        Args:
+            label: Описание транзакции
+            versions: Путь -> (текст до, текст после); None - файла нет
+
+        Returns:
+            Транзакция или None, если ни один файл не изменился
+        """
+        patches = [FilePatch.from_versions(path, before, after)
+                   for path, (before, after) in versions.items() if before != after]
+        if not patches:
+            return None
+
+        transaction = UndoTransaction(label, patches)
+        with self._lock:
+            self._release(self._redo)
+            self._redo = []
+            self._undo.append(transaction)
+            self._memory += transaction.size
+            if len(self._undo) > self.max_depth:
+                self._release(self._undo[:-self.max_depth])
+                del self._undo[:-self.max_depth]
+            self._enforce_limit()
+        logger.debug(f"Транзакция для отмены: {label}, файлов {len(patches)}, "
+                     f"патчи {transaction.size} байт")
+        return transaction
+
+    def clear(self):
+        """Очищает оба стека (например, при закрытии проекта)."""
+        with self._lock:
+            self._release(self._undo)
+            self._release(self._redo)
+            self._undo = []
+            self._redo = []
+
+    def set_repository(self, repository):
+        """Переключает менеджер на репозиторий другого проекта рабочего пространства."""
+        self.repository = repository
+        logger.debug("Репозиторий UndoManager переключен")
+
+    # --- Отмена и повтор ---
+
+    def undo(self) -> Tuple[bool, List[str]]:
+        """
+        Отменяет последнюю транзакцию во всех ее файлах атомарно.
+
+        Returns:
+            (успех, пути восстановленных файлов); причина ошибки - в last_error
+        """
+        return self._step(self._undo, self._redo, reverse=True)
+
+    def redo(self) -> Tuple[bool, List[str]]:
+        """Повторяет последнюю отмененную транзакцию."""
+        return self._step(self._redo, self._undo, reverse=False)
+
+    def _step(self, source: List[UndoTransaction], target: List[UndoTransaction],
+              reverse: bool) -> Tuple[bool, List[str]]:
+        with self._lock:
+            self.last_error = ""
+            if not source:
+                self.last_error = "Нечего отменять" if reverse else "Нечего повторять"
+                return False, []
+
+            transaction = source[-1]
+            try:
+                patches = self._patches(transaction)
+            except (OSError, ValueError, KeyError) as e:
+                self.last_error = f"Не удалось прочитать патчи транзакции: {e}"
+                logger.error(self.last_error)
+                return False, []
+
+            # Все новые версии вычисляются до первой записи
+            writes: List[Tuple[str, Optional[str]]] = []
+            for patch in patches:
+                current = self._read(patch.path)
+                expected = patch.after_hash if reverse else patch.before_hash
+                if _hash(current) != expected:
+                    self.last_error = f"Файл изменен после применения изменений: {patch.path}"
+                    logger.warning(self.last_error)
+                    return False, []
+                writes.append((patch.path, patch.revert(current) if reverse else patch.reapply(current)))
+
+            journal = RollbackJournal(self.journal_dir)
+            try:
+                for path, content in writes:
+                    journal.record(path)
+                    self._write(path, content)
+            except Exception as e:
+                failed = journal.rollback()
+                self.last_error = f"Ошибка записи файлов, изменения откачены: {e}"
+                if failed:
+                    self.last_error += f" (не восстановлено: {len(failed)})"
+                logger.error(self.last_error)
+                return False, []
+            journal.commit()
+
+            source.pop()
+            target.append(transaction)
+            action = "Отменено" if reverse else "Повторено"
+            logger.info(f"{action}: {transaction.label}, файлов {len(writes)}")
+            return True, [path for path, _ in writes]
+
+    # --- Файлы ---
+
+    def _read(self, path: str) -> Optional[str]:
+        if not os.path.exists(path):
+            return None
+        if self.repository is not None:
+            return self.repository.read_file(path)
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def _write(self, path: str, content: Optional[str]):
+        if content is None:
+            if os.path.exists(path):
+                os.remove(path)
+            file_cache = getattr(self.repository, 'file_cache', None)
+            if file_cache is not None:
+                file_cache.invalidate(path)
+            return
+
+        if self.repository is not None:
+            if not self.repository.write_file_atomic(path, content):
+                raise OSError(f"не удалось записать {path}")
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.undo"
+        with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    # --- Выгрузка на диск ---
+
+    def _enforce_limit(self):
+        """Выгружает на диск самые старые транзакции, пока память выше лимита."""
+        if self._memory <= self.memory_limit:
+            return
+        # Сначала дальние от текущего состояния: низ стека отмены, затем низ стека повтора
+        for transaction in self._undo + self._redo:
+            if self._memory <= self.memory_limit:
+                break
+            if transaction.spilled:
+                continue
+            try:
+                self._spill(transaction)
+            except OSError as e:
+                logger.error(f"Не удалось выгрузить патчи на диск: {e}")
+                break
+
+    def _spill(self, transaction: UndoTransaction):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="ai_code_assistant_undo_")
+            self._own_spill_dir = True
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._spill_counter += 1
+        path = os.path.join(self.spill_dir, f"{os.getpid()}-{self._spill_counter}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([patch.to_dict() for patch in transaction.patches], f, ensure_ascii=False)
+
+        transaction.spill_path = path
+        transaction.patches = None
+        self._memory -= transaction.size
+        logger.debug(f"Патчи транзакции выгружены на диск: {transaction.label}")
+
+    def _patches(self, transaction: UndoTransaction) -> List[FilePatch]:
+        """Патчи транзакции; выгруженные читаются с диска и остаются выгруженными."""
+        if transaction.patches is not None:
+            return transaction.patches
+        with open(transaction.spill_path, encoding='utf-8') as f:
+            return [FilePatch.from_dict(data) for data in json.load(f)]
+
+    def _release(self, transactions: List[UndoTransaction]):
+        for transaction in transactions:
+            if transaction.spilled:
+                try:
+                    os.remove(transaction.spill_path)
+                except OSError:
+                    pass
+            else:
+                self._memory -= transaction.size
+
+    def close(self):
+        """Очищает стеки и удаляет выгруженные патчи."""
+        self.clear()
+        if self._own_spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+            self._own_spill_dir = False
+
+
+def _hash(text: Optional[str]) -> Optional[str]:
+    return content_hash(text) if text is not None else None
+
+
+def _apply_regions(text: str, regions: List[Region]) -> str:
+    lines = text.splitlines(keepends=True)
+    result: List[str] = []
+    position = 0
+    for start, end, inserted in regions:
+        result.extend(lines[position:start])
+        result.extend(inserted)
+        position = end
+    result.extend(lines[position:])
+    return ''.join(result)
@@ -0,0 +1,218 @@
+# core/business/workspace_service.py
+
+"""
+Рабочее пространство из нескольких открытых проектов.
+
+Каждый проект хранит собственную структуру, AST дерево и индексы,
+поэтому переключение между проектами не требует повторного парсинга.
+Кэши чтения и парсинга общие для всех проектов. Глобальный бюджет памяти
+определяет, какой неактивный проект выгрузить первым (LRU).
+"""
+
+import os
+import time
+import threading
+import logging
+from typing import Dict, List, Optional, Any
+
+from core.business.ast_service import ASTService
+from core.business.parse_cache import ParseCache
+from core.business.project_service import ProjectService
+from core.business.error_handler import handle_errors
+from core.data.file_cache import FileCache
+from core.data.project_repository import ProjectRepository
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class WorkspaceProject:
+    """Открытый в рабочем пространстве проект."""
+
+    def __init__(self, path: str, project_service: ProjectService,
+                 parse_cache: Optional[ParseCache] = None):
+        self.path = path
+        self.project_service = project_service
+        self.parse_cache = parse_cache
+        self.last_access = time.monotonic()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Проверяет, держит ли проект структуру в памяти."""
+        return self.project_service.structure_cache.peek() is not None
+
+    @property
+    def memory_estimate(self) -> int:
+        """Оценка памяти, занятой проектом: структура и его модули в общем кэше парсинга."""
+        estimate = self.project_service.structure_cache.memory_estimate
+        if self.parse_cache is not None:
+            estimate += self.parse_cache.size_under(self.path)
+        return estimate
+
+    def unload(self):
+        """Освобождает структуру проекта и его деревья CodeNode в общем кэше."""
+        self.project_service.invalidate_structure()
+        if self.parse_cache is not None:
+            self.parse_cache.invalidate_under(self.path)
+
+    def touch(self):
+        """Обновляет время последнего обращения."""
+        self.last_access = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'name': self.project_service.project_name,
+            'loaded': self.is_loaded,
+            'memory_estimate': self.memory_estimate
+        }
+
+
+class WorkspaceService:
+    """Управляет несколькими открытыми проектами с общими кэшами."""
+
+    DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 file_cache: FileCache = None, parse_cache: ParseCache = None,
+                 ast_service: ASTService = None):
+        self.memory_budget = memory_budget
+        self.file_cache = file_cache or FileCache()
+        self.parse_cache = parse_cache or ParseCache()
+        # ASTService не хранит состояния проекта, поэтому один экземпляр
+        # поверх общих кэшей обслуживает все открытые проекты
+        self.ast_service = ast_service or ASTService(parse_cache=self.parse_cache, file_cache=self.file_cache)
+        self._projects: Dict[str, WorkspaceProject] = {}
+        self._active_path: Optional[str] = None
+        self._lock = threading.RLock()
+        logger.debug("Инициализирован WorkspaceService")
+
+    # --- Открытие и переключение проектов ---
+
+    @handle_errors(default_return=None)
+    def open_project(self, path: str) -> Optional[ProjectService]:
+        """
+        Открывает проект (или активирует уже открытый) и возвращает его ProjectService.
+        """
+        key = self._normalize(path)
+        with self._lock:
+            entry = self._projects.get(key)
+            if entry is None:
+                project_service = self._create_project_service()
+                if not project_service.open_project(path):
+                    return None
+                entry = WorkspaceProject(key, project_service, self.parse_cache)
+                self._projects[key] = entry
+                logger.info(f"Проект добавлен в рабочее пространство: {path}")
+
+            self._active_path = key
+            entry.touch()
+
+        self.enforce_memory_budget()
+        return entry.project_service
+
+    def attach_project(self, project_service: ProjectService) -> bool:
+        """Регистрирует уже открытый ProjectService как активный проект."""
+        if not project_service or not project_service.project_path:
+            return False
+
+        key = self._normalize(project_service.project_path)
+        with self._lock:
+            entry = self._projects.get(key)
+            if entry is None or entry.project_service is not project_service:
+                entry = WorkspaceProject(key, project_service, self.parse_cache)
+                self._projects[key] = entry
+            self._active_path = key
+            entry.touch()
+
+        self.enforce_memory_budget()
+        return True
+
+    def activate(self, path: str) -> Optional[ProjectService]:
+        """Делает открытый проект активным."""
+        with self._lock:
+            entry = self._projects.get(self._normalize(path))
+            if entry is None:
+                return None
+            self._active_path = entry.path
+            entry.touch()
+            return entry.project_service
+
+    def close_project(self, path: str) -> bool:
+        """Закрывает проект и удаляет его из рабочего пространства."""
+        with self._lock:
+            entry = self._projects.pop(self._normalize(path), None)
+            if entry is None:
+                return False
+            if self._active_path == entry.path:
+                self._active_path = None
+
+        success = entry.project_service.close_project()
+        if self.parse_cache is not None:
+            self.parse_cache.invalidate_under(entry.path)
+        logger.info(f"Проект удален из рабочего пространства: {path}")
+        return success
+
+    def get_active_project(self) -> Optional[ProjectService]:
+        """Возвращает ProjectService активного проекта."""
+        with self._lock:
+            entry = self._projects.get(self._active_path) if self._active_path else None
+            return entry.project_service if entry else None
+
+    def get_project(self, path: str) -> Optional[ProjectService]:
+        """Возвращает ProjectService открытого проекта по пути."""
+        entry = self._projects.get(self._normalize(path))
+        return entry.project_service if entry else None
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        """Список открытых проектов."""
+        with self._lock:
+            return [entry.to_dict() for entry in self._projects.values()]
+
+    # --- Бюджет памяти ---
+
+    @property
+    def memory_usage(self) -> int:
+        """Суммарная оценка памяти всех загруженных проектов."""
+        with self._lock:
+            return sum(entry.memory_estimate for entry in self._projects.values())
+
+    def enforce_memory_budget(self) -> List[str]:
+        """
+        Выгружает неактивные проекты (начиная с давно не использованных),
+        пока суммарная память не уложится в бюджет.
+
+        Returns:
+            Список путей выгруженных проектов
+        """
+        evicted = []
+        with self._lock:
+            usage = self.memory_usage
+            if usage <= self.memory_budget:
+                return evicted
+
+            candidates = sorted(
+                (entry for entry in self._projects.values()
+                 if entry.path != self._active_path and entry.is_loaded),
+                key=lambda entry: entry.last_access
+            )
+
+            for entry in candidates:
+                if usage <= self.memory_budget:
+                    break
+                usage -= entry.memory_estimate
+                entry.unload()
+                evicted.append(entry.path)
+                logger.info(f"Проект выгружен из памяти: {entry.path}")
+
+        return evicted
+
+    # --- Внутренние методы ---
+
+    def _create_project_service(self) -> ProjectService:
+        """Создает ProjectService, подключенный к общим кэшам и ASTService."""
+        repository = ProjectRepository(file_cache=self.file_cache)
+        return ProjectService(repository, ast_service=self.ast_service)
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return os.path.normcase(os.path.abspath(str(path)))
@@ -0,0 +1,437 @@
+# core/cli.py
+
+"""
+Консольный интерфейс AI Code Assistant для пакетной обработки без дисплея.
+
+    python -m core.cli <команда> ... [--workers N] [--format json|ndjson] [-o ФАЙЛ]
+
+Команды:
+    parse <проект>                    дерево элементов каждого модуля
+    stats <проект>                    статистика по модулям и итог по проекту
+    analyze-ai <файл> [-p <проект>]   изменения, которые внесет ответ AI
+    apply <changes.json> [-p <проект>] применение изменений (в том числе вывода analyze-ai)
+    export <проект>                   полный анализ проекта: элементы и статистика
+
+Сервисы берутся из того же AppContext, что и в GUI; tkinter не импортируется.
+Вывод: JSON-документ {"command", "items", "summary"} либо NDJSON - по записи
+на строку по мере готовности и итоговая запись {"type": "summary"}.
+
+Коды завершения: 0 - успешно, 1 - ошибки в результатах (модуль не разобран,
+изменение не применено), 2 - неверные аргументы или входные данные,
+3 - обнаружены конфликты, 130 - прервано пользователем.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from core.app_context import get_app_context, init_app_context
+from core.business.change_service import CodeChange, PendingChange
+from core.business.multi_file_analyzer import MultiFileAnalyzer
+from core.business.project_structure_service import ProjectStructureService
+from core.models.code_model import CodeNode
+
+logger = logging.getLogger('ai_code_assistant')
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CONFLICTS = 3
+EXIT_INTERRUPTED = 130
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class CLIError(Exception):
+    """Неверные входные данные команды (код завершения EXIT_USAGE)"""
+
+
+class OutputWriter:
+    """Вывод записей команды в формате JSON или NDJSON"""
+
+    def __init__(self, command: str, output_format: str = 'json', stream: Optional[TextIO] = None):
+        self.command = command
+        self.format = output_format
+        self.stream = stream or sys.stdout
+        self._items: List[Dict[str, Any]] = []
+
+    def item(self, record: Dict[str, Any]):
+        """Добавляет запись; в NDJSON она выводится сразу."""
+        if self.format == 'ndjson':
+            self._write_line(record)
+        else:
+            self._items.append(record)
+
+    def finish(self, summary: Dict[str, Any]):
+        """Выводит итог (и накопленные записи в формате JSON)."""
+        if self.format == 'ndjson':
+            self._write_line({'type': 'summary', 'command': self.command, **summary})
+        else:
+            json.dump({'command': self.command, 'items': self._items, 'summary': summary},
+                      self.stream, ensure_ascii=False, indent=2)
+            self.stream.write("\n")
+        self.stream.flush()
+
+    def _write_line(self, record: Dict[str, Any]):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# --- Преобразование моделей в записи ---
+
+def node_to_dict(node: CodeNode) -> Dict[str, Any]:
+    """Элемент кода с вложенными элементами (без исходного текста)."""
+    data: Dict[str, Any] = {'name': node.name, 'type': node.type}
+    if node.has_span:
+        data['lines'] = [node.start_line, node.end_line]
+    if node.children:
+        data['children'] = [node_to_dict(child) for child in node.children]
+    return data
+
+
+def change_to_dict(change: CodeChange, root: str = "") -> Dict[str, Any]:
+    """Изменение в формате PendingChange.to_dict() (его принимает команда apply)."""
+    pending = PendingChange(change.action, change.entity_name, change.new_code,
+                            change.old_code, _relative(change.file_path, root), change.node_type)
+    pending.parent_name = change.parent_name
+    pending.span = change.span
+    record = {'type': 'change', **pending.to_dict()}
+    if change.conflict_reason:
+        record['conflict_reason'] = change.conflict_reason
+    return record
+
+
+def module_file_path(node: CodeNode) -> Optional[str]:
+    """Файл модуля, которому принадлежит элемент."""
+    while node is not None and not node.file_path:
+        node = node.parent
+    return node.file_path if node is not None else None
+
+
+def _relative(path: str, root: str) -> str:
+    """Путь относительно корня проекта (пути вне корня не меняются)."""
+    if not path or not root:
+        return path
+    relative = os.path.relpath(os.path.abspath(path), root)
+    return path if relative.startswith('..') else relative.replace(os.sep, '/')
+
+
+def _module_name(relative_path: str) -> str:
+    module = relative_path[:-3] if relative_path.endswith('.py') else relative_path
+    module = module.replace('/', '.')
+    return module[:-len('.__init__')] if module.endswith('.__init__') else module
+
+
+def _module_error(node: CodeNode) -> Optional[str]:
+    if node.type != 'module_error':
+        return None
+    first_line = node.source_code.split('\n', 1)[0]
+    return first_line.replace("# Ошибка парсинга: ", "", 1)
+
+
+def _module_statistics(node: CodeNode) -> Dict[str, int]:
+    stats = ProjectStructureService.get_module_statistics(node)
+    stats['lines'] = 0 if node.type == 'module_error' else len(node.source_code.splitlines())
+    return stats
+
+
+# --- Ввод ---
+
+def _project_dir(path: str) -> str:
+    root = os.path.abspath(path)
+    if not os.path.isdir(root):
+        raise CLIError(f"Каталог проекта не найден: {path}")
+    return root
+
+
+def _read_input(path: str) -> str:
+    """Читает файл или stdin ('-')."""
+    if path == '-':
+        return sys.stdin.read()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        raise CLIError(f"Не удалось прочитать {path}: {e}")
+
+
+def load_changes(text: str) -> List[PendingChange]:
+    """
+    Загружает изменения: JSON-список, документ команды analyze-ai
+    ({"items": [...]}) или NDJSON. Записи другого типа (итог) пропускаются.
+    """
+    try:
+        data = json.loads(text)
+        records = data.get('items', []) if isinstance(data, dict) else data
+    except json.JSONDecodeError:
+        try:
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            raise CLIError(f"Файл изменений не является JSON или NDJSON: {e}")
+
+    if not isinstance(records, list):
+        raise CLIError("Ожидался список изменений")
+    changes = []
+    for number, record in enumerate(records, 1):
+        if not isinstance(record, dict) or record.get('type', 'change') != 'change':
+            continue
+        try:
+            changes.append(PendingChange.from_dict(record))
+        except (KeyError, TypeError, IndexError) as e:
+            raise CLIError(f"Изменение #{number}: неверная запись ({e})")
+    return changes
+
+
+# --- Команды ---
+
+def _parse_project(args, context) -> Tuple[str, List[Tuple[str, CodeNode]]]:
+    """Разбирает проект общим ASTService; модули в порядке путей."""
+    root = _project_dir(args.project)
+    tree = context.get_ast_service().parse_project(root, max_workers=args.workers)
+    return root, sorted(((_relative(path, root), node) for path, node in tree.items()),
+                        key=lambda item: item[0])
+
+
+def command_parse(args, context, writer: OutputWriter) -> int:
+    started = time.perf_counter()
+    root, modules = _parse_project(args, context)
+    errors = 0
+    for path, node in modules:
+        error = _module_error(node)
+        errors += error is not None
+        writer.item({'type': 'module', 'path': path, 'module': _module_name(path), 'error': error,
+                     'elements': [node_to_dict(child) for child in node.children]})
+    writer.finish({'project': root, 'modules': len(modules), 'errors': errors,
+                   'duration': round(time.perf_counter() - started, 3)})
+    return EXIT_FAILED if errors else EXIT_OK
+
+
+def command_stats(args, context, writer: OutputWriter) -> int:
+    started = time.perf_counter()
+    root, modules = _parse_project(args, context)
+    totals = {'modules': len(modules)}
+    for path, node in modules:
+        stats = _module_statistics(node)
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+        writer.item({'type': 'module', 'path': path, **stats})
+    writer.finish({'project': root, **totals, 'duration': round(time.perf_counter() - started, 3)})
+    return EXIT_FAILED if totals.get('errors') else EXIT_OK
+
+
+def command_export(args, context, writer: OutputWriter) -> int:
+    started = time.perf_counter()
+    root, modules = _parse_project(args, context)
+    totals = {'modules': len(modules)}
+    packages = set()
+    for path, node in modules:
+        stats = _module_statistics(node)
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+        if '/' in path:
+            packages.add(_module_name(path.rsplit('/', 1)[0]))
+        writer.item({'type': 'module', 'path': path, 'module': _module_name(path),
+                     'error': _module_error(node), 'statistics': stats,
+                     'elements': [node_to_dict(child) for child in node.children]})
+    writer.finish({'project': root, 'packages': sorted(packages), **totals,
+                   'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'duration': round(time.perf_counter() - started, 3)})
+    return EXIT_FAILED if totals.get('errors') else EXIT_OK
+
+
+def analyze_ai_response(context, ai_code: str, project_tree: Dict[str, CodeNode], root: str,
+                        target: str = "", workers: int = DEFAULT_WORKERS) -> List[CodeChange]:
+    """
+    Изменения, которые внесет ответ AI: многофайловый ответ разбирается по
+    файлам, однофайловый сопоставляется с проектом (новые сущности - в target).
+    """
+    code_manager = context.get_code_manager()
+    analyzer = MultiFileAnalyzer(code_manager, max_workers=workers)
+    if not analyzer.is_multi_file(ai_code):
+        target_path = os.path.join(root, target) if target else ""
+        changes = code_manager.analyze_ai_code_batch(ai_code, project_tree, target_path, max_workers=workers)
+        if not target_path:
+            # Без целевого файла изменения существующих сущностей относятся к их модулям
+            index = code_manager.get_symbol_index(project_tree)
+            for change in changes:
+                if not change.file_path and change.action != 'conflict':
+                    change.file_path = _entity_file(index, change) or ""
+        return changes
+
+    changes: List[CodeChange] = []
+    for change_set in analyzer.analyze(ai_code, project_tree, root):
+        if change_set.payload.is_python:
+            changes.extend(change_set.changes)
+        else:
+            # Не-Python файл ставится целиком, как и в GUI
+            changes.append(CodeChange('add', f"AI код: {change_set.path}", change_set.payload.code,
+                                      file_path=change_set.target_path, node_type='ai_code'))
+    return changes
+
+
+def _entity_file(index, change: CodeChange) -> Optional[str]:
+    for node in index.lookup_all(change.entity_name.rsplit('.', 1)[-1]):
+        if node.qualified_name == change.entity_name and node.type == change.node_type:
+            return module_file_path(node)
+    return None
+
+
+def apply_pending_changes(context, changes: List[PendingChange], root: str, transactional: bool = True,
+                          workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """
+    Применяет изменения через ChangeManager контекста.
+    Неразрешенные конфликты пропускаются: в транзакции они отменили бы все.
+
+    Returns:
+        {'results': [записи результатов], 'summary': итог}
+    """
+    started = time.perf_counter()
+    change_manager = context.get_change_manager()
+    change_manager.max_workers = workers
+    change_manager.clear_changes()
+    skipped = 0
+    for change in changes:
+        if change.action == 'conflict':
+            skipped += 1
+            continue
+        if change.file_path and not os.path.isabs(change.file_path):
+            change.file_path = os.path.join(root, change.file_path)
+        change_manager.add_change(change)
+
+    queued = change_manager.count
+    change_manager.apply_all_changes(transactional=transactional)
+    report = change_manager.last_report
+    if report is None and queued:
+        # Применение прервано исключением (оно уже записано в журнал)
+        change_manager.clear_changes()
+
+    results = [{'type': 'result', 'action': result.change.action, 'entity_name': result.change.entity_name,
+                'file_path': _relative(result.file_path, root), 'success': result.success,
+                'message': result.message, 'duration_ms': round(result.duration * 1000, 1)}
+               for result in (report.results if report is not None else [])]
+    touched = report.touched_files if report is not None else []
+    summary = {'project': root, 'changes': len(changes),
+               'applied': len(report.applied) if report is not None else 0,
+               'failed': len(report.failed) if report is not None else queued,
+               'skipped_conflicts': skipped, 'touched_files': [_relative(path, root) for path in touched],
+               'duration': round(time.perf_counter() - started, 3)}
+    return {'results': results, 'summary': summary}
+
+
+def command_analyze_ai(args, context, writer: OutputWriter) -> int:
+    started = time.perf_counter()
+    ai_code = _read_input(args.file)
+    root, modules = _parse_project(args, context)
+    project_tree = {os.path.join(root, path): node for path, node in modules}
+    changes = analyze_ai_response(context, ai_code, project_tree, root, args.target or "", args.workers)
+
+    actions: Dict[str, int] = {}
+    for change in changes:
+        actions[change.action] = actions.get(change.action, 0) + 1
+        writer.item(change_to_dict(change, root))
+    conflicts = actions.get('conflict', 0)
+    writer.finish({'project': root, 'changes': len(changes), 'actions': actions, 'conflicts': conflicts,
+                   'duration': round(time.perf_counter() - started, 3)})
+    return EXIT_CONFLICTS if conflicts else EXIT_OK
+
+
+def command_apply(args, context, writer: OutputWriter) -> int:
+    changes = load_changes(_read_input(args.changes))
+    root = _project_dir(args.project)
+    outcome = apply_pending_changes(context, changes, root, not args.no_transaction, args.workers)
+
+    for record in outcome['results']:
+        writer.item(record)
+    summary = outcome['summary']
+    writer.finish(summary)
+    if summary['failed']:
+        return EXIT_FAILED
+    return EXIT_CONFLICTS if summary['skipped_conflicts'] else EXIT_OK
+
+
+COMMANDS = {
+    'parse': command_parse,
+    'stats': command_stats,
+    'analyze-ai': command_analyze_ai,
+    'apply': command_apply,
+    'export': command_export,
+}
+
+
+def _workers(value: str) -> int:
+    workers = int(value)
+    if workers < 1:
+        raise argparse.ArgumentTypeError("число потоков должно быть не меньше 1")
+    return workers
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Парсер аргументов: общие параметры задаются после команды."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--workers', '-w', type=_workers, default=DEFAULT_WORKERS,
+                        help=f"Число потоков (по умолчанию {DEFAULT_WORKERS})")
+    common.add_argument('--format', '-f', choices=['json', 'ndjson'], default='json', help="Формат вывода")
+    common.add_argument('--output', '-o', help="Файл результата (по умолчанию stdout)")
+    common.add_argument('--verbose', '-v', action='store_true', help="Журнал работы в stderr")
+
+    parser = argparse.ArgumentParser(prog='python -m core.cli',
+                                     description="AI Code Assistant: пакетная обработка без GUI")
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='команда')
+
+    for name, help_text in (('parse', "Дерево элементов каждого модуля проекта"),
+                            ('stats', "Статистика по модулям проекта"),
+                            ('export', "Полный анализ проекта")):
+        command = subparsers.add_parser(name, parents=[common], help=help_text)
+        command.add_argument('project', nargs='?', default='.', help="Каталог проекта")
+
+    analyze = subparsers.add_parser('analyze-ai', parents=[common], help="Анализ ответа AI")
+    analyze.add_argument('file', help="Файл с ответом AI ('-' - stdin)")
+    analyze.add_argument('--project', '-p', default='.', help="Каталог проекта")
+    analyze.add_argument('--target', '-t', help="Целевой файл однофайлового ответа (относительно проекта)")
+
+    apply = subparsers.add_parser('apply', parents=[common], help="Применение изменений")
+    apply.add_argument('changes', help="JSON/NDJSON с изменениями ('-' - stdin)")
+    apply.add_argument('--project', '-p', default='.', help="Каталог для относительных путей")
+    apply.add_argument('--no-transaction', action='store_true',
+                       help="Записывать успешно обработанные файлы, даже если другие изменения не применены")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """Точка входа; возвращает код завершения."""
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else EXIT_USAGE
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    stream = None
+    try:
+        if not init_app_context():
+            print("Ошибка: не удалось инициализировать контекст приложения", file=sys.stderr)
+            return EXIT_FAILED
+        if args.output:
+            stream = open(args.output, 'w', encoding='utf-8')
+        writer = OutputWriter(args.command, args.format, stream)
+        return COMMANDS[args.command](args, get_app_context(), writer)
+    except CLIError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except OSError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        if stream is not None:
+            stream.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
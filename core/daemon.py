@@ -0,0 +1,590 @@
+# core/daemon.py
+
+"""
+Локальный демон AI Code Assistant с API JSON-RPC 2.0.
+
+    python -m core.daemon <проект> [--host 127.0.0.1] [--port 8765] [--workers N] [--token-file PATH]
+
+Демон держит сервисы AppContext и разобранное дерево проекта в памяти,
+поэтому редакторы и скрипты получают ответы без повторного разбора.
+Запрос - HTTP POST на / с телом JSON-RPC: одиночный вызов или пакет
+(массив вызовов, выполняются параллельно). Каждое соединение
+обслуживается в своем потоке; изменяющие вызовы (parse с refresh,
+apply_changes) выполняются по одному. В каждый ответ добавляется поле
+"duration_ms" - время выполнения вызова.
+
+Методы:
+    status                                  состояние демона и статистика вызовов
+    parse(refresh=false, path=null)         сводка разбора или элементы одного модуля
+    lookup_symbol(name, type=null)          сущности проекта по имени (в том числе Class.method)
+    analyze_ai_code(code, target=null)      изменения, которые внесет ответ AI
+    diff(new, old=null, path=null, context=3) построчный и структурный diff
+    apply_changes(changes, transactional=true) применение изменений и повторный разбор
+    shutdown                                остановка демона
+
+Сервер слушает только локальный адрес (другие адреса отклоняются);
+DaemonClient - клиент для тестов и скриптов.
+
+Защита от чужих запросов: при каждом запуске создается токен, который
+записывается в файл, доступный только владельцу (--token-file, по
+умолчанию ~/.ai_code_assistant/daemon.token); каждый запрос должен
+содержать заголовок "Authorization: Bearer <токен>". Кроме того,
+принимаются только запросы с Content-Type application/json (браузер не
+отправит такой запрос с чужой страницы без preflight), с локальным
+заголовком Host и без чужого Origin. Пути файлов в diff и apply_changes
+должны находиться внутри проекта.
+"""
+
+import os
+import sys
+import json
+import time
+import hmac
+import inspect
+import secrets
+import argparse
+import ipaddress
+import logging
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.app_context import get_app_context, init_app_context
+from core.business.change_service import PendingChange
+from core.business.diff_engine import DiffEngine
+from core.business.project_structure_service import ProjectStructureService
+from core.cli import (DEFAULT_WORKERS, analyze_ai_response, apply_pending_changes, change_to_dict,
+                      module_file_path, node_to_dict)
+from core.models.code_model import CodeNode
+
+logger = logging.getLogger('ai_code_assistant')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TOKEN_FILE = os.path.join(os.path.expanduser("~"), ".ai_code_assistant", "daemon.token")
+
+# Коды ошибок JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RPCError(Exception):
+    """Ошибка вызова JSON-RPC (на стороне демона и клиента)"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        error = {'code': self.code, 'message': self.message}
+        if self.data is not None:
+            error['data'] = self.data
+        return error
+
+
+class ProjectDaemon:
+    """Разобранный проект и сервисы контекста, доступные через JSON-RPC"""
+
+    def __init__(self, project_path: str, context=None, workers: int = DEFAULT_WORKERS,
+                 token: Optional[str] = None):
+        """
+        Args:
+            project_path: Каталог проекта
+            context: AppContext (по умолчанию - глобальный)
+            workers: Число потоков разбора, анализа и пакетных вызовов
+            token: Токен, который клиент передает в заголовке Authorization
+                   (по умолчанию создается случайный)
+        """
+        self.root = os.path.abspath(project_path)
+        if not os.path.isdir(self.root):
+            raise ValueError(f"Каталог проекта не найден: {project_path}")
+        self._real_root = os.path.realpath(self.root)
+        self.token = token or secrets.token_urlsafe(32)
+        self.token_file: Optional[str] = None
+        if context is None:
+            init_app_context()
+            context = get_app_context()
+        self.context = context
+        self.workers = workers
+        self.started = time.time()
+
+        # Снимок состояния (дерево, индекс) заменяется целиком под _state_lock;
+        # читающие вызовы работают со снимком без блокировки разбора
+        self._tree: Dict[str, CodeNode] = {}
+        self._index = None
+        self._parsed_at = 0.0
+        self._parse_duration = 0.0
+        self._state_lock = threading.Lock()
+        # Изменяющие вызовы выполняются по одному (ChangeManager общий)
+        self._write_lock = threading.Lock()
+        # Метод -> [вызовов, ошибок, суммарное время, наибольшее время]
+        self._stats: Dict[str, List[float]] = {}
+        self._stats_lock = threading.Lock()
+
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.methods = {
+            'status': self.rpc_status,
+            'parse': self.rpc_parse,
+            'lookup_symbol': self.rpc_lookup_symbol,
+            'analyze_ai_code': self.rpc_analyze_ai_code,
+            'diff': self.rpc_diff,
+            'apply_changes': self.rpc_apply_changes,
+            'shutdown': self.rpc_shutdown,
+        }
+        self.refresh()
+
+    # --- Состояние проекта ---
+
+    def refresh(self):
+        """Разбирает проект заново; неизмененные файлы берутся из ParseCache."""
+        with self._write_lock:
+            self._refresh()
+
+    def _refresh(self):
+        started = time.perf_counter()
+        tree = dict(self.context.get_ast_service().parse_project(self.root, max_workers=self.workers))
+        # Индекс CodeManager: им же пользуется анализ AI-кода
+        index = self.context.get_code_manager().get_symbol_index(tree)
+        with self._state_lock:
+            self._tree, self._index = tree, index
+            self._parsed_at = time.time()
+            self._parse_duration = time.perf_counter() - started
+        logger.info(f"Демон: проект разобран, модулей {len(tree)} за {self._parse_duration:.3f} с")
+
+    def _snapshot(self):
+        with self._state_lock:
+            return self._tree, self._index
+
+    def _relative(self, path: Optional[str]) -> Optional[str]:
+        if not path:
+            return path
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+        return path if relative.startswith('..') else relative.replace(os.sep, '/')
+
+    def _project_path(self, path: str) -> str:
+        """Абсолютный путь файла проекта; пути вне корня проекта отклоняются."""
+        real_path = os.path.realpath(path if os.path.isabs(path) else os.path.join(self.root, path))
+        try:
+            inside = os.path.commonpath([real_path, self._real_root]) == self._real_root
+        except ValueError:
+            # Разные диски Windows
+            inside = False
+        if not inside:
+            raise RPCError(INVALID_PARAMS, f"Путь вне проекта: {path}")
+        # Путь в форме корня проекта: ключи дерева строятся от self.root
+        return os.path.normpath(os.path.join(self.root, os.path.relpath(real_path, self._real_root)))
+
+    def write_token_file(self, path: str = DEFAULT_TOKEN_FILE) -> str:
+        """Записывает токен доступа в файл, доступный только владельцу."""
+        path = os.path.abspath(os.path.expanduser(path))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as token_file:
+            token_file.write(self.token)
+        self.token_file = path
+        return self.token
+
+    # --- Методы RPC ---
+
+    def rpc_status(self) -> Dict[str, Any]:
+        tree, index = self._snapshot()
+        with self._stats_lock:
+            calls = {method: {'calls': int(stats[0]), 'errors': int(stats[1]),
+                              'total_ms': round(stats[2] * 1000, 3), 'max_ms': round(stats[3] * 1000, 3)}
+                     for method, stats in self._stats.items()}
+        return {'project': self.root, 'modules': len(tree), 'symbols': len(index) if index else 0,
+                'parsed_at': self._parsed_at, 'parse_duration_ms': round(self._parse_duration * 1000, 3),
+                'uptime': round(time.time() - self.started, 3), 'workers': self.workers, 'calls': calls}
+
+    def rpc_parse(self, refresh: bool = False, path: Optional[str] = None) -> Dict[str, Any]:
+        if refresh:
+            self.refresh()
+        tree, _ = self._snapshot()
+
+        if path is not None:
+            node = tree.get(self._project_path(path))
+            if node is None:
+                raise RPCError(INVALID_PARAMS, f"Модуль не найден: {path}")
+            return {'path': self._relative(node.file_path), 'error': node.type == 'module_error',
+                    'statistics': ProjectStructureService.get_module_statistics(node),
+                    'elements': [node_to_dict(child) for child in node.children]}
+
+        errors = [self._relative(file_path) for file_path, node in tree.items() if node.type == 'module_error']
+        return {'project': self.root, 'modules': len(tree), 'errors': sorted(errors),
+                'parsed_at': self._parsed_at, 'duration_ms': round(self._parse_duration * 1000, 3)}
+
+    def rpc_lookup_symbol(self, name: str, type: Optional[str] = None) -> List[Dict[str, Any]]:
+        _, index = self._snapshot()
+        short_name = name.rsplit('.', 1)[-1]
+        nodes = index.lookup_all(short_name) if index else []
+
+        found = []
+        for node in nodes:
+            if type is not None and node.type != type:
+                continue
+            if '.' in name and node.qualified_name != name:
+                continue
+            found.append({'name': node.name, 'qualified_name': node.qualified_name, 'type': node.type,
+                          'path': self._relative(module_file_path(node)),
+                          'lines': [node.start_line, node.end_line] if node.has_span else None})
+        return found
+
+    def rpc_analyze_ai_code(self, code: str, target: Optional[str] = None) -> Dict[str, Any]:
+        tree, _ = self._snapshot()
+        target = self._project_path(target) if target else ""
+        changes = analyze_ai_response(self.context, code, tree, self.root, target, self.workers)
+        records = [change_to_dict(change, self.root) for change in changes]
+        return {'changes': records, 'conflicts': sum(1 for change in changes if change.action == 'conflict')}
+
+    def rpc_diff(self, new: str, old: Optional[str] = None, path: Optional[str] = None,
+                 context: int = 3) -> Dict[str, Any]:
+        if old is None:
+            if path is None:
+                raise RPCError(INVALID_PARAMS, "Нужен параметр old или path")
+            file_path = self._project_path(path)
+            if not os.path.isfile(file_path):
+                raise RPCError(INVALID_PARAMS, f"Файл не найден: {path}")
+            old = self.context.get_project_repository().read_file(file_path)
+
+        diff = self.context.get_diff_engine().compare(old, new)
+        hunks = [{'header': hunk.header, 'lines': [[tag, line] for tag, line in hunk.lines]}
+                 for hunk in diff.iter_hunks(context)]
+        entity_diffs = DiffEngine.generate_structural_diff(old, new, with_line_diff=False)
+        structural = None if entity_diffs is None else [
+            {'kind': entity.kind, 'name': entity.qualified_name, 'type': entity.node_type,
+             'summary': entity.summary} for entity in entity_diffs
+        ]
+        return {'has_changes': diff.has_changes, 'old_hash': diff.old_hash, 'new_hash': diff.new_hash,
+                'hunks': hunks, 'structural': structural}
+
+    def rpc_apply_changes(self, changes: List[Dict[str, Any]], transactional: bool = True) -> Dict[str, Any]:
+        try:
+            pending = [PendingChange.from_dict(record) for record in changes
+                       if record.get('type', 'change') == 'change']
+        except (AttributeError, KeyError, TypeError, IndexError) as e:
+            raise RPCError(INVALID_PARAMS, f"Неверная запись изменения: {e}")
+        # Все пути проверяются до применения: иначе часть изменений уже была бы записана
+        for change in pending:
+            if change.file_path:
+                change.file_path = self._project_path(change.file_path)
+
+        with self._write_lock:
+            outcome = apply_pending_changes(self.context, pending, self.root, transactional, self.workers)
+            if outcome['summary']['touched_files']:
+                self._refresh()
+        return outcome
+
+    def rpc_shutdown(self) -> bool:
+        # Остановка из отдельного потока: ответ на этот вызов должен уйти клиенту
+        threading.Thread(target=self.stop, daemon=True).start()
+        return True
+
+    # --- JSON-RPC ---
+
+    def handle(self, body: bytes) -> Optional[str]:
+        """Обрабатывает тело запроса; None - ответ не нужен (только уведомления)."""
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError) as e:
+            return json.dumps(self._error(None, RPCError(PARSE_ERROR, f"Ошибка разбора JSON: {e}")))
+
+        if isinstance(payload, list):
+            if not payload:
+                return json.dumps(self._error(None, RPCError(INVALID_REQUEST, "Пустой пакет")))
+            if len(payload) > 1 and self.workers > 1:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(payload))) as executor:
+                    responses = list(executor.map(self.dispatch, payload))
+            else:
+                responses = [self.dispatch(request) for request in payload]
+            responses = [response for response in responses if response is not None]
+            return json.dumps(responses, ensure_ascii=False) if responses else None
+
+        response = self.dispatch(payload)
+        return json.dumps(response, ensure_ascii=False) if response is not None else None
+
+    def dispatch(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Выполняет один вызов и возвращает ответ (None для уведомления)."""
+        started = time.perf_counter()
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' \
+                or not isinstance(request.get('method'), str):
+            return self._error(None, RPCError(INVALID_REQUEST, "Неверный запрос JSON-RPC"))
+
+        request_id = request.get('id')
+        notification = 'id' not in request
+        method_name = request['method']
+        try:
+            result = self._invoke(method_name, request.get('params'))
+            response = {'jsonrpc': '2.0', 'result': result, 'id': request_id}
+            failed = False
+        except RPCError as e:
+            response = self._error(request_id, e)
+            failed = True
+        except Exception as e:
+            logger.error(f"Демон: ошибка вызова {method_name}: {e}", exc_info=True)
+            response = self._error(request_id, RPCError(INTERNAL_ERROR, str(e)))
+            failed = True
+
+        duration = time.perf_counter() - started
+        self._record(method_name if method_name in self.methods else '<unknown>', duration, failed)
+        if notification:
+            return None
+        response['duration_ms'] = round(duration * 1000, 3)
+        return response
+
+    def _invoke(self, method_name: str, params: Any) -> Any:
+        method = self.methods.get(method_name)
+        if method is None:
+            raise RPCError(METHOD_NOT_FOUND, f"Метод не найден: {method_name}")
+        if params is None:
+            args, kwargs = (), {}
+        elif isinstance(params, list):
+            args, kwargs = tuple(params), {}
+        elif isinstance(params, dict):
+            args, kwargs = (), params
+        else:
+            raise RPCError(INVALID_REQUEST, "params должен быть массивом или объектом")
+        try:
+            inspect.signature(method).bind(*args, **kwargs)
+        except TypeError as e:
+            raise RPCError(INVALID_PARAMS, f"Неверные параметры {method_name}: {e}")
+        return method(*args, **kwargs)
+
+    @staticmethod
+    def _error(request_id: Any, error: RPCError) -> Dict[str, Any]:
+        return {'jsonrpc': '2.0', 'error': error.to_dict(), 'id': request_id}
+
+    def _record(self, method_name: str, duration: float, failed: bool):
+        with self._stats_lock:
+            stats = self._stats.setdefault(method_name, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += failed
+            stats[2] += duration
+            stats[3] = max(stats[3], duration)
+
+    # --- Сервер ---
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        return self._server.server_address[:2] if self._server is not None else None
+
+    @property
+    def url(self) -> Optional[str]:
+        return f"http://{self.address[0]}:{self.address[1]}/" if self._server is not None else None
+
+    def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Tuple[str, int]:
+        """Запускает сервер в фоновом потоке; port=0 - любой свободный порт."""
+        if not _is_loopback(host):
+            raise ValueError(f"Демон слушает только локальный адрес, а не {host}")
+        self._server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.daemon_threads = True
+        self._server.rpc = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='ai-daemon', daemon=True)
+        self._thread.start()
+        logger.info(f"Демон запущен: {self.url} (проект {self.root})")
+        return self.address
+
+    def wait(self):
+        """Ожидает остановки сервера."""
+        while self._thread is not None and self._thread.is_alive():
+            self._thread.join(0.5)
+
+    def stop(self):
+        """Останавливает сервер."""
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            logger.info("Демон остановлен")
+        token_file, self.token_file = self.token_file, None
+        if token_file and os.path.exists(token_file):
+            os.remove(token_file)
+
+
+def _is_loopback(host: Optional[str]) -> bool:
+    """Является ли имя хоста локальным адресом."""
+    if not host:
+        return False
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """HTTP-транспорт: POST / с телом JSON-RPC"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        rejected = self._check_request()
+        if rejected is not None:
+            status, message = rejected
+            logger.warning(f"Демон: запрос отклонен ({status}): {message}")
+            # Тело не читается, поэтому соединение дальше не используется
+            self.close_connection = True
+            self._send_json(status, json.dumps(ProjectDaemon._error(None, RPCError(INVALID_REQUEST, message)),
+                                               ensure_ascii=False))
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        response = self.server.rpc.handle(self.rfile.read(length))
+        if response is None:
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self._send_json(200, response)
+
+    def _check_request(self) -> Optional[Tuple[int, str]]:
+        """Проверяет заголовки запроса; возвращает (HTTP-статус, причина) при отказе."""
+        host = self.headers.get('Host', "")
+        if not _is_loopback(urllib.parse.urlsplit(f"//{host}").hostname):
+            return 403, f"Недопустимый заголовок Host: {host}"
+
+        origin = self.headers.get('Origin')
+        if origin is not None:
+            parsed = urllib.parse.urlsplit(origin)
+            if not (parsed.scheme == 'http' and _is_loopback(parsed.hostname)
+                    and parsed.port == self.server.server_address[1]):
+                return 403, f"Недопустимый источник запроса: {origin}"
+
+        token = self.server.rpc.token
+        if not hmac.compare_digest(self.headers.get('Authorization', ""), f"Bearer {token}"):
+            return 401, "Неверный токен доступа"
+
+        if self.headers.get_content_type() != 'application/json':
+            return 415, "Ожидается Content-Type: application/json"
+        return None
+
+    def _send_json(self, status: int, text: str):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Демон: {self.address_string()} {format % args}")
+
+
+class DaemonClient:
+    """Клиент JSON-RPC демона"""
+
+    def __init__(self, url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}/", timeout: float = 60.0,
+                 token: Optional[str] = None, token_file: str = DEFAULT_TOKEN_FILE):
+        """
+        Args:
+            token: Токен доступа; по умолчанию читается из token_file
+        """
+        self.url = url
+        self.timeout = timeout
+        if token is None and os.path.isfile(token_file):
+            with open(token_file, encoding='utf-8') as f:
+                token = f.read().strip()
+        self.token = token
+        # Время выполнения последнего вызова на стороне демона, мс
+        self.last_duration_ms: Optional[float] = None
+        self._next_id = 0
+        self._id_lock = threading.Lock()
+        # Локальный адрес не должен уходить на прокси из переменных окружения
+        self._opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    def call(self, method: str, params: Any = None) -> Any:
+        """Вызывает метод; ошибка демона поднимается как RPCError."""
+        response = self._send(self._request(method, params))
+        self.last_duration_ms = response.get('duration_ms')
+        return self._result(response)
+
+    def batch(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        Выполняет пакет вызовов одним запросом.
+
+        Returns:
+            Результаты в порядке вызовов; для неудачного вызова - RPCError
+        """
+        requests = [self._request(method, params) for method, params in calls]
+        responses = {response.get('id'): response for response in self._send(requests)}
+        results = []
+        for request in requests:
+            try:
+                results.append(self._result(responses[request['id']]))
+            except RPCError as e:
+                results.append(e)
+        return results
+
+    def _request(self, method: str, params: Any) -> Dict[str, Any]:
+        with self._id_lock:
+            self._next_id += 1
+            request = {'jsonrpc': '2.0', 'method': method, 'id': self._next_id}
+        if params is not None:
+            request['params'] = params
+        return request
+
+    def _send(self, payload: Any) -> Any:
+        data = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        request = urllib.request.Request(self.url, data=data, headers=headers)
+        with self._opener.open(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    @staticmethod
+    def _result(response: Dict[str, Any]) -> Any:
+        if 'error' in response:
+            error = response['error']
+            raise RPCError(error.get('code', INTERNAL_ERROR), error.get('message', ""), error.get('data'))
+        return response.get('result')
+
+
+def main(argv=None) -> int:
+    """Точка входа: запускает демон и ждет его остановки."""
+    parser = argparse.ArgumentParser(prog='python -m core.daemon',
+                                     description="AI Code Assistant: локальный демон JSON-RPC")
+    parser.add_argument('project', nargs='?', default='.', help="Каталог проекта")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"Локальный адрес (по умолчанию {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Порт (по умолчанию {DEFAULT_PORT})")
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_WORKERS, help="Число потоков")
+    parser.add_argument('--token-file', metavar='PATH', default=DEFAULT_TOKEN_FILE,
+                        help=f"Файл токена доступа (по умолчанию {DEFAULT_TOKEN_FILE}; удаляется при остановке)")
+    parser.add_argument('--verbose', '-v', action='store_true', help="Журнал работы в stderr")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    daemon = None
+    try:
+        daemon = ProjectDaemon(args.project, workers=max(1, args.workers))
+        daemon.write_token_file(args.token_file)
+        daemon.start(args.host, args.port)
+    except (ValueError, OSError) as e:
+        if daemon is not None:
+            daemon.stop()
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+    print(f"Демон слушает {daemon.url}, токен: {daemon.token_file}", file=sys.stderr)
+    try:
+        daemon.wait()
+    except KeyboardInterrupt:
+        daemon.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
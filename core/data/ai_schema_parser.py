@@ -1,6 +1,6 @@
 # core/data/ai_schema_parser.py
 
-import re
+from core.parsers.ai_schema_stream_parser import AISchemaStreamParser
 
 class AISchemaParser:
     """
@@ -20,29 +20,5 @@ class AISchemaParser:
         Парсинг текстовой AI-схемы в структурированный dict.
         Возвращает структуру: {'modules': [...], 'files': {file: content}}
         """
-        modules = []
-        files = {}
-
-        # Парсим раздел modules (список путей)
-        mod_match = re.search(r'modules:\s*([\s\S]+?)(files\:|$)', schema)
-        if mod_match:
-            mods_block = mod_match.group(1)
-            lines = [line.strip('- ').strip() for line in mods_block.splitlines() if line.strip()]
-            for line in lines:
-                if line and not line.startswith('files:') and line != '':
-                    modules.append(line)
-
-        # Парсим раздел files (каждая строка: file.py: "content")
-        files_match = re.search(r'files:\s*([\s\S]+)', schema)
-        if files_match:
-            files_block = files_match.group(1)
-            lines = [line.strip() for line in files_block.splitlines() if line.strip()]
-            for line in lines:
-                # Формат: path: "content"
-                if ':' in line:
-                    file_path, content = line.split(':', 1)
-                    # Удалить кавычки, если есть
-                    content = content.strip().strip('"').strip("'")
-                    files[file_path.strip()] = content
-
-        return {'modules': modules, 'files': files}
\ No newline at end of file
+        result = AISchemaStreamParser.parse(schema)
+        return {'modules': result['modules'], 'files': result['files']}
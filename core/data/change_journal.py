@@ -0,0 +1,252 @@
+# core/data/change_journal.py
+
+"""
+Журнал упреждающей записи (WAL) для очереди отложенных изменений.
+
+Каждая операция с очередью (добавление, удаление, очистка) дописывается
+в журнал отдельной записью: 4 байта длины, 4 байта CRC32 и JSON. Записи
+сбрасываются на диск (fsync) пакетно - не чаще одного раза за sync_interval.
+Когда записей становится много, состояние очереди сжимается в снимок, и
+журнал начинается заново. При запуске снимок и журнал воспроизводятся;
+оборванная при сбое последняя запись отбрасывается.
+
+Исходное содержимое файлов (base_content изменений) сохраняется один раз
+на поколение журнала и упоминается в изменениях по хэшу.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger('ai_code_assistant')
+
+_HEADER = struct.Struct('>II')
+
+
+class ChangeJournal:
+    """Журнал операций очереди изменений одного проекта"""
+
+    SNAPSHOT = "snapshot.bin"
+    DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".ai_code_assistant", "journal")
+
+    def __init__(self, directory: str, sync_interval: float = 0.2, compact_threshold: int = 5000):
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+        self.records = 0
+        self._generation = 0
+        self._wal = None
+        self._written_bases: set = set()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def for_project(cls, project_path: str, root: Optional[str] = None, **kwargs) -> 'ChangeJournal':
+        """Журнал проекта в каталоге пользователя (вне каталога проекта)."""
+        digest = hashlib.sha1(os.path.abspath(project_path).encode('utf-8')).hexdigest()[:16]
+        return cls(os.path.join(root or cls.DEFAULT_ROOT, digest), **kwargs)
+
+    # --- Чтение ---
+
+    def load(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Воспроизводит снимок и журнал текущего поколения.
+
+        Yields:
+            ('add', словарь изменения с ключом 'base_content'),
+            ('remove', id изменения) или ('clear', None)
+        """
+        with self._lock:
+            bases: Dict[str, str] = {}
+            snapshot = self._read_snapshot()
+            if snapshot is not None:
+                self._generation = snapshot.get('generation', 0)
+                bases.update(snapshot.get('bases', {}))
+                for data in snapshot.get('changes', []):
+                    yield 'add', self._with_base(data, bases)
+
+            wal_path = self._wal_path(self._generation)
+            records = 0
+            for record in self._read_records(wal_path, truncate=True):
+                records += 1
+                op = record.get('op')
+                if op == 'base':
+                    bases[record['hash']] = record['content']
+                elif op == 'add':
+                    yield 'add', self._with_base(record['change'], bases)
+                elif op == 'remove':
+                    yield 'remove', record['id']
+                elif op == 'clear':
+                    yield 'clear', None
+
+            self.records = records
+            self._written_bases = set(bases)
+            self._remove_stale_wals()
+
+    # --- Запись ---
+
+    def log_add(self, change_data: Dict[str, Any], base_content: Optional[str] = None):
+        """Записывает добавление изменения (словарь PendingChange.to_dict())."""
+        with self._lock:
+            if base_content is not None:
+                digest = self._hash(base_content)
+                if digest not in self._written_bases:
+                    self._append({'op': 'base', 'hash': digest, 'content': base_content})
+                    self._written_bases.add(digest)
+                change_data = dict(change_data, base=digest)
+            self._append({'op': 'add', 'change': change_data})
+
+    def log_remove(self, change_id: str):
+        with self._lock:
+            self._append({'op': 'remove', 'id': change_id})
+
+    def log_clear(self):
+        with self._lock:
+            self._append({'op': 'clear'})
+
+    def needs_compaction(self, live_count: int) -> bool:
+        """Пора ли сжать журнал: записей много и большая часть из них устарела."""
+        return self.records >= self.compact_threshold and self.records > 2 * live_count
+
+    def compact(self, changes: Iterable[Tuple[Dict[str, Any], Optional[str]]]):
+        """
+        Сжимает журнал в снимок текущего состояния очереди.
+
+        Args:
+            changes: Пары (словарь изменения, base_content) живых изменений
+        """
+        with self._lock:
+            generation = self._generation + 1
+            bases: Dict[str, str] = {}
+            items: List[Dict[str, Any]] = []
+            for data, base_content in changes:
+                data = dict(data)
+                if base_content is not None:
+                    digest = self._hash(base_content)
+                    bases[digest] = base_content
+                    data['base'] = digest
+                items.append(data)
+
+            snapshot_path = os.path.join(self.directory, self.SNAPSHOT)
+            temp_path = snapshot_path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(self._encode({'generation': generation, 'bases': bases, 'changes': items}))
+                f.flush()
+                os.fsync(f.fileno())
+            # После замены снимка старый журнал больше не воспроизводится
+            os.replace(temp_path, snapshot_path)
+
+            self._close_wal()
+            self._generation = generation
+            self._written_bases = set(bases)
+            self.records = 0
+            self._remove_stale_wals()
+            logger.debug(f"Журнал изменений сжат: {len(items)} изменений, поколение {generation}")
+
+    def sync(self):
+        """Сбрасывает накопленные записи на диск."""
+        with self._lock:
+            self._timer = None
+            if self._wal is not None and not self._wal.closed:
+                self._wal.flush()
+                os.fsync(self._wal.fileno())
+
+    def close(self):
+        """Сбрасывает записи и закрывает журнал."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self.sync()
+            self._close_wal()
+
+    # --- Внутренняя логика ---
+
+    def _append(self, record: Dict[str, Any]):
+        if self._wal is None:
+            self._wal = open(self._wal_path(self._generation), 'ab')
+            # Записи, ожидающие пакетного fsync, сбрасываются и при выходе
+            atexit.register(self.close)
+        self._wal.write(self._encode(record))
+        self.records += 1
+
+        if self.sync_interval <= 0:
+            self.sync()
+        elif self._timer is None:
+            # Пакетный fsync: все записи интервала сбрасываются одним вызовом
+            self._timer = threading.Timer(self.sync_interval, self.sync)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _close_wal(self):
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+            atexit.unregister(self.close)
+
+    def _wal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"wal.{generation}.log")
+
+    def _remove_stale_wals(self):
+        current = os.path.basename(self._wal_path(self._generation))
+        for name in os.listdir(self.directory):
+            if name.startswith("wal.") and name != current:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError as e:
+                    logger.warning(f"Не удалось удалить старый журнал {name}: {e}")
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.directory, self.SNAPSHOT)
+        for record in self._read_records(path, truncate=False):
+            return record
+        return None
+
+    def _read_records(self, path: str, truncate: bool) -> Iterator[Dict[str, Any]]:
+        """Записи файла; чтение останавливается на первой поврежденной записи."""
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            length, checksum = _HEADER.unpack_from(data, offset)
+            payload = data[offset + _HEADER.size:offset + _HEADER.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            try:
+                record = json.loads(payload.decode('utf-8'))
+            except ValueError:
+                break
+            offset += _HEADER.size + length
+            yield record
+
+        if truncate and offset < len(data):
+            logger.warning(f"Журнал изменений поврежден после {offset} байт, хвост отброшен")
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    @staticmethod
+    def _with_base(data: Dict[str, Any], bases: Dict[str, str]) -> Dict[str, Any]:
+        digest = data.get('base')
+        if digest is None:
+            return data
+        data = dict(data)
+        data['base_content'] = bases.get(digest)
+        return data
+
+    @staticmethod
+    def _hash(content: str) -> str:
+        return hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
@@ -0,0 +1,102 @@
+# core/data/file_cache.py
+
+"""
+Общий кэш чтения файлов.
+Разделяется между всеми открытыми проектами рабочего пространства.
+"""
+
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .file_provider import FileProvider
+
+logger = logging.getLogger('ai_code_assistant')
+
+# Сигнатура файла: (mtime в наносекундах, размер в байтах)
+FileSignature = Tuple[int, int]
+
+
+def get_file_signature(file_path: str) -> Optional[FileSignature]:
+    """Возвращает сигнатуру файла или None, если файл недоступен."""
+    try:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+class FileCache:
+    """
+    LRU-кэш содержимого файлов с ограничением по объему.
+    Запись считается актуальной, пока не изменились mtime и размер файла.
+    """
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[FileSignature, str]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, file_path: str) -> str:
+        """Читает файл, используя кэш, если файл не менялся."""
+        key = os.path.abspath(file_path)
+        signature = get_file_signature(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and signature is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        content = FileProvider.read_file(key)
+        if signature is not None:
+            self.put(key, content, signature)
+        return content
+
+    def put(self, file_path: str, content: str, signature: Optional[FileSignature] = None):
+        """Кладет содержимое файла в кэш."""
+        key = os.path.abspath(file_path)
+        signature = signature or get_file_signature(key)
+        if signature is None or len(content) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (signature, content)
+            self._size += len(content)
+            while self._size > self.max_bytes and self._entries:
+                old_key, _ = next(iter(self._entries.items()))
+                self._remove(old_key)
+
+    def invalidate(self, file_path: str):
+        """Удаляет файл из кэша."""
+        with self._lock:
+            self._remove(os.path.abspath(file_path))
+
+    def clear(self):
+        """Очищает кэш."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Текущий объем закэшированных данных (в символах)."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
@@ -36,6 +36,34 @@ class FileProvider:
             logger.error(f"Ошибка записи файла {file_path}: {e}")
             return False
 
+    @staticmethod
+    def write_file_atomic(file_path: str, content: str) -> bool:
+        """
+        Атомарно записывает файл: содержимое пишется во временный файл
+        в той же директории и подменяет исходный через os.replace.
+        При сбое исходный файл остается нетронутым.
+        """
+        path = Path(file_path)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists():
+                os.chmod(temp_path, path.stat().st_mode & 0o7777)
+            os.replace(temp_path, path)
+            logger.debug(f"Файл атомарно записан: {file_path} ({len(content)} символов)")
+            return True
+        except Exception as e:
+            logger.error(f"Ошибка атомарной записи файла {file_path}: {e}")
+            try:
+                temp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return False
+
     @staticmethod
     def list_dir(dir_path: str) -> List[str]:
         """Список содержимого директории"""
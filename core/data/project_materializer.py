@@ -0,0 +1,238 @@
+# core/data/project_materializer.py
+
+"""
+Создание структуры проекта на диске по заранее вычисленному плану.
+
+План вычисляется целиком до первой записи: уникальное множество каталогов
+(включая промежуточные), список файлов и их совпадения с уже
+существующими файлами. Затем каталоги создаются одним проходом в
+отсортированном порядке (родитель раньше потомка), а файлы записываются
+атомарно ограниченным пулом потоков. План без выполнения служит отчетом
+пробного запуска (dry run).
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .file_provider import FileProvider
+
+logger = logging.getLogger('ai_code_assistant')
+
+PACKAGE_INIT = "# Package initialization\n"
+
+
+class MaterializationPlan:
+    """План создания структуры: каталоги, файлы и совпадения с диском"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        # Создаваемые каталоги (отсортированы, родитель раньше потомка)
+        self.directories: List[Path] = []
+        # Файл -> содержимое; только файлы, которые будут записаны
+        self.files: Dict[Path, str] = {}
+        # Существующие файлы с другим содержимым (перезаписываются, если разрешено)
+        self.collisions: List[Path] = []
+        # Существующие файлы, которые не записываются
+        self.skipped: List[Path] = []
+        # Пути вне корня проекта и другие отклоненные записи: (путь, причина)
+        self.rejected: List[Tuple[str, str]] = []
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.directories and not self.files
+
+    def report(self) -> str:
+        """Текстовый отчет пробного запуска."""
+        lines = [f"Корень: {self.root}",
+                 f"Каталогов к созданию: {len(self.directories)}",
+                 f"Файлов к записи: {len(self.files)}"]
+        lines.extend(f"  + {self._relative(path)}/" for path in self.directories)
+        collisions = set(self.collisions)
+        for path in self.files:
+            marker = '~' if path in collisions else '+'
+            lines.append(f"  {marker} {self._relative(path)}")
+        if self.skipped:
+            lines.append(f"Пропущено существующих файлов: {len(self.skipped)}")
+            lines.extend(f"  = {self._relative(path)}" for path in self.skipped)
+        if self.rejected:
+            lines.append(f"Отклонено путей: {len(self.rejected)}")
+            lines.extend(f"  ! {path}: {reason}" for path, reason in self.rejected)
+        return "\n".join(lines)
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def __repr__(self):
+        return (f"MaterializationPlan(dirs={len(self.directories)}, files={len(self.files)}, "
+                f"collisions={len(self.collisions)})")
+
+
+class MaterializationResult:
+    """Результат выполнения плана"""
+
+    def __init__(self, plan: MaterializationPlan):
+        self.plan = plan
+        self.created_directories: List[Path] = []
+        self.written: List[Path] = []
+        self.failed: List[Path] = []
+        self.duration = 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> str:
+        return (f"Каталогов создано: {len(self.created_directories)}, "
+                f"файлов записано: {len(self.written)} из {len(self.plan.files)}"
+                + (f", ошибок: {len(self.failed)}" if self.failed else ""))
+
+    def __repr__(self):
+        return f"MaterializationResult({self.summary()})"
+
+
+class ProjectMaterializer:
+    """Вычисляет и выполняет план создания структуры проекта"""
+
+    def __init__(self, max_workers: int = 8, overwrite: bool = True):
+        """
+        Args:
+            max_workers: Наибольшее число потоков записи
+            overwrite: Перезаписывать ли существующие файлы с другим содержимым
+        """
+        self.max_workers = max_workers
+        self.overwrite = overwrite
+
+    def plan(self, root: str, structure: Dict[str, Any], package_inits: bool = False) -> MaterializationPlan:
+        """
+        Вычисляет план без изменений на диске.
+
+        Args:
+            root: Корневой каталог проекта
+            structure: {'modules': [каталоги], 'files': {путь: содержимое}}
+            package_inits: Создавать __init__.py в каталогах модулей, где его нет
+        """
+        root_path = Path(root).resolve()
+        plan = MaterializationPlan(root_path)
+        directories = {root_path}
+        files: Dict[Path, str] = {}
+        # Шаблонные __init__.py: существующие файлы не перезаписываются
+        generated_inits = set()
+
+        for file_path, content in structure.get('files', {}).items():
+            path = self._resolve(plan, file_path)
+            if path is None:
+                continue
+            if path == root_path:
+                plan.rejected.append((file_path, "путь совпадает с корнем проекта"))
+                continue
+            files[path] = content if content is not None else ""
+
+        modules = []
+        for module in structure.get('modules', []):
+            path = self._resolve(plan, module.strip().strip('/\\'))
+            if path is None or path == root_path:
+                continue
+            modules.append(path)
+            init_path = path / "__init__.py"
+            # Явно заданное содержимое __init__.py важнее шаблонного
+            if package_inits and init_path not in files:
+                files[init_path] = PACKAGE_INIT
+                generated_inits.add(init_path)
+
+        # Каталоги модулей и файлов со всеми промежуточными; каждый каталог
+        # проходится один раз, подъем останавливается на уже известном
+        for path in modules + [path.parent for path in files]:
+            while path not in directories:
+                directories.add(path)
+                path = path.parent
+
+        plan.directories = sorted((path for path in directories if not path.is_dir()),
+                                  key=lambda path: (len(path.parts), str(path)))
+        for path in sorted(files, key=str):
+            content = files[path]
+            if path.is_dir():
+                plan.rejected.append((str(path), "по этому пути находится каталог"))
+                continue
+            if not path.exists():
+                plan.files[path] = content
+                continue
+            if path in generated_inits or self._same_content(path, content):
+                plan.skipped.append(path)
+                continue
+            plan.collisions.append(path)
+            if self.overwrite:
+                plan.files[path] = content
+            else:
+                plan.skipped.append(path)
+
+        logger.debug(f"План структуры: {plan}")
+        return plan
+
+    def execute(self, plan: MaterializationPlan) -> MaterializationResult:
+        """Создает каталоги одним проходом и записывает файлы пулом потоков."""
+        started = time.perf_counter()
+        result = MaterializationResult(plan)
+
+        for directory in plan.directories:
+            try:
+                directory.mkdir(exist_ok=True)
+                result.created_directories.append(directory)
+            except OSError as e:
+                logger.error(f"Ошибка создания каталога {directory}: {e}")
+
+        items = list(plan.files.items())
+        if items:
+            workers = max(1, min(self.max_workers, len(items)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                written = list(executor.map(
+                    lambda item: FileProvider.write_file_atomic(str(item[0]), item[1]), items
+                ))
+            for (path, _), ok in zip(items, written):
+                (result.written if ok else result.failed).append(path)
+
+        result.duration = time.perf_counter() - started
+        logger.info(f"{result.summary()} за {result.duration:.3f} с")
+        return result
+
+    def materialize(self, root: str, structure: Dict[str, Any], package_inits: bool = False,
+                    dry_run: bool = False) -> Tuple[MaterializationPlan, Optional[MaterializationResult]]:
+        """
+        План и его выполнение.
+
+        Returns:
+            (план, результат или None при dry_run)
+        """
+        plan = self.plan(root, structure, package_inits)
+        if dry_run:
+            logger.info(f"Пробный запуск создания структуры:\n{plan.report()}")
+            return plan, None
+        return plan, self.execute(plan)
+
+    @staticmethod
+    def _resolve(plan: MaterializationPlan, relative: str) -> Optional[Path]:
+        """Абсолютный путь внутри корня; пути вне корня отклоняются."""
+        if not relative or not relative.strip():
+            return plan.root
+        path = Path(relative.strip())
+        path = (path if path.is_absolute() else plan.root / path).resolve()
+        if path != plan.root and plan.root not in path.parents:
+            plan.rejected.append((relative, "путь вне каталога проекта"))
+            return None
+        return path
+
+    @staticmethod
+    def _same_content(path: Path, content: str) -> bool:
+        try:
+            if os.path.getsize(path) != len(content.encode('utf-8')):
+                return False
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                return f.read() == content
+        except (OSError, UnicodeDecodeError):
+            return False
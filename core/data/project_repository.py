@@ -3,8 +3,11 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
 import os
+from contextlib import contextmanager
 from typing import Dict, Any
 from .file_provider import FileProvider
+from .project_materializer import ProjectMaterializer
+from core.models.piece_table import PieceTable
 import logging
 
 logger = logging.getLogger('ai_code_assistant')
@@ -32,9 +35,6 @@ class IProjectRepository(ABC):
     @abstractmethod
     def add_ai_code_to_current(self, ai_code: str) -> bool: pass
     
-    @abstractmethod
-    def replace_code_in_file(self, file_path: str, node_name: str, new_code: str) -> bool: pass
-    
     @abstractmethod
     def get_project_structure(self) -> Dict[str, Any]: pass
     
@@ -48,12 +48,34 @@ class IProjectRepository(ABC):
 class ProjectRepository(IProjectRepository):
     """Репозиторий для работы с проектом, файлами и структурой."""
     
-    def __init__(self):
+    def __init__(self, file_cache=None):
         self.current_file_path = None
         self.project_path = None
         self.file_provider = FileProvider
+        # Общий кэш чтения (FileCache), разделяемый между проектами
+        self.file_cache = file_cache
+        # Открытые на редактирование документы: {абсолютный путь: PieceTable}.
+        # Внутри batch_edits() правки накапливаются и записываются один раз.
+        self._documents: Dict[str, PieceTable] = {}
+        self._batch_depth = 0
+        # План последнего create_structure (отчет пробного запуска)
+        self.last_structure_plan = None
         logger.debug("Инициализирован ProjectRepository")
     
+    def _read(self, file_path: str) -> str:
+        """Читает файл через общий кэш, если он подключен."""
+        if self.file_cache is not None:
+            return self.file_cache.read(file_path)
+        return self.file_provider.read_file(file_path)
+    
+    def _write(self, file_path: str, content: str) -> bool:
+        """Записывает файл и сбрасывает его запись в кэше чтения."""
+        self._documents.pop(str(Path(file_path)), None)
+        success = self.file_provider.write_file(file_path, content)
+        if self.file_cache is not None:
+            self.file_cache.invalidate(file_path)
+        return success
+    
     def create_basic_python_project(self, path, name):
         """Создает базовый Python проект."""
         try:
@@ -112,30 +134,25 @@ class ProjectRepository(IProjectRepository):
         logger.info("Проект закрыт")
         return True
     
-    def create_structure(self, path, structure):
-        """Создает структуру проекта."""
+    def create_structure(self, path, structure, dry_run: bool = False):
+        """
+        Создает структуру проекта по плану: каталоги модулей (с __init__.py,
+        если его нет) и файлы. При dry_run диск не меняется, а план
+        сохраняется в last_structure_plan.
+        """
         try:
-            base_dir = Path(path)
-            
-            # Создаем директории модулей
-            for module in structure.get('modules', []):
-                module_dir = base_dir / module.strip("/")
-                self.file_provider.create_directory(str(module_dir))
-                
-                # Создаем __init__.py в каждой папке Python модуля
-                init_file = module_dir / "__init__.py"
-                self.file_provider.write_file(str(init_file), "# Package initialization\n")
+            self.last_structure_plan, result = ProjectMaterializer().materialize(
+                str(path), structure, package_inits=True, dry_run=dry_run
+            )
+            if dry_run:
+                return True
             
-            # Создаем файлы
-            for file_path, content in structure.get('files', {}).items():
-                # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: создаем абсолютный путь
-                if not Path(file_path).is_absolute():
-                    file_full_path = base_dir / file_path
-                else:
-                    file_full_path = Path(file_path)
-                    
-                self.file_provider.create_directory(str(file_full_path.parent))
-                self.file_provider.write_file(str(file_full_path), content)
+            if self.file_cache is not None:
+                for file_path in result.written:
+                    self.file_cache.invalidate(str(file_path))
+            if not result.success:
+                logger.error(f"Структура создана с ошибками: {result.summary()}")
+                return False
             
             logger.info(f"Структура создана в: {path}")
             return True
@@ -150,7 +167,7 @@ class ProjectRepository(IProjectRepository):
                 logger.error("Нет текущего файла для записи")
                 return False
             
-            success = self.file_provider.write_file(self.current_file_path, content)
+            success = self._write(self.current_file_path, content)
             if success:
                 logger.info(f"Файл сохранен: {self.current_file_path}")
             return success
@@ -165,13 +182,10 @@ class ProjectRepository(IProjectRepository):
                 logger.error("Нет текущего файла для добавления AI-кода")
                 return False
             
-            current_content = self.file_provider.read_file(self.current_file_path)
-            if current_content is None:
-                current_content = ""
-            
-            appended_content = f"{current_content}\n\n# == AI CODE ==\n{ai_code}\n"
+            document = self.get_document(self.current_file_path)
+            document.append(f"\n\n# == AI CODE ==\n{ai_code}\n")
             
-            success = self.file_provider.write_file(self.current_file_path, appended_content)
+            success = self.commit_document(self.current_file_path)
             if success:
                 logger.info(f"AI-код добавлен в файл: {self.current_file_path}")
             return success
@@ -179,40 +193,6 @@ class ProjectRepository(IProjectRepository):
             logger.error(f"Ошибка добавления AI-кода: {e}")
             return False
     
-    def replace_code_in_file(self, file_path: str, node_name: str, new_code: str) -> bool:
-        """Заменяет код в файле."""
-        try:
-            # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: получаем абсолютный путь
-            if not Path(file_path).is_absolute() and self.project_path:
-                file_path = str(self.project_path / file_path)
-            
-            content = self.file_provider.read_file(file_path)
-            if content is None:
-                content = ""
-            
-            lines = content.splitlines()
-            out_lines = []
-            replaced = False
-            
-            for line in lines:
-                if node_name in line and not replaced:
-                    out_lines.append(new_code)
-                    replaced = True
-                else:
-                    out_lines.append(line)
-            
-            if replaced:
-                new_content = "\n".join(out_lines)
-                logger.info(f"Код заменен в файле: {file_path}, элемент: {node_name}")
-            else:
-                new_content = content + "\n" + new_code
-                logger.info(f"Элемент не найден, код добавлен в конец файла: {file_path}")
-            
-            return self.file_provider.write_file(file_path, new_content)
-        except Exception as e:
-            logger.error(f"Ошибка замены кода: {e}")
-            return False
-    
     def get_project_structure(self) -> Dict[str, Any]:
         """Сканирует директорию проекта и возвращает файловую структуру."""
         structure = {
@@ -253,7 +233,7 @@ class ProjectRepository(IProjectRepository):
                     
                     # Читаем содержимое файла
                     try:
-                        content = self.file_provider.read_file(str(item))  # Абсолютный путь
+                        content = self._read(str(item))  # Абсолютный путь
                         if content is not None:
                             structure['files'][rel_path] = {
                                 'path': str(item),  # Абсолютный путь
@@ -293,7 +273,12 @@ class ProjectRepository(IProjectRepository):
         if not path.is_absolute() and self.project_path:
             file_path = str(self.project_path / file_path)
         
-        content = self.file_provider.read_file(file_path)
+        # Документ с незаписанными правками (внутри batch_edits) важнее файла
+        document = self._documents.get(str(Path(file_path)))
+        if document is not None:
+            return document.get_text()
+        
+        content = self._read(file_path)
         if content is None:
             return ""
         return content
@@ -305,7 +290,81 @@ class ProjectRepository(IProjectRepository):
         if not path.is_absolute() and self.project_path:
             file_path = str(self.project_path / file_path)
         
-        return self.file_provider.write_file(file_path, content)
+        return self._write(file_path, content)
+    
+    def write_file_atomic(self, file_path: str, content: str) -> bool:
+        """Атомарно записывает файл (временный файл + os.replace)."""
+        path = Path(file_path)
+        if not path.is_absolute() and self.project_path:
+            file_path = str(self.project_path / file_path)
+        
+        self._documents.pop(str(Path(file_path)), None)
+        success = self.file_provider.write_file_atomic(file_path, content)
+        if self.file_cache is not None:
+            self.file_cache.invalidate(file_path)
+        return success
+    
+    # Редактирование документов
+    
+    def _resolve_path(self, file_path: str) -> str:
+        path = Path(file_path)
+        if not path.is_absolute() and self.project_path:
+            return str(self.project_path / file_path)
+        return str(path)
+    
+    def get_document(self, file_path: str) -> PieceTable:
+        """
+        Возвращает документ файла для правок в памяти.
+        Правки записываются на диск через commit_document().
+        """
+        file_path = self._resolve_path(file_path)
+        document = self._documents.get(file_path)
+        if document is None:
+            content = self._read(file_path) if os.path.exists(file_path) else ""
+            document = PieceTable(content or "")
+            self._documents[file_path] = document
+        return document
+    
+    def commit_document(self, file_path: str) -> bool:
+        """
+        Записывает документ одним атомарным вызовом.
+        Внутри batch_edits() запись откладывается до выхода из блока.
+        """
+        if self._batch_depth:
+            return True
+        return self._flush_document(self._resolve_path(file_path))
+    
+    @contextmanager
+    def batch_edits(self):
+        """Группирует правки документов: каждый измененный файл записывается один раз."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush_documents()
+    
+    def flush_documents(self) -> bool:
+        """Записывает все открытые документы с изменениями."""
+        results = [self._flush_document(file_path) for file_path in list(self._documents)]
+        return all(results)
+    
+    def _flush_document(self, file_path: str) -> bool:
+        document = self._documents.get(file_path)
+        if document is None or not document.is_modified:
+            self._documents.pop(file_path, None)
+            return True
+        
+        success = self.file_provider.write_file_atomic(file_path, document.get_text())
+        if self.file_cache is not None:
+            self.file_cache.invalidate(file_path)
+        if success:
+            document.mark_saved()
+            self._documents.pop(file_path, None)
+            logger.debug(f"Документ записан: {file_path}")
+        # При ошибке документ с правками остается открытым для повторной записи
+        return success
     
     # Дополнительные методы для удобства
     
@@ -0,0 +1,228 @@
+# core/data/rollback_journal.py
+
+"""
+Журнал отката для транзакционной записи нескольких файлов.
+
+Перед записью файла его исходное содержимое копируется в каталог журнала,
+а манифест с путями сохраняется на диск. При сбое любой записи все файлы
+восстанавливаются из копий; после успешной записи журнал удаляется.
+Если приложение завершилось посреди записи, оставшийся журнал
+откатывается при следующем открытии проекта (RollbackJournal.recover).
+
+Журналы хранятся в личном каталоге пользователя (права 0700). Каталог
+журнала называется "<pid>-<uuid>": откатываются только журналы
+завершившихся процессов и только если все их файлы лежат в проекте,
+открытом текущим процессом.
+"""
+
+import json
+import os
+import shutil
+import re
+import threading
+import uuid
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class RollbackJournal:
+    """Журнал исходных версий файлов одной транзакции"""
+
+    MANIFEST = "manifest.json"
+    DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".ai_code_assistant", "rollback")
+    _NAME = re.compile(r'^(\d+)-[0-9a-f]+$')
+    _BACKUP = re.compile(r'^\d+\.bak$')
+
+    def __init__(self, journal_dir: Optional[str] = None):
+        self.journal_dir = journal_dir or self.DEFAULT_DIR
+        self.path = os.path.join(self.journal_dir, f"{os.getpid()}-{uuid.uuid4().hex[:12]}")
+        # Путь файла -> имя копии в журнале (None - файла не было)
+        self.entries: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, file_path: str):
+        """Сохраняет исходную версию файла до его изменения."""
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            if file_path in self.entries:
+                return
+            if not os.path.isdir(self.path):
+                self._private_dir(self.journal_dir)
+                os.makedirs(self.path, mode=0o700, exist_ok=True)
+
+            backup = None
+            if os.path.exists(file_path):
+                backup = f"{len(self.entries)}.bak"
+                backup_path = os.path.join(self.path, backup)
+                shutil.copy2(file_path, backup_path)
+                self._fsync(backup_path)
+            self.entries[file_path] = backup
+            self._write_manifest()
+
+    def rollback(self) -> List[str]:
+        """
+        Восстанавливает все записанные в журнал файлы.
+
+        Returns:
+            Пути файлов, которые не удалось восстановить
+        """
+        failed = []
+        with self._lock:
+            for file_path, backup in self.entries.items():
+                try:
+                    if backup is None:
+                        if os.path.exists(file_path):
+                            os.remove(file_path)
+                        continue
+                    temp_path = f"{file_path}.{os.getpid()}.rollback"
+                    shutil.copy2(os.path.join(self.path, backup), temp_path)
+                    os.replace(temp_path, file_path)
+                except OSError as e:
+                    logger.error(f"Не удалось восстановить файл {file_path}: {e}")
+                    failed.append(file_path)
+
+            if failed:
+                # Журнал остается на диске для повторной попытки
+                logger.error(f"Откат выполнен частично, журнал сохранен: {self.path}")
+            else:
+                logger.info(f"Откат выполнен: восстановлено файлов {len(self.entries)}")
+                self._discard()
+        return failed
+
+    def commit(self):
+        """Завершает транзакцию: копии больше не нужны."""
+        with self._lock:
+            self._discard()
+
+    @classmethod
+    def recover(cls, project_roots: Iterable[str], journal_dir: Optional[str] = None) -> int:
+        """
+        Откатывает журналы, оставшиеся после аварийного завершения.
+
+        Журналы работающих процессов (их транзакции еще идут) и журналы,
+        затрагивающие файлы вне project_roots, не трогаются.
+
+        Args:
+            project_roots: Каталоги проектов, открытых текущим процессом
+
+        Returns:
+            Количество откаченных журналов
+        """
+        journal_dir = journal_dir or cls.DEFAULT_DIR
+        roots = [os.path.realpath(root) for root in project_roots]
+        if not roots or not os.path.isdir(journal_dir):
+            return 0
+        if not cls._is_private(journal_dir):
+            logger.error(f"Каталог журналов отката доступен другим пользователям, восстановление пропущено: "
+                         f"{journal_dir}")
+            return 0
+
+        recovered = 0
+        for name in sorted(os.listdir(journal_dir)):
+            match = cls._NAME.match(name)
+            if match is None or cls._pid_alive(int(match.group(1))):
+                continue
+            manifest_path = os.path.join(journal_dir, name, cls.MANIFEST)
+            try:
+                with open(manifest_path, encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not cls._valid_entries(entries, roots):
+                # Журнал другого проекта (или чужой): откатится при открытии своего проекта
+                logger.debug(f"Журнал отката пропущен: {name}")
+                continue
+
+            journal = cls(journal_dir)
+            journal.path = os.path.join(journal_dir, name)
+            journal.entries = entries
+            if not journal.rollback():
+                recovered += 1
+        return recovered
+
+    @classmethod
+    def _valid_entries(cls, entries, roots: List[str]) -> bool:
+        """Все файлы журнала лежат в одном из проектов, копии - внутри журнала."""
+        if not isinstance(entries, dict):
+            return False
+        for file_path, backup in entries.items():
+            if backup is not None and not (isinstance(backup, str) and cls._BACKUP.match(backup)):
+                return False
+            if not os.path.isabs(file_path):
+                return False
+            real_path = os.path.realpath(file_path)
+            if not any(cls._inside(real_path, root) for root in roots):
+                return False
+        return True
+
+    @staticmethod
+    def _inside(path: str, root: str) -> bool:
+        try:
+            return os.path.commonpath([path, root]) == root
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        """Работает ли процесс, создавший журнал."""
+        if pid <= 0:
+            return False
+        if pid == os.getpid():
+            return True
+        if os.name == 'nt':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            # PROCESS_QUERY_LIMITED_INFORMATION; os.kill в Windows завершил бы процесс
+            handle = kernel32.OpenProcess(0x1000, False, pid)
+            if not handle:
+                return False
+            exit_code = ctypes.c_ulong()
+            queried = kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            kernel32.CloseHandle(handle)
+            # STILL_ACTIVE
+            return not queried or exit_code.value == 259
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def _private_dir(path: str):
+        """Создает каталог журналов, доступный только владельцу."""
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        if os.name == 'posix':
+            if os.stat(path).st_uid != os.getuid():
+                raise PermissionError(f"Каталог журналов отката принадлежит другому пользователю: {path}")
+            os.chmod(path, 0o700)
+
+    @staticmethod
+    def _is_private(path: str) -> bool:
+        if os.name != 'posix':
+            return True
+        info = os.stat(path)
+        return info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+    def _write_manifest(self):
+        manifest_path = os.path.join(self.path, self.MANIFEST)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, manifest_path)
+
+    def _discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.entries = {}
+
+    @staticmethod
+    def _fsync(path: str):
+        with open(path, 'rb') as f:
+            os.fsync(f.fileno())
@@ -15,10 +15,38 @@ class CodeNode:
         self.ast_node = ast_node        # Оригинальный AST узел (опционально)
         self.file_path = file_path      # Путь к файлу (опционально)
         
+        # Положение в файле: строки 1-based включительно (первая строка - с учетом
+        # декораторов), колонки 0-based как в ast. None - положение неизвестно.
+        self.start_line = None
+        self.start_col = None
+        self.end_line = None
+        self.end_col = None
+        
         # Для обратной совместимости с кодом, который может ожидать ast_node
         if ast_node is not None and not hasattr(self, 'ast_node'):
             self.ast_node = ast_node
 
+    def set_span(self, start_line: int, start_col: int, end_line: int, end_col: int):
+        """Устанавливает положение узла в файле."""
+        self.start_line = start_line
+        self.start_col = start_col
+        self.end_line = end_line
+        self.end_col = end_col
+
+    @property
+    def has_span(self) -> bool:
+        return self.start_line is not None and self.end_line is not None
+
+    @property
+    def qualified_name(self) -> str:
+        """Имя с учетом вложенности в классы: Class.method."""
+        names = [self.name]
+        parent = self.parent
+        while parent is not None and parent.type == 'class':
+            names.append(parent.name)
+            parent = parent.parent
+        return '.'.join(reversed(names))
+
     def add_child(self, child_node):
         """Добавляет дочерний узел."""
         self.children.append(child_node)
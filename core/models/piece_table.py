@@ -0,0 +1,305 @@
+# core/models/piece_table.py
+
+"""
+Модель редактируемого документа на основе таблицы фрагментов (piece table).
+
+Текст хранится как последовательность фрагментов, ссылающихся на неизменяемые
+буферы: исходный текст файла и добавленные вставки. Фрагменты лежат в
+персистентном декартовом дереве (treap) с длиной и числом переводов строк
+в поддеревьях, поэтому вставка, удаление и поиск строки выполняются за
+O(log n), а снимок документа для отмены - это просто ссылка на корень.
+"""
+
+import random
+from bisect import bisect_left
+from typing import List, Optional
+
+
+class _Piece:
+    """Неизменяемый узел дерева: фрагмент буфера и агрегаты поддерева."""
+
+    __slots__ = ('buffer', 'start', 'length', 'newlines', 'priority',
+                 'left', 'right', 'size', 'lines')
+
+    def __init__(self, buffer: int, start: int, length: int, newlines: int,
+                 priority: float, left: Optional['_Piece'], right: Optional['_Piece']):
+        self.buffer = buffer
+        self.start = start
+        self.length = length
+        self.newlines = newlines
+        self.priority = priority
+        self.left = left
+        self.right = right
+        self.size = length + (left.size if left else 0) + (right.size if right else 0)
+        self.lines = newlines + (left.lines if left else 0) + (right.lines if right else 0)
+
+    def with_children(self, left: Optional['_Piece'], right: Optional['_Piece']) -> '_Piece':
+        return _Piece(self.buffer, self.start, self.length, self.newlines,
+                      self.priority, left, right)
+
+
+class PieceTableSnapshot:
+    """Снимок документа. Создается за O(1) и не меняется при дальнейших правках."""
+
+    __slots__ = ('_table', '_root')
+
+    def __init__(self, table: 'PieceTable', root: Optional[_Piece]):
+        self._table = table
+        self._root = root
+
+    def __len__(self) -> int:
+        return self._root.size if self._root else 0
+
+    def get_text(self) -> str:
+        return self._table._collect(self._root)
+
+
+class PieceTable:
+    """
+    Редактируемый текстовый документ.
+
+    Смещения - индексы символов, номера строк - 1-based (как в ast и CodeNode).
+    """
+
+    def __init__(self, text: str = ""):
+        self._buffers: List[str] = []
+        self._newline_index: List[List[int]] = []
+        self._random = random.Random(0x5EED)
+        self._root: Optional[_Piece] = None
+        if text:
+            self._root = self._new_piece(text)
+        self._saved_root = self._root
+        self.version = 0
+
+    # --- Размеры и состояние ---
+
+    def __len__(self) -> int:
+        return self._root.size if self._root else 0
+
+    @property
+    def line_count(self) -> int:
+        """Количество строк (пустой документ содержит одну пустую строку)."""
+        return (self._root.lines if self._root else 0) + 1
+
+    @property
+    def is_modified(self) -> bool:
+        """Изменен ли документ с момента последнего mark_saved()."""
+        return self._root is not self._saved_root
+
+    def mark_saved(self):
+        """Отмечает текущее состояние как сохраненное."""
+        self._saved_root = self._root
+
+    # --- Правки ---
+
+    def insert(self, offset: int, text: str):
+        """Вставляет текст в позицию offset."""
+        if not text:
+            return
+        offset = self._check_offset(offset)
+        left, right = self._split(self._root, offset)
+        self._root = self._merge(self._merge(left, self._new_piece(text)), right)
+        self.version += 1
+
+    def delete(self, start: int, end: int):
+        """Удаляет диапазон [start, end)."""
+        start, end = self._check_offset(start), self._check_offset(end)
+        if start >= end:
+            return
+        left, rest = self._split(self._root, start)
+        _, right = self._split(rest, end - start)
+        self._root = self._merge(left, right)
+        self.version += 1
+
+    def replace(self, start: int, end: int, text: str):
+        """Заменяет диапазон [start, end) текстом."""
+        start, end = self._check_offset(start), self._check_offset(end)
+        left, rest = self._split(self._root, start)
+        _, right = self._split(rest, max(end - start, 0))
+        middle = self._new_piece(text) if text else None
+        self._root = self._merge(self._merge(left, middle), right)
+        self.version += 1
+
+    def append(self, text: str):
+        """Дописывает текст в конец документа."""
+        self.insert(len(self), text)
+
+    # --- Чтение ---
+
+    def get_text(self) -> str:
+        """Полный текст документа (O(n))."""
+        return self._collect(self._root)
+
+    def get_range(self, start: int, end: int) -> str:
+        """Текст диапазона [start, end)."""
+        start, end = self._check_offset(start), self._check_offset(end)
+        if start >= end:
+            return ""
+        parts: List[str] = []
+        self._collect_range(self._root, 0, start, end, parts)
+        return ''.join(parts)
+
+    def line_start(self, line_number: int) -> int:
+        """Смещение начала строки line_number."""
+        if line_number < 1 or line_number > self.line_count:
+            raise IndexError(f"Строка {line_number} вне документа (строк: {self.line_count})")
+        if line_number == 1:
+            return 0
+        return self._newline_offset(line_number - 1) + 1
+
+    def line_end(self, line_number: int) -> int:
+        """Смещение конца строки line_number (без перевода строки)."""
+        if line_number == self.line_count:
+            return len(self)
+        return self.line_start(line_number + 1) - 1
+
+    def get_line(self, line_number: int) -> str:
+        """Текст строки без перевода строки."""
+        return self.get_range(self.line_start(line_number), self.line_end(line_number))
+
+    def line_of_offset(self, offset: int) -> int:
+        """Номер строки, содержащей смещение offset."""
+        offset = self._check_offset(offset)
+        node, count = self._root, 0
+        while node is not None:
+            left_size = node.left.size if node.left else 0
+            if offset < left_size:
+                node = node.left
+                continue
+            count += node.left.lines if node.left else 0
+            offset -= left_size
+            if offset < node.length:
+                return count + self._count_newlines(node.buffer, node.start, node.start + offset) + 1
+            count += node.newlines
+            offset -= node.length
+            node = node.right
+        return count + 1
+
+    def trailing_whitespace_length(self) -> int:
+        """Длина пробельного хвоста документа (для аналога rstrip без копирования текста)."""
+        total, length, chunk = len(self), 0, 64
+        while length < total:
+            start = max(0, total - length - chunk)
+            tail = self.get_range(start, total - length)
+            stripped = len(tail) - len(tail.rstrip())
+            length += stripped
+            if stripped < len(tail):
+                break
+            chunk *= 2
+        return length
+
+    # --- Снимки ---
+
+    def snapshot(self) -> PieceTableSnapshot:
+        """Снимок текущего состояния за O(1)."""
+        return PieceTableSnapshot(self, self._root)
+
+    def restore(self, snapshot: PieceTableSnapshot):
+        """Возвращает документ к снимку за O(1)."""
+        if snapshot._table is not self:
+            raise ValueError("Снимок принадлежит другому документу")
+        self._root = snapshot._root
+        self.version += 1
+
+    # --- Внутренняя логика ---
+
+    def _check_offset(self, offset: int) -> int:
+        if offset < 0 or offset > len(self):
+            raise IndexError(f"Смещение {offset} вне документа (длина: {len(self)})")
+        return offset
+
+    def _new_piece(self, text: str) -> _Piece:
+        newline_positions = []
+        position = text.find('\n')
+        while position != -1:
+            newline_positions.append(position)
+            position = text.find('\n', position + 1)
+
+        self._buffers.append(text)
+        self._newline_index.append(newline_positions)
+        return _Piece(len(self._buffers) - 1, 0, len(text), len(newline_positions),
+                      self._random.random(), None, None)
+
+    def _count_newlines(self, buffer: int, start: int, end: int) -> int:
+        index = self._newline_index[buffer]
+        return bisect_left(index, end) - bisect_left(index, start)
+
+    def _slice(self, node: _Piece, start: int, length: int, priority: float,
+               left: Optional[_Piece], right: Optional[_Piece]) -> _Piece:
+        newlines = self._count_newlines(node.buffer, start, start + length)
+        return _Piece(node.buffer, start, length, newlines, priority, left, right)
+
+    def _split(self, node: Optional[_Piece], offset: int):
+        """Делит дерево на первые offset символов и остаток (с копированием пути)."""
+        if node is None:
+            return None, None
+
+        left_size = node.left.size if node.left else 0
+        if offset <= left_size:
+            left, right = self._split(node.left, offset)
+            return left, node.with_children(right, node.right)
+        if offset >= left_size + node.length:
+            left, right = self._split(node.right, offset - left_size - node.length)
+            return node.with_children(node.left, left), right
+
+        # Точка деления внутри фрагмента: фрагмент делится на два
+        cut = offset - left_size
+        left = self._slice(node, node.start, cut, node.priority, node.left, None)
+        right = self._slice(node, node.start + cut, node.length - cut, node.priority, None, node.right)
+        return left, right
+
+    def _merge(self, left: Optional[_Piece], right: Optional[_Piece]) -> Optional[_Piece]:
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            return left.with_children(left.left, self._merge(left.right, right))
+        return right.with_children(self._merge(left, right.left), right.right)
+
+    def _newline_offset(self, k: int) -> int:
+        """Смещение k-го (1-based) перевода строки."""
+        node, base = self._root, 0
+        while node is not None:
+            left_lines = node.left.lines if node.left else 0
+            if k <= left_lines:
+                node = node.left
+                continue
+            left_size = node.left.size if node.left else 0
+            k -= left_lines
+            if k <= node.newlines:
+                index = self._newline_index[node.buffer]
+                position = index[bisect_left(index, node.start) + k - 1]
+                return base + left_size + position - node.start
+            k -= node.newlines
+            base += left_size + node.length
+            node = node.right
+        raise IndexError("Перевод строки не найден")
+
+    def _collect(self, root: Optional[_Piece]) -> str:
+        parts = []
+        stack = []
+        node = root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            parts.append(self._buffers[node.buffer][node.start:node.start + node.length])
+            node = node.right
+        return ''.join(parts)
+
+    def _collect_range(self, node: Optional[_Piece], base: int, start: int, end: int, parts: List[str]):
+        if node is None or base >= end or base + node.size <= start:
+            return
+        left_size = node.left.size if node.left else 0
+        self._collect_range(node.left, base, start, end, parts)
+
+        piece_start = base + left_size
+        low = max(start, piece_start)
+        high = min(end, piece_start + node.length)
+        if low < high:
+            offset = node.start + low - piece_start
+            parts.append(self._buffers[node.buffer][offset:offset + high - low])
+
+        self._collect_range(node.right, piece_start + node.length, start, end, parts)
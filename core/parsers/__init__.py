@@ -5,7 +5,9 @@
 """
 
 from .code_tree_parser import CodeTreeParser
+from .ai_schema_stream_parser import AISchemaStreamParser
 
 __all__ = [
-    'CodeTreeParser'
+    'CodeTreeParser',
+    'AISchemaStreamParser'
 ]
\ No newline at end of file
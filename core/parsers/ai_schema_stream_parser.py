@@ -0,0 +1,376 @@
+# core/parsers/ai_schema_stream_parser.py
+
+"""
+Потоковый парсер AI-схем проекта.
+
+Текст разбирается за один проход построчным автоматом состояний и может
+поступать порциями (feed) по мере генерации ответа модели. Каждая строка
+просматривается один раз, содержимое файлов накапливается списками строк,
+поэтому время разбора линейно от размера схемы.
+
+Поддерживаемые форматы (могут сочетаться в одной схеме):
+
+    modules:                      files:
+      - utils/                      utils/helpers.py: "# helpers"
+      - data/                       main.py: |
+                                      def main():
+    project/                            pass
+    ├── utils/                      data/:
+    │   ├── __init__.py               - model.py
+    │   └── helpers.py              README.md:
+    └── main.py                     ```
+                                    # Project
+    utils/helpers.py                ```
+
+Строки дерева могут быть закомментированы ('# ├── ...'), как в подсказке
+редактора AI-кода. Схема, обернутая целиком в блок ```, тоже допускается.
+"""
+
+import re
+import textwrap
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('ai_code_assistant')
+
+_SECTION = re.compile(r'^(modules|directories|dirs|folders|files)\s*:\s*$', re.IGNORECASE)
+_NAME = re.compile(r'^(?:project_)?name\s*:\s*["\']?([^"\']*)["\']?\s*$', re.IGNORECASE)
+_ENTRY = re.compile(r'^(?:-\s+)?["\'`]?([^\s:"\'`]+)["\'`]?\s*:(?:\s+(.*))?$')
+_ITEM = re.compile(r'^(?:-\s+)?["\'`]?([^\s"\'`]+)["\'`]?\s*(?:#.*)?$')
+_TREE = re.compile(r'[├└]\S*\s+|[|`+]--+\s+')
+_FILE_NAME = re.compile(r'^[\w.-]*\.[\w-]+$')
+_ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\', "'": "'"}
+
+
+class AISchemaStreamParser:
+    """Однопроходный построчный парсер AI-схемы"""
+
+    # Состояния автомата
+    TOP, MODULES, FILES = 'top', 'modules', 'files'
+    PENDING, BLOCK, QUOTED, FENCE = 'pending', 'block', 'quoted', 'fence'
+
+    def __init__(self, default_content: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            default_content: Содержимое для файлов, перечисленных без
+                             содержимого (по имени файла); по умолчанию пустое
+        """
+        self.default_content = default_content
+        self.name: Optional[str] = None
+        self.modules: Dict[str, None] = {}
+        self.files: Dict[str, str] = {}
+        self.lines = 0
+
+        self._section = self.TOP
+        self._state = self.TOP
+        self._tail: List[str] = []
+        # Вложенность: (отступ или колонка, путь каталога)
+        self._dirs: List[Tuple[int, str]] = []
+        self._tree: List[Tuple[int, str]] = []
+        self._wrapper_fence = False
+
+        # Открытый файл, содержимое которого еще читается
+        self._path: Optional[str] = None
+        self._indent = 0
+        self._content: List[str] = []
+        self._chomp = False
+        self._closing = ''
+        self._closed = False
+
+    @classmethod
+    def parse(cls, text: str, default_content: Optional[Callable[[str], str]] = None) -> Dict[str, Any]:
+        """Разбирает схему целиком."""
+        parser = cls(default_content)
+        parser.feed(text)
+        return parser.close()
+
+    # --- Потоковый ввод ---
+
+    def feed(self, chunk: str):
+        """Принимает очередную порцию текста; неполная последняя строка ждет продолжения."""
+        if self._closed:
+            raise ValueError("Парсер уже закрыт")
+        start = 0
+        while True:
+            end = chunk.find('\n', start)
+            if end < 0:
+                break
+            if self._tail:
+                self._tail.append(chunk[start:end])
+                line = ''.join(self._tail)
+                self._tail = []
+            else:
+                line = chunk[start:end]
+            self._line(line[:-1] if line.endswith('\r') else line)
+            start = end + 1
+        if start < len(chunk):
+            self._tail.append(chunk[start:])
+
+    def close(self) -> Dict[str, Any]:
+        """Завершает разбор: обрабатывает последнюю строку и открытый файл."""
+        if not self._closed:
+            if self._tail:
+                line = ''.join(self._tail)
+                self._tail = []
+                self._line(line[:-1] if line.endswith('\r') else line)
+            self._finish_file()
+            self._closed = True
+            logger.debug(f"AI схема разобрана: строк {self.lines}, модулей {len(self.modules)}, "
+                         f"файлов {len(self.files)}")
+        return self.result
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        """Текущий результат (во время потокового ввода - уже разобранная часть)."""
+        return {
+            'name': self.name or 'ai_generated_project',
+            'modules': list(self.modules),
+            'files': dict(self.files),
+            'directories': []
+        }
+
+    # --- Автомат ---
+
+    def _line(self, line: str):
+        self.lines += 1
+        state = self._state
+        if state == self.BLOCK:
+            if self._block_line(line):
+                return
+        elif state == self.QUOTED:
+            self._quoted_line(line)
+            return
+        elif state == self.FENCE:
+            if line.strip().startswith('```'):
+                self._finish_file()
+            else:
+                self._content.append(line)
+            return
+        elif state == self.PENDING:
+            if self._pending_line(line):
+                return
+
+        stripped = line.strip()
+        if not stripped:
+            return
+        if stripped.startswith('```'):
+            # Обертка всей схемы в блок кода
+            self._wrapper_fence = not self._wrapper_fence
+            return
+
+        tree = _TREE.search(line)
+        if tree is not None and not line[:tree.start()].strip(' \t#│|'):
+            self._tree_line(tree.start(), line[tree.end():])
+            return
+
+        header = _SECTION.match(stripped)
+        if header is not None:
+            kind = header.group(1).lower()
+            self._section = self.FILES if kind == 'files' else self.MODULES
+            self._state = self._section
+            self._dirs = []
+            self._tree = []
+            return
+
+        if stripped.startswith('#'):
+            # Закомментированная схема из подсказки: '# project/'
+            stripped = stripped.lstrip('#').strip()
+            if not stripped or ' ' in stripped:
+                return
+            if stripped.endswith('/'):
+                self._tree = [(-1, self._add_module(stripped))]
+                return
+            indent = 0
+        else:
+            indent = len(line) - len(line.lstrip())
+
+        if self._section == self.TOP:
+            self._top_line(stripped)
+        else:
+            self._section_line(stripped, indent)
+
+    def _top_line(self, stripped: str):
+        name = _NAME.match(stripped)
+        if name is not None:
+            self.name = name.group(1).strip() or None
+            return
+        if ' ' in stripped or ':' in stripped:
+            return
+
+        path = stripped.strip('`')
+        if path.endswith('/') or path.endswith('\\'):
+            path = self._add_module(path)
+            # Корень последующего дерева
+            self._tree = [(-1, path)]
+        elif _FILE_NAME.match(path.replace('\\', '/').rsplit('/', 1)[-1]):
+            self._open_file(path, 0)
+        elif '/' in path or '\\' in path:
+            # Простой список путей: каталог без завершающего '/' ('src/utils')
+            self._add_module(path)
+
+    def _section_line(self, stripped: str, indent: int):
+        while self._dirs and self._dirs[-1][0] >= indent:
+            self._dirs.pop()
+        prefix = self._dirs[-1][1] + '/' if self._dirs else ''
+
+        entry = _ENTRY.match(stripped)
+        if entry is not None:
+            key, value = entry.group(1), (entry.group(2) or '').strip()
+            if indent == 0 and _NAME.match(stripped):
+                self.name = _NAME.match(stripped).group(1).strip() or None
+            elif self._section == self.MODULES:
+                self._dirs.append((indent, self._add_module(prefix + key)))
+            elif value and not value.startswith('#'):
+                self._entry_value(prefix + key, value, indent)
+            elif key.endswith('/'):
+                self._dirs.append((indent, self._add_module(prefix + key)))
+            else:
+                self._open_file(prefix + key, indent)
+            return
+
+        item = _ITEM.match(stripped)
+        if item is None:
+            return
+        path = prefix + item.group(1)
+        if self._section == self.MODULES or path.endswith('/'):
+            self._add_module(path)
+        else:
+            self._set_file(path, None)
+
+    def _entry_value(self, path: str, value: str, indent: int):
+        """Значение записи 'путь: значение' раздела files."""
+        if value in ('|', '|-', '|+', '>', '>-'):
+            self._path, self._indent, self._content = path, indent, []
+            self._chomp = value.endswith('-')
+            self._state = self.BLOCK
+            return
+        for quotes in ('"""', "'''"):
+            if value.startswith(quotes):
+                rest = value[len(quotes):]
+                if rest.endswith(quotes) and len(rest) >= len(quotes):
+                    self._set_file(path, rest[:-len(quotes)])
+                    return
+                self._path, self._content, self._closing = path, [rest] if rest else [], quotes
+                self._state = self.QUOTED
+                return
+        if value.startswith('```'):
+            self._path, self._content = path, []
+            self._state = self.FENCE
+            return
+        self._set_file(path, self._unquote(value))
+
+    def _pending_line(self, line: str) -> bool:
+        """
+        Строка после пути без содержимого: блок ``` или более глубокий
+        отступ задают содержимое файла, иначе файл получает содержимое
+        по умолчанию. Возвращает True, если строка поглощена.
+        """
+        stripped = line.strip()
+        if not stripped:
+            return True
+        indent = len(line) - len(line.lstrip())
+        # Внутри обертки голый ``` на уровне пути закрывает обертку
+        if stripped.startswith('```') and (not self._wrapper_fence or len(stripped) > 3
+                                           or indent > self._indent):
+            self._content = []
+            self._state = self.FENCE
+            return True
+        if self._section == self.FILES and indent > self._indent and not _TREE.search(line):
+            if _ENTRY.match(stripped) is not None or stripped.startswith('- '):
+                # Вложенные записи: путь без содержимого оказался каталогом
+                self._dirs.append((self._indent, self._add_module(self._path)))
+                self._path = None
+                self._state = self._section
+                return False
+            self._content = []
+            self._chomp = False
+            self._state = self.BLOCK
+            return self._block_line(line)
+        self._finish_file()
+        return False
+
+    def _block_line(self, line: str) -> bool:
+        """Строка блока с отступом; False - блок закончился на этой строке."""
+        if not line.strip():
+            self._content.append('')
+            return True
+        if len(line) - len(line.lstrip()) <= self._indent:
+            self._finish_file()
+            return False
+        self._content.append(line)
+        return True
+
+    def _quoted_line(self, line: str):
+        stripped = line.rstrip()
+        if stripped.endswith(self._closing):
+            self._content.append(stripped[:-len(self._closing)])
+            self._finish_file()
+        else:
+            self._content.append(line)
+
+    def _tree_line(self, column: int, name: str):
+        name = name.split('  #', 1)[0].split(' # ', 1)[0].strip().strip('`')
+        if not name:
+            return
+        while self._tree and self._tree[-1][0] >= column:
+            self._tree.pop()
+        path = self._tree[-1][1] + '/' + name if self._tree else name
+        if name.endswith('/'):
+            self._tree.append((column, self._add_module(path)))
+        else:
+            self._set_file(path, None)
+
+    # --- Результат ---
+
+    def _open_file(self, path: str, indent: int):
+        self._path, self._indent, self._content = path, indent, []
+        self._state = self.PENDING
+
+    def _finish_file(self):
+        state, path = self._state, self._path
+        self._state = self._section
+        self._path = None
+        if path is None:
+            return
+
+        content = self._content
+        self._content = []
+        if state == self.PENDING:
+            self._set_file(path, None)
+            return
+
+        while content and not content[-1].strip():
+            content.pop()
+        text = textwrap.dedent('\n'.join(content))
+        if state == self.QUOTED:
+            text = text.strip('\n')
+        if text and not (state == self.BLOCK and self._chomp):
+            text += '\n'
+        self._set_file(path, text)
+
+    def _set_file(self, path: str, content: Optional[str]):
+        path = path.replace('\\', '/').strip()
+        if path.startswith('./'):
+            path = path[2:]
+        if content is None:
+            if path in self.files:
+                return
+            content = self.default_content(path.rsplit('/', 1)[-1]) if self.default_content else ''
+        self.files[path] = content
+
+    def _add_module(self, path: str) -> str:
+        path = path.replace('\\', '/').strip().rstrip('/')
+        if path.startswith('./'):
+            path = path[2:]
+        if path:
+            self.modules[path] = None
+        return path
+
+    @staticmethod
+    def _unquote(value: str) -> str:
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            body = value[1:-1]
+            if value[0] == '"' and '\\' in body:
+                return re.sub(r'\\(.)', lambda m: _ESCAPES.get(m.group(1), m.group(0)), body)
+            return body
+        return value
@@ -15,8 +15,8 @@ class CodeTreeParser:
     Использует унифицированный ASTService внутри.
     """
 
-    def __init__(self):
-        self.ast_service = ASTService()
+    def __init__(self, ast_service: Optional[ASTService] = None):
+        self.ast_service = ast_service or ASTService()
         logger.debug("Инициализирован CodeTreeParser (адаптер)")
 
     def parse_project(self, project_path: str) -> Dict[str, CodeNode]:
@@ -1,7 +1,5 @@
 # gui/controller/analysis_controller.py
 
-import difflib
-
 from gui.views.main_window_view import IMainWindowView
 from gui.views.dialogs_view import DialogsView
 from gui.views.analysis_view import IAnalysisView
@@ -57,6 +55,8 @@ class AnalysisController:
         """
         Показать различия между двумя версиями кода.
         """
+        import difflib
+
         diff = "\n".join(difflib.unified_diff(
             old_code.splitlines(), new_code.splitlines(),
             fromfile="Старый", tofile="Новый", lineterm=""))
@@ -4,7 +4,6 @@ from gui.views.code_editor_view import ICodeEditorView
 from gui.views.main_window_view import IMainWindowView
 from gui.views.dialogs_view import DialogsView
 from core.business.code_service import ICodeService
-import difflib
 
 class CodeController:
     """
@@ -88,6 +87,8 @@ class CodeController:
         """
         Показать различия между версиями файла (diff).
         """
+        import difflib
+
         diff = "\n".join(
             difflib.unified_diff(
                 old_code.splitlines(), new_code.splitlines(), 
@@ -15,8 +15,12 @@ from core.business.project_service import IProjectService
 from core.business.code_service import ICodeService
 from core.business.analysis_service import IAnalysisService
 from core.business.change_service import PendingChange
+from core.business.multi_file_analyzer import MultiFileAnalyzer
+from core.data.change_journal import ChangeJournal
+from core.data.rollback_journal import RollbackJournal
 from core.app_context import get_app_context
 from gui.utils.ui_factory import ui_factory
+from gui.utils.background_worker import DebouncedBackgroundTask
 
 logger = logging.getLogger('ai_code_assistant')
 
@@ -54,21 +58,28 @@ class MainController:
         self.code_manager = self.app_context.get_code_manager()
         self.change_manager = self.app_context.get_change_manager()
         self.diff_engine = self.app_context.get_diff_engine()
+        self.undo_manager = self.app_context.get_undo_manager()
         self.ast_service = self.app_context.get_ast_service()
         self.project_creator = self.app_context.get_project_creator()
         self.ai_schema_service = self.app_context.get_ai_schema_service()
+        self.workspace = self.app_context.get_workspace()
+        self.multi_file_analyzer = MultiFileAnalyzer(self.code_manager)
         
         
-        # Для обратной совместимости - получаем парсер через сервис
-        from core.data.ai_schema_parser import AISchemaParser  # Локальный импорт
-        self.schema_parser = AISchemaParser()
+        # Для обратной совместимости - парсер схем из контекста
+        self.schema_parser = self.app_context.get_schema_parser()
         
         # Состояние контроллера
         self.current_file_path: Optional[str] = None
         self.has_unsaved_changes = False
+        # Содержимое файла на момент загрузки в редактор (база для слияния при сохранении)
+        self._editor_base_content: Optional[str] = None
         self.auto_save_on_blur = False
         self.project_ast_tree: Dict[str, Any] = {}
         
+        # Фоновый анализ AI-кода на конфликты (запускается после паузы во вводе)
+        self.ai_analysis_task: Optional[DebouncedBackgroundTask] = None
+        
         # Инициализация GUI
         self._setup_gui_structure()
         self._setup_event_bindings()
@@ -198,6 +209,8 @@ class MainController:
         self.main_window_view.bind_save_project(self.on_save_project)
         self.main_window_view.bind_show_pending_changes(self.on_show_pending_changes)
         self.main_window_view.bind_close_project(self.on_close_project)
+        self.main_window_view.bind_undo_changes(self.on_undo_changes)
+        self.main_window_view.bind_redo_changes(self.on_redo_changes)
         
         # Анализ
         self.main_window_view.bind_analyze_code(self.on_analyze_code)
@@ -401,21 +414,19 @@ class MainController:
             # Получаем сохраненное содержимое из файловой системы
             saved_content = self.code_service.get_file_content(self.current_file_path)
             
-            if current_content == saved_content:
-                self.main_window_view.show_info("Сравнение", "Файлы идентичны")
-                return
-            
-            # Используем DiffEngine из контекста
-            diff = self.diff_engine.generate_diff(saved_content, current_content)
+            # Результат берется из кэша DiffEngine; наличие изменений
+            # определяется по хэшам, diff считается только при отображении
+            diff = self.diff_engine.compare(saved_content, current_content)
             
             if self.diff_engine.has_changes(diff):
-                formatted_diff = self.diff_engine.format_diff_for_display(diff)
-                self.dialogs_view.show_diff(
-                    formatted_diff, 
+                # Окно просмотра сворачивает неизмененные области и
+                # отрисовывает только видимые строки
+                self.dialogs_view.show_diff_result(
+                    diff,
                     title=f"Сравнение: {os.path.basename(self.current_file_path)}"
                 )
             else:
-                self.main_window_view.show_info("Сравнение", "Нет различий")
+                self.main_window_view.show_info("Сравнение", "Файлы идентичны")
                 
         except Exception as e:
             logger.error(f"Ошибка при сравнении версий: {e}")
@@ -431,12 +442,15 @@ class MainController:
             path, name, template_name, is_empty, full_path = result
             
             # Используем ProjectCreatorService из контекста
+            error = None
             if is_empty:
                 success = self.project_creator.create_basic_python_project(path, name)
             else:
+                # Существующие файлы каталога не перезаписываются
                 success = self.project_creator.create_project_from_template(
                     template_name, path, name
                 )
+                error = self.project_creator.last_error
             
             if success:
                 self.main_window_view.set_status(f"Проект создан: {name}")
@@ -446,14 +460,17 @@ class MainController:
                 self.project_service.open_project(full_path)
                 self._load_project_tree()
             else:
-                self.main_window_view.show_error("Ошибка", "Не удалось создать проект!")
+                message = "Не удалось создать проект!"
+                if error:
+                    message += f"\n{error}"
+                self.main_window_view.show_error("Ошибка", message)
 
     def on_open_project_clicked(self):
         """Обработка открытия существующего проекта."""
         directory = self.dialogs_view.ask_directory("Выберите директорию проекта")
         
         if directory:
-            success = self.project_service.open_project(directory)
+            success = self._switch_project(directory)
             if success:
                 self.main_window_view.set_status(f"Открыт проект: {directory}")
                 
@@ -461,13 +478,92 @@ class MainController:
                 self.project_tree_view.load_project_from_repository(self.project_service)
                 
                 self._update_ast_tree(directory)
+                
+                # Структура загружена - проверяем бюджет памяти рабочего пространства
+                if self.workspace:
+                    self.workspace.enforce_memory_budget()
             else:
                 self.main_window_view.show_error("Ошибка", "Не удалось открыть проект!")
 
+    def _switch_project(self, directory: str) -> bool:
+        """
+        Открывает проект через рабочее пространство.
+        Ранее открытые проекты сохраняют разобранное состояние,
+        поэтому повторное переключение на них не требует парсинга.
+        """
+        self._recover_interrupted_writes(directory)
+        if not self.workspace:
+            success = self.project_service.open_project(directory)
+            if success:
+                self._restore_pending_changes(directory)
+            return success
+        
+        # Текущий проект остается в рабочем пространстве
+        if self.project_service.project_path:
+            self.workspace.attach_project(self.project_service)
+        
+        project_service = self.workspace.open_project(directory)
+        if not project_service:
+            return False
+        
+        self.project_service = project_service
+        # Сервис и репозиторий активного проекта доступны и через контекст
+        self.app_context.set_service('project_service', project_service)
+        self.app_context.set_service('project_repository', project_service.repository)
+        # Запись изменений и отмена идут через репозиторий активного проекта
+        for service in (self.code_service, self.change_manager, self.undo_manager):
+            if hasattr(service, 'set_repository'):
+                service.set_repository(project_service.repository)
+        self.project_ast_tree = {}
+        self._restore_pending_changes(directory)
+        return True
+
+    def _recover_interrupted_writes(self, directory: str):
+        """
+        Откатывает файлы проекта, запись которых прервало аварийное
+        завершение приложения (до разбора проекта).
+        """
+        try:
+            recovered = RollbackJournal.recover([directory])
+        except OSError as e:
+            logger.error(f"Журналы отката недоступны: {e}")
+            return
+        if recovered:
+            logger.warning(f"Откачено незавершенных транзакций записи: {recovered}")
+            self.main_window_view.show_warning(
+                "Восстановление",
+                f"Запись файлов проекта была прервана, исходные версии восстановлены (транзакций: {recovered})"
+            )
+
+    def _restore_pending_changes(self, directory: str):
+        """
+        Подключает журнал отложенных изменений проекта: изменения, не
+        примененные до аварийного завершения, возвращаются в очередь.
+        """
+        try:
+            restored = self.change_manager.attach_journal(ChangeJournal.for_project(directory))
+        except OSError as e:
+            logger.error(f"Журнал отложенных изменений недоступен: {e}")
+            self.change_manager.detach_journal()
+            return
+        
+        if restored:
+            self.main_window_view.set_status(f"Восстановлено отложенных изменений: {restored}")
+        self._update_unsaved_changes_status()
+
     def _update_ast_tree(self, project_path: str):
         """Обновляет AST дерево проекта."""
         try:
-            self.project_ast_tree = self.ast_service.parse_project(project_path)
+            # AST дерево берется из кэша структуры проекта: перепарсиваются
+            # только файлы, помеченные как измененные
+            structure = {}
+            if self.project_service.project_path == project_path:
+                structure = self.project_service.get_project_structure()
+            
+            if structure and 'ast_tree' in structure:
+                self.project_ast_tree = structure['ast_tree']
+            else:
+                self.project_ast_tree = self.ast_service.parse_project(project_path)
             logger.info(f"AST дерево обновлено: {len(self.project_ast_tree)} модулей")
         except Exception as e:
             logger.error(f"Ошибка при обновлении AST дерева: {e}")
@@ -502,6 +598,7 @@ class MainController:
                 structure, self.project_service.project_path
             )
             if success:
+                self.project_service.invalidate_structure()
                 self.main_window_view.show_info("Структура проекта", "Структура успешно добавлена!")
                 self._load_project_tree()
             else:
@@ -510,8 +607,9 @@ class MainController:
     def on_refresh_project(self):
         """Обновить проект."""
         if self.project_service.project_path:
+            # Явное обновление - пересканируем проект целиком
+            self.project_service.invalidate_structure()
             self._load_project_tree()
-            self._update_ast_tree(self.project_service.project_path)
             self.main_window_view.set_status("Проект обновлен")
         else:
             self.main_window_view.show_warning("Обновение", "Нет открытого проекта")
@@ -527,10 +625,8 @@ class MainController:
             self.on_save_current_file()
         
         # Применить отложенные изменения через ChangeManager из контекста
-        pending_changes = self.change_manager.get_pending_changes()
-        if pending_changes:
-            success, messages = self.change_manager.apply_all_changes()
-            if success:
+        if self.change_manager.count:
+            if self._apply_pending_changes():
                 self.main_window_view.show_info("Изменения", "Отложенные изменения применены")
             else:
                 self.main_window_view.show_error("Изменения", "Ошибка применения изменений")
@@ -549,16 +645,58 @@ class MainController:
         apply_changes = self.dialogs_view.show_pending_changes_dialog(pending_changes)
         
         if apply_changes:
-            success, messages = self.change_manager.apply_all_changes()
-            if success:
+            # Дерево обновляется внутри _apply_pending_changes
+            if self._apply_pending_changes():
                 self.main_window_view.show_info("Изменения", "Отложенные изменения применены")
-                self._load_project_tree()  # Обновляем дерево
             else:
                 self.main_window_view.show_error("Изменения", "Ошибка применения изменений")
         else:
             self.change_manager.clear_changes()
             self.main_window_view.show_info("Изменения", "Отложенные изменения отменены")
 
+    def on_undo_changes(self):
+        """Отменить последнее применение изменений (во всех его файлах)."""
+        self._step_applied_changes(undo=True)
+
+    def on_redo_changes(self):
+        """Повторить последнее отмененное применение изменений."""
+        self._step_applied_changes(undo=False)
+
+    def _step_applied_changes(self, undo: bool):
+        """Отмена или повтор транзакции UndoManager с обновлением представлений."""
+        title = "Отмена" if undo else "Повтор"
+        label = self.undo_manager.undo_label if undo else self.undo_manager.redo_label
+        if label is None:
+            self.main_window_view.show_info(title, "Нечего отменять" if undo else "Нечего повторять")
+            return
+        
+        success, files = self.undo_manager.undo() if undo else self.undo_manager.redo()
+        if not success:
+            self.main_window_view.show_error(title, self.undo_manager.last_error)
+            return
+        
+        self._invalidate_files(files)
+        # Дерево обновляется без сброса редактора: открытый файл и его правки остаются
+        self._refresh_project_tree()
+        
+        status = f"{'Отменено' if undo else 'Повторено'}: {label}"
+        current_file = self.current_file_path
+        if current_file and os.path.abspath(current_file) in files:
+            if self.has_unsaved_changes:
+                # База редактора не меняется: при сохранении правки сольются
+                # с новым содержимым диска
+                status += " (несохраненные правки открытого файла сохранены в редакторе)"
+            elif os.path.exists(current_file):
+                self._load_file_content(current_file)
+            else:
+                # Отменено создание открытого файла
+                self.current_file_path = None
+                self._editor_base_content = None
+                self.code_editor_view.set_source_content("")
+                self.code_editor_view.update_modified_status(False)
+        
+        self.main_window_view.set_status(status)
+
     def on_close_project(self):
         """Закрыть проект."""
         if not self.project_service.project_path:
@@ -566,7 +704,7 @@ class MainController:
             return
         
         # Проверяем несохраненные изменения
-        if self.has_unsaved_changes or self.change_manager.get_pending_changes():
+        if self.has_unsaved_changes or self.change_manager.count:
             response = self.dialogs_view.ask_save_changes("проект")
             
             if response is None:  # Отмена
@@ -574,7 +712,12 @@ class MainController:
             elif response:  # Сохранить
                 self.on_save_project()
         
-        success = self.project_service.close_project()
+        project_path = self.project_service.project_path
+        # Проект из рабочего пространства закрывается через него (вместе с его кэшами)
+        if self.workspace and self.workspace.get_project(project_path) is self.project_service:
+            success = self.workspace.close_project(project_path)
+        else:
+            success = self.project_service.close_project()
         if success:
             self.main_window_view.set_status("Проект закрыт")
             self._clear_all_views()
@@ -628,8 +771,8 @@ class MainController:
             
             if success:
                 self.main_window_view.show_info("Рефакторинг", "Авторефакторинг завершен")
+                self.project_service.invalidate_structure()
                 self._load_project_tree()
-                self._update_ast_tree(self.project_service.project_path)
             else:
                 self.main_window_view.show_error("Рефакторинг", "Ошибка рефакторинга")
                 
@@ -659,22 +802,51 @@ class MainController:
         if ai_code:
             self.main_window_view.set_status(f"AI-код: {len(ai_code)} символов")
             
-            # Автоматический анализ AI-кода на конфликты
+            # Автоматический анализ AI-кода на конфликты выполняется в фоне
+            # после паузы во вводе; устаревшие анализы отменяются
             if self.current_file_path and self.project_ast_tree:
-                try:
-                    changes = self.code_manager.analyze_ai_code(
-                        ai_code, 
-                        self.project_ast_tree,
-                        self.current_file_path
+                task = self._get_ai_analysis_task()
+                if task:
+                    task.submit(
+                        self._analyze_ai_code_in_background,
+                        ai_code,
+                        dict(self.project_ast_tree),  # снимок дерева для рабочего потока
+                        self.current_file_path,
+                        on_result=self._on_ai_analysis_done
                     )
-                    
-                    conflicts = [c for c in changes if c.action == 'conflict']
-                    if conflicts:
-                        self.main_window_view.set_status(
-                            f"Обнаружено {len(conflicts)} конфликтов в AI-коде"
-                        )
-                except Exception as e:
-                    logger.debug(f"Ошибка при анализе AI-кода: {e}")
+        elif self.ai_analysis_task:
+            self.ai_analysis_task.cancel()
+
+    def _get_ai_analysis_task(self) -> Optional[DebouncedBackgroundTask]:
+        """Возвращает (создавая при первом обращении) фоновую задачу анализа AI-кода."""
+        if self.ai_analysis_task is None and hasattr(self.code_editor_view, 'after'):
+            self.ai_analysis_task = DebouncedBackgroundTask(self.code_editor_view, delay_ms=300)
+        return self.ai_analysis_task
+
+    def shutdown(self):
+        """Останавливает фоновые задачи перед закрытием окна."""
+        if self.ai_analysis_task:
+            self.ai_analysis_task.shutdown()
+            self.ai_analysis_task = None
+        logger.debug("Фоновые задачи контроллера остановлены")
+
+    def _analyze_ai_code_in_background(self, cancel_event, ai_code: str,
+                                       project_tree: Dict[str, Any], file_path: str):
+        """Анализ AI-кода (выполняется в рабочем потоке)."""
+        return self.code_manager.analyze_ai_code_batch(
+            ai_code,
+            project_tree,
+            file_path,
+            cancel_event=cancel_event
+        )
+
+    def _on_ai_analysis_done(self, changes):
+        """Отображает результат фонового анализа AI-кода (поток Tk)."""
+        conflicts = [c for c in changes or [] if c.action == 'conflict']
+        if conflicts:
+            self.main_window_view.set_status(
+                f"Обнаружено {len(conflicts)} конфликтов в AI-коде"
+            )
 
     def on_editor_focus_out(self, event=None):
         """Обработчик потери фокуса редактором (автосохранение)."""
@@ -688,21 +860,64 @@ class MainController:
             self.main_window_view.show_warning("Сохранение", "Нет открытого файла")
             return
         
-        content = self.code_editor_view.get_source_content()
+        content = self._merge_editor_with_disk(self.code_editor_view.get_source_content())
+        if content is None:
+            return
         success = self.code_service.save_current_file(content)
         
         if success:
+            self._editor_base_content = content
             self.has_unsaved_changes = False
             self.code_editor_view.update_modified_status(False)
             self._update_unsaved_changes_status()
             self.main_window_view.set_status("Файл сохранен")
             
-            # Обновляем AST дерево
+            # Обновляем AST дерево (перепарсивается только сохраненный файл)
             if self.project_service.project_path:
+                self.project_service.invalidate_structure(self.current_file_path)
                 self._update_ast_tree(self.project_service.project_path)
         else:
             self.main_window_view.show_error("Ошибка", "Не удалось сохранить файл")
 
+    def _add_pending_change(self, pending_change: PendingChange):
+        """
+        Ставит изменение в очередь, запоминая версию файла, для которой оно
+        вычислено: если файл изменится до применения, изменение будет слито.
+        """
+        file_path = pending_change.file_path
+        if file_path and os.path.isfile(file_path):
+            pending_change.base_content = self.code_service.get_file_content(file_path) or None
+        self.change_manager.add_change(pending_change)
+
+    def _merge_editor_with_disk(self, content: str) -> Optional[str]:
+        """
+        Сливает правки редактора с изменениями файла на диске, сделанными после
+        его загрузки. Возвращает текст для сохранения или None при конфликте
+        (тогда в редактор выводится текст с маркерами конфликтов).
+        """
+        base = self._editor_base_content
+        if base is None:
+            return content
+        disk = self.code_service.get_file_content(self.current_file_path)
+        if not disk or disk == base:
+            return content
+        
+        merged = self.diff_engine.merge3(base, content, disk, "редактор", "диск")
+        self.code_editor_view.set_source_content(merged.text)
+        if merged.has_conflicts:
+            lines = ", ".join(str(conflict.line) for conflict in merged.conflicts[:10])
+            self.main_window_view.show_warning(
+                "Сохранение",
+                f"Файл изменен на диске. Конфликтов: {len(merged.conflicts)} (строки: {lines}).\n"
+                "Разрешите конфликты в редакторе и сохраните снова."
+            )
+            # Следующее сохранение считается уже слитым с диском
+            self._editor_base_content = disk
+            return None
+        
+        logger.info("Изменения на диске слиты с правками редактора: %s", self.current_file_path)
+        return merged.text
+
     def on_delete_selected_element(self):
         """Удалить выбранный элемент."""
         selected_item = self.project_tree_view.get_selected_item()
@@ -725,7 +940,7 @@ class MainController:
                 node_type=selected_item.get('type')
             )
             
-            self.change_manager.add_change(pending_change)
+            self._add_pending_change(pending_change)
             self._update_unsaved_changes_status()
             
             self.main_window_view.show_info("Удаление", "Элемент помещен в очередь удаления")
@@ -740,6 +955,10 @@ class MainController:
             self.main_window_view.show_warning("AI Код", "Введите код в поле AI")
             return
         
+        # Многофайловый ответ AI раскладывается по файлам проекта
+        if self._queue_multi_file_ai_code(ai_code):
+            return
+        
         selected_item = self.project_tree_view.get_selected_item()
         if not selected_item:
             self.main_window_view.show_warning("AI Код", "Выберите место для добавления кода")
@@ -773,13 +992,70 @@ class MainController:
             node_type='ai_code'
         )
         
-        self.change_manager.add_change(pending_change)
+        self._add_pending_change(pending_change)
         self._update_unsaved_changes_status()
         
         self.code_editor_view.clear_ai_content()
         self.main_window_view.show_info("AI Код", "Код добавлен в очередь изменений")
         self.main_window_view.set_status("AI код будет добавлен при сохранении проекта")
 
+    def _queue_multi_file_ai_code(self, ai_code: str) -> bool:
+        """
+        Ставит в очередь многофайловый ответ AI. Для существующих модулей
+        ставятся изменения отдельных сущностей (замены на месте), новые и
+        не-Python файлы ставятся целиком.
+        Возвращает False, если в тексте нет блоков кода с путями файлов.
+        """
+        change_sets = self.multi_file_analyzer.analyze(
+            ai_code, self.project_ast_tree or {}, self.project_service.project_path or ""
+        )
+        if not change_sets:
+            return False
+        
+        whole_files = [change_set for change_set in change_sets
+                       if change_set.is_new or not change_set.payload.is_python]
+        # Конфликты существующих модулей в очередь не попадают: их применение невозможно
+        skipped = sum(len(change_set.conflicts) for change_set in change_sets if change_set not in whole_files)
+        conflicts = sum(len(change_set.conflicts) for change_set in change_sets)
+        if conflicts:
+            message = f"Найдено {conflicts} конфликтов в {len(change_sets)} файлах."
+            if skipped:
+                message += (f"\nИзменения с конфликтами ({skipped}) будут пропущены, "
+                            f"AI-код останется в редакторе.")
+            response = self.dialogs_view.show_warning_dialog(
+                "Конфликты обнаружены", message + "\nДобавить остальной код в очередь?"
+            )
+            if not response:
+                return True
+        
+        queued = 0
+        for change_set in change_sets:
+            if change_set in whole_files:
+                self._add_pending_change(PendingChange(
+                    action='add',
+                    entity_name=f'AI код: {change_set.path}',
+                    new_code=change_set.payload.code,
+                    file_path=change_set.target_path,
+                    node_type='ai_code'
+                ))
+                queued += 1
+                continue
+            for change in change_set.changes:
+                if change.action != 'conflict':
+                    self._add_pending_change(PendingChange.from_code_change(change))
+                    queued += 1
+        self._update_unsaved_changes_status()
+        
+        new_files = sum(1 for change_set in change_sets if change_set.is_new)
+        message = f"В очередь добавлено изменений: {queued} в {len(change_sets)} файлах (новых файлов: {new_files})"
+        if skipped:
+            message += f"\nПропущено конфликтов: {skipped}; AI-код оставлен в редакторе"
+        else:
+            self.code_editor_view.clear_ai_content()
+        self.main_window_view.show_info("AI Код", message)
+        self.main_window_view.set_status("AI код будет добавлен при сохранении проекта")
+        return True
+
     def on_replace_selected_element(self):
         """Заменить выбранный элемент AI кодом."""
         selected_item = self.project_tree_view.get_selected_item()
@@ -808,7 +1084,7 @@ class MainController:
             node_type=selected_item.get('type')
         )
         
-        self.change_manager.add_change(pending_change)
+        self._add_pending_change(pending_change)
         self._update_unsaved_changes_status()
         
         self.code_editor_view.clear_ai_content()
@@ -863,7 +1139,9 @@ class MainController:
                         else:
                             self.main_window_view.set_status(f"Показан элемент: {item_name}")
                     
-                    # Сбрасываем флаг изменений для этого элемента
+                    # Сбрасываем флаг изменений для этого элемента;
+                    # в редакторе фрагмент, а не файл - слияние с диском невозможно
+                    self._editor_base_content = None
                     self.has_unsaved_changes = False
                     self.code_editor_view.update_modified_status(False)
                     self._update_unsaved_changes_status()
@@ -911,17 +1189,14 @@ class MainController:
         # Если это директория проекта, можно добавить статистику
         if directory_item.get('type') == 'project' and hasattr(self, 'project_service'):
             try:
-                structure = self.project_service.get_project_structure()
-                if structure:
-                    files_count = len(structure.get('files', {}))
-                    dirs_count = len(structure.get('directories', []))
-                    modules_count = len(structure.get('modules', []))
-                    
+                # Счетчики берутся из кэша структуры без повторного сканирования
+                counts = self.project_service.get_structure_counts()
+                if counts:
                     info_lines.extend([
                         f"# Статистика проекта:",
-                        f"#   Файлов: {files_count}",
-                        f"#   Директорий: {dirs_count}",
-                        f"#   Модулей: {modules_count}",
+                        f"#   Файлов: {counts.get('files', 0)}",
+                        f"#   Директорий: {counts.get('directories', 0)}",
+                        f"#   Модулей: {counts.get('modules', 0)}",
                         f""
                     ])
             except Exception:
@@ -1011,6 +1286,7 @@ class MainController:
             if content is not None:
                 self.code_editor_view.set_source_content(content)
                 self.current_file_path = file_path
+                self._editor_base_content = content
                 self.has_unsaved_changes = False
                 self.code_editor_view.update_modified_status(False)
                 self.project_service.repository.current_file_path = file_path
@@ -1076,6 +1352,7 @@ class MainController:
             
             # Сбрасываем состояние
             self.current_file_path = None
+            self._editor_base_content = None
             self.has_unsaved_changes = False
             self.code_editor_view.set_source_content("")
             self.code_editor_view.clear_ai_content()
@@ -1090,12 +1367,28 @@ class MainController:
             logger.error(f"Ошибка при загрузке проекта: {e}")
             self.main_window_view.show_error("Ошибка", f"Не удалось загрузить проект: {e}")
 
+    def _refresh_project_tree(self):
+        """Перечитывает структуру проекта в дереве, не трогая редактор."""
+        try:
+            self.project_tree_view.load_from_project_service(self.project_service)
+            self._update_ast_tree(self.project_service.project_path)
+        except Exception as e:
+            logger.error(f"Ошибка при обновлении дерева проекта: {e}")
+            self.main_window_view.show_error("Ошибка", f"Не удалось обновить дерево проекта: {e}")
+
     def _clear_all_views(self):
         """Очищает все представления."""
         self.current_file_path = None
+        self._editor_base_content = None
         self.has_unsaved_changes = False
+        # Проект закрыт пользователем: очередь и ее журнал очищаются
         self.change_manager.clear_changes()
-        self.project_ast_tree.clear()
+        self.change_manager.detach_journal()
+        self.undo_manager.clear()
+        if self.ai_analysis_task:
+            self.ai_analysis_task.cancel()
+        # Не очищаем словарь на месте: он принадлежит кэшу структуры проекта
+        self.project_ast_tree = {}
         
         self.code_editor_view.set_source_content("")
         self.code_editor_view.clear_ai_content()
@@ -1111,54 +1404,57 @@ class MainController:
 
     def _apply_pending_changes(self):
         """Применить отложенные изменения."""
-        pending_changes = self.change_manager.get_pending_changes()
-        if not pending_changes:
+        if not self.change_manager.count:
             logger.debug("Нет отложенных изменений для применения")
             return False
         
         try:
-            # Конвертируем PendingChange в CodeChange
-            from core.business.change_service import CodeChange
-            code_changes = []
-            for pending_change in pending_changes:
-                code_change = CodeChange(
-                    action=pending_change.action,
-                    entity_name=pending_change.entity_name,
-                    new_code=pending_change.new_code,
-                    old_code=pending_change.old_code,
-                    file_path=pending_change.file_path,
-                    node_type=pending_change.node_type
-                )
-                code_changes.append(code_change)
+            # Одно чтение и одна атомарная запись на файл; при ошибке любого
+            # изменения все файлы остаются (или возвращаются) в исходном виде
+            self.change_manager.apply_all_changes()
+            report = self.change_manager.last_report
+            if report is None:
+                logger.error("Не удалось применить отложенные изменения")
+                return False
             
-            # Используем CodeManager для применения изменений
-            success = self.code_manager.apply_changes(code_changes)
+            # Структура и разбор обновляются только для затронутых файлов
+            self._invalidate_files(report.touched_files)
+            logger.info(report.summary())
             
-            if success:
-                applied_count = len(pending_changes)
-                self.change_manager.clear_changes()
-                logger.info("Применено %s изменений", applied_count)
-                
+            if report.failed:
+                details = "\n".join(
+                    f"{result.change.entity_name}: {result.message}" for result in report.failed[:10]
+                )
+                self.main_window_view.show_warning(
+                    "Изменения",
+                    f"Не применено изменений: {len(report.failed)}\n{details}"
+                )
+            
+            if report.touched_files:
                 # Обновляем дерево проекта
                 self._load_project_tree()
-                
-                return True
-            else:
-                logger.error("Не удалось применить отложенные изменения")
-                return False
+            
+            return report.success
                 
         except Exception as e:
             logger.error("Ошибка применения отложенных изменений: %s", e)
             return False
 
+    def _invalidate_files(self, files):
+        """Сбрасывает кэш структуры и разобранные модули измененных файлов."""
+        for file_path in files:
+            self.project_service.invalidate_structure(file_path)
+            if file_path.endswith('.py'):
+                self.ast_service.invalidate_module(file_path)
+
     def _update_unsaved_changes_status(self):
         """Обновляет статус несохраненных изменений."""
         status_text = []
         
-        # Проверяем отложенные изменения
-        pending_changes = self.change_manager.get_pending_changes()
-        if pending_changes:
-            status_text.append(f"[{len(pending_changes)} отложенных]")
+        # Проверяем отложенные изменения (счетчик очереди, без обхода списка)
+        pending_count = self.change_manager.count
+        if pending_count:
+            status_text.append(f"[{pending_count} отложенных]")
         
         # Проверяем несохраненные изменения в редакторе
         if self.has_unsaved_changes:
@@ -1173,7 +1469,7 @@ class MainController:
             'project_name': self.project_service.project_name,
             'current_file': self.current_file_path,
             'has_unsaved_changes': self.has_unsaved_changes,
-            'pending_changes_count': len(self.change_manager.get_pending_changes()),
+            'pending_changes_count': self.change_manager.count,
             'auto_save_enabled': self.auto_save_on_blur,
             'ast_modules_count': len(self.project_ast_tree)
         }
@@ -0,0 +1,149 @@
+# gui/utils/background_worker.py
+
+"""
+Фоновое выполнение тяжелых задач для GUI с отложенным запуском (debounce).
+
+Задача запускается только после паузы во вводе, выполняется в рабочем
+потоке, а результат передается обратно в поток Tk через очередь,
+которую опрашивает widget.after(). Устаревшие задачи отменяются,
+и в GUI попадает только результат последней.
+"""
+
+import queue
+import threading
+import logging
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class DebouncedBackgroundTask:
+    """
+    Фоновая задача с задержкой запуска и отменой устаревших результатов.
+
+    Функция задачи получает первым аргументом threading.Event отмены
+    и может периодически проверять его, чтобы завершиться раньше.
+    """
+
+    def __init__(self, widget, delay_ms: int = 300, poll_ms: int = 50):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gui-background')
+        self._results: "queue.Queue" = queue.Queue()
+        self._generation = 0
+        self._pending_after_id = None
+        self._poll_after_id = None
+        self._cancel_event: Optional[threading.Event] = None
+        self._running = 0
+        self._closed = False
+
+    def submit(self, func: Callable[..., Any], *args,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        Планирует запуск задачи через delay_ms.
+        Предыдущая запланированная задача отменяется, выполняющаяся - помечается отмененной.
+        """
+        if self._closed:
+            return
+
+        self._generation += 1
+        generation = self._generation
+        self._cancel_current()
+
+        self._pending_after_id = self.widget.after(
+            self.delay_ms, self._start, generation, func, args, on_result, on_error
+        )
+
+    def cancel(self):
+        """Отменяет запланированную и выполняющуюся задачи."""
+        self._generation += 1
+        self._cancel_current()
+
+    def shutdown(self):
+        """Останавливает обработку задач."""
+        self.cancel()
+        self._closed = True
+        if self._poll_after_id is not None:
+            self._safe_after_cancel(self._poll_after_id)
+            self._poll_after_id = None
+        self._executor.shutdown(wait=False)
+
+    @property
+    def is_busy(self) -> bool:
+        """Есть ли запланированная или выполняющаяся задача."""
+        return self._pending_after_id is not None or self._running > 0
+
+    # --- Внутренняя логика (поток Tk) ---
+
+    def _cancel_current(self):
+        if self._pending_after_id is not None:
+            self._safe_after_cancel(self._pending_after_id)
+            self._pending_after_id = None
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def _start(self, generation, func, args, on_result, on_error):
+        self._pending_after_id = None
+        if generation != self._generation or self._closed:
+            return
+
+        cancel_event = threading.Event()
+        self._cancel_event = cancel_event
+        self._running += 1
+        self._executor.submit(self._run, generation, cancel_event, func, args, on_result, on_error)
+        self._schedule_poll()
+
+    def _run(self, generation, cancel_event, func, args, on_result, on_error):
+        """Выполняется в рабочем потоке."""
+        try:
+            if cancel_event.is_set():
+                result, error = None, None
+            else:
+                result, error = func(cancel_event, *args), None
+        except Exception as e:
+            result, error = None, e
+        self._results.put((generation, cancel_event, result, error, on_result, on_error))
+
+    def _schedule_poll(self):
+        if self._poll_after_id is None and not self._closed:
+            try:
+                self._poll_after_id = self.widget.after(self.poll_ms, self._poll)
+            except tk.TclError:
+                self._poll_after_id = None
+
+    def _poll(self):
+        self._poll_after_id = None
+
+        while True:
+            try:
+                generation, cancel_event, result, error, on_result, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            self._running -= 1
+            # В GUI попадает только результат последней неотмененной задачи
+            if generation != self._generation or cancel_event.is_set():
+                continue
+
+            self._cancel_event = None
+            if error is not None:
+                logger.debug(f"Ошибка фоновой задачи: {error}")
+                if on_error:
+                    on_error(error)
+            elif on_result:
+                on_result(result)
+
+        if self._running > 0:
+            self._schedule_poll()
+
+    def _safe_after_cancel(self, after_id):
+        try:
+            self.widget.after_cancel(after_id)
+        except (tk.TclError, ValueError):
+            pass
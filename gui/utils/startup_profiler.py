@@ -0,0 +1,156 @@
+# gui/utils/startup_profiler.py
+
+"""
+Профилирование запуска приложения (режим --profile-startup).
+
+Время импорта каждого модуля измеряется обертками над загрузчиками,
+которые устанавливает поисковик в начале sys.meta_path: для модуля
+учитывается собственное время выполнения и суммарное вместе с вложенными
+импортами. Этапы запуска (контекст, интерфейс, первая отрисовка окна)
+отмечаются вызовом mark(). Отчет записывается в текстовый файл.
+"""
+
+import os
+import sys
+import time
+import logging
+import importlib.abc
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger('ai_code_assistant')
+
+
+class _TimedLoader:
+    """Обертка загрузчика, измеряющая время выполнения модуля"""
+
+    def __init__(self, loader, profiler: 'StartupProfiler'):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        # get_code, is_package, get_resource_reader и т.д.
+        return getattr(self._loader, name)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Поисковик, подменяющий загрузчик найденного модуля на _TimedLoader"""
+
+    def __init__(self, profiler: 'StartupProfiler'):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    """Время импорта модулей и этапов запуска"""
+
+    # Цель: пустое окно не позднее чем через 300 мс после старта
+    TARGET = 0.3
+
+    def __init__(self, started: Optional[float] = None):
+        """
+        Args:
+            started: Момент старта (time.perf_counter()); по умолчанию - сейчас
+        """
+        self.started = started if started is not None else time.perf_counter()
+        # (модуль, собственное время, суммарное время) в порядке завершения импорта
+        self.imports: List[Tuple[str, float, float]] = []
+        # (этап, время от старта)
+        self.marks: List[Tuple[str, float]] = []
+        self._children: List[float] = []
+        self._finder: Optional[_ImportTimer] = None
+
+    # --- Измерение ---
+
+    def install(self):
+        """Начинает измерение импортов"""
+        if self._finder is None:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """Прекращает измерение импортов"""
+        if self._finder is not None:
+            if self._finder in sys.meta_path:
+                sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def mark(self, label: str) -> float:
+        """Отмечает этап запуска; возвращает время от старта в секундах"""
+        elapsed = time.perf_counter() - self.started
+        self.marks.append((label, elapsed))
+        logger.debug(f"Запуск: {label} - {elapsed * 1000:.1f} мс")
+        return elapsed
+
+    def _enter(self):
+        self._children.append(0.0)
+
+    def _leave(self, name: str, elapsed: float):
+        children = self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        self.imports.append((name, elapsed - children, elapsed))
+
+    # --- Отчет ---
+
+    @property
+    def import_time(self) -> float:
+        """Суммарное время импортов верхнего уровня"""
+        return sum(own for _, own, _ in self.imports)
+
+    def report(self, limit: int = 40) -> str:
+        """Текстовый отчет: этапы и самые долгие импорты"""
+        lines = ["Профиль запуска AI Code Assistant",
+                 f"Импортировано модулей: {len(self.imports)}, "
+                 f"время импорта: {self.import_time * 1000:.1f} мс",
+                 "",
+                 "Этапы (от старта, мс):"]
+        lines.extend(f"  {elapsed * 1000:9.1f}  {label}" for label, elapsed in self.marks)
+        if self.marks:
+            total = self.marks[-1][1]
+            verdict = "достигнута" if total <= self.TARGET else "не достигнута"
+            lines.append(f"Цель {self.TARGET * 1000:.0f} мс {verdict}: {total * 1000:.1f} мс")
+
+        lines.extend(["", f"Самые долгие импорты (собственное / суммарное, мс), первые {limit}:"])
+        slowest = sorted(self.imports, key=lambda item: item[1], reverse=True)[:limit]
+        lines.extend(f"  {own * 1000:8.2f} {total * 1000:9.2f}  {name}" for name, own, total in slowest)
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str) -> bool:
+        """Записывает отчет в файл"""
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.report())
+            logger.info(f"Профиль запуска записан: {path}")
+            return True
+        except OSError as e:
+            logger.error(f"Ошибка записи профиля запуска {path}: {e}")
+            return False
@@ -1,29 +1,32 @@
 # gui/views/__init__.py
 
-from .code_editor_view import CodeEditorView, ICodeEditorView
-from .dialogs_view import DialogsView, IDialogsView
-from .main_window_view import IMainWindowView, MainWindowView
+"""
+Представления GUI.
 
-# ProjectTreeView может быть временно отключен если есть проблемы с импортом
-try:
-    from .project_tree_view import IProjectTreeView, ProjectTreeView
-    __all__ = [
-        'MainWindowView',
-        'IMainWindowView',
-        'CodeEditorView',
-        'ICodeEditorView',
-        'ProjectTreeView',
-        'IProjectTreeView',
-        'DialogsView',
-        'IDialogsView'
-    ]
-except ImportError as e:
-    print(f"Warning: Could not import ProjectTreeView: {e}")
-    __all__ = [
-        'MainWindowView',
-        'IMainWindowView',
-        'CodeEditorView',
-        'ICodeEditorView',
-        'DialogsView',
-        'IDialogsView'
-    ]
+Классы загружаются при первом обращении (from gui.views import X), чтобы
+импорт одного представления не тянул за собой все остальные.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'MainWindowView': '.main_window_view',
+    'IMainWindowView': '.main_window_view',
+    'CodeEditorView': '.code_editor_view',
+    'ICodeEditorView': '.code_editor_view',
+    'ProjectTreeView': '.project_tree_view',
+    'IProjectTreeView': '.project_tree_view',
+    'DialogsView': '.dialogs_view',
+    'IDialogsView': '.dialogs_view',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Dict, List, Optional, Callable
 import logging
+from core.app_context import get_app_context
 from core.business.ast_service import ASTService
 from core.models.code_model import CodeNode
 from gui.utils.ui_factory import ui_factory, Tooltip
@@ -22,11 +23,11 @@ class ICodeStructureView:
 class CodeStructureView(ttk.Frame, ICodeStructureView):
     """Виджет для отображения структуры кода с эмодзи"""
     
-    def __init__(self, parent):
+    def __init__(self, parent, ast_service: Optional[ASTService] = None):
         super().__init__(parent)
         self.pack(fill=tk.BOTH, expand=True)
         
-        self.ast_service = ASTService()
+        self.ast_service = ast_service or get_app_context().get_ast_service()
         self._on_element_select_callback: Optional[Callable] = None
         self._item_map: Dict[str, Dict] = {}
         
@@ -15,6 +15,7 @@ logger = logging.getLogger('ai_code_assistant')
 class IDialogsView(ABC):
     def ask_save_changes(self, filename: str): pass
     def show_diff(self, diff_text: str, title: str): pass
+    def show_diff_result(self, diff_result, title: str): pass
     def show_info_dialog(self, title: str, message: str): pass
     def show_error_dialog(self, title: str, message: str): pass
     def show_warning_dialog(self, title: str, message: str) -> bool: pass
@@ -58,6 +59,20 @@ class DialogsView(IDialogsView):
         win.grab_set()
         win.wait_window()
 
+    def show_diff_result(self, diff_result, title: str = "Сравнение изменений"):
+        """
+        Открыть окно просмотра DiffResult: неизмененные области свернуты,
+        отрисовывается только видимая часть строк.
+        """
+        # Просмотрщик различий загружается при первом открытии, а не при запуске
+        from gui.views.diff_viewer_view import DiffViewerView
+        from core.business.diff_view_model import DiffViewModel
+
+        viewer = DiffViewerView(self.parent, DiffViewModel(diff_result), title=title)
+        viewer.window.transient(self.parent)
+        viewer.window.grab_set()
+        viewer.window.wait_window()
+
     def show_info_dialog(self, title: str, message: str):
         """Обычный инфо-диалог."""
         messagebox.showinfo(title, message)
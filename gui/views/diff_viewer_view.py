@@ -0,0 +1,162 @@
+# gui/views/diff_viewer_view.py
+
+import tkinter as tk
+from typing import Optional
+
+from gui.utils.ui_factory import ui_factory, UIFactory
+from core.business.diff_view_model import DiffViewModel
+
+import logging
+logger = logging.getLogger('ai_code_assistant')
+
+
+class DiffViewerView:
+    """
+    Окно просмотра diff с виртуальной прокруткой.
+
+    В текстовом поле находятся только видимые строки модели: полоса
+    прокрутки управляет номером первой строки окна, а при прокрутке текст
+    окна перестраивается. Щелчок по свернутой области раскрывает ее.
+    """
+
+    EXPAND_STEP = 20
+    COLUMN_WIDTH = 60
+
+    def __init__(self, parent, model: DiffViewModel, title: str = "Сравнение изменений"):
+        self.parent = parent
+        self.model = model
+        self.first_row = 0
+        self.visible_rows = 30
+        self._rendered = []
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("900x500")
+        self._create_widgets()
+        self.render()
+
+    def _create_widgets(self):
+        """Создает панель инструментов, текстовое поле и полосу прокрутки."""
+        toolbar = ui_factory.create_frame(self.window)
+        toolbar.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        self.side_by_side_var = tk.BooleanVar(value=self.model.side_by_side)
+        ui_factory.create_checkbutton(
+            toolbar, text="Две колонки", variable=self.side_by_side_var,
+            command=self.on_toggle_side_by_side, tooltip="Старая и новая версии рядом"
+        ).pack(side=tk.LEFT, padx=2)
+        ui_factory.create_button(
+            toolbar, text="▲", command=self.on_previous_hunk, tooltip="Предыдущее изменение"
+        ).pack(side=tk.LEFT, padx=2)
+        ui_factory.create_button(
+            toolbar, text="▼", command=self.on_next_hunk, tooltip="Следующее изменение"
+        ).pack(side=tk.LEFT, padx=2)
+        ui_factory.create_button(
+            toolbar, text="Свернуть все", command=self.on_collapse_all
+        ).pack(side=tk.LEFT, padx=2)
+
+        self.status_label = ui_factory.create_label(toolbar, text="")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+
+        body = ui_factory.create_frame(self.window)
+        body.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.scrollbar = ui_factory.create_scrollbar(body, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.text = tk.Text(body, wrap=tk.NONE, font=UIFactory.STYLES['text_editor']['font'],
+                            cursor="arrow")
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.tag_configure('delete', background='#ffecec')
+        self.text.tag_configure('insert', background='#eaffea')
+        self.text.tag_configure('change', background='#fff8dc')
+        self.text.tag_configure('gap', background='#eef2ff', foreground='#3050a0')
+
+        self.text.bind('<Configure>', self._on_resize)
+        self.text.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.text.bind('<Button-4>', lambda event: self.scroll_by(-3))
+        self.text.bind('<Button-5>', lambda event: self.scroll_by(3))
+        self.text.bind('<Button-1>', self._on_click)
+        self.window.bind('<Next>', lambda event: self.scroll_by(self.visible_rows))
+        self.window.bind('<Prior>', lambda event: self.scroll_by(-self.visible_rows))
+
+        ui_factory.create_button(self.window, text="Закрыть", command=self.window.destroy).pack(pady=5)
+
+    # --- Отрисовка ---
+
+    def render(self):
+        """Перестраивает текст видимого окна строк."""
+        self.first_row = max(0, min(self.first_row, self.model.row_count - self.visible_rows))
+        self._rendered = self.model.rows(self.first_row, self.visible_rows)
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        for number, row in enumerate(self._rendered):
+            line = self.model.format_row(row, self.COLUMN_WIDTH)
+            self.text.insert(tk.END, line + ("\n" if number < len(self._rendered) - 1 else ""),
+                             row.kind if row.kind != 'equal' else ())
+        self.text.config(state=tk.DISABLED)
+
+        total = max(self.model.row_count, 1)
+        self.scrollbar.set(self.first_row / total,
+                           min(1.0, (self.first_row + self.visible_rows) / total))
+        self.status_label.config(
+            text=f"Строк: {self.model.row_count}, скрыто: {self.model.hidden_count}"
+        )
+
+    def scroll_by(self, rows: int):
+        self.first_row += rows
+        self.render()
+
+    # --- Обработчики ---
+
+    def on_scroll(self, action: str, amount, unit: Optional[str] = None):
+        """Команда полосы прокрутки (moveto/scroll)."""
+        if action == tk.MOVETO:
+            self.first_row = int(float(amount) * self.model.row_count)
+        elif action == tk.SCROLL:
+            step = self.visible_rows if unit == tk.PAGES else 1
+            self.first_row += int(amount) * step
+        self.render()
+
+    def on_toggle_side_by_side(self):
+        self.model.set_side_by_side(self.side_by_side_var.get())
+        self.first_row = 0
+        self.render()
+
+    def on_collapse_all(self):
+        self.model.collapse_all()
+        self.render()
+
+    def on_next_hunk(self):
+        following = [row for row in self.model.hunk_rows() if row > self.first_row]
+        if following:
+            self.first_row = following[0]
+            self.render()
+
+    def on_previous_hunk(self):
+        preceding = [row for row in self.model.hunk_rows() if row < self.first_row]
+        if preceding:
+            self.first_row = preceding[-1]
+            self.render()
+
+    def _on_click(self, event):
+        index = self.text.index(f"@{event.x},{event.y}")
+        offset = int(index.split('.')[0]) - 1
+        if 0 <= offset < len(self._rendered) and self._rendered[offset].kind == 'gap':
+            # Небольшие области раскрываются целиком, большие - порциями
+            lines = None if self._rendered[offset].hidden <= self.EXPAND_STEP * 2 else self.EXPAND_STEP
+            self.model.expand(self.first_row + offset, lines)
+            self.render()
+        return "break"
+
+    def _on_mouse_wheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_resize(self, event):
+        line_height = max(self.text.tk.call('font', 'metrics', self.text.cget('font'), '-linespace'), 1)
+        rows = max(1, event.height // int(line_height))
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
@@ -20,6 +20,8 @@ class IMainWindowView(ABC):
     def bind_save_project(self, callback): pass
     def bind_show_pending_changes(self, callback): pass
     def bind_close_project(self, callback): pass
+    def bind_undo_changes(self, callback): pass
+    def bind_redo_changes(self, callback): pass
     def bind_analyze_code(self, callback): pass
     def bind_show_analysis_report(self, callback): pass
     def bind_auto_refactor(self, callback): pass
@@ -99,6 +101,16 @@ class MainWindowView(ttk.Frame, IMainWindowView):
         )
         self.show_pending_changes_button.pack(side=tk.LEFT, padx=2)
         
+        self.undo_changes_button = ui_factory.create_button(
+            project_frame, '↶', square=True, tooltip='Отменить примененные изменения'
+        )
+        self.undo_changes_button.pack(side=tk.LEFT, padx=2)
+        
+        self.redo_changes_button = ui_factory.create_button(
+            project_frame, '↷', square=True, tooltip='Повторить отмененные изменения'
+        )
+        self.redo_changes_button.pack(side=tk.LEFT, padx=2)
+        
         self.close_project_button = ui_factory.create_button(
             project_frame, '❌', square=True, tooltip='Закрыть проект'
         )
@@ -257,6 +269,14 @@ class MainWindowView(ttk.Frame, IMainWindowView):
         """Привязать обработчик к кнопке 'Закрыть проект'."""
         self.close_project_button.config(command=callback)
 
+    def bind_undo_changes(self, callback):
+        """Привязать обработчик к кнопке 'Отменить изменения'."""
+        self.undo_changes_button.config(command=callback)
+
+    def bind_redo_changes(self, callback):
+        """Привязать обработчик к кнопке 'Повторить изменения'."""
+        self.redo_changes_button.config(command=callback)
+
     def bind_analyze_code(self, callback):
         """Привязать обработчик к кнопке 'Анализ'."""
         self.analyze_code_button.config(command=callback)
@@ -8,6 +8,7 @@ from tkinter import ttk
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from gui.utils.ui_factory import ui_factory, Tooltip
+from core.app_context import get_app_context
 from core.business.ast_service import ASTService
 from core.models.code_model import CodeNode
 
@@ -36,7 +37,7 @@ class IProjectTreeView:
 class ProjectTreeView(ttk.Frame, IProjectTreeView):
     """Реализация дерева проекта с использованием фабрики UI."""
     
-    def __init__(self, parent):
+    def __init__(self, parent, ast_service: Optional[ASTService] = None):
         super().__init__(parent)
         if parent:
             self.pack(fill=tk.BOTH, expand=True)
@@ -51,7 +52,7 @@ class ProjectTreeView(ttk.Frame, IProjectTreeView):
         self._item_map: Dict[str, Dict] = {}
         self._on_tree_select_callback: Optional[Callable] = None
         self.all_tree_items: List[str] = []
-        self.ast_service = ASTService()
+        self.ast_service = ast_service or get_app_context().get_ast_service()
         self.project_tree: Dict[str, CodeNode] = {}
         
         # Создаем виджеты только если родитель указан
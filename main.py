@@ -2,20 +2,20 @@
 """
 Главный модуль AI Code Assistant.
 Использует обновленную архитектуру с AppContext.
+
+Модули интерфейса и сервисов импортируются внутри AIApp, а не при
+загрузке main.py: так режим --profile-startup успевает подключить
+измерение импортов, а окно не ждет модулей, нужных лишь позже.
 """
 
-import tkinter as tk
-import logging
-from tkinter import ttk
+import time
 
-from core.app_context import init_app_context, get_app_context
-from gui.views.main_window_view import MainWindowView
-from gui.views.code_editor_view import CodeEditorView
-from gui.views.project_tree_view import ProjectTreeView
-from gui.views.dialogs_view import DialogsView
-from gui.views.analysis_view import AnalysisView
-from gui.controller.main_controller import MainController
-from gui.utils.ui_factory import ui_factory
+STARTED = time.perf_counter()
+
+import os
+import sys
+import argparse
+import logging
 
 # Настройка логирования
 logging.basicConfig(
@@ -24,50 +24,76 @@ logging.basicConfig(
 )
 logger = logging.getLogger('ai_code_assistant')
 
+DEFAULT_PROFILE_REPORT = os.path.join(os.path.expanduser("~"), ".ai_code_assistant", "startup_profile.txt")
+
 
 class AIApp:
     """Главное приложение AI Code Assistant с обновленной архитектурой."""
-    
-    def __init__(self):
+
+    def __init__(self, profiler=None, profile_report: str = DEFAULT_PROFILE_REPORT):
+        import tkinter as tk
+        from core.app_context import init_app_context, get_app_context
+
+        self.profiler = profiler
+        self.profile_report = profile_report
+        self._mark("Импорт tkinter и AppContext")
+
         self.root = tk.Tk()
         self.root.title("AI Code Assistant")
         self.root.geometry("1200x800")
-        
+        self._mark("Окно Tk создано")
+
         # Инициализация контекста приложения
         if not init_app_context():
             logger.error("Не удалось инициализировать AppContext")
             raise RuntimeError("Ошибка инициализации приложения")
-        
+
         # Получение сервисов из контекста
         self.context = get_app_context()
         self._setup_ui()
+        self._mark("Представления созданы")
         self._setup_controllers()
-        
+        self._mark("Контроллеры настроены")
+
+        if self.profiler:
+            self.root.bind('<Map>', self._on_first_map, add='+')
+
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
         logger.info("AI Code Assistant инициализирован с новой архитектурой")
-    
+
     def _setup_ui(self):
         """Настраивает пользовательский интерфейс."""
+        from gui.views.main_window_view import MainWindowView
+        from gui.views.code_editor_view import CodeEditorView
+        from gui.views.project_tree_view import ProjectTreeView
+        from gui.views.dialogs_view import DialogsView
+        from gui.views.analysis_view import AnalysisView
+        from gui.utils.ui_factory import ui_factory
+
         # Настраиваем стили
         ui_factory.setup_default_styles()
-        
+
         # Создаем главное представление
         self.main_window_view = MainWindowView(self.root)
-        
+
         # Создаем дочерние представления
         self.code_editor_view = CodeEditorView(None)  # Будет размещено в контроллере
         self.project_tree_view = ProjectTreeView(None)  # Будет размещено в контроллере
         self.dialogs_view = DialogsView(self.root)
         self.analysis_view = AnalysisView(None)  # Будет размещено в контроллере
-        
+
         logger.debug("Представления созданы")
-    
+
     def _setup_controllers(self):
         """Настраивает контроллеры с сервисами из контекста."""
+        from gui.controller.main_controller import MainController
+
         # Получаем сервисы из контекста
         project_service = self.context.get_project_service()
         code_service = self.context.get_code_service()
         analysis_service = self.context.get_analysis_service()
-        
+
         # Создаем главный контроллер
         self.main_controller = MainController(
             main_window_view=self.main_window_view,
@@ -79,36 +105,78 @@ class AIApp:
             code_service=code_service,
             analysis_service=analysis_service
         )
-        
+
         logger.info("Контроллеры настроены с сервисами из AppContext")
-    
+
+    def _on_close(self):
+        """Закрытие окна: фоновые потоки не должны задерживать выход из интерпретатора."""
+        self.main_controller.shutdown()
+        self.root.destroy()
+
+    def _mark(self, label: str):
+        """Отмечает этап запуска в режиме профилирования."""
+        if self.profiler:
+            self.profiler.mark(label)
+
+    def _on_first_map(self, event):
+        """Окно показано: дожидаемся отрисовки и записываем профиль."""
+        if event.widget is not self.root:
+            return
+        self.root.unbind('<Map>')
+        self.root.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.profiler.mark("Первая отрисовка окна")
+        self.profiler.uninstall()
+        self.profiler.write_report(self.profile_report)
+
     def run(self):
         """Запускает главный цикл приложения."""
         logger.info("Запуск AI Code Assistant...")
-        
+
         # Центрируем окно
         self.root.eval('tk::PlaceWindow . center')
-        
+
         # Запускаем главный цикл
         self.root.mainloop()
-        
+        self.main_controller.shutdown()
+
         logger.info("AI Code Assistant завершен")
-    
+
     def show_context_info(self):
         """Показывает информацию о контексте приложения (для отладки)."""
-        services = self.context.get_all_services()
+        # Только созданные сервисы: остальные создаются по первому запросу
+        services = self.context.get_created_services()
         info = "=== Контекст приложения ===\n"
         for name, service in services.items():
             info += f"{name}: {type(service).__name__}\n"
-        
+
         logger.info(info)
         return info
 
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description="AI Code Assistant")
+    parser.add_argument(
+        '--profile-startup', nargs='?', const=DEFAULT_PROFILE_REPORT, default=None, metavar='REPORT',
+        help=f"Записать время импорта модулей и первой отрисовки окна (по умолчанию {DEFAULT_PROFILE_REPORT})"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Точка входа в приложение."""
+    args = parse_args(argv)
+
+    profiler = None
+    if args.profile_startup:
+        from gui.utils.startup_profiler import StartupProfiler
+        profiler = StartupProfiler(started=STARTED)
+        profiler.install()
+
     try:
-        app = AIApp()
+        app = AIApp(profiler=profiler, profile_report=args.profile_startup or DEFAULT_PROFILE_REPORT)
         app.show_context_info()  # Для отладки
         app.run()
     except Exception as e:
@@ -117,4 +185,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
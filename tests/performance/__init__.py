@@ -0,0 +1,3 @@
+# tests/performance/__init__.py
+
+"""Тесты производительности (запускаются с --runslow)."""
@@ -0,0 +1,84 @@
+# tests/performance/test_line_diff_benchmark.py
+
+"""
+Сравнение производительности LineDiff и difflib на больших файлах.
+
+Запуск: pytest tests/performance --runslow -s
+"""
+
+import difflib
+import random
+import time
+
+import pytest
+
+from core.business.line_diff import LineDiff
+
+
+def _make_versions(size: int, seed: int = 42):
+    """
+    Исходный файл и версия с переписанными блоками (похожие строки -
+    худший случай для внутристрочного сопоставления Differ), а также
+    разбросанными заменами, вставками и удалениями.
+    """
+    rng = random.Random(seed)
+    old = [f"    value_{i} = compute({i}, {i % 7})\n" for i in range(size)]
+    new = list(old)
+    for _ in range(size // 1000):
+        start = rng.randrange(len(new) - 60)
+        new[start:start + 60] = [f"    value_{start + k} = compute({start + k} + 1, {k})\n"
+                                 for k in range(60)]
+    for _ in range(size // 100):
+        position = rng.randrange(len(new))
+        action = rng.random()
+        if action < 0.4:
+            new[position] = f"    value_{position} = changed({position})\n"
+        elif action < 0.7:
+            new.insert(position, f"    inserted_{position} = None\n")
+        else:
+            del new[position]
+    return old, new
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def _assert_valid(diff, old, new):
+    assert [line for tag, line in diff if tag != 'insert'] == old
+    assert [line for tag, line in diff if tag != 'delete'] == new
+
+
+@pytest.mark.slow
+@pytest.mark.performance
+class TestLineDiffBenchmark:
+    """Бенчмарки построчного diff."""
+
+    def test_10k_lines_against_differ(self):
+        """10k строк: LineDiff против difflib.Differ (прежняя реализация)."""
+        old, new = _make_versions(10_000)
+
+        diff, line_diff_time = _timed(LineDiff.diff, old, new)
+        _, differ_time = _timed(lambda: list(difflib.Differ().compare(old, new)))
+
+        _assert_valid(diff, old, new)
+        print(f"\n10k: LineDiff {line_diff_time:.3f} с, difflib.Differ {differ_time:.3f} с")
+        assert line_diff_time < differ_time
+
+    def test_100k_lines_against_sequence_matcher(self):
+        """
+        100k строк: LineDiff против difflib.SequenceMatcher (без внутристрочного
+        сопоставления Differ, которое на таком объеме неприменимо).
+        """
+        old, new = _make_versions(100_000)
+
+        diff, line_diff_time = _timed(LineDiff.diff, old, new)
+        _, matcher_time = _timed(
+            lambda: difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+        )
+
+        _assert_valid(diff, old, new)
+        print(f"\n100k: LineDiff {line_diff_time:.3f} с, SequenceMatcher {matcher_time:.3f} с")
+        assert line_diff_time < 5.0
@@ -0,0 +1,125 @@
+# tests/unit/test_ai_schema_stream_parser.py
+
+"""
+Тесты потокового парсера AI-схем (AISchemaStreamParser).
+"""
+
+import time
+
+from core.business.ai_schema_service import AISchemaService
+from core.data.ai_schema_parser import AISchemaParser
+from core.parsers.ai_schema_stream_parser import AISchemaStreamParser
+
+
+SECTIONS_SCHEMA = '''name: demo
+modules:
+  - utils/
+  - data/
+files:
+  utils/helpers.py: "# helpers\\nVALUE = 1"
+  main.py: |
+    def main():
+        return 1
+
+  data/:
+    - model.py
+    io/:
+      reader.py: 'pass'
+  README.md:
+  ```
+  # Demo
+  ```
+'''
+
+
+class TestAISchemaStreamParser:
+    """Тесты разбора форматов схем."""
+
+    def test_sections_and_multiline_content(self):
+        result = AISchemaStreamParser.parse(SECTIONS_SCHEMA)
+
+        assert result['name'] == "demo"
+        assert result['modules'] == ["utils", "data", "data/io"]
+        assert result['files'] == {
+            "utils/helpers.py": "# helpers\nVALUE = 1",
+            "main.py": "def main():\n    return 1\n",
+            "data/model.py": "",
+            "data/io/reader.py": "pass",
+            "README.md": "# Demo\n",
+        }
+
+    def test_tree_drawing(self):
+        """Дерево из подсказки редактора, в том числе закомментированное."""
+        schema = ("# modules/\n"
+                  "# ├── module1/\n"
+                  "# │   ├── __init__.py\n"
+                  "# │   └── file1.py\n"
+                  "# └── main.py\n")
+        result = AISchemaStreamParser.parse(schema, lambda name: f"# {name}\n")
+
+        assert result['modules'] == ["modules", "modules/module1"]
+        assert result['files'] == {
+            "modules/module1/__init__.py": "# __init__.py\n",
+            "modules/module1/file1.py": "# file1.py\n",
+            "modules/main.py": "# main.py\n",
+        }
+
+    def test_ascii_tree_and_plain_paths(self):
+        schema = "project/\n|-- src/\n|   `-- app.py\n`-- setup.py\n\nHere is the plan:\ndocs/index.md\n"
+        result = AISchemaStreamParser.parse(schema)
+
+        assert result['modules'] == ["project", "project/src"]
+        assert set(result['files']) == {"project/src/app.py", "project/setup.py", "docs/index.md"}
+
+    def test_plain_list_directories_without_slash(self):
+        result = AISchemaStreamParser.parse("src/utils\nsrc\\models\nsrc/main.py\nREADME\n")
+
+        assert result['modules'] == ["src/utils", "src/models"]
+        assert set(result['files']) == {"src/main.py"}
+
+    def test_plain_path_with_fenced_content(self):
+        schema = "app.py\n```python\nprint('hi')\n```\nlib/\n"
+        result = AISchemaStreamParser.parse(schema)
+
+        assert result['files'] == {"app.py": "print('hi')\n"}
+        assert result['modules'] == ["lib"]
+
+    def test_incremental_feed_matches_whole_parse(self):
+        """Результат не зависит от разбиения текста на порции."""
+        parser = AISchemaStreamParser()
+        for position in range(0, len(SECTIONS_SCHEMA), 3):
+            parser.feed(SECTIONS_SCHEMA[position:position + 3])
+            # Уже разобранная часть доступна во время ввода
+            assert isinstance(parser.result['files'], dict)
+
+        assert parser.close() == AISchemaStreamParser.parse(SECTIONS_SCHEMA)
+
+    def test_linear_time_on_large_schema(self):
+        body = "".join(f"  pkg{i % 50}/mod{i}.py: |\n    def f{i}():\n        return {i}\n\n"
+                       for i in range(20000))
+        schema = "files:\n" + body
+
+        started = time.perf_counter()
+        result = AISchemaStreamParser.parse(schema)
+        small = time.perf_counter() - started
+        started = time.perf_counter()
+        AISchemaStreamParser.parse("files:\n" + body * 4)
+        large = time.perf_counter() - started
+
+        assert len(result['files']) == 20000
+        assert large < small * 10
+
+
+class TestSchemaServicesDelegation:
+    """AISchemaService и AISchemaParser используют потоковый парсер."""
+
+    def test_service_default_content_and_alias(self):
+        result = AISchemaService().parse("main.py\nutils/\n")
+
+        assert result['modules'] == ["utils"]
+        assert "def main()" in result['files']["main.py"]
+
+    def test_legacy_parser_format(self):
+        result = AISchemaParser().parse('modules:\n  - utils/\nfiles:\n  utils/a.py: "# a"\n')
+
+        assert result == {'modules': ["utils"], 'files': {"utils/a.py": "# a"}}
@@ -0,0 +1,61 @@
+# tests/unit/test_app_context.py
+
+"""
+Тесты контекста приложения (AppContext): ленивое создание сервисов.
+"""
+
+import pytest
+
+from core.app_context import AppContext
+from core.business.workspace_service import WorkspaceService
+
+
+@pytest.fixture
+def context():
+    context = AppContext()
+    assert context.initialize()
+    yield context
+    context.clear()
+
+
+class TestAppContext:
+    """Тесты ленивого создания и общих экземпляров."""
+
+    def test_services_created_on_first_request(self, context):
+        assert context.get_created_services() == {}
+
+        code_manager = context.get_code_manager()
+
+        assert context.get_code_manager() is code_manager
+        assert set(context.get_created_services()) == {'file_cache', 'parse_cache', 'ast_service', 'code_manager'}
+
+    def test_single_ast_service(self, context):
+        ast_service = context.get_ast_service()
+
+        assert ast_service.parse_cache is context.get_service('parse_cache')
+        assert ast_service.file_cache is context.get_service('file_cache')
+        assert context.get_project_service().project_structure_service is context.get_service('project_structure_service')
+        assert context.get_code_service().ast_service is ast_service
+        assert context.get_code_service().code_manager is context.get_code_manager()
+        assert context.get_code_manager().ast_service is ast_service
+        assert context.get_service('project_structure_service').ast_service is ast_service
+        assert context.get_project_repository().file_cache is context.get_service('file_cache')
+
+    def test_workspace_projects_share_ast_service(self, context, tmp_path):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        workspace = context.get_workspace()
+
+        first = workspace.open_project(str(tmp_path / "a"))
+        second = workspace.open_project(str(tmp_path / "b"))
+
+        assert first.project_structure_service.ast_service is context.get_ast_service()
+        assert second.project_structure_service.ast_service is context.get_ast_service()
+
+    def test_unknown_service_and_override(self, context):
+        workspace = WorkspaceService()
+        context.set_service('workspace', workspace)
+
+        assert context.get_service('missing') is None
+        assert context.get_workspace() is workspace
+        assert 'schema_parser' in context.get_all_services()
@@ -0,0 +1,131 @@
+# tests/unit/test_background_worker.py
+
+"""
+Тесты фоновой задачи с отложенным запуском (DebouncedBackgroundTask).
+"""
+
+import threading
+import time
+
+import pytest
+
+from gui.utils.background_worker import DebouncedBackgroundTask
+
+
+class FakeWidget:
+    """Имитация widget.after()/after_cancel() с ручным управлением временем."""
+
+    def __init__(self):
+        self.now = 0
+        self._jobs = {}
+        self._next_id = 0
+
+    def after(self, ms, func, *args):
+        self._next_id += 1
+        self._jobs[self._next_id] = (self.now + ms, func, args)
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self._jobs.pop(after_id, None)
+
+    def advance(self, ms):
+        """Сдвигает время и выполняет наступившие задания."""
+        self.now += ms
+        while True:
+            due = [(when, job_id) for job_id, (when, _, _) in self._jobs.items() if when <= self.now]
+            if not due:
+                break
+            _, job_id = min(due)
+            _, func, args = self._jobs.pop(job_id)
+            func(*args)
+
+    def run_until(self, predicate, timeout=5.0):
+        """Прокручивает опрос очереди, пока не выполнится условие."""
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                raise AssertionError("Условие не выполнено за отведенное время")
+            self.advance(50)
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def widget():
+    return FakeWidget()
+
+
+class TestDebouncedBackgroundTask:
+    """Тесты debounce и отмены устаревших результатов."""
+
+    def test_only_last_submission_runs(self, widget):
+        """Быстрые повторные вызовы приводят к одному запуску с последними данными."""
+        task = DebouncedBackgroundTask(widget, delay_ms=300)
+        calls, results = [], []
+
+        def work(cancel_event, value):
+            calls.append(value)
+            return value * 2
+
+        for value in range(5):
+            task.submit(work, value, on_result=results.append)
+            widget.advance(100)
+
+        widget.advance(300)
+        widget.run_until(lambda: results)
+        task.shutdown()
+
+        assert calls == [4]
+        assert results == [8]
+
+    def test_stale_running_result_is_dropped(self, widget):
+        """Результат задачи, устаревшей во время выполнения, не попадает в GUI."""
+        task = DebouncedBackgroundTask(widget, delay_ms=300)
+        started, release = threading.Event(), threading.Event()
+        seen_cancel, results = [], []
+
+        def slow(cancel_event, value):
+            started.set()
+            release.wait(5)
+            seen_cancel.append(cancel_event.is_set())
+            return value
+
+        task.submit(slow, 'old', on_result=results.append)
+        widget.advance(300)
+        assert started.wait(5)
+
+        task.submit(lambda cancel_event, value: value, 'new', on_result=results.append)
+        release.set()
+        widget.advance(300)
+        widget.run_until(lambda: results)
+        task.shutdown()
+
+        assert results == ['new']
+        assert seen_cancel == [True]
+
+    def test_errors_are_reported(self, widget):
+        """Исключение в задаче передается в on_error."""
+        task = DebouncedBackgroundTask(widget, delay_ms=10)
+        errors = []
+
+        def failing(cancel_event):
+            raise ValueError("boom")
+
+        task.submit(failing, on_error=errors.append)
+        widget.advance(10)
+        widget.run_until(lambda: errors)
+        task.shutdown()
+
+        assert isinstance(errors[0], ValueError)
+
+    def test_cancel(self, widget):
+        """Отмененная до запуска задача не выполняется."""
+        task = DebouncedBackgroundTask(widget, delay_ms=300)
+        calls = []
+
+        task.submit(lambda cancel_event: calls.append(1))
+        task.cancel()
+        widget.advance(1000)
+        task.shutdown()
+
+        assert calls == []
+        assert not task.is_busy
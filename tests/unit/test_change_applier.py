@@ -0,0 +1,211 @@
+# tests/unit/test_change_applier.py
+
+"""
+Тесты группового применения изменений (ChangeApplier, ChangeManager).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+from unittest.mock import patch
+
+from core.business.ast_service import ASTService
+from core.business.change_applier import ChangeApplier
+from core.business.change_service import ChangeManager, CodeChange, PendingChange
+from core.business.code_manager import CodeManager
+from core.data.file_provider import FileProvider
+from core.data.project_repository import ProjectRepository
+from core.data.rollback_journal import RollbackJournal
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "a.py").write_text(
+        "def first():\n    return 1\n\n\ndef second():\n    return 2\n", encoding="utf-8"
+    )
+    (tmp_path / "b.py").write_text(
+        "class Worker:\n    def run(self):\n        return 'old'\n", encoding="utf-8"
+    )
+    return tmp_path
+
+
+class TestChangeApplier:
+    """Тесты применения изменений к файлам."""
+
+    def test_one_atomic_write_per_file(self, project):
+        """Несколько изменений одного файла дают одну запись."""
+        applier = ChangeApplier(ProjectRepository())
+        changes = [
+            CodeChange('replace', 'first', "def first():\n    return 10", file_path=str(project / "a.py")),
+            CodeChange('delete', 'second', "", file_path=str(project / "a.py")),
+            CodeChange('add', 'third', "def third():\n    return 3", file_path=str(project / "a.py")),
+            CodeChange('add', 'helper', "def helper():\n    pass", file_path=str(project / "new.py")),
+        ]
+
+        with patch.object(FileProvider, 'write_file_atomic', wraps=FileProvider.write_file_atomic) as write:
+            report = applier.apply(changes)
+
+        assert report.success
+        assert write.call_count == 2
+        assert sorted(report.touched_files) == [str(project / "a.py"), str(project / "new.py")]
+        assert (project / "a.py").read_text(encoding="utf-8") == \
+            "def first():\n    return 10\n\ndef third():\n    return 3\n"
+        assert (project / "new.py").read_text(encoding="utf-8") == "def helper():\n    pass\n"
+
+    def test_per_change_report(self, project):
+        """Конфликты и ненайденные сущности отражаются в отчете, остальное применяется."""
+        path = str(project / "a.py")
+        changes = [
+            CodeChange('conflict', 'first', "def first(x):\n    pass", file_path=path),
+            CodeChange('replace', 'missing', "def missing():\n    pass", file_path=path),
+            CodeChange('replace', 'second', "def second():\n    return 20", file_path=path),
+        ]
+
+        report = ChangeApplier(ProjectRepository()).apply(changes)
+
+        assert [result.success for result in report.results] == [False, False, True]
+        assert "return 20" in (project / "a.py").read_text(encoding="utf-8")
+
+    def test_member_changes_from_analysis(self, project):
+        """Изменения уровня методов из анализа применяются по диапазонам."""
+        tree = ASTService().parse_project(str(project))
+        ai_code = (
+            "class Worker:\n"
+            "    def run(self):\n        return 'new'\n\n"
+            "    def stop(self):\n        return 'stop'\n"
+        )
+        changes = CodeManager().analyze_ai_code(ai_code, tree)
+
+        report = ChangeApplier(ProjectRepository()).apply(changes)
+
+        assert report.success
+        content = (project / "b.py").read_text(encoding="utf-8")
+        assert "return 'new'" in content and "def stop(self)" in content
+        compile(content, "b.py", "exec")
+
+
+class TestAtomicWrite:
+    """Тесты атомарной записи файла."""
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        """При ошибке записи исходный файл не изменяется и временный файл удаляется."""
+        path = tmp_path / "module.py"
+        path.write_text("original", encoding="utf-8")
+
+        with patch('core.data.file_provider.os.replace', side_effect=OSError("disk full")):
+            assert not FileProvider.write_file_atomic(str(path), "new content")
+
+        assert path.read_text(encoding="utf-8") == "original"
+        assert [p.name for p in tmp_path.iterdir()] == ["module.py"]
+
+
+class TestTransactionalApply:
+    """Тесты ChangeManager.apply_all_changes с журналом отката."""
+
+    def _manager(self, project, journal):
+        manager = ChangeManager(ProjectRepository(), journal_dir=str(journal))
+        manager.add_change(PendingChange('replace', 'first', "def first():\n    return 10",
+                                         file_path=str(project / "a.py")))
+        manager.add_change(PendingChange('add', 'helper', "def helper():\n    pass",
+                                         file_path=str(project / "b.py")))
+        return manager
+
+    def test_applies_and_reports_timings(self, project, tmp_path):
+        """Изменения записываются; по каждому изменению есть результат со временем."""
+        manager = self._manager(project, tmp_path / "journal")
+
+        success, messages = manager.apply_all_changes()
+
+        assert success
+        assert manager.get_pending_changes() == []
+        assert "return 10" in (project / "a.py").read_text(encoding="utf-8")
+        assert "def helper()" in (project / "b.py").read_text(encoding="utf-8")
+        assert len(messages) == 3 and all("мс]" in message for message in messages[1:])
+        assert not list((tmp_path / "journal").iterdir())
+
+    def test_failed_change_writes_nothing(self, project, tmp_path):
+        """Если одно изменение не применяется, ни один файл не записывается."""
+        manager = self._manager(project, tmp_path / "journal")
+        manager.add_change(PendingChange('delete', 'missing', file_path=str(project / "b.py")))
+        original = (project / "a.py").read_text(encoding="utf-8")
+
+        success, _ = manager.apply_all_changes()
+
+        assert not success
+        assert len(manager.get_pending_changes()) == 3
+        assert (project / "a.py").read_text(encoding="utf-8") == original
+
+    def test_write_failure_rolls_back(self, project, tmp_path):
+        """При сбое записи одного файла остальные восстанавливаются из журнала."""
+        manager = self._manager(project, tmp_path / "journal")
+        manager.max_workers = 1
+        original = {name: (project / name).read_bytes() for name in ("a.py", "b.py")}
+        real_write = FileProvider.write_file_atomic
+
+        def failing_write(file_path, content):
+            return False if file_path.endswith("b.py") else real_write(file_path, content)
+
+        with patch.object(ProjectRepository, 'write_file_atomic', side_effect=failing_write):
+            success, _ = manager.apply_all_changes()
+
+        assert not success
+        assert {name: (project / name).read_bytes() for name in original} == original
+        assert all(not result.success for result in manager.last_report.results)
+
+    def _interrupted_journal(self, project, journal_dir):
+        """Журнал транзакции, прерванной вместе с завершившимся процессом."""
+        journal = RollbackJournal(str(journal_dir))
+        journal.record(str(project / "a.py"))
+        journal.record(str(project / "created.py"))
+        (project / "a.py").write_text("broken", encoding="utf-8")
+        (project / "created.py").write_text("x = 1\n", encoding="utf-8")
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        finished.wait()
+        dead_path = os.path.join(str(journal_dir), f"{finished.pid}-{uuid.uuid4().hex[:12]}")
+        os.rename(journal.path, dead_path)
+        return journal
+
+    def test_recover_interrupted_transaction(self, project, tmp_path):
+        """Журнал завершившегося процесса откатывается при открытии проекта."""
+        original = (project / "a.py").read_text(encoding="utf-8")
+        journal_dir = tmp_path / "journal"
+        self._interrupted_journal(project, journal_dir)
+
+        # Журнал чужого проекта не откатывается
+        assert RollbackJournal.recover([str(tmp_path / "other")], str(journal_dir)) == 0
+        assert (project / "a.py").read_text(encoding="utf-8") == "broken"
+
+        assert RollbackJournal.recover([str(project)], str(journal_dir)) == 1
+        assert (project / "a.py").read_text(encoding="utf-8") == original
+        assert not (project / "created.py").exists()
+        if os.name == 'posix':
+            assert journal_dir.stat().st_mode & 0o777 == 0o700
+
+    def test_recover_skips_live_and_foreign_journals(self, project, tmp_path):
+        """Журнал работающего процесса и журнал с путями вне проекта не трогаются."""
+        journal_dir = tmp_path / "journal"
+        live = RollbackJournal(str(journal_dir))
+        live.record(str(project / "a.py"))
+        (project / "a.py").write_text("in progress", encoding="utf-8")
+
+        outside = tmp_path.parent / f"{tmp_path.name}_outside.py"
+        outside.write_text("keep\n", encoding="utf-8")
+        manifests = {"1-abcdef": {str(outside): None},
+                     "2-abcdef": {str(project / "b.py"): "../../planted.bak"}}
+        for name, entries in manifests.items():
+            (journal_dir / name).mkdir()
+            (journal_dir / name / "manifest.json").write_text(json.dumps(entries), encoding="utf-8")
+        original_b = (project / "b.py").read_text(encoding="utf-8")
+
+        try:
+            with patch.object(RollbackJournal, '_pid_alive', side_effect=lambda pid: pid == os.getpid()):
+                assert RollbackJournal.recover([str(project)], str(journal_dir)) == 0
+            assert outside.read_text(encoding="utf-8") == "keep\n"
+        finally:
+            outside.unlink()
+        assert (project / "a.py").read_text(encoding="utf-8") == "in progress"
+        assert (project / "b.py").read_text(encoding="utf-8") == original_b
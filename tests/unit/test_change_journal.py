@@ -0,0 +1,98 @@
+# tests/unit/test_change_journal.py
+
+"""
+Тесты журнала отложенных изменений (запись, сжатие, восстановление).
+"""
+
+import os
+import time
+
+from core.business.change_service import ChangeManager, PendingChange
+from core.data.change_journal import ChangeJournal
+
+
+def _change(index, action='replace', base=None):
+    change = PendingChange(action, f"func_{index}", new_code=f"def func_{index}(): return {index}",
+                           file_path=f"/project/m{index % 20}.py", node_type='function')
+    change.base_content = base
+    return change
+
+
+def _restore(directory, **kwargs):
+    manager = ChangeManager()
+    restored = manager.attach_journal(ChangeJournal(str(directory), **kwargs))
+    return manager, restored
+
+
+class TestChangeJournal:
+    """Тесты восстановления очереди после перезапуска."""
+
+    def test_queue_restored_after_restart(self, tmp_path):
+        """Очередь, включая слияния и удаления, восстанавливается без закрытия журнала."""
+        manager, _ = _restore(tmp_path, sync_interval=0)
+        manager.add_change(_change(1, base="base text\n"))
+        manager.add_change(_change(2, action='add'))
+        manager.add_change(_change(2, action='replace'))
+        manager.add_change(_change(3))
+        manager.remove_change(manager.get_change("/project/m3.py", "func_3"))
+        # Аварийное завершение: журнал не закрывается
+
+        restored_manager, restored = _restore(tmp_path)
+
+        assert restored == 2
+        changes = restored_manager.get_pending_changes()
+        assert [(change.entity_name, change.action) for change in changes] == \
+            [("func_1", "replace"), ("func_2", "add")]
+        assert changes[0].base_content == "base text\n"
+        assert changes[0].change_id == manager.get_pending_changes()[0].change_id
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        """Оборванная последняя запись отбрасывается, остальные восстанавливаются."""
+        manager, _ = _restore(tmp_path, sync_interval=0)
+        manager.add_change(_change(1))
+        manager.add_change(_change(2))
+        manager.detach_journal()
+
+        wal = next(name for name in os.listdir(tmp_path) if name.startswith("wal."))
+        with open(tmp_path / wal, 'r+b') as f:
+            f.truncate(os.path.getsize(tmp_path / wal) - 5)
+
+        restored_manager, restored = _restore(tmp_path)
+        assert restored == 1
+        restored_manager.add_change(_change(3))
+        restored_manager.detach_journal()
+        assert _restore(tmp_path)[1] == 2
+
+    def test_compaction(self, tmp_path):
+        """При большом числе устаревших записей журнал сжимается в снимок."""
+        manager, _ = _restore(tmp_path, compact_threshold=100)
+        for version in range(300):
+            manager.add_change(_change(version % 10, base=f"base {version % 3}"))
+        manager.detach_journal()
+
+        assert os.path.exists(tmp_path / ChangeJournal.SNAPSHOT)
+        restored_manager, restored = _restore(tmp_path)
+        assert restored == 10
+        assert restored_manager.journal.records < 100
+        assert restored_manager.get_change("/project/m9.py", "func_9").base_content == "base 0"
+
+    def test_clear_is_journaled(self, tmp_path):
+        manager, _ = _restore(tmp_path)
+        manager.add_change(_change(1))
+        manager.clear_changes()
+        manager.detach_journal()
+
+        assert _restore(tmp_path)[1] == 0
+
+    def test_fast_replay(self, tmp_path):
+        """Восстановление 10 тысяч изменений занимает меньше секунды."""
+        manager, _ = _restore(tmp_path)
+        for index in range(10000):
+            manager.add_change(_change(index, base=f"base {index % 20}"))
+        manager.detach_journal()
+
+        started = time.perf_counter()
+        _, restored = _restore(tmp_path)
+
+        assert restored == 10000
+        assert time.perf_counter() - started < 1.0
@@ -0,0 +1,115 @@
+# tests/unit/test_change_manager.py
+
+"""
+Тесты индексированной очереди отложенных изменений.
+"""
+
+import time
+
+from core.business.change_service import ChangeManager, PendingChange
+from core.data.project_repository import ProjectRepository
+
+
+def _change(action, entity, path="/project/a.py", code="", node_type="function"):
+    return PendingChange(action, entity, new_code=code, file_path=path, node_type=node_type)
+
+
+class TestChangeQueue:
+    """Тесты слияния изменений одной цели."""
+
+    def test_repeated_replace_keeps_last(self):
+        manager = ChangeManager()
+        for version in range(3):
+            manager.add_change(_change('replace', 'foo', code=f"v{version}"))
+
+        assert manager.count == 1
+        assert manager.get_change("/project/a.py", "foo").new_code == "v2"
+
+    def test_coalescing_rules(self):
+        """add+replace -> add, add+delete -> ничего, replace+delete -> delete, delete+add -> replace."""
+        manager = ChangeManager()
+        manager.add_change(_change('add', 'new_func', code="def new_func(): pass"))
+        manager.add_change(_change('replace', 'new_func', code="def new_func(): return 1"))
+        manager.add_change(_change('add', 'temp'))
+        manager.add_change(_change('delete', 'temp'))
+        manager.add_change(_change('replace', 'old'))
+        manager.add_change(_change('delete', 'old'))
+        manager.add_change(_change('delete', 'gone'))
+        manager.add_change(_change('add', 'gone', code="def gone(): pass"))
+
+        actions = {change.entity_name: change.action for change in manager.get_pending_changes()}
+        assert actions == {'new_func': 'add', 'old': 'delete', 'gone': 'replace'}
+        assert manager.get_change("/project/a.py", "new_func").new_code == "def new_func(): return 1"
+
+    def test_ai_code_is_not_coalesced(self):
+        """Блоки AI-кода без конкретной сущности накапливаются."""
+        manager = ChangeManager()
+        manager.add_change(_change('add', 'AI код', node_type='ai_code', code="x = 1"))
+        manager.add_change(_change('add', 'AI код', node_type='ai_code', code="y = 2"))
+
+        assert manager.count == 2
+
+    def test_method_keyed_by_qualified_name(self):
+        manager = ChangeManager()
+        first = _change('replace', 'run', node_type='method')
+        first.parent_name = 'Worker'
+        manager.add_change(first)
+        manager.add_change(_change('replace', 'Worker.run', node_type='method', code="new"))
+        manager.add_change(_change('replace', 'run', node_type='function'))
+
+        assert manager.count == 2
+        assert manager.get_change("/project/a.py", "Worker.run").new_code == "new"
+
+    def test_delete_then_add_keeps_replaced_span(self, tmp_path):
+        """delete+add -> replace на месте удаленной сущности, а не в точке вставки."""
+        path = tmp_path / "a.py"
+        path.write_text("class A:\n    def m(self):\n        return 1\n\n    def n(self):\n        pass\n",
+                        encoding="utf-8")
+        manager = ChangeManager(ProjectRepository())
+        delete = _change('delete', 'A.m', path=str(path), node_type='method')
+        delete.parent_name, delete.span, delete.old_code = 'A', (2, 3), "    def m(self):\n        return 1"
+        add = _change('add', 'A.m', path=str(path), code="    def m(self):\n        return 2",
+                      node_type='method')
+        add.parent_name, add.span = 'A', (7, 6)
+        manager.add_change(delete)
+        manager.add_change(add)
+
+        merged = manager.get_change(str(path), 'A.m')
+        assert (merged.action, merged.span) == ('replace', (2, 3))
+        assert merged.old_code == delete.old_code
+        success, _ = manager.apply_all_changes()
+        assert success
+        assert path.read_text(encoding="utf-8") == (
+            "class A:\n    def m(self):\n        return 2\n\n    def n(self):\n        pass\n"
+        )
+
+
+class TestQueueIndex:
+    """Тесты счетчиков и плана применения."""
+
+    def test_file_counts_and_plan(self):
+        manager = ChangeManager()
+        manager.add_change(_change('replace', 'a', path="/project/a.py"))
+        manager.add_change(_change('replace', 'b', path="/project/b.py"))
+        manager.add_change(_change('delete', 'c', path="/project/a.py"))
+        manager.add_change(_change('add', 'c', path="/project/a.py"))
+
+        assert manager.count_for_file("/project/a.py") == 2
+        assert manager.get_file_counts() == {"/project/a.py": 2, "/project/b.py": 1}
+        plan = manager.get_apply_plan()
+        assert [change.entity_name for change in plan["/project/a.py"]] == ['a', 'c']
+
+        manager.get_change("/project/b.py", "b").applied = True
+        assert manager.remove_applied() == 1
+        assert manager.get_file_counts() == {"/project/a.py": 2}
+
+    def test_thousands_of_changes(self):
+        """Постановка и запросы не зависят линейно от размера очереди."""
+        manager = ChangeManager()
+        started = time.perf_counter()
+        for index in range(20000):
+            manager.add_change(_change('replace', f"func_{index % 5000}", path=f"/project/m{index % 50}.py"))
+            assert manager.count_for_file("/project/m0.py") <= 100
+
+        assert manager.count == 5000
+        assert time.perf_counter() - started < 2.0
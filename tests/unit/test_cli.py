@@ -0,0 +1,99 @@
+# tests/unit/test_cli.py
+
+"""
+Тесты консольного интерфейса (core.cli).
+"""
+
+import json
+
+import pytest
+
+from core import cli
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "proj"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "pkg" / "a.py").write_text(
+        "import os\n\nclass A:\n    def f(self):\n        return 1\n\ndef g():\n    pass\n", encoding="utf-8"
+    )
+    return root
+
+
+def run(tmp_path, *argv):
+    """Запускает команду и возвращает (код завершения, вывод)."""
+    output = tmp_path / "out.txt"
+    code = cli.main([*argv, "-o", str(output)])
+    return code, output.read_text(encoding="utf-8") if output.exists() else ""
+
+
+class TestCLI:
+    """Тесты команд и кодов завершения."""
+
+    def test_parse(self, project, tmp_path):
+        code, output = run(tmp_path, "parse", str(project), "--workers", "4")
+        document = json.loads(output)
+        modules = {item['path']: item for item in document['items']}
+
+        assert code == cli.EXIT_OK
+        assert list(modules) == ["pkg/__init__.py", "pkg/a.py"]
+        assert modules["pkg/a.py"]['module'] == "pkg.a"
+        assert modules["pkg/a.py"]['elements'][1] == {
+            'name': "A", 'type': "class", 'lines': [3, 5],
+            'children': [{'name': "f", 'type': "method", 'lines': [4, 5]}]
+        }
+
+    def test_stats_ndjson_and_parse_errors(self, project, tmp_path):
+        (project / "bad.py").write_text("def broken(:\n", encoding="utf-8")
+
+        code, output = run(tmp_path, "stats", str(project), "--format", "ndjson")
+        records = [json.loads(line) for line in output.splitlines()]
+        summary = records[-1]
+
+        assert code == cli.EXIT_FAILED
+        assert len(records) == 4 and summary['type'] == "summary"
+        assert (summary['classes'], summary['functions'], summary['methods'], summary['errors']) == (1, 1, 1, 1)
+        assert {record['path']: record['lines'] for record in records[:-1]}["pkg/a.py"] == 8
+
+    def test_analyze_then_apply(self, project, tmp_path):
+        ai_file = tmp_path / "ai.py"
+        ai_file.write_text("class A:\n    def f(self):\n        return 2\n\ndef h():\n    return 3\n",
+                           encoding="utf-8")
+
+        code, changes = run(tmp_path, "analyze-ai", str(ai_file), "-p", str(project), "-t", "pkg/a.py",
+                            "-f", "ndjson")
+        assert code == cli.EXIT_OK
+        changes_file = tmp_path / "changes.ndjson"
+        changes_file.write_text(changes, encoding="utf-8")
+
+        code, output = run(tmp_path, "apply", str(changes_file), "-p", str(project))
+        summary = json.loads(output)['summary']
+
+        assert code == cli.EXIT_OK
+        assert (summary['applied'], summary['failed'], summary['touched_files']) == (2, 0, ["pkg/a.py"])
+        source = (project / "pkg" / "a.py").read_text(encoding="utf-8")
+        assert "return 2" in source and "def h():" in source
+
+    def test_conflicts_are_reported_and_skipped(self, project, tmp_path):
+        ai_file = tmp_path / "ai.py"
+        ai_file.write_text("def broken(:\n", encoding="utf-8")
+
+        code, output = run(tmp_path, "analyze-ai", str(ai_file), "-p", str(project), "-t", "pkg/a.py")
+        assert code == cli.EXIT_CONFLICTS
+        changes_file = tmp_path / "changes.json"
+        changes_file.write_text(output, encoding="utf-8")
+
+        code, output = run(tmp_path, "apply", str(changes_file), "-p", str(project))
+        assert code == cli.EXIT_CONFLICTS
+        assert json.loads(output)['summary']['skipped_conflicts'] == 1
+
+    def test_usage_errors(self, tmp_path):
+        bad_changes = tmp_path / "bad.json"
+        bad_changes.write_text("{not json", encoding="utf-8")
+
+        assert cli.main(["parse", str(tmp_path / "missing")]) == cli.EXIT_USAGE
+        assert cli.main(["apply", str(bad_changes), "-p", str(tmp_path)]) == cli.EXIT_USAGE
+        assert cli.main(["unknown"]) == cli.EXIT_USAGE
+        assert cli.main(["parse", "--workers", "0"]) == cli.EXIT_USAGE
@@ -0,0 +1,220 @@
+# tests/unit/test_code_manager.py
+
+"""
+Тесты анализа AI-кода в CodeManager.
+"""
+
+import pytest
+
+from core.business.ast_service import ASTService
+from core.business.change_applier import ChangeApplier
+from core.business.code_manager import CodeManager
+from core.business.symbol_index import SymbolIndex
+from core.data.project_repository import ProjectRepository
+
+
+@pytest.fixture
+def project_tree(tmp_path):
+    """Дерево небольшого проекта."""
+    (tmp_path / "utils.py").write_text(
+        "def helper(a, b):\n    return a + b\n\n\n"
+        "def unchanged():\n    return 1\n",
+        encoding="utf-8"
+    )
+    (tmp_path / "models.py").write_text(
+        "class Model:\n    def save(self):\n        pass\n",
+        encoding="utf-8"
+    )
+    return ASTService().parse_project(str(tmp_path))
+
+
+class TestAnalyzeAICode:
+    """Тесты пакетного анализа AI-кода."""
+
+    def test_actions(self, project_tree):
+        """Новая сущность - add, совпадающая - replace, другая сигнатура - conflict."""
+        ai_code = (
+            "def unchanged():\n    return 1\n\n"
+            "def helper(a):\n    return a\n\n"
+            "def brand_new():\n    pass\n"
+        )
+        changes = CodeManager().analyze_ai_code(ai_code, project_tree, "target.py")
+
+        assert [(c.entity_name, c.action) for c in changes] == [
+            ('unchanged', 'replace'),
+            ('helper', 'conflict'),
+            ('brand_new', 'add'),
+        ]
+        assert all(c.file_path == "target.py" for c in changes)
+
+    def test_syntax_error(self, project_tree):
+        """Синтаксическая ошибка в AI-коде возвращается как конфликт."""
+        changes = CodeManager().analyze_ai_code("def broken(:\n", project_tree)
+
+        assert len(changes) == 1
+        assert changes[0].action == 'conflict'
+        assert changes[0].node_type == 'error'
+
+    def test_parallel_batch_keeps_input_order(self, project_tree):
+        """Результаты пула потоков совпадают с последовательным анализом по порядку."""
+        ai_code = "\n\n".join(
+            f"def func_{i}():\n    return {i}" for i in range(CodeManager.PARALLEL_THRESHOLD + 10)
+        ) + "\n\ndef helper(a, b, c):\n    pass\n"
+        manager = CodeManager()
+
+        sequential = manager.analyze_ai_code_batch(ai_code, project_tree)
+        parallel = manager.analyze_ai_code_batch(ai_code, project_tree, max_workers=4)
+
+        assert [(c.entity_name, c.action) for c in parallel] == \
+            [(c.entity_name, c.action) for c in sequential]
+        assert parallel[-1].action == 'conflict'
+
+    def test_symbol_index_is_reused(self, project_tree):
+        """Индекс перестраивается только при изменении дерева проекта."""
+        manager = CodeManager()
+        index = manager.get_symbol_index(project_tree)
+
+        assert manager.get_symbol_index(project_tree) is index
+
+        project_tree["extra.py"] = None
+        assert manager.get_symbol_index(project_tree) is not index
+
+
+class TestSymbolIndex:
+    """Тесты индекса символов."""
+
+    def test_lookup_matches_linear_search(self, project_tree):
+        """Индекс возвращает те же узлы, что и рекурсивный поиск."""
+        index = SymbolIndex(project_tree)
+        manager = CodeManager()
+
+        for name, node_type in [('helper', 'function'), ('Model', 'class'),
+                                ('save', 'method'), ('missing', 'function')]:
+            assert index.lookup(name, node_type) is \
+                manager._find_entity_in_project(name, node_type, project_tree)
+
+
+class TestClassMemberMerge:
+    """Тесты слияния классов на уровне методов."""
+
+    SOURCE = (
+        "class Service:\n"
+        "    \"\"\"Сервис.\"\"\"\n"
+        "\n"
+        "    def start(self):\n"
+        "        return 'start'\n"
+        "\n"
+        "    @property\n"
+        "    def name(self):\n"
+        "        return 'old'\n"
+        "\n"
+        "    def stop(self):\n"
+        "        return 'stop'\n"
+        "\n"
+        "\n"
+        "def tail():\n"
+        "    pass\n"
+    )
+
+    @pytest.fixture
+    def service_tree(self, tmp_path):
+        path = tmp_path / "service.py"
+        path.write_text(self.SOURCE, encoding="utf-8")
+        return path, ASTService().parse_project(str(tmp_path))
+
+    @staticmethod
+    def _apply(path, changes):
+        report = ChangeApplier(ProjectRepository()).apply(changes)
+        return report, path.read_text(encoding="utf-8")
+
+    def test_emits_only_changed_methods(self, service_tree):
+        """Неизмененные методы пропускаются, измененные и новые дают отдельные изменения."""
+        path, tree = service_tree
+        ai_code = (
+            "class Service:\n"
+            "    \"\"\"Сервис.\"\"\"\n"
+            "\n"
+            "    # комментарий не влияет на отпечаток\n"
+            "    def start(self):\n"
+            "        return 'start'\n"
+            "\n"
+            "    @property\n"
+            "    def name(self):\n"
+            "        return 'new'\n"
+            "\n"
+            "    def restart(self):\n"
+            "        return 'restart'\n"
+        )
+        changes = CodeManager().analyze_ai_code(ai_code, tree, "target.py")
+
+        assert [(c.entity_name, c.action) for c in changes] == [
+            ('Service.name', 'replace'),
+            ('Service.restart', 'add'),
+        ]
+        assert changes[0].span == (7, 9)
+        assert changes[0].old_code.startswith("    @property")
+        assert all(c.file_path == str(path) for c in changes)
+
+        report, new_source = self._apply(path, changes)
+
+        assert report.success
+        assert "return 'new'" in new_source
+        assert new_source.index("def restart") < new_source.index("def tail")
+        assert new_source.count("def stop") == 1
+        compile(new_source, "service.py", "exec")
+
+    def test_comment_only_edit_is_detected(self, service_tree):
+        """Метод, в котором изменились только комментарии, заменяется."""
+        path, tree = service_tree
+        ai_code = self.SOURCE.split("\n\n\n")[0].replace(
+            "        return 'stop'", "        # останавливает сервис\n        return 'stop'"
+        )
+        changes = CodeManager().analyze_ai_code(ai_code, tree)
+
+        assert [(c.entity_name, c.action) for c in changes] == [('Service.stop', 'replace')]
+        report, new_source = self._apply(path, changes)
+        assert report.success and "# останавливает сервис" in new_source
+
+    def test_deletes_are_opt_in(self, service_tree):
+        """Отсутствующие в AI-версии методы удаляются только при allow_member_deletes."""
+        path, tree = service_tree
+        ai_code = (
+            "class Service:\n"
+            "    \"\"\"Сервис.\"\"\"\n"
+            "\n"
+            "    def start(self):\n"
+            "        return 'start'\n"
+        )
+        manager = CodeManager()
+        assert manager.analyze_ai_code(ai_code, tree) == []
+
+        manager.allow_member_deletes = True
+        changes = manager.analyze_ai_code(ai_code, tree)
+
+        assert sorted((c.entity_name, c.action) for c in changes) == [
+            ('Service.name', 'delete'), ('Service.stop', 'delete')
+        ]
+        _, new_source = self._apply(path, changes)
+        assert "def name" not in new_source and "def stop" not in new_source
+        compile(new_source, "service.py", "exec")
+
+    def test_changed_class_shell_falls_back_to_whole_class(self, service_tree):
+        """Изменение базовых классов или атрибутов класса дает замену класса целиком."""
+        _, tree = service_tree
+        ai_code = "class Service(Base):\n    def start(self):\n        return 1\n"
+
+        changes = CodeManager().analyze_ai_code(ai_code, tree)
+
+        assert [(c.entity_name, c.node_type) for c in changes] == [('Service', 'class')]
+
+    def test_stale_span_is_rejected(self, service_tree):
+        """Изменение отклоняется, если файл изменился после анализа."""
+        path, tree = service_tree
+        ai_code = self.SOURCE.split("\n\n\n")[0].replace("'old'", "'new'")
+        changes = CodeManager().analyze_ai_code(ai_code, tree)
+        path.write_text(self.SOURCE.replace("'old'", "'edited'"), encoding="utf-8")
+
+        report, new_source = self._apply(path, changes)
+
+        assert [result.change for result in report.failed] == changes
+        assert "'edited'" in new_source
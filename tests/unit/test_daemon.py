@@ -0,0 +1,170 @@
+# tests/unit/test_daemon.py
+
+"""
+Тесты локального демона JSON-RPC (ProjectDaemon, DaemonClient).
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from core.app_context import AppContext
+from core.daemon import (DaemonClient, INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR, ProjectDaemon,
+                         RPCError)
+
+
+SOURCE = "import os\n\nclass A:\n    def f(self):\n        return 1\n\ndef g():\n    pass\n"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text(SOURCE, encoding="utf-8")
+    context = AppContext()
+    context.initialize()
+    daemon = ProjectDaemon(str(tmp_path), context=context, workers=4)
+    daemon.start(port=0)
+    yield daemon
+    daemon.stop()
+    context.clear()
+
+
+@pytest.fixture
+def client(daemon):
+    return DaemonClient(daemon.url, timeout=10, token=daemon.token)
+
+
+def post(daemon, body=b'{"jsonrpc": "2.0", "method": "status", "id": 1}', **headers):
+    """Отправляет POST с заданными заголовками; возвращает (HTTP-статус, ответ)."""
+    headers.setdefault('Content-Type', "application/json")
+    headers.setdefault('Authorization', f"Bearer {daemon.token}")
+    request = urllib.request.Request(daemon.url, data=body, headers=headers)
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    try:
+        with opener.open(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+class TestProjectDaemon:
+    """Тесты методов и протокола."""
+
+    def test_parse_and_lookup_from_warm_state(self, daemon, client):
+        assert client.call('parse')['modules'] == 1
+        assert client.call('lookup_symbol', {'name': "A.f"}) == [
+            {'name': "f", 'qualified_name': "A.f", 'type': "method", 'path': "pkg/a.py", 'lines': [4, 5]}
+        ]
+        assert client.last_duration_ms is not None
+        assert client.call('lookup_symbol', ["g", "class"]) == []
+
+        calls = client.call('status')['calls']
+        assert calls['lookup_symbol']['calls'] == 2
+        assert calls['parse']['calls'] == 1
+
+    def test_batch_and_concurrent_calls(self, client):
+        results = client.batch([('status', None), ('missing', None), ('lookup_symbol', ["g"])])
+
+        assert results[0]['modules'] == 1
+        assert isinstance(results[1], RPCError) and results[1].code == METHOD_NOT_FOUND
+        assert results[2][0]['name'] == "g"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            found = list(executor.map(lambda _: client.call('lookup_symbol', ["A"]), range(32)))
+        assert all(result[0]['type'] == "class" for result in found)
+
+    def test_analyze_apply_and_reparse(self, daemon, client):
+        analysis = client.call('analyze_ai_code', {'code': "def g():\n    return 5\n\ndef h():\n    return 6\n",
+                                                   'target': "pkg/a.py"})
+        assert [change['action'] for change in analysis['changes']] == ["replace", "add"]
+
+        outcome = client.call('apply_changes', {'changes': analysis['changes']})
+
+        assert outcome['summary']['applied'] == 2
+        assert "return 5" in Path(daemon.root, "pkg", "a.py").read_text(encoding="utf-8")
+        # После применения дерево разобрано заново
+        assert client.call('lookup_symbol', ["h"])[0]['path'] == "pkg/a.py"
+
+    def test_diff(self, client):
+        result = client.call('diff', {'path': "pkg/a.py", 'new': SOURCE.replace("return 1", "return 2")})
+
+        assert result['has_changes']
+        assert result['hunks'][0]['header'].startswith("@@")
+        assert result['structural'] == [
+            {'kind': "body_changed", 'name': "A.f", 'type': "method", 'summary': "метод A.f: изменено тело"}
+        ]
+        with pytest.raises(RPCError) as error:
+            client.call('diff', {'new': "x"})
+        assert error.value.code == INVALID_PARAMS
+
+    def test_protocol_errors(self, daemon, client):
+        assert post(daemon, b"{oops")[1]['error']['code'] == PARSE_ERROR
+
+        with pytest.raises(RPCError) as error:
+            client.call('lookup_symbol', {'unknown': 1})
+        assert error.value.code == INVALID_PARAMS
+
+        # Уведомление (без id) выполняется без ответа
+        assert daemon.handle(json.dumps({'jsonrpc': "2.0", 'method': "status"}).encode()) is None
+
+    def test_shutdown(self, daemon, client):
+        assert client.call('shutdown') is True
+        daemon.wait()
+        assert daemon.address is None
+
+
+class TestDaemonSecurity:
+    """Тесты отклонения чужих запросов и путей вне проекта."""
+
+    def test_paths_outside_project_are_rejected(self, daemon, client, tmp_path_factory):
+        outside = tmp_path_factory.mktemp("outside") / "outside.py"
+        changes = [{'action': "add", 'entity_name': "AI код", 'new_code': "x = 1\n",
+                    'file_path': str(outside), 'node_type': "ai_code"},
+                   {'action': "add", 'entity_name': "AI код", 'new_code': "x = 1\n",
+                    'file_path': "../escape.py", 'node_type': "ai_code"}]
+
+        for change in changes:
+            with pytest.raises(RPCError) as error:
+                client.call('apply_changes', {'changes': [change]})
+            assert error.value.code == INVALID_PARAMS
+        assert not outside.exists()
+        assert not os.path.exists(os.path.join(os.path.dirname(daemon.root), "escape.py"))
+
+        for path in (str(outside), "../" + os.path.basename(daemon.root) + "_x/a.py", "pkg/../../a.py"):
+            with pytest.raises(RPCError) as error:
+                client.call('diff', {'path': path, 'new': ""})
+            assert error.value.code == INVALID_PARAMS
+
+    def test_foreign_requests_are_rejected(self, daemon):
+        assert post(daemon, **{'Content-Type': "text/plain"})[0] == 415
+        assert post(daemon, Origin="http://evil.example")[0] == 403
+        assert post(daemon, Origin="http://localhost:1")[0] == 403
+        assert post(daemon, Host="evil.example")[0] == 403
+        status, response = post(daemon, Host=f"localhost:{daemon.address[1]}")
+        assert status == 200 and response['result']['modules'] == 1
+
+    def test_token_is_required(self, daemon, tmp_path):
+        token_file = tmp_path / "tokens" / "daemon.token"
+        token = daemon.write_token_file(str(token_file))
+
+        assert token and token_file.read_text(encoding="utf-8") == token
+        if os.name == 'posix':
+            assert token_file.stat().st_mode & 0o777 == 0o600
+        assert post(daemon, Authorization="")[0] == 401
+        assert post(daemon, Authorization="Bearer wrong")[0] == 401
+        assert DaemonClient(daemon.url, timeout=10, token_file=str(token_file)).call('status')['modules'] == 1
+
+        daemon.stop()
+        assert not token_file.exists()
+
+    def test_non_loopback_host_is_refused(self, daemon):
+        other = ProjectDaemon(daemon.root, context=daemon.context)
+        for host in ("0.0.0.0", "192.0.2.1", "example.com"):
+            with pytest.raises(ValueError):
+                other.start(host=host, port=0)
+        assert other.address is None
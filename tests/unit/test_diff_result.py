@@ -0,0 +1,80 @@
+# tests/unit/test_diff_result.py
+
+"""
+Тесты ленивого результата сравнения и кэша DiffEngine.
+"""
+
+import difflib
+from unittest.mock import patch
+
+from core.business.diff_engine import DiffEngine
+from core.business.line_diff import LineDiff
+
+
+def _numbered(count, changed=()):
+    return ''.join(f"line {i}{'!' if i in changed else ''}\n" for i in range(1, count + 1))
+
+
+class TestDiffResult:
+    """Тесты хунков и ленивого вычисления."""
+
+    def test_hunks_match_unified_diff(self):
+        """Заголовки и строки хунков совпадают с difflib.unified_diff."""
+        old = _numbered(60)
+        new = _numbered(60, changed={5, 7, 30, 58})
+
+        hunks = list(DiffEngine().compare(old, new).iter_hunks(context=3))
+
+        expected = [line for line in difflib.unified_diff(
+            old.splitlines(True), new.splitlines(True), n=3) if line.startswith('@@')]
+        assert [hunk.header + '\n' for hunk in hunks] == expected
+        assert [tag for tag, _ in hunks[0].lines].count('equal') == 7
+
+    def test_first_hunk_before_full_diff(self):
+        """Первый хунк доступен до того, как посчитан весь diff."""
+        old = _numbered(5000)
+        new = _numbered(5000, changed={2, 4000})
+
+        result = DiffEngine().compare(old, new)
+        first = next(result.iter_hunks())
+
+        assert first.old_start == 1
+        assert not result.is_complete
+        assert len(result.lines) == 5002
+        assert result.is_complete
+
+    def test_identical_content_has_no_changes(self):
+        """Для одинакового содержимого diff не вычисляется."""
+        with patch.object(LineDiff, 'iter_diff') as iter_diff:
+            result = DiffEngine().compare("x = 1\n", "x = 1\n")
+
+        assert not DiffEngine.has_changes(result)
+        assert list(result.iter_hunks()) == []
+        iter_diff.assert_not_called()
+
+
+class TestDiffCache:
+    """Тесты LRU-кэша результатов."""
+
+    def test_repeated_compare_uses_cache(self):
+        """Повторное сравнение тех же версий возвращает тот же результат."""
+        engine = DiffEngine()
+        first = engine.compare("a\nb\n", "a\nc\n")
+        DiffEngine.format_diff_for_display(first)
+
+        with patch.object(LineDiff, 'iter_diff') as iter_diff:
+            second = engine.compare("a\nb\n", "a\nc\n")
+            assert DiffEngine.format_diff_for_display(second) == "  a\n- b\n+ c\n"
+
+        assert second is first
+        assert engine.hits == 1
+        iter_diff.assert_not_called()
+
+    def test_cache_is_bounded(self):
+        engine = DiffEngine(cache_size=2)
+        oldest = engine.compare("1", "2")
+        engine.compare("3", "4")
+        engine.compare("5", "6")
+
+        assert engine.compare("1", "2") is not oldest
+        assert engine.misses == 4
@@ -0,0 +1,65 @@
+# tests/unit/test_diff_view_model.py
+
+"""
+Тесты модели представления diff (сворачивание, раскрытие, окна строк).
+"""
+
+from core.business.diff_engine import DiffEngine
+from core.business.diff_view_model import DiffViewModel
+
+
+OLD = "".join(f"line {i}\n" for i in range(1, 20001))
+NEW = OLD.replace("line 10\n", "first\nsecond\n").replace("line 15000\n", "")
+
+
+def _model(**kwargs):
+    return DiffViewModel(DiffEngine().compare(OLD, NEW), **kwargs)
+
+
+class TestDiffViewModel:
+    """Тесты свернутого представления."""
+
+    def test_unchanged_regions_collapsed(self):
+        """Вокруг изменений остается context строк, остальное свернуто."""
+        model = _model(context=3)
+        rows = model.rows(0, model.row_count)
+
+        assert model.row_count == 19
+        assert [row.kind for row in rows[:8]] == ['gap', 'equal', 'equal', 'equal',
+                                                  'delete', 'insert', 'insert', 'equal']
+        assert rows[0].hidden == 6
+        assert sum(row.hidden for row in rows) == model.hidden_count == 19986
+        assert (rows[4].old_no, rows[5].new_no, rows[6].new_no) == (10, 10, 11)
+
+    def test_window_only(self):
+        """Окно строк строится без остальных строк; номера строк сохраняются."""
+        model = _model()
+        model.expand(10)
+
+        window = model.rows(5000, 3)
+
+        assert [row.old_no for row in window] == [5004, 5005, 5006]
+        assert [row.new_no for row in window] == [5005, 5006, 5007]
+
+    def test_expand_partially(self):
+        model = _model()
+        gap = model.rows(0, 1)[0]
+
+        assert model.expand(0, lines=4)
+        assert [row.kind for row in model.rows(0, 6)] == ['equal'] * 4 + ['gap', 'equal']
+        assert model.rows(4, 1)[0].hidden == gap.hidden - 4
+        assert not model.expand(1)
+
+        model.collapse_all()
+        assert model.row_count == 19
+
+    def test_side_by_side(self):
+        """В двухколоночном режиме удаленные и вставленные строки стоят рядом."""
+        model = _model(side_by_side=True)
+        rows = model.rows(0, 8)
+
+        assert [row.kind for row in rows] == ['gap', 'equal', 'equal', 'equal',
+                                              'change', 'insert', 'equal', 'equal']
+        assert (rows[4].old_text, rows[4].new_text) == ("line 10\n", "first\n")
+        assert model.hunk_rows() == [4, 13]
+        assert "│" in model.format_row(rows[4])
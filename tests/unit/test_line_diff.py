@@ -0,0 +1,61 @@
+# tests/unit/test_line_diff.py
+
+"""
+Тесты построчного diff (LineDiff) и его использования в DiffEngine.
+"""
+
+import difflib
+import random
+
+from core.business.diff_engine import DiffEngine
+from core.business.line_diff import LineDiff
+
+
+def _changed(diff):
+    return sum(1 for tag, _ in diff if tag != 'equal')
+
+
+class TestLineDiff:
+    """Тесты корректности diff."""
+
+    def test_reconstructs_both_versions(self):
+        """Из diff восстанавливаются обе версии; правок не больше, чем у difflib."""
+        rng = random.Random(11)
+        for _ in range(300):
+            old = [rng.choice("abcde") for _ in range(rng.randint(0, 25))]
+            new = [rng.choice("abcde") for _ in range(rng.randint(0, 25))]
+            reference = [line for line in difflib.Differ().compare(old, new) if line[:2] in ('- ', '+ ')]
+
+            for patience in (True, False):
+                diff = LineDiff.diff(old, new, patience=patience)
+                assert [line for tag, line in diff if tag != 'insert'] == old
+                assert [line for tag, line in diff if tag != 'delete'] == new
+            assert _changed(LineDiff.diff(old, new, patience=False)) <= len(reference)
+
+    def test_same_output_as_differ_for_simple_edit(self):
+        """Для типичной правки результат совпадает с прежним difflib.Differ."""
+        old = "def f():\n    return 1\n\n\ndef g():\n    pass\n"
+        new = "def f():\n    return 2\n\n\ndef g():\n    pass\n\nx = 1\n"
+        expected = []
+        for line in difflib.Differ().compare(old.splitlines(True), new.splitlines(True)):
+            tag = {'  ': 'equal', '+ ': 'insert', '- ': 'delete'}.get(line[:2])
+            if tag:
+                expected.append((tag, line[2:]))
+
+        assert DiffEngine.generate_diff(old, new) == expected
+
+    def test_deletes_before_inserts(self):
+        """Внутри измененного блока удаления идут перед вставками."""
+        diff = LineDiff.diff(["a", "b", "c"], ["a", "x", "y", "c"])
+
+        assert diff == [('equal', 'a'), ('delete', 'b'), ('insert', 'x'), ('insert', 'y'), ('equal', 'c')]
+
+    def test_cost_limit_falls_back_to_block_replace(self):
+        """При превышении предела стоимости промежуток заменяется целиком, результат корректен."""
+        old = ["x", "a"] * 50
+        new = ["a", "y"] * 50
+
+        diff = LineDiff.diff(old, new, patience=False, max_cost=3)
+
+        assert [line for tag, line in diff if tag != 'insert'] == old
+        assert [line for tag, line in diff if tag != 'delete'] == new
@@ -0,0 +1,157 @@
+# tests/unit/test_main_controller.py
+
+"""
+Тесты логики MainController без создания окна (представления - заглушки).
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core import app_context
+from core.app_context import AppContext
+from core.business.change_service import PendingChange
+from core.data.change_journal import ChangeJournal
+from gui.controller.main_controller import MainController
+
+
+@pytest.fixture
+def context(monkeypatch):
+    context = AppContext()
+    assert context.initialize()
+    monkeypatch.setattr(app_context, '_app_context', context)
+    yield context
+    context.clear()
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg" / "mod.py").write_text("def foo():\n    return 1\n\n\ndef bar():\n    pass\n",
+                                             encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def controller(context, project):
+    with patch.object(MainController, '_setup_gui_structure'), \
+            patch.object(MainController, '_setup_event_bindings'):
+        controller = MainController(
+            MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+            context.get_project_service(), context.get_code_service(), context.get_analysis_service()
+        )
+    controller.dialogs_view.show_warning_dialog.return_value = True
+    assert controller.project_service.open_project(str(project))
+    controller._update_ast_tree(str(project))
+    return controller
+
+
+class TestMainController:
+    """Тесты очереди изменений контроллера."""
+
+    def test_multi_file_response_replaces_existing_definitions(self, controller, project):
+        response = ("```python pkg/mod.py\ndef foo():\n    return 2\n```\n\n"
+                    "```python pkg/new.py\ndef fresh():\n    pass\n```\n")
+
+        assert controller._queue_multi_file_ai_code(response)
+        queued = {change.entity_name: change.action for change in controller.change_manager.get_pending_changes()}
+        assert queued == {"foo": "replace", "AI код: pkg/new.py": "add"}
+
+        success, _ = controller.change_manager.apply_all_changes()
+        assert success
+        source = (project / "pkg" / "mod.py").read_text(encoding="utf-8")
+        assert source.count("def foo") == 1
+        assert "return 2" in source and "def bar" in source
+        assert (project / "pkg" / "new.py").read_text(encoding="utf-8").startswith("def fresh")
+
+    def test_conflicts_are_skipped_and_code_kept(self, controller, project):
+        response = "```python pkg/mod.py\ndef foo(x):\n    return x\n\ndef baz():\n    pass\n```\n"
+
+        assert controller._queue_multi_file_ai_code(response)
+
+        assert "будут пропущены" in controller.dialogs_view.show_warning_dialog.call_args[0][1]
+        queued = [(change.entity_name, change.action) for change in controller.change_manager.get_pending_changes()]
+        assert queued == [("baz", "add")]
+        controller.code_editor_view.clear_ai_content.assert_not_called()
+        assert "Пропущено конфликтов: 1" in controller.main_window_view.show_info.call_args[0][1]
+
+    def _apply_addition(self, controller, project):
+        mod = str(project / "pkg" / "mod.py")
+        controller._load_file_content(mod)
+        controller._add_pending_change(PendingChange('add', "AI код", "def baz():\n    pass\n",
+                                                     file_path=mod, node_type='ai_code'))
+        success, _ = controller.change_manager.apply_all_changes()
+        assert success
+        return mod
+
+    def test_apply_invalidates_touched_modules(self, controller, project):
+        mod = str(project / "pkg" / "mod.py")
+        controller._add_pending_change(PendingChange('replace', "foo", "def foo():\n    return 3",
+                                                     file_path=mod, node_type='function'))
+
+        with patch.object(controller.ast_service, 'invalidate_module',
+                          wraps=controller.ast_service.invalidate_module) as invalidate:
+            assert controller._apply_pending_changes()
+
+        invalidate.assert_called_once_with(mod)
+        assert "return 3" in controller.ast_service.parse_module(mod).source_code
+
+    def test_undo_keeps_unsaved_editor_edits(self, controller, project):
+        mod = self._apply_addition(controller, project)
+        controller.has_unsaved_changes = True
+        controller.code_editor_view.reset_mock()
+
+        controller.on_undo_changes()
+
+        assert "def baz" not in (project / "pkg" / "mod.py").read_text(encoding="utf-8")
+        assert controller.current_file_path == mod
+        assert controller.has_unsaved_changes
+        controller.code_editor_view.set_source_content.assert_not_called()
+
+    def test_undo_reloads_clean_open_file(self, controller, project):
+        mod = self._apply_addition(controller, project)
+        controller.code_editor_view.reset_mock()
+
+        controller.on_undo_changes()
+
+        restored = (project / "pkg" / "mod.py").read_text(encoding="utf-8")
+        controller.code_editor_view.set_source_content.assert_called_once_with(restored)
+        assert controller.current_file_path == mod and not controller.has_unsaved_changes
+
+    def test_switch_project_updates_context(self, controller, context, tmp_path_factory, monkeypatch):
+        monkeypatch.setattr(ChangeJournal, 'DEFAULT_ROOT', str(tmp_path_factory.mktemp("journals")))
+        other = tmp_path_factory.mktemp("other")
+        (other / "main.py").write_text("def main():\n    pass\n", encoding="utf-8")
+
+        assert controller._switch_project(str(other))
+
+        assert context.get_project_service() is controller.project_service
+        assert controller.project_service.project_path == str(other)
+        repository = controller.project_service.repository
+        assert controller.change_manager.repository is repository
+        assert controller.undo_manager.repository is repository
+        assert context.get_service('project_repository') is repository
+
+    def test_close_project_closes_once(self, controller, context, tmp_path_factory, monkeypatch):
+        monkeypatch.setattr(ChangeJournal, 'DEFAULT_ROOT', str(tmp_path_factory.mktemp("journals")))
+        other = tmp_path_factory.mktemp("other")
+        (other / "main.py").write_text("def main():\n    pass\n", encoding="utf-8")
+        assert controller._switch_project(str(other))
+        controller.dialogs_view.ask_save_changes.return_value = False
+        project_service = controller.project_service
+
+        with patch.object(project_service, 'close_project', wraps=project_service.close_project) as close:
+            controller.on_close_project()
+
+        close.assert_called_once_with()
+        assert controller.workspace.get_project(str(other)) is None
+
+    def test_shutdown_stops_background_task(self, controller):
+        task = controller._get_ai_analysis_task()
+
+        controller.shutdown()
+
+        assert controller.ai_analysis_task is None
+        assert task._executor._shutdown
+        controller.shutdown()
@@ -0,0 +1,82 @@
+# tests/unit/test_merge.py
+
+"""
+Тесты трехстороннего слияния и применения изменений к изменившемуся файлу.
+"""
+
+from core.business.change_applier import ChangeApplier
+from core.business.change_service import CodeChange
+from core.business.diff_engine import DiffEngine
+from core.data.project_repository import ProjectRepository
+
+
+BASE = "".join(f"line {i}\n" for i in range(1, 21))
+
+
+class TestThreeWayMerge:
+    """Тесты слияния текста."""
+
+    def test_non_overlapping_changes_merge(self):
+        """Непересекающиеся изменения обеих сторон сливаются без конфликтов."""
+        ours = BASE.replace("line 3\n", "changed 3\n").replace("line 10\n", "line 10\nextra\n")
+        theirs = BASE.replace("line 4\n", "changed 4\n").replace("line 15\n", "")
+
+        result = DiffEngine.merge3(BASE, ours, theirs)
+
+        assert not result.has_conflicts
+        assert result.text == (
+            BASE.replace("line 3\n", "changed 3\n").replace("line 4\n", "changed 4\n")
+            .replace("line 10\n", "line 10\nextra\n").replace("line 15\n", "")
+        )
+
+    def test_identical_changes_taken_once(self):
+        ours = BASE.replace("line 5\n", "same\n")
+
+        result = DiffEngine.merge3(BASE, ours, ours.replace("line 20\n", "last\n"))
+
+        assert not result.has_conflicts
+        assert result.text.count("same\n") == 1 and result.text.endswith("last\n")
+
+    def test_true_conflict_is_reported(self):
+        """Различные изменения одной строки дают конфликт с маркерами."""
+        result = DiffEngine.merge3(BASE, BASE.replace("line 7\n", "ours\n"),
+                                   BASE.replace("line 7\n", "theirs\n"), "editor", "disk")
+
+        assert len(result.conflicts) == 1
+        assert result.conflicts[0].line == 7
+        assert "<<<<<<< editor\nours\n=======\ntheirs\n>>>>>>> disk\nline 8\n" in result.text
+
+
+class TestStaleChanges:
+    """Тесты применения изменений, вычисленных для старой версии файла."""
+
+    def test_change_merged_with_disk_edit(self, tmp_path):
+        """Изменение по старой версии сливается с правкой файла на диске."""
+        path = tmp_path / "module.py"
+        base = "def first():\n    return 1\n\n\ndef second():\n    return 2\n"
+        change = CodeChange('replace', 'second', "def second():\n    return 20", file_path=str(path))
+        change.span = (5, 6)
+        change.old_code = "def second():\n    return 2"
+        change.base_content = base
+        path.write_text("# header\n" + base.replace("return 1", "return 10"), encoding="utf-8")
+
+        report = ChangeApplier(ProjectRepository()).apply([change])
+
+        assert report.success
+        assert path.read_text(encoding="utf-8") == (
+            "# header\ndef first():\n    return 10\n\n\ndef second():\n    return 20\n"
+        )
+
+    def test_conflicting_change_rejected(self, tmp_path):
+        """При конфликте с правкой на диске изменение отклоняется, файл не меняется."""
+        path = tmp_path / "module.py"
+        base = "def first():\n    return 1\n"
+        change = CodeChange('replace', 'first', "def first():\n    return 2", file_path=str(path))
+        change.base_content = base
+        path.write_text("def first():\n    return 3\n", encoding="utf-8")
+
+        report = ChangeApplier(ProjectRepository()).apply([change])
+
+        assert not report.success
+        assert "Конфликт" in report.results[0].message
+        assert path.read_text(encoding="utf-8") == "def first():\n    return 3\n"
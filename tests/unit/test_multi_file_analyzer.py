@@ -0,0 +1,148 @@
+# tests/unit/test_multi_file_analyzer.py
+
+"""
+Тесты анализа многофайловых ответов AI.
+"""
+
+import os
+import pytest
+
+from core.business.ast_service import ASTService
+from core.business.change_applier import ChangeApplier
+from core.data.project_repository import ProjectRepository
+from core.business.multi_file_analyzer import MultiFileAnalyzer, MultiFileResponseSplitter
+
+
+RESPONSE = '''Вот обновленные файлы.
+
+### `core/utils.py`
+```python
+def helper(a, b):
+    return a * b
+
+
+def added():
+    return 2
+```
+
+```python:models.py
+class Model:
+    def save(self):
+        pass
+```
+
+```python
+# core/new_module.py
+def fresh():
+    pass
+```
+
+```bash
+pip install something
+```
+'''
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "core").mkdir()
+    (tmp_path / "core" / "utils.py").write_text(
+        "def helper(a, b):\n    return a + b\n", encoding="utf-8"
+    )
+    (tmp_path / "models.py").write_text(
+        "class Model:\n    def save(self):\n        pass\n", encoding="utf-8"
+    )
+    return tmp_path, ASTService().parse_project(str(tmp_path))
+
+
+class TestMultiFileResponseSplitter:
+    """Тесты разбора ответа на файлы."""
+
+    def test_header_styles(self):
+        """Путь берется из заголовка, info-строки или комментария в первой строке."""
+        splitter = MultiFileResponseSplitter()
+        payloads = splitter.feed(RESPONSE) + splitter.close()
+
+        assert [p.path for p in payloads] == ['core/utils.py', 'models.py', 'core/new_module.py', '']
+        assert payloads[0].code.startswith("def helper")
+        assert payloads[3].language == 'bash'
+
+    def test_streaming_matches_single_feed(self):
+        """Разбор по частям дает тот же результат, что и разбор целиком."""
+        splitter = MultiFileResponseSplitter()
+        completed = []
+        for start in range(0, len(RESPONSE), 7):
+            completed.extend(splitter.feed(RESPONSE[start:start + 7]))
+        completed.extend(splitter.close())
+
+        whole = MultiFileResponseSplitter()
+        expected = whole.feed(RESPONSE) + whole.close()
+
+        assert [(p.path, p.code) for p in completed] == [(p.path, p.code) for p in expected]
+
+    def test_unclosed_block(self):
+        """Незакрытый блок в конце ответа считается завершенным."""
+        splitter = MultiFileResponseSplitter()
+        splitter.feed("```python app.py\nx = 1\n")
+
+        payloads = splitter.close()
+
+        assert [(p.path, p.code) for p in payloads] == [('app.py', 'x = 1')]
+
+
+class TestMultiFileAnalyzer:
+    """Тесты сопоставления файлов и анализа."""
+
+    def test_grouped_change_sets(self, project):
+        """Каждый файл сопоставляется с модулем и анализируется отдельно."""
+        root, tree = project
+        change_sets = MultiFileAnalyzer(max_workers=4).analyze(RESPONSE, tree, str(root))
+
+        assert [s.path for s in change_sets] == ['core/utils.py', 'models.py', 'core/new_module.py']
+
+        utils, models, new_module = change_sets
+        assert utils.module_path == str(root / "core" / "utils.py")
+        assert [(c.entity_name, c.action) for c in utils.changes] == [
+            ('helper', 'replace'), ('added', 'add')
+        ]
+        assert models.changes == []
+        assert new_module.is_new
+        assert new_module.target_path == os.path.join(str(root), "core", "new_module.py")
+        assert [c.action for c in new_module.changes] == ['add']
+
+    def test_entities_matched_within_target_module(self, project):
+        """Одноименная сущность из другого модуля не считается существующей."""
+        root, tree = project
+        response = "```python core/other.py\nclass Model:\n    pass\n```\n"
+
+        change_set, = MultiFileAnalyzer().analyze(response, tree, str(root))
+
+        assert [(c.entity_name, c.action) for c in change_set.changes] == [('Model', 'add')]
+
+    def test_module_level_code_of_existing_module(self, project):
+        """Импорты и код уровня модуля ставятся вместе с сущностями, а не теряются."""
+        root, tree = project
+        (root / "core" / "utils.py").write_text("import os\n\nCONST = 1\n\n\ndef helper(a, b):\n    return a + b\n",
+                                                encoding="utf-8")
+        tree = ASTService().parse_project(str(root))
+        response = ("```python\n# core/utils.py\nimport os\nimport json\nCONST = 5\n\n"
+                    "def bar():\n    return json.dumps(CONST)\n\nprint(bar())\n```\n")
+
+        change_set, = MultiFileAnalyzer().analyze(response, tree, str(root))
+
+        assert [(c.entity_name, c.action, c.span) for c in change_set.changes] == [
+            ("Код модуля: начало", 'add', (2, 1)), ("CONST", 'replace', (3, 3)),
+            ("bar", 'add', None), ("Код модуля: конец", 'add', None),
+        ]
+        assert change_set.changes[0].new_code == "import json"
+        source = (root / "core" / "utils.py").read_text(encoding="utf-8")
+        new_source, results = ChangeApplier(ProjectRepository()).apply_to_source(source, change_set.changes)
+        assert all(result.success for result in results)
+        namespace = {}
+        exec(compile(new_source, "utils.py", "exec"), namespace)
+        assert namespace['bar']() == "5"
+
+    def test_plain_code_is_not_multi_file(self):
+        """Обычный код без блоков с путями не считается многофайловым ответом."""
+        assert not MultiFileAnalyzer.is_multi_file("def f():\n    pass\n")
+        assert MultiFileAnalyzer.is_multi_file(RESPONSE)
@@ -0,0 +1,107 @@
+# tests/unit/test_piece_table.py
+
+"""
+Тесты модели документа PieceTable и пакетных правок файлов.
+"""
+
+import random
+from unittest.mock import patch
+
+from core.business.code_service import CodeService
+from core.data.file_provider import FileProvider
+from core.data.project_repository import ProjectRepository
+from core.models.piece_table import PieceTable
+
+
+class TestPieceTable:
+    """Тесты правок, поиска строк и снимков."""
+
+    def test_matches_string_model(self):
+        """Случайная последовательность правок дает тот же текст, что и операции над строкой."""
+        rng = random.Random(7)
+        text = "first\nsecond\nthird"
+        document = PieceTable(text)
+
+        for _ in range(300):
+            start = rng.randint(0, len(text))
+            end = rng.randint(start, len(text))
+            if rng.random() < 0.5:
+                chunk = rng.choice(["x", "\n", "ab\ncd", "line\n"])
+                document.insert(start, chunk)
+                text = text[:start] + chunk + text[start:]
+            else:
+                document.delete(start, end)
+                text = text[:start] + text[end:]
+
+        assert document.get_text() == text
+        lines = text.split('\n')
+        assert document.line_count == len(lines)
+        assert [document.get_line(i + 1) for i in range(len(lines))] == lines
+        assert all(document.line_of_offset(o) == text[:o].count('\n') + 1
+                   for o in range(0, len(text) + 1, 5))
+
+    def test_snapshots_are_independent(self):
+        """Снимок не меняется при последующих правках и восстанавливается за O(1)."""
+        document = PieceTable("def f():\n    pass\n")
+        snapshot = document.snapshot()
+
+        document.replace(13, 17, "return 1")
+        document.append("\nx = 1\n")
+
+        assert snapshot.get_text() == "def f():\n    pass\n"
+        assert document.is_modified
+
+        document.restore(snapshot)
+        assert document.get_text() == "def f():\n    pass\n"
+        assert not document.is_modified
+
+    def test_trailing_whitespace(self):
+        document = PieceTable("code" + " \n" * 100)
+        assert document.trailing_whitespace_length() == 200
+
+
+class TestDocumentEdits:
+    """Тесты правок файлов через документы репозитория."""
+
+    def test_batch_flushes_once(self, tmp_path):
+        """Серия правок внутри batch_edits записывает файл один раз."""
+        path = tmp_path / "module.py"
+        path.write_text("import os\n\n\ndef main():\n    pass\n", encoding="utf-8")
+        service = CodeService(ProjectRepository())
+
+        with patch.object(FileProvider, 'write_file_atomic', wraps=FileProvider.write_file_atomic) as write:
+            with service.batch_edits():
+                service.add_code(str(path), "def a():\n    pass")
+                service.add_code(str(path), "import sys", position='1')
+                service.add_code(str(path), "# header", position='beginning')
+                assert "def a()" in service.get_file_content(str(path))
+
+        assert write.call_count == 1
+        assert path.read_text(encoding="utf-8") == (
+            "# header\n\nimport os\nimport sys\n\n\ndef main():\n    pass\n\ndef a():\n    pass\n"
+        )
+
+    def test_failed_flush_keeps_edits(self, tmp_path):
+        """Правки пакета, которые не удалось записать, можно записать повторно."""
+        path = tmp_path / "module.py"
+        path.write_text("x = 1\n", encoding="utf-8")
+        repository = ProjectRepository()
+        service = CodeService(repository)
+
+        with patch.object(FileProvider, 'write_file_atomic', return_value=False):
+            with service.batch_edits():
+                service.add_code(str(path), "y = 2")
+
+        assert path.read_text(encoding="utf-8") == "x = 1\n"
+        assert repository.flush_documents()
+        assert path.read_text(encoding="utf-8") == "x = 1\n\ny = 2\n"
+
+    def test_single_edit_writes_immediately(self, tmp_path):
+        """Вне пакета правка записывается сразу."""
+        path = tmp_path / "module.py"
+        path.write_text("x = 1\n", encoding="utf-8")
+        repository = ProjectRepository()
+        repository.set_current_file(str(path))
+
+        assert CodeService(repository).add_ai_code("y = 2")
+        assert path.read_text(encoding="utf-8") == "x = 1\n\ny = 2\n"
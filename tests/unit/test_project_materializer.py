@@ -0,0 +1,102 @@
+# tests/unit/test_project_materializer.py
+
+"""
+Тесты создания структуры проекта по плану (ProjectMaterializer).
+"""
+
+from unittest.mock import patch
+
+from core.business.project_creator_service import ProjectCreatorService
+from core.data.file_provider import FileProvider
+from core.data.project_materializer import PACKAGE_INIT, ProjectMaterializer
+from core.data.project_repository import ProjectRepository
+
+
+STRUCTURE = {
+    'modules': ['pkg/', 'pkg/sub', 'data'],
+    'files': {
+        'pkg/core.py': "VALUE = 1\n",
+        'pkg/sub/deep/leaf.py': "",
+        'README.md': "# Demo\n",
+    }
+}
+
+
+class TestProjectMaterializer:
+    """Тесты плана и его выполнения."""
+
+    def test_plan_collects_unique_directories(self, tmp_path):
+        plan = ProjectMaterializer().plan(str(tmp_path / "proj"), STRUCTURE, package_inits=True)
+        relative = [path.relative_to(tmp_path).as_posix() for path in plan.directories]
+
+        assert relative == ["proj", "proj/data", "proj/pkg", "proj/pkg/sub", "proj/pkg/sub/deep"]
+        # __init__.py в каждом каталоге модуля ровно один раз
+        inits = [path for path in plan.files if path.name == "__init__.py"]
+        assert len(inits) == 3
+        assert not (tmp_path / "proj").exists()
+
+    def test_execute_writes_atomically_once_per_file(self, tmp_path):
+        materializer = ProjectMaterializer(max_workers=3)
+        plan = materializer.plan(str(tmp_path), STRUCTURE, package_inits=True)
+
+        with patch.object(FileProvider, 'write_file_atomic', wraps=FileProvider.write_file_atomic) as write:
+            result = materializer.execute(plan)
+
+        assert result.success
+        assert write.call_count == len(plan.files) == 6
+        assert (tmp_path / "pkg" / "sub" / "deep" / "leaf.py").exists()
+        assert (tmp_path / "pkg" / "__init__.py").read_text(encoding="utf-8") == PACKAGE_INIT
+
+    def test_collisions_and_skips(self, tmp_path):
+        """Существующие файлы: одинаковые пропускаются, __init__.py не перезаписывается."""
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "__init__.py").write_text("from .core import VALUE\n", encoding="utf-8")
+        (tmp_path / "pkg" / "core.py").write_text("VALUE = 0\n", encoding="utf-8")
+        (tmp_path / "README.md").write_text("# Demo\n", encoding="utf-8")
+
+        plan = ProjectMaterializer().plan(str(tmp_path), STRUCTURE, package_inits=True)
+
+        assert plan.collisions == [tmp_path / "pkg" / "core.py"]
+        assert set(plan.skipped) == {tmp_path / "pkg" / "__init__.py", tmp_path / "README.md"}
+        assert (tmp_path / "pkg" / "core.py") in plan.files
+
+        keep = ProjectMaterializer(overwrite=False).plan(str(tmp_path), STRUCTURE)
+        assert (tmp_path / "pkg" / "core.py") not in keep.files
+
+    def test_paths_outside_root_rejected(self, tmp_path):
+        plan = ProjectMaterializer().plan(str(tmp_path / "proj"), {
+            'files': {'../evil.py': "x", 'ok.py': "y"}
+        })
+
+        assert [path for path, _ in plan.rejected] == ['../evil.py']
+        assert list(plan.files) == [(tmp_path / "proj" / "ok.py").resolve()]
+
+    def test_dry_run_report(self, tmp_path):
+        plan, result = ProjectMaterializer().materialize(str(tmp_path), STRUCTURE, dry_run=True)
+        report = plan.report()
+
+        assert result is None
+        assert "+ pkg/sub/deep/" in report
+        assert "+ README.md" in report
+        assert not (tmp_path / "README.md").exists()
+
+
+class TestMaterializationCallers:
+    """ProjectCreatorService и ProjectRepository используют план."""
+
+    def test_creator_dry_run_and_create(self, tmp_path):
+        creator = ProjectCreatorService()
+
+        assert creator.create_project_from_ai_schema(STRUCTURE, str(tmp_path), dry_run=True)
+        assert not (tmp_path / "pkg").exists()
+        assert creator.create_project_from_ai_schema(STRUCTURE, str(tmp_path))
+        assert (tmp_path / "pkg" / "core.py").read_text(encoding="utf-8") == "VALUE = 1\n"
+        # Модули AI-схемы создаются без шаблонных __init__.py, как и раньше
+        assert not (tmp_path / "pkg" / "__init__.py").exists()
+
+    def test_repository_create_structure(self, tmp_path):
+        repository = ProjectRepository()
+
+        assert repository.create_structure(tmp_path, STRUCTURE)
+        assert (tmp_path / "data" / "__init__.py").exists()
+        assert repository.last_structure_plan.files
@@ -0,0 +1,92 @@
+# tests/unit/test_project_structure_cache.py
+
+"""
+Тесты кэша структуры проекта (ProjectStructureCache / ProjectService).
+"""
+
+import pytest
+from unittest.mock import patch
+
+from core.business.project_service import ProjectService
+from core.data.project_repository import ProjectRepository
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """Создает небольшой проект на диске."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "main.py").write_text("def main():\n    pass\n", encoding="utf-8")
+    (tmp_path / "pkg" / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "pkg" / "models.py").write_text(
+        "class Model:\n    def save(self):\n        pass\n", encoding="utf-8"
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def project_service(project_dir):
+    service = ProjectService(ProjectRepository())
+    assert service.open_project(str(project_dir))
+    return service
+
+
+class TestProjectStructureCache:
+    """Тесты кэширования и инвалидации структуры."""
+
+    def test_structure_is_built_once(self, project_service):
+        """Повторные обращения не запускают полное сканирование."""
+        structure_service = project_service.project_structure_service
+        with patch.object(structure_service, 'get_full_project_structure',
+                          wraps=structure_service.get_full_project_structure) as full_scan:
+            project_service.get_project_structure()
+            project_service.get_project_structure()
+            project_service.get_project_statistics()
+            project_service.get_structure_counts()
+
+        assert full_scan.call_count == 1
+
+    def test_counts(self, project_service):
+        """Счетчики соответствуют структуре проекта."""
+        counts = project_service.get_structure_counts()
+
+        assert counts == {'files': 3, 'directories': 1, 'modules': 1}
+
+    def test_file_invalidation_reparses_only_that_file(self, project_service, project_dir):
+        """Сохранение файла обновляет статистику без полного сканирования."""
+        assert project_service.get_project_statistics()['functions'] == 1
+
+        main_file = project_dir / "main.py"
+        main_file.write_text("def main():\n    pass\n\n\ndef helper():\n    pass\n", encoding="utf-8")
+
+        structure_service = project_service.project_structure_service
+        with patch.object(structure_service, 'get_full_project_structure') as full_scan:
+            project_service.invalidate_structure(str(main_file))
+            stats = project_service.get_project_statistics()
+
+        full_scan.assert_not_called()
+        assert stats['functions'] == 2
+        assert stats['classes'] == 1
+        structure = project_service.get_project_structure()
+        assert 'helper' in structure['files']['main.py']['content']
+
+    def test_watcher_created_event_drops_cache(self, project_service, project_dir):
+        """Создание нового .py файла пересобирает структуру."""
+        project_service.get_project_structure()
+
+        new_file = project_dir / "pkg" / "views.py"
+        new_file.write_text("def view():\n    pass\n", encoding="utf-8")
+        project_service.notify_file_event('created', str(new_file))
+
+        assert project_service.get_structure_counts()['files'] == 4
+        assert project_service.get_project_statistics()['functions'] == 2
+
+    def test_events_outside_project_are_ignored(self, project_service, tmp_path_factory):
+        """События вне проекта не сбрасывают кэш."""
+        project_service.get_project_structure()
+        version = project_service.structure_cache.version
+
+        outside = tmp_path_factory.mktemp("other") / "x.py"
+        project_service.notify_file_event('created', str(outside))
+
+        assert project_service.structure_cache.version == version
+        assert project_service.structure_cache.is_valid
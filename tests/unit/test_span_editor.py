@@ -0,0 +1,135 @@
+# tests/unit/test_span_editor.py
+
+"""
+Тесты точечного редактирования кода по диапазонам AST.
+"""
+
+import pytest
+
+from core.business.ast_service import ASTService
+from core.business.code_service import CodeService
+from core.business.span_editor import SpanEditor
+from core.data.project_repository import ProjectRepository
+
+
+SOURCE = (
+    "import functools\n"
+    "\n"
+    "\n"
+    "# helper вызывается из process\n"
+    "def helper():\n"
+    "    return 'helper'\n"
+    "\n"
+    "\n"
+    "class Worker:\n"
+    "    @functools.lru_cache()\n"
+    "    def process(self):\n"
+    "        return helper()\n"
+    "\n"
+    "    def helper(self):\n"
+    "        return 'method'\n"
+    "\n"
+    "\n"
+    "def helper_two():\n"
+    "    pass\n"
+)
+
+
+class TestSpanEditor:
+    """Тесты поиска и правки диапазонов."""
+
+    def test_locate_includes_decorators(self):
+        """Диапазон метода начинается с декоратора."""
+        span = SpanEditor.locate(SOURCE, 'Worker.process')
+
+        assert (span.start_line, span.end_line, span.indent) == (10, 12, 4)
+        assert SOURCE[span.start_offset:span.end_offset].startswith("    @functools")
+
+    def test_no_false_matches(self):
+        """Имя в комментарии, вызове и более длинном имени не считается совпадением."""
+        new_source = SpanEditor.replace(SOURCE, SpanEditor.locate(SOURCE, 'helper'),
+                                        "def helper():\n    return 'new'")
+
+        assert "# helper вызывается из process" in new_source
+        assert "return helper()" in new_source
+        assert "def helper_two" in new_source
+        assert "return 'method'" in new_source
+        assert "return 'new'" in new_source
+
+    def test_ambiguous_nested_name(self):
+        """Неквалифицированное имя ищется сначала на верхнем уровне."""
+        assert SpanEditor.locate(SOURCE, 'helper').indent == 0
+        assert SpanEditor.locate(SOURCE, 'Worker.helper').indent == 4
+        assert SpanEditor.locate(SOURCE, 'helper', node_type='method').indent == 4
+
+    def test_function_does_not_match_method(self):
+        """Функция не находится среди методов класса."""
+        source = "class A:\n    def foo(self):\n        pass\n"
+
+        assert SpanEditor.locate(source, 'foo', 'function') is None
+        assert SpanEditor.locate(source, 'foo') is None
+        assert SpanEditor.locate(source, 'foo', 'method').start_line == 2
+        assert SpanEditor.locate(source, 'A.foo', 'function').start_line == 2
+
+    def test_replace_reindents_method(self):
+        """Код метода без отступа выравнивается по отступу заменяемого метода."""
+        span = SpanEditor.locate(SOURCE, 'Worker.helper')
+        new_source = SpanEditor.replace(SOURCE, span, "def helper(self):\n    return 'x'\n")
+
+        assert "    def helper(self):\n        return 'x'\n\n\ndef helper_two" in new_source
+        compile(new_source, "source.py", "exec")
+
+    def test_delete_keeps_spacing(self):
+        """Удаление не оставляет лишних пустых строк."""
+        new_source = SpanEditor.delete(SOURCE, SpanEditor.locate(SOURCE, 'helper_two'))
+        assert new_source.endswith("return 'method'\n\n\n")
+
+        new_source = SpanEditor.delete(SOURCE, SpanEditor.locate(SOURCE, 'Worker.process'))
+        assert "class Worker:\n    def helper(self):" in new_source
+        compile(new_source, "source.py", "exec")
+
+    def test_overlapping_edits_rejected(self):
+        """Пересекающиеся правки не применяются."""
+        outer = SpanEditor.locate(SOURCE, 'Worker')
+        inner = SpanEditor.locate(SOURCE, 'Worker.helper')
+
+        with pytest.raises(ValueError):
+            SpanEditor.apply(SOURCE, [(outer, "class Worker:\n    pass"), (inner, None)])
+
+    def test_span_from_stale_node(self, tmp_path):
+        """Если файл изменился после разбора, сущность ищется заново."""
+        path = tmp_path / "module.py"
+        path.write_text(SOURCE, encoding="utf-8")
+        module = ASTService().parse_module(str(path))
+        method = module.find_child('Worker', 'class').find_child('helper', 'method')
+
+        assert method.qualified_name == 'Worker.helper'
+        assert SpanEditor.span_from_node(SOURCE, method).start_line == method.start_line
+
+        shifted = "\n\n" + SOURCE
+        assert SpanEditor.span_from_node(shifted, method).start_line == method.start_line + 2
+
+
+class TestCodeServiceSpanEdits:
+    """Тесты замены и удаления в CodeService."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        path = tmp_path / "module.py"
+        path.write_text(SOURCE, encoding="utf-8")
+        return CodeService(ProjectRepository()), path
+
+    def test_replace_code(self, service):
+        code_service, path = service
+
+        assert code_service.replace_code(str(path), 'Worker.process',
+                                         "def process(self):\n    return 1")
+        content = path.read_text(encoding="utf-8")
+        assert "lru_cache" not in content
+        assert "    def process(self):\n        return 1\n" in content
+
+    def test_delete_missing_entity(self, service):
+        code_service, path = service
+
+        assert not code_service.delete_code(str(path), 'missing')
+        assert path.read_text(encoding="utf-8") == SOURCE
@@ -0,0 +1,65 @@
+# tests/unit/test_startup_profiler.py
+
+"""
+Тесты профилирования запуска (StartupProfiler, --profile-startup).
+"""
+
+import sys
+
+import pytest
+
+import main
+from gui.utils.startup_profiler import StartupProfiler
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """Пакет с вложенным импортом, еще не загруженный в sys.modules."""
+    root = tmp_path / "profiled_pkg"
+    root.mkdir()
+    (root / "__init__.py").write_text("from . import inner\n", encoding="utf-8")
+    (root / "inner.py").write_text("import time\ntime.sleep(0.02)\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "profiled_pkg"
+    for name in ("profiled_pkg", "profiled_pkg.inner"):
+        sys.modules.pop(name, None)
+
+
+class TestStartupProfiler:
+    """Тесты измерения импортов и отчета."""
+
+    def test_import_times(self, package):
+        profiler = StartupProfiler()
+        profiler.install()
+        finder = profiler._finder
+        try:
+            __import__(package)
+        finally:
+            profiler.uninstall()
+        times = {name: (own, total) for name, own, total in profiler.imports}
+
+        assert set(times) == {"profiled_pkg", "profiled_pkg.inner"}
+        assert times["profiled_pkg.inner"][0] >= 0.02
+        # Вложенный импорт входит в суммарное, но не в собственное время пакета
+        assert times["profiled_pkg"][1] >= times["profiled_pkg.inner"][1]
+        assert times["profiled_pkg"][0] < 0.02
+        assert finder not in sys.meta_path
+
+    def test_report(self, package, tmp_path):
+        profiler = StartupProfiler()
+        profiler.install()
+        __import__(package)
+        profiler.uninstall()
+        profiler.mark("Первая отрисовка окна")
+        path = tmp_path / "reports" / "startup.txt"
+
+        assert profiler.write_report(str(path))
+        report = path.read_text(encoding="utf-8")
+        assert "Первая отрисовка окна" in report
+        assert "Цель 300 мс" in report
+        assert "profiled_pkg.inner" in report
+
+    def test_command_line(self):
+        assert main.parse_args([]).profile_startup is None
+        assert main.parse_args(["--profile-startup"]).profile_startup == main.DEFAULT_PROFILE_REPORT
+        assert main.parse_args(["--profile-startup", "out.txt"]).profile_startup == "out.txt"
@@ -0,0 +1,106 @@
+# tests/unit/test_structural_diff.py
+
+"""
+Тесты структурного diff на уровне сущностей.
+"""
+
+from unittest.mock import patch
+
+from core.business.diff_engine import DiffEngine
+from core.business.line_diff import LineDiff
+
+
+OLD = '''import os
+
+
+def helper(a):
+    return a
+
+
+def legacy(items):
+    total = 0
+    for item in items:
+        total += item
+    return total
+
+
+class Worker(Base):
+    limit = 1
+
+    def run(self):
+        return 1
+
+    def stop(self):
+        pass
+'''
+
+NEW = '''import os
+import sys
+
+
+def helper(a, b):
+    return a
+
+
+def summarize(items):
+    total = 0
+    for item in items:
+        total += item
+    return total
+
+
+class Worker(Base):
+    limit = 1
+
+    def run(self):
+        # комментарий не считается изменением
+        return 2
+
+    def start(self):
+        pass
+'''
+
+
+class TestStructuralDiff:
+    """Тесты выравнивания сущностей."""
+
+    def test_entity_changes(self):
+        """Распознаются добавление, удаление, переименование, смена сигнатуры и тела."""
+        diffs = DiffEngine.generate_structural_diff(OLD, NEW)
+
+        assert [(d.kind, d.qualified_name) for d in diffs] == [
+            ('body_changed', 'imports'),
+            ('signature_changed', 'helper'),
+            ('renamed', 'summarize'),
+            ('body_changed', 'Worker.run'),
+            ('added', 'Worker.start'),
+            ('removed', 'Worker.stop'),
+        ]
+        assert diffs[2].old_name == 'legacy'
+        assert not diffs[1].body_changed
+
+    def test_line_diff_only_for_changed_entities(self):
+        """Построчный diff считается только для измененных сущностей."""
+        with patch.object(LineDiff, 'diff', wraps=LineDiff.diff) as line_diff:
+            diffs = DiffEngine.generate_structural_diff(OLD, NEW)
+
+        assert line_diff.call_count == 3
+        run = next(d for d in diffs if d.qualified_name == 'Worker.run')
+        assert ('delete', '        return 1\n') in run.line_diff
+        assert ('insert', '        return 2\n') in run.line_diff
+
+    def test_formatting_is_not_a_change(self):
+        """Изменение форматирования и комментариев не дает изменений."""
+        reformatted = OLD.replace("return a", "return (a)  # same")
+
+        assert DiffEngine.generate_structural_diff(OLD, reformatted) == []
+
+    def test_syntax_error_falls_back(self):
+        """Для неразбираемого кода структурный diff недоступен."""
+        assert DiffEngine.generate_structural_diff(OLD, "def broken(:\n") is None
+
+    def test_format(self):
+        text = DiffEngine.format_structural_diff(DiffEngine.generate_structural_diff(OLD, NEW))
+
+        assert "> функция legacy переименован(а) в summarize" in text
+        assert "+ метод Worker.start добавлен(а)" in text
@@ -0,0 +1,114 @@
+# tests/unit/test_template_registry.py
+
+"""
+Тесты реестра шаблонов проектов (TemplateRegistry).
+"""
+
+import time
+
+import pytest
+
+from core.business.project_creator_service import ProjectCreatorService
+from core.business.template_registry import TemplateRegistry
+
+
+@pytest.fixture
+def templates(tmp_path):
+    root = tmp_path / "templates" / "app"
+    (root / "pkg" / "data").mkdir(parents=True)
+    (root / "template_info.json").write_text(
+        '// templates/app/template_info.json\n{"name": "app", "description": "Тестовый шаблон"}\n',
+        encoding="utf-8"
+    )
+    (root / "main.py").write_text(
+        '# templates/app/main.py\n\nprint(f"{project_name}: {e}")\n', encoding="utf-8"
+    )
+    (root / "pkg" / "util.py").write_text("def util():\n    return 1\n", encoding="utf-8")
+    (root / "pkg" / "data" / "blob.bin").write_bytes(bytes(range(256)) * 10)
+    return tmp_path / "templates"
+
+
+class TestTemplateRegistry:
+    """Тесты манифестов и создания проектов."""
+
+    def test_manifest(self, templates):
+        registry = TemplateRegistry(str(templates))
+        manifest = registry.get("app")
+
+        assert registry.names() == ["app"]
+        assert manifest.description == "Тестовый шаблон"
+        assert [item.path for item in manifest.files] == ["main.py", "pkg/util.py", "pkg/data/blob.bin"]
+        assert manifest.directories == ["pkg", "pkg/data"]
+        # Только известные подстановки: {e} из f-строки не трогается
+        assert manifest.placeholders == ["project_name"]
+
+    def test_scanned_once(self, templates):
+        registry = TemplateRegistry(str(templates))
+        registry.names()
+        registry.get("app")
+        registry.get("missing")
+
+        assert registry.scan_count == 1
+
+    def test_instantiate(self, templates, tmp_path):
+        registry = TemplateRegistry(str(templates))
+        result = registry.instantiate("app", str(tmp_path / "out"), {'project_name': "demo"})
+
+        assert result.success
+        assert result.rendered == ["main.py"]
+        assert sum(result.copied.values()) == 2
+        assert (tmp_path / "out" / "main.py").read_text(encoding="utf-8") == 'print(f"demo: {e}")\n'
+        assert (tmp_path / "out" / "pkg" / "data" / "blob.bin").read_bytes() == bytes(range(256)) * 10
+        assert not (tmp_path / "out" / "template_info.json").exists()
+
+    def test_non_empty_target_refused(self, templates, tmp_path):
+        (tmp_path / "out").mkdir()
+        (tmp_path / "out" / "keep.txt").write_text("x", encoding="utf-8")
+
+        assert TemplateRegistry(str(templates)).instantiate("app", str(tmp_path / "out")) is None
+
+    def test_manifest_cache_file(self, templates, tmp_path):
+        """Неизмененные файлы не перечитываются при следующем запуске."""
+        cache_file = str(tmp_path / "cache.json")
+        TemplateRegistry(str(templates), cache_file=cache_file).names()
+        (templates / "app" / "pkg" / "util.py").write_text("{project_name}\n", encoding="utf-8")
+
+        manifest = TemplateRegistry(str(templates), cache_file=cache_file).get("app")
+        items = {item.path: item for item in manifest.files}
+
+        assert items["pkg/util.py"].placeholders == ["project_name"]
+        assert items["main.py"].text is not None
+
+    def test_large_template(self, tmp_path):
+        root = tmp_path / "templates" / "big"
+        for index in range(2000):
+            directory = root / f"d{index % 20}"
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / f"f{index}.py").write_text(f"VALUE = {index}\n", encoding="utf-8")
+        registry = TemplateRegistry(str(tmp_path / "templates"))
+        registry.get("big")
+
+        started = time.perf_counter()
+        result = registry.instantiate("big", str(tmp_path / "out"))
+
+        assert result.success and sum(result.copied.values()) == 2000
+        assert time.perf_counter() - started < 10
+        assert (tmp_path / "out" / "d7" / "f1907.py").read_text(encoding="utf-8") == "VALUE = 1907\n"
+
+    def test_creator_uses_registry(self, templates, tmp_path):
+        creator = ProjectCreatorService(template_registry=TemplateRegistry(str(templates)))
+
+        assert creator.create_project_from_template("app", str(tmp_path), "demo")
+        assert (tmp_path / "demo" / "pkg" / "util.py").exists()
+        assert not creator.create_project_from_template("missing", str(tmp_path), "other")
+        assert creator.last_error == "Шаблон не найден: missing"
+
+    def test_creator_keeps_existing_directory(self, templates, tmp_path):
+        creator = ProjectCreatorService(template_registry=TemplateRegistry(str(templates)))
+        (tmp_path / "demo").mkdir()
+        (tmp_path / "demo" / "main.py").write_text("# mine\n", encoding="utf-8")
+
+        assert not creator.create_project_from_template("app", str(tmp_path), "demo")
+        assert creator.last_error.startswith("Каталог проекта не пуст")
+        assert (tmp_path / "demo" / "main.py").read_text(encoding="utf-8") == "# mine\n"
+        assert not (tmp_path / "demo" / "pkg").exists()
@@ -0,0 +1,165 @@
+# tests/unit/test_undo_manager.py
+
+"""
+Тесты отмены и повтора примененных изменений (UndoManager).
+"""
+
+import os
+
+import pytest
+from unittest.mock import patch
+
+from core.business.change_service import ChangeManager, PendingChange
+from core.business.undo_manager import FilePatch, UndoManager
+from core.data.file_provider import FileProvider
+from core.data.project_repository import ProjectRepository
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "a.py").write_text(
+        "def first():\n    return 1\n\n\ndef second():\n    return 2\n", encoding="utf-8"
+    )
+    (tmp_path / "b.py").write_text(
+        "class Worker:\n    def run(self):\n        return 'old'\n", encoding="utf-8"
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def manager(project, tmp_path_factory):
+    """ChangeManager с подключенным UndoManager."""
+    repository = ProjectRepository()
+    change_manager = ChangeManager(repository, journal_dir=str(tmp_path_factory.mktemp("journal")))
+    change_manager.undo_manager = UndoManager(repository,
+                                              journal_dir=str(tmp_path_factory.mktemp("undo_journal")))
+    return change_manager
+
+
+def apply_integration(manager, project):
+    """Применяет изменения сразу в трех файлах (один из них новый)."""
+    manager.add_change(PendingChange('replace', 'first', "def first():\n    return 10",
+                                     file_path=str(project / "a.py")))
+    manager.add_change(PendingChange('replace', 'Worker', "class Worker:\n    pass",
+                                     file_path=str(project / "b.py")))
+    manager.add_change(PendingChange('add', 'helper', "def helper():\n    pass",
+                                     file_path=str(project / "c.py")))
+    success, _ = manager.apply_all_changes()
+    assert success
+
+
+class TestFilePatch:
+    """Тесты патча одного файла."""
+
+    def test_revert_and_reapply(self):
+        """Обратные и прямые области восстанавливают обе версии."""
+        before = "".join(f"line {i}\n" for i in range(200))
+        after = before.replace("line 50\n", "changed\n").replace("line 150\n", "")
+        file_patch = FilePatch.from_versions("x.py", before, after)
+
+        assert file_patch.revert(after) == before
+        assert file_patch.reapply(before) == after
+        # Хранятся только измененные области, а не файл целиком
+        assert file_patch.size < len(before) / 4
+
+    def test_created_file(self):
+        """Отмена созданного файла удаляет его."""
+        file_patch = FilePatch.from_versions("x.py", None, "print(1)\n")
+
+        assert file_patch.revert("print(1)\n") is None
+        assert file_patch.reapply(None) == "print(1)\n"
+
+    def test_round_trip_dict(self):
+        file_patch = FilePatch.from_versions("x.py", "a\nb\n", "a\nc\n")
+        restored = FilePatch.from_dict(file_patch.to_dict())
+
+        assert restored.revert("a\nc\n") == "a\nb\n"
+        assert restored.after_hash == file_patch.after_hash
+
+
+class TestUndoManager:
+    """Тесты стеков отмены и повтора."""
+
+    def test_undo_multi_file_integration(self, manager, project):
+        """Отмена возвращает все файлы транзакции, повтор применяет их снова."""
+        original_a = (project / "a.py").read_text(encoding="utf-8")
+        original_b = (project / "b.py").read_text(encoding="utf-8")
+        apply_integration(manager, project)
+        applied_a = (project / "a.py").read_text(encoding="utf-8")
+        undo = manager.undo_manager
+
+        success, files = undo.undo()
+        assert success
+        assert len(files) == 3
+        assert (project / "a.py").read_text(encoding="utf-8") == original_a
+        assert (project / "b.py").read_text(encoding="utf-8") == original_b
+        assert not (project / "c.py").exists()
+        assert undo.can_redo and not undo.can_undo
+
+        success, _ = undo.redo()
+        assert success
+        assert (project / "a.py").read_text(encoding="utf-8") == applied_a
+        assert (project / "c.py").read_text(encoding="utf-8") == "def helper():\n    pass\n"
+
+    def test_modified_file_blocks_undo(self, manager, project):
+        """Файл изменен после применения: отмена не трогает ни один файл."""
+        apply_integration(manager, project)
+        applied_b = (project / "b.py").read_text(encoding="utf-8")
+        (project / "a.py").write_text("edited\n", encoding="utf-8")
+
+        success, files = manager.undo_manager.undo()
+
+        assert not success and files == []
+        assert "a.py" in manager.undo_manager.last_error
+        assert (project / "b.py").read_text(encoding="utf-8") == applied_b
+        assert (project / "c.py").exists()
+        assert manager.undo_manager.can_undo
+
+    def test_write_failure_rolls_back(self, manager, project):
+        """Сбой записи одного файла откатывает уже восстановленные."""
+        apply_integration(manager, project)
+        applied = {name: (project / name).read_text(encoding="utf-8") for name in ("a.py", "b.py")}
+        original_write = FileProvider.write_file_atomic
+
+        def failing_write(file_path, content):
+            if file_path.endswith("b.py"):
+                return False
+            return original_write(file_path, content)
+
+        with patch.object(FileProvider, 'write_file_atomic', side_effect=failing_write):
+            success, _ = manager.undo_manager.undo()
+
+        assert not success
+        for name, content in applied.items():
+            assert (project / name).read_text(encoding="utf-8") == content
+        assert (project / "c.py").exists()
+
+    def test_new_record_clears_redo(self, manager, project):
+        apply_integration(manager, project)
+        manager.undo_manager.undo()
+        manager.undo_manager.record("правка", {str(project / "a.py"): ("x\n", "y\n")})
+
+        assert not manager.undo_manager.can_redo
+
+    def test_spill_to_disk(self, tmp_path):
+        """При превышении лимита памяти старые патчи выгружаются и читаются с диска."""
+        path = tmp_path / "big.py"
+        versions = ["".join(f"v{version} line {i}\n" for i in range(500)) for version in range(4)]
+        path.write_text(versions[-1], encoding="utf-8")
+        undo = UndoManager(memory_limit=20000, spill_dir=str(tmp_path / "spill"),
+                           journal_dir=str(tmp_path / "journal"))
+        for before, after in zip(versions, versions[1:]):
+            undo.record("шаг", {str(path): (before, after)})
+
+        assert undo.memory_usage <= 20000
+        assert os.listdir(tmp_path / "spill")
+        for _ in range(3):
+            assert undo.undo()[0]
+        assert path.read_text(encoding="utf-8") == versions[0]
+
+    def test_max_depth(self, tmp_path):
+        undo = UndoManager(max_depth=2)
+        for step in range(5):
+            undo.record("шаг", {str(tmp_path / "x.py"): (f"{step}\n", f"{step + 1}\n")})
+
+        assert len(undo._undo) == 2
@@ -0,0 +1,92 @@
+# tests/unit/test_workspace_service.py
+
+"""
+Тесты рабочего пространства из нескольких проектов (WorkspaceService).
+"""
+
+import pytest
+from unittest.mock import patch
+
+from core.business.workspace_service import WorkspaceService
+
+
+def _make_project(root, name, functions=1):
+    project = root / name
+    project.mkdir()
+    body = "\n\n".join(f"def func_{i}():\n    return {i}\n" for i in range(functions))
+    (project / "main.py").write_text(body, encoding="utf-8")
+    return project
+
+
+@pytest.fixture
+def projects(tmp_path):
+    return [_make_project(tmp_path, f"service_{i}", functions=i + 1) for i in range(3)]
+
+
+class TestWorkspaceService:
+    """Тесты переключения проектов и бюджета памяти."""
+
+    def test_switching_back_keeps_parsed_state(self, projects):
+        """Повторное открытие проекта не пересобирает его структуру."""
+        workspace = WorkspaceService()
+        first = workspace.open_project(str(projects[0]))
+        first.get_project_structure()
+
+        workspace.open_project(str(projects[1])).get_project_structure()
+
+        structure_service = first.project_structure_service
+        with patch.object(structure_service, 'get_full_project_structure') as full_scan:
+            again = workspace.open_project(str(projects[0]))
+            stats = again.get_project_statistics()
+
+        assert again is first
+        full_scan.assert_not_called()
+        assert stats['functions'] == 1
+        assert workspace.get_active_project() is first
+
+    def test_parse_cache_is_shared(self, projects):
+        """Выгруженный проект перестраивается из общего кэша парсинга."""
+        workspace = WorkspaceService()
+        service = workspace.open_project(str(projects[0]))
+        service.get_project_structure()
+        parsed = len(workspace.parse_cache)
+
+        service.invalidate_structure()
+        service.get_project_structure()
+
+        assert len(workspace.parse_cache) == parsed
+        assert workspace.parse_cache.hits >= 1
+
+    def test_memory_budget_evicts_least_recently_used(self, projects):
+        """При превышении бюджета выгружается давно не использованный неактивный проект."""
+        workspace = WorkspaceService(memory_budget=10 ** 9)
+        services = []
+        for project in projects:
+            service = workspace.open_project(str(project))
+            service.get_project_structure()
+            services.append(service)
+
+        workspace.activate(str(projects[1]))
+        estimates = [entry['memory_estimate'] for entry in workspace.list_projects()]
+        assert estimates[0] > services[0].structure_cache.memory_estimate
+        workspace.memory_budget = estimates[1] + estimates[2]
+
+        evicted = workspace.enforce_memory_budget()
+
+        assert len(evicted) == 1
+        assert services[0].structure_cache.peek() is None
+        assert workspace.parse_cache.size_under(str(projects[0])) == 0
+        assert workspace.memory_usage <= workspace.memory_budget
+        assert services[1].structure_cache.peek() is not None
+        assert services[2].structure_cache.peek() is not None
+
+    def test_close_project(self, projects):
+        """Закрытый проект удаляется из рабочего пространства."""
+        workspace = WorkspaceService()
+        workspace.open_project(str(projects[0])).get_project_structure()
+        assert workspace.parse_cache.size_under(str(projects[0])) > 0
+
+        assert workspace.close_project(str(projects[0]))
+        assert workspace.get_active_project() is None
+        assert workspace.list_projects() == []
+        assert workspace.parse_cache.size_under(str(projects[0])) == 0
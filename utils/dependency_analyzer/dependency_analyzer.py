@@ -10,13 +10,11 @@ import sys
 from pathlib import Path
 from collections import defaultdict
 import subprocess
+import importlib.util
 from typing import Dict, List, Set, Tuple
 
-try:
-    import graphviz
-    HAS_GRAPHVIZ = True
-except ImportError:
-    HAS_GRAPHVIZ = False
+# graphviz импортируется при построении графа; здесь - только проверка наличия
+HAS_GRAPHVIZ = importlib.util.find_spec('graphviz') is not None
 
 class ModuleDependencyAnalyzer:
     def __init__(self, root_dir: str, exclude_dirs: List[str] = None):
@@ -121,6 +119,8 @@ class ModuleDependencyAnalyzer:
             print("Установите graphviz: pip install graphviz")
             return
         
+        import graphviz
+        
         # Создаем граф
         dot = graphviz.Digraph(comment='Module Dependencies',
                               format=output_format,
@@ -8,14 +8,16 @@ import ast
 import sys
 from pathlib import Path
 from collections import defaultdict, deque
-from typing import Dict, List, Set, Tuple, Optional, Any
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple, Optional, Any
+from datetime import datetime
 import argparse
 import time
 
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+    from openpyxl.styles import Border
+
+
 class OptimizedDependencyReporter:
     def __init__(self, root_path: str, exclude_dirs: List[str] = None):
         self.root_path = Path(root_path).absolute()
@@ -266,7 +268,9 @@ class OptimizedDependencyReporter:
             print("⚠️  Не найдено межмодульных зависимостей для отчета")
             return
         
-        # Создаем Excel файл
+        # Создаем Excel файл; openpyxl загружается только для отчета,
+        # анализ зависимостей и консольная сводка работают без него
+        from openpyxl import Workbook
         wb = Workbook()
         
         # 1. Лист с детальными связями
@@ -288,8 +292,10 @@ class OptimizedDependencyReporter:
         print(f"✅ Отчет сохранен: {output_file}")
         self._print_console_summary()
     
-    def _create_detailed_sheet(self, wb: Workbook) -> None:
+    def _create_detailed_sheet(self, wb: "Workbook") -> None:
         """Создает лист с детальными связями."""
+        from openpyxl.styles import PatternFill, Font, Alignment
+        from openpyxl.utils import get_column_letter
         ws = wb.create_sheet(title="Межмодульные связи")
         
         # Заголовки
@@ -344,8 +350,10 @@ class OptimizedDependencyReporter:
         ws.freeze_panes = 'A2'
         ws.auto_filter.ref = ws.dimensions
     
-    def _create_matrix_sheet(self, wb: Workbook) -> None:
+    def _create_matrix_sheet(self, wb: "Workbook") -> None:
         """Создает лист с матрицей связей."""
+        from openpyxl.styles import PatternFill, Font, Alignment
+        from openpyxl.utils import get_column_letter
         ws = wb.create_sheet(title="Матрица связей")
         
         # Получаем все модули с связями
@@ -444,8 +452,9 @@ class OptimizedDependencyReporter:
         
         ws.freeze_panes = 'C3'
     
-    def _create_summary_sheet(self, wb: Workbook) -> None:
+    def _create_summary_sheet(self, wb: "Workbook") -> None:
         """Создает лист со сводкой."""
+        from openpyxl.styles import Font
         ws = wb.create_sheet(title="Сводка")
         
         # Заголовок
@@ -458,7 +467,7 @@ class OptimizedDependencyReporter:
         
         stats = [
             ("Проект", str(self.root_path)),
-            ("Дата анализа", pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")),
+            ("Дата анализа", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
             ("Время анализа", f"{self.stats['analysis_time']:.2f} сек."),
             ("Всего модулей", self.stats['total_modules']),
             ("Межмодульных связей", self.stats['inter_module_relations']),
@@ -522,8 +531,9 @@ class OptimizedDependencyReporter:
         }
         return colors.get(relation_type, 'FFFFFF')
     
-    def _thin_border(self) -> Border:
+    def _thin_border(self) -> "Border":
         """Создает тонкую границу."""
+        from openpyxl.styles import Border, Side
         return Border(
             left=Side(style='thin'),
             right=Side(style='thin'),
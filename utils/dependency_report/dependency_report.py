@@ -9,13 +9,14 @@ import ast
 import sys
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple, Optional, Any
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple, Optional, Any
 import argparse
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from openpyxl import Workbook
+
+
 class DependencyReporter:
     def __init__(self, root_path: str, exclude_dirs: List[str] = None):
         """
@@ -394,7 +395,9 @@ class DependencyReporter:
             print("⚠️  Не найдено зависимостей для отчета")
             return
         
-        # Создаем DataFrame
+        # Создаем DataFrame; pandas и openpyxl загружаются только для отчета,
+        # анализ зависимостей работает без них
+        import pandas as pd
         df = pd.DataFrame(all_relations)
         
         # Сортируем по типу связи
@@ -409,8 +412,10 @@ class DependencyReporter:
         # Выводим сводку
         self._print_summary(df)
     
-    def _create_formatted_excel(self, df: pd.DataFrame, output_file: str) -> None:
+    def _create_formatted_excel(self, df: "pd.DataFrame", output_file: str) -> None:
         """Создает форматированный Excel-файл."""
+        from openpyxl import Workbook
+        from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
         wb = Workbook()
         ws = wb.active
         ws.title = "Зависимости модулей"
@@ -527,8 +532,9 @@ class DependencyReporter:
         }
         return colors.get(relation_type, 'FFFFFF')
     
-    def _create_summary_sheet(self, wb: Workbook) -> None:
+    def _create_summary_sheet(self, wb: "Workbook") -> None:
         """Создает лист со сводкой."""
+        from openpyxl.styles import Font, Alignment
         ws_summary = wb.create_sheet(title="Сводка")
         
         # Заголовок
@@ -585,7 +591,7 @@ class DependencyReporter:
         ws_summary.column_dimensions['A'].width = 30
         ws_summary.column_dimensions['B'].width = 20
     
-    def _print_summary(self, df: pd.DataFrame) -> None:
+    def _print_summary(self, df: "pd.DataFrame") -> None:
         """Выводит сводку в консоль."""
         print(f"\n📋 СВОДКА ОТЧЕТА:")
         print(f"{'='*60}")